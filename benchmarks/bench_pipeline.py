@@ -0,0 +1,284 @@
+"""
+End-to-end scrape -> filter -> download throughput against a local fake X.
+
+Starts benchmarks.fake_x_server in a subprocess (synthetic UserMedia pages,
+CDN media of configurable size/latency/429 rate) and runs
+run_account_pipeline() for one account into a temporary download root.
+
+twscrape only talks to the real x.com GraphQL endpoint, so the scraper is
+swapped for LocalUserMediaScraper: the same paging loop (throttle, rate gate,
+loads_page + parse_user_media_page, stop-at-synced) over the local server.
+Everything after the scraper - prefetch, Filter Engine, AsyncMediaDownloader,
+retry/Range resume, hash index, checkpoints - is the production code path.
+
+Reports files/s, MiB/s, time to first file on disk, peak RSS and how many
+429s the server sent. Throttles and global rate caps are off by default, so
+the numbers show the pipeline itself; --production-limits keeps the defaults.
+
+Usage:
+    python -m benchmarks.bench_pipeline [--tweets 500] [--image-kb 300] [--workers 4] [--rate-429 0.05]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, AsyncIterator, Optional
+from unittest.mock import patch
+from urllib.parse import quote
+
+from src.backend.downloader.async_downloader import AsyncMediaDownloader
+from src.backend.downloader.downloader import DownloadResult, DownloadStatus, FetchedMedia
+from src.backend.net.async_http import shared_async_client
+from src.backend.net.governor import RateGate, RateLimitConfig
+from src.backend.net.retry import RetryConfig
+from src.backend.net.throttle import Throttle, ThrottleConfig
+from src.backend.pipeline import account_runner
+from src.backend.scheduler.models import Run
+from src.backend.scraper.twscrape_scraper import ScrapePage, drop_synced_tweets
+from src.backend.scraper.user_media_parser import loads_page, parse_user_media_page
+from src.backend.settings.models import Credentials, GlobalSettings
+from src.backend.settings.store import SettingsStore
+from src.shared.task_status import TaskStatus
+
+from .fake_x_server import add_server_arguments
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore[assignment]
+
+
+class LocalUserMediaScraper:
+    """TwscrapeMediaScraper stand-in that pages the fake server's UserMedia endpoint."""
+
+    base_url = ""
+
+    def __init__(
+        self,
+        *,
+        credentials: Credentials,
+        proxy: Optional[str] = None,
+        throttle: Optional[Throttle] = None,
+        rate_gate: Optional[RateGate] = None,
+        session: Any = None,
+        **_: Any,
+    ) -> None:
+        self._throttle = throttle
+        self._rate_gate = rate_gate
+
+    async def iter_user_media_pages(
+        self,
+        *,
+        handle: str,
+        max_pages: Optional[int] = None,
+        stop_at_tweet_id: Optional[int] = None,
+        start_cursor: Optional[str] = None,
+    ) -> AsyncIterator[ScrapePage]:
+        client = shared_async_client(None)
+        cursor = start_cursor or None
+        page_count = 0
+        while True:
+            if self._throttle is not None:
+                await self._throttle.wait_async()
+            if self._rate_gate is not None:
+                await self._rate_gate.api_request()
+
+            url = f"{self.base_url}/graphql/UserMedia"
+            if cursor:
+                url += f"?cursor={quote(cursor)}"
+            resp = await client.get(url, headers={"Accept": "application/json"})
+            if self._throttle is not None:
+                self._throttle.record_response(resp.status_code, resp.headers)
+            resp.raise_for_status()
+            body = resp.content
+
+            parsed = parse_user_media_page(loads_page(body))
+            tweets = parsed.tweets
+            reached_synced = False
+            if stop_at_tweet_id is not None:
+                tweets, reached_synced = drop_synced_tweets(tweets, stop_at_tweet_id)
+
+            page_count += 1
+            yield ScrapePage(tweets=tuple(tweets), bottom_cursor=parsed.bottom_cursor)
+
+            if reached_synced or not parsed.bottom_cursor:
+                break
+            if max_pages is not None and page_count >= int(max_pages):
+                break
+            cursor = parsed.bottom_cursor
+
+
+class _TimedDownloader(AsyncMediaDownloader):
+    """Records when the first file is committed to disk."""
+
+    first_file_at: Optional[float] = None
+
+    def commit(self, fetched: FetchedMedia) -> DownloadResult:
+        result = super().commit(fetched)
+        if result.status == DownloadStatus.SUCCESS and _TimedDownloader.first_file_at is None:
+            _TimedDownloader.first_file_at = time.perf_counter()
+        return result
+
+
+def _max_rss_mib() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # KiB on Linux, bytes on macOS.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _start_server(args: argparse.Namespace) -> tuple[subprocess.Popen, str]:
+    cmd = [sys.executable, "-m", "benchmarks.fake_x_server", "--port", "0"]
+    for name in (
+        "tweets",
+        "page_size",
+        "media_per_tweet",
+        "video_ratio",
+        "image_kb",
+        "video_kb",
+        "api_latency_ms",
+        "media_latency_ms",
+        "rate_429",
+        "retry_after_s",
+        "seed",
+    ):
+        cmd += [f"--{name.replace('_', '-')}", str(getattr(args, name))]
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, text=True, cwd=Path(__file__).resolve().parent.parent)
+    line = proc.stdout.readline().strip() if proc.stdout else ""
+    if not line.startswith("listening on "):
+        proc.kill()
+        raise RuntimeError(f"fake X server failed to start: {line!r}")
+    return proc, line.removeprefix("listening on ")
+
+
+def _server_stats(base_url: str) -> dict[str, int]:
+    from urllib.request import urlopen
+
+    with urlopen(f"{base_url}/stats", timeout=5) as resp:
+        return json.loads(resp.read())
+
+
+def _settings(root: Path, args: argparse.Namespace) -> GlobalSettings:
+    off = ThrottleConfig(enabled=False)
+    return GlobalSettings(
+        credentials=Credentials(auth_token="bench", ct0="bench"),
+        download_root=str(root / "downloads"),
+        download_workers=args.workers,
+        throttle=None if args.production_limits else off,
+        media_throttle=None if args.production_limits else off,
+        retry=RetryConfig(base_delay_s=args.retry_base_delay_s),
+        rate_limits=None if args.production_limits else RateLimitConfig(enabled=False),
+    )
+
+
+def run_once(base_url: str, args: argparse.Namespace) -> dict[str, Any]:
+    with tempfile.TemporaryDirectory(prefix="xmc-bench-") as tmp:
+        root = Path(tmp)
+        store = SettingsStore(path=root / "config.json")
+        store.save(_settings(root, args))
+        now = datetime.now(timezone.utc)
+        run = Run(
+            run_id="bench",
+            handle="benchuser",
+            kind="start",
+            account_config={},
+            status=TaskStatus.QUEUED,
+            created_at=now,
+            updated_at=now,
+        )
+
+        LocalUserMediaScraper.base_url = base_url
+        _TimedDownloader.first_file_at = None
+        rss_before = _max_rss_mib()
+        with patch.object(account_runner, "TwscrapeMediaScraper", LocalUserMediaScraper), patch.object(
+            account_runner, "AsyncMediaDownloader", _TimedDownloader
+        ):
+            start = time.perf_counter()
+            error = None
+            try:
+                asyncio.run(account_runner.run_account_pipeline(run=run, store=store))
+            except RuntimeError as exc:  # e.g. "download failures" after exhausted 429 retries
+                error = str(exc)
+            elapsed = time.perf_counter() - start
+
+        stats = run.download_stats or {}
+        files = int(stats.get("images_downloaded", 0)) + int(stats.get("videos_downloaded", 0))
+        mib = int(stats.get("total_bytes", 0)) / (1024 * 1024)
+        first = _TimedDownloader.first_file_at
+        return {
+            "elapsed_s": elapsed,
+            "files": files,
+            "failed": int(stats.get("failed", 0)),
+            "files_per_s": files / elapsed if elapsed else 0.0,
+            "mib": mib,
+            "mib_per_s": mib / elapsed if elapsed else 0.0,
+            "time_to_first_file_s": (first - start) if first is not None else None,
+            "rss_before_mib": rss_before,
+            "peak_rss_mib": _max_rss_mib(),
+            "error": error,
+        }
+
+
+def _fmt(value: Optional[float], spec: str) -> str:
+    return "n/a" if value is None else format(value, spec)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_server_arguments(parser)
+    parser.add_argument("--workers", type=int, default=4, help="settings.download_workers")
+    parser.add_argument("--retry-base-delay-s", type=float, default=0.1, help="retry backoff base (production: 2s)")
+    parser.add_argument(
+        "--production-limits",
+        action="store_true",
+        help="keep the default API/media throttles and global rate caps",
+    )
+    parser.add_argument("--json", action="store_true", help="print the result as JSON")
+    args = parser.parse_args(argv)
+
+    proc, base_url = _start_server(args)
+    try:
+        result = run_once(base_url, args)
+        result["server"] = _server_stats(base_url)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+
+    server = result["server"]
+    print(
+        f"tweets={args.tweets} page_size={args.page_size} workers={args.workers} "
+        f"image={args.image_kb}KiB video={args.video_kb}KiB video_ratio={args.video_ratio} "
+        f"latency(api/media)={args.api_latency_ms:.0f}/{args.media_latency_ms:.0f}ms rate_429={args.rate_429}"
+    )
+    print(f"  elapsed             {result['elapsed_s']:8.2f} s")
+    print(f"  files               {result['files']:8d}  ({result['failed']} failed)")
+    print(f"  files/s             {result['files_per_s']:8.1f}")
+    print(f"  MiB/s               {result['mib_per_s']:8.1f}  ({result['mib']:.1f} MiB)")
+    print(f"  time to first file  {_fmt(result['time_to_first_file_s'], '8.3f')} s")
+    print(
+        f"  peak RSS            {_fmt(result['peak_rss_mib'], '8.1f')} MiB"
+        f"  (before run: {_fmt(result['rss_before_mib'], '.1f')} MiB)"
+    )
+    print(
+        f"  server              {server['api_requests']} API pages, "
+        f"{server['media_requests']} media requests, {server['media_429']} answered 429"
+    )
+    if result["error"]:
+        print(f"  run error: {result['error']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Memory footprint of a large parsed timeline.
+
+Compares, for N synthetic media (snowflake IDs, pbs/video CDN URLs, about 1.3
+media per tweet, some quotes):
+
+- list[Tweet] with per-instance __dict__ (the previous model layout);
+- list[Tweet] with __slots__ (current models);
+- TweetBatch (columnar);
+- the sorted DownloadIntent tuple produced by apply_filters().
+
+Usage:
+    python -m benchmarks.bench_tweet_memory [--media 100000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Optional
+
+from src.shared.filter_engine import FilterConfig, MediaKind, TweetBatch, apply_filters
+
+from .synthetic import synthetic_tweets
+
+
+@dataclass(frozen=True)
+class _DictMediaCandidate:
+    media_id: str
+    kind: MediaKind
+    url: str
+    width: Optional[int] = None
+    height: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class _DictTweet:
+    tweet_id: str
+    created_at: datetime
+    is_reply: bool = False
+    is_retweet: bool = False
+    quoted_tweet: Optional["_DictTweet"] = None
+    media: tuple[_DictMediaCandidate, ...] = ()
+
+
+def measure(build: Callable[[], Any]) -> tuple[Any, int]:
+    """(result, bytes allocated by `build` that are still alive)."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        result = build()
+        gc.collect()
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, after - before
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--media", type=int, default=100_000, help="number of media in the synthetic timeline")
+    args = parser.parse_args(argv)
+
+    rows: list[tuple[str, int]] = []
+
+    _, size = measure(lambda: synthetic_tweets(args.media, tweet_cls=_DictTweet, media_cls=_DictMediaCandidate))
+    rows.append(("list[Tweet] (__dict__)", size))
+
+    tweets, size = measure(lambda: synthetic_tweets(args.media))
+    rows.append(("list[Tweet] (__slots__)", size))
+
+    batch, size = measure(lambda: TweetBatch.from_tweets(tweets))
+    rows.append(("TweetBatch", size))
+
+    _, size = measure(lambda: apply_filters(batch, FilterConfig()).intents)
+    rows.append(("FilterResult.intents", size))
+
+    print(f"{len(tweets)} tweets, {args.media} media")
+    print(f"{'structure':<26}{'MiB':>10}{'bytes/media':>14}")
+    for name, size in rows:
+        print(f"{name:<26}{size / 2**20:>10.1f}{size / args.media:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
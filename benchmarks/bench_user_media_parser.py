@@ -0,0 +1,73 @@
+"""
+UserMedia page parsing cost on artifacts/samples/x_timeline_user_media_sample.json.
+
+Reports microseconds per page for:
+
+- decoding the response body (json, and orjson when installed);
+- the two-call API (parse_user_media_tweets + extract_bottom_cursor);
+- the single-pass parse_user_media_page(), with cold caches (timestamp and
+  image URL caches cleared before every page) and warm caches.
+
+Usage:
+    python -m benchmarks.bench_user_media_parser [--repeat 5000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+from src.backend.scraper import user_media_parser as parser_mod
+
+SAMPLE = Path(__file__).resolve().parents[1] / "artifacts" / "samples" / "x_timeline_user_media_sample.json"
+
+
+def per_call_us(repeat: int, fn: Callable[[], object]) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat * 1e6
+
+
+def _clear_caches() -> None:
+    parser_mod._parse_created_at_str.cache_clear()
+    parser_mod._upgrade_pbs_image_url.cache_clear()
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5000, help="pages parsed per measurement")
+    args = parser.parse_args(argv)
+
+    body = SAMPLE.read_bytes()
+    page = json.loads(body)
+
+    def two_calls() -> None:
+        parser_mod.parse_user_media_tweets(page)
+        parser_mod.extract_bottom_cursor(page)
+
+    def single_pass_cold() -> None:
+        _clear_caches()
+        parser_mod.parse_user_media_page(page)
+
+    rows = [("json.loads", per_call_us(args.repeat, lambda: json.loads(body)))]
+    if parser_mod._orjson is not None:
+        rows.append(("orjson.loads", per_call_us(args.repeat, lambda: parser_mod._orjson.loads(body))))
+    else:
+        rows.append(("orjson.loads", float("nan")))
+    rows.append(("tweets + cursor (2 calls)", per_call_us(args.repeat, two_calls)))
+    rows.append(("parse_user_media_page, cold", per_call_us(args.repeat, single_pass_cold)))
+    rows.append(("parse_user_media_page, warm", per_call_us(args.repeat, lambda: parser_mod.parse_user_media_page(page))))
+
+    print(f"{SAMPLE.name}: {len(body)} bytes, {len(parser_mod.parse_user_media_tweets(page))} tweets")
+    print(f"{'step':<30}{'us/page':>10}")
+    for name, us in rows:
+        label = "not installed" if us != us else f"{us:.1f}"
+        print(f"{name:<30}{label:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+"""
+Local stand-in for X: synthetic UserMedia GraphQL pages + CDN media.
+
+- `GET /graphql/UserMedia?cursor=<n>` returns page n (newest first) in the
+  UserMedia response layout (TimelineAddEntries, Bottom cursor). After the
+  last page a cursor-only page ends the walk.
+- `GET /media/<id>.jpg` and `GET /vid/avc1/1280x720/<id>.mp4` return bodies
+  of the configured size; each body starts with the media ID, so no two
+  media are duplicates.
+- `GET /stats` returns request/429/byte counters as JSON.
+
+Latency is added per response. A configurable share of media requests is
+answered with 429 (`Retry-After` as configured).
+
+Runs in its own process so the server does not share the GIL or the RSS of
+the pipeline under test:
+
+    python -m benchmarks.fake_x_server --tweets 500 --image-kb 300
+
+The first line printed is `listening on http://127.0.0.1:<port>`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from .synthetic import snowflake
+
+
+@dataclass(frozen=True)
+class FakeXConfig:
+    tweets: int = 500
+    page_size: int = 20
+    video_ratio: float = 0.1
+    media_per_tweet: int = 1
+    image_kb: int = 300
+    video_kb: int = 4096
+    api_latency_ms: float = 50.0
+    media_latency_ms: float = 20.0
+    rate_429: float = 0.0
+    retry_after_s: int = 0
+    seed: int = 7
+
+
+class _Timeline:
+    """Deterministic newest-first timeline rendered as GraphQL pages."""
+
+    def __init__(self, config: FakeXConfig, base_url: str) -> None:
+        rng = random.Random(config.seed)
+        now = datetime(2026, 1, 13, 12, 0, 0, tzinfo=timezone.utc)
+        self.pages: list[list[dict[str, Any]]] = []
+        page: list[dict[str, Any]] = []
+        for seq in range(1, config.tweets + 1):
+            now -= timedelta(seconds=rng.randint(60, 6 * 3600))
+            tweet_id = snowflake(now, seq)
+            media = []
+            for i in range(config.media_per_tweet):
+                media_id = str(tweet_id + i + 1)
+                if rng.random() < config.video_ratio:
+                    media.append(_video(media_id, base_url))
+                else:
+                    media.append(_photo(media_id, base_url))
+            page.append(_tweet(str(tweet_id), now, media))
+            if len(page) == config.page_size:
+                self.pages.append(page)
+                page = []
+        if page:
+            self.pages.append(page)
+
+    def render(self, index: int) -> bytes:
+        entries: list[dict[str, Any]] = []
+        if index < len(self.pages):
+            entries.append(
+                {
+                    "entryId": f"profile-grid-{index}",
+                    "content": {
+                        "entryType": "TimelineTimelineModule",
+                        "items": [
+                            {"item": {"itemContent": {"itemType": "TimelineTweet", "tweet_results": {"result": t}}}}
+                            for t in self.pages[index]
+                        ],
+                    },
+                }
+            )
+            entries.append(
+                {
+                    "entryId": f"cursor-bottom-{index}",
+                    "content": {"entryType": "TimelineTimelineCursor", "cursorType": "Bottom", "value": str(index + 1)},
+                }
+            )
+        page = {
+            "data": {
+                "user": {
+                    "result": {
+                        "timeline": {"timeline": {"instructions": [{"type": "TimelineAddEntries", "entries": entries}]}}
+                    }
+                }
+            }
+        }
+        return json.dumps(page, separators=(",", ":")).encode("utf-8")
+
+
+def _photo(media_id: str, base_url: str) -> dict[str, Any]:
+    return {
+        "type": "photo",
+        "id_str": media_id,
+        "media_url_https": f"{base_url}/media/{media_id}.jpg",
+        "original_info": {"width": 2048, "height": 1536},
+    }
+
+
+def _video(media_id: str, base_url: str) -> dict[str, Any]:
+    return {
+        "type": "video",
+        "id_str": media_id,
+        "media_url_https": f"{base_url}/thumb/{media_id}.jpg",
+        "original_info": {"width": 1920, "height": 1080},
+        "video_info": {
+            "variants": [
+                {"content_type": "video/mp4", "url": f"{base_url}/vid/avc1/1280x720/{media_id}.mp4", "bitrate": 2176000}
+            ]
+        },
+    }
+
+
+def _tweet(tweet_id: str, created_at: datetime, media: list[dict[str, Any]]) -> dict[str, Any]:
+    return {
+        "__typename": "Tweet",
+        "rest_id": tweet_id,
+        "legacy": {
+            "created_at": created_at.strftime("%a %b %d %H:%M:%S +0000 %Y"),
+            "extended_entities": {"media": media},
+        },
+    }
+
+
+class _Stats:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.api_requests = 0
+        self.media_requests = 0
+        self.media_429 = 0
+        self.media_bytes = 0
+
+    def to_dict(self) -> dict[str, int]:
+        with self.lock:
+            return {
+                "api_requests": self.api_requests,
+                "media_requests": self.media_requests,
+                "media_429": self.media_429,
+                "media_bytes": self.media_bytes,
+            }
+
+
+def make_server(config: FakeXConfig, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """Build (not start) the server; `server.server_address` has the bound port."""
+
+    server = ThreadingHTTPServer((host, port), BaseHTTPRequestHandler)
+    server.daemon_threads = True
+    base_url = f"http://{host}:{server.server_address[1]}"
+    timeline = _Timeline(config, base_url)
+    stats = _Stats()
+    rng = random.Random(config.seed)
+    filler = bytes(range(256)) * (max(config.image_kb, config.video_kb) * 4 + 1)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self) -> None:  # noqa: N802
+            url = urlsplit(self.path)
+            if url.path == "/graphql/UserMedia":
+                with stats.lock:
+                    stats.api_requests += 1
+                cursor = parse_qs(url.query).get("cursor", ["0"])[0]
+                time.sleep(config.api_latency_ms / 1000)
+                self._send(200, timeline.render(int(cursor) if cursor.isdigit() else 0), "application/json")
+            elif url.path.startswith(("/media/", "/vid/")):
+                time.sleep(config.media_latency_ms / 1000)
+                with stats.lock:
+                    stats.media_requests += 1
+                    throttled = rng.random() < config.rate_429
+                    if throttled:
+                        stats.media_429 += 1
+                if throttled:
+                    self._send(429, b"", "text/plain", {"Retry-After": str(config.retry_after_s)})
+                    return
+                media_id = url.path.rsplit("/", 1)[-1].encode()
+                size = (config.video_kb if url.path.startswith("/vid/") else config.image_kb) * 1024
+                body = media_id + b"|" + filler[: max(0, size - len(media_id) - 1)]
+                with stats.lock:
+                    stats.media_bytes += len(body)
+                self._send(200, body, "video/mp4" if url.path.endswith(".mp4") else "image/jpeg")
+            elif url.path == "/stats":
+                self._send(200, json.dumps(stats.to_dict()).encode(), "application/json")
+            else:
+                self._send(404, b"", "text/plain")
+
+        def _send(self, status: int, body: bytes, content_type: str, headers: Optional[dict[str, str]] = None) -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            try:
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def log_message(self, format, *args):  # noqa: A002, ANN001
+            return
+
+    server.RequestHandlerClass = Handler
+    return server
+
+
+def add_server_arguments(parser: argparse.ArgumentParser) -> None:
+    defaults = FakeXConfig()
+    parser.add_argument("--tweets", type=int, default=defaults.tweets, help="tweets in the timeline")
+    parser.add_argument("--page-size", type=int, default=defaults.page_size, help="tweets per UserMedia page")
+    parser.add_argument("--media-per-tweet", type=int, default=defaults.media_per_tweet)
+    parser.add_argument("--video-ratio", type=float, default=defaults.video_ratio, help="share of media that are videos")
+    parser.add_argument("--image-kb", type=int, default=defaults.image_kb, help="image body size (KiB)")
+    parser.add_argument("--video-kb", type=int, default=defaults.video_kb, help="video body size (KiB)")
+    parser.add_argument("--api-latency-ms", type=float, default=defaults.api_latency_ms)
+    parser.add_argument("--media-latency-ms", type=float, default=defaults.media_latency_ms)
+    parser.add_argument("--rate-429", type=float, default=defaults.rate_429, help="share of media requests answered 429")
+    parser.add_argument("--retry-after-s", type=int, default=defaults.retry_after_s)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+
+
+def config_from_args(args: argparse.Namespace) -> FakeXConfig:
+    return FakeXConfig(
+        tweets=args.tweets,
+        page_size=args.page_size,
+        media_per_tweet=args.media_per_tweet,
+        video_ratio=args.video_ratio,
+        image_kb=args.image_kb,
+        video_kb=args.video_kb,
+        api_latency_ms=args.api_latency_ms,
+        media_latency_ms=args.media_latency_ms,
+        rate_429=args.rate_429,
+        retry_after_s=args.retry_after_s,
+        seed=args.seed,
+    )
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=0)
+    add_server_arguments(parser)
+    args = parser.parse_args(argv)
+
+    server = make_server(config_from_args(args), port=args.port)
+    print(f"listening on http://127.0.0.1:{server.server_address[1]}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Synthetic UserMedia timelines shared by the benchmarks.
+"""
+
+from __future__ import annotations
+
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from src.shared.filter_engine import MediaCandidate, MediaKind, Tweet
+
+SNOWFLAKE_EPOCH_MS = 1288834974657
+
+
+def snowflake(dt: datetime, seq: int) -> int:
+    ms = int(dt.timestamp() * 1000) - SNOWFLAKE_EPOCH_MS
+    return (ms << 22) | (seq & 0x3FFFFF)
+
+
+def synthetic_tweets(media_count: int, *, seed: int = 7, tweet_cls: Any = Tweet, media_cls: Any = MediaCandidate) -> list:
+    """Newest-first timeline with `media_count` media in total."""
+    rng = random.Random(seed)
+    now = datetime(2026, 1, 13, 12, 0, 0, tzinfo=timezone.utc)
+    tweets: list = []
+    made = 0
+    seq = 0
+    while made < media_count:
+        now -= timedelta(seconds=rng.randint(60, 6 * 3600))
+        seq += 1
+        tweet_id = snowflake(now, seq)
+        n = min(media_count - made, rng.choice((1, 1, 1, 2, 4)))
+        media = []
+        for i in range(n):
+            media_id = str(tweet_id + i + 1)
+            if rng.random() < 0.8:
+                media.append(
+                    media_cls(
+                        media_id=media_id,
+                        kind=MediaKind.IMAGE,
+                        url=f"https://pbs.twimg.com/media/G{media_id[-11:]}xYz.jpg?name=orig",
+                        width=rng.choice((1200, 1920, 2048)),
+                        height=rng.choice((675, 1080, 1536)),
+                    )
+                )
+            else:
+                media.append(
+                    media_cls(
+                        media_id=media_id,
+                        kind=MediaKind.VIDEO,
+                        url=f"https://video.twimg.com/ext_tw_video/{media_id}/pu/vid/avc1/1280x720/aBcD{seq}.mp4",
+                        width=1280,
+                        height=720,
+                    )
+                )
+        made += n
+        quoted = None
+        if rng.random() < 0.05:
+            quoted = tweet_cls(tweet_id=str(tweet_id - 1000), created_at=now - timedelta(days=1))
+        tweets.append(
+            tweet_cls(
+                tweet_id=str(tweet_id),
+                created_at=now,
+                is_reply=rng.random() < 0.1,
+                quoted_tweet=quoted,
+                media=tuple(media),
+            )
+        )
+    return tweets
@@ -10,7 +10,10 @@ from .scheduler.api import create_scheduler_router
 from .scheduler.scheduler import Scheduler
 from .settings.api import create_settings_router
 from .settings.store import SettingsStore
-from .pipeline.account_runner import create_account_runner
+from .pipeline.account_runner import create_account_runner, create_session_registry
+from .pipeline.timeline_cache import TIMELINE_CACHE_DIRNAME, TimelineCacheStore
+from .net.governor import RateGovernor
+from .scraper.api import create_scraper_router
 from .fs import AccountStorageManager
 from .lifecycle.api import create_lifecycle_router
 from .os.api import create_os_router
@@ -29,19 +32,23 @@ def create_app() -> FastAPI:
 
     store = SettingsStore(path=config_path)
     scheduler_config = SchedulerConfig(max_concurrent=store.load().max_concurrent)
-    runner = create_account_runner(store=store)
+    governor = RateGovernor(store.load().get_rate_limits())
+    sessions = create_session_registry(store=store)
+    runner = create_account_runner(store=store, governor=governor, sessions=sessions)
     scheduler = Scheduler(config=scheduler_config, runs_dir=runs_dir, runner=runner)
 
     # Create storage manager for lifecycle operations
     download_root = Path(store.load().download_root or (repo_root / "downloads"))
     storage = AccountStorageManager(download_root=download_root)
+    timeline_caches = TimelineCacheStore(directory=data_dir / TIMELINE_CACHE_DIRNAME)
 
     app = FastAPI(title="x-media-collector-local")
     app.include_router(
         create_settings_router(store=store, scheduler_config=scheduler_config, scheduler=scheduler, repo_root=repo_root)
     )
     app.include_router(create_scheduler_router(scheduler=scheduler))
-    app.include_router(create_lifecycle_router(storage=storage))
+    app.include_router(create_scraper_router(store=store, sessions=sessions, governor=governor))
+    app.include_router(create_lifecycle_router(storage=storage, timeline_caches=timeline_caches))
     app.include_router(create_os_router(repo_root=repo_root))
 
     app.state.settings_store = store
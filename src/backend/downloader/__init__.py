@@ -4,10 +4,26 @@ Media downloader with deduplication support.
 Provides:
 - Content-hash based deduplication (dedup.py)
 - Media download with proper naming and storage (downloader.py)
+- Async variant with batched disk writes (async_downloader.py)
+- Header-only dimension probes for the MIN_SHORT_SIDE check (media_probe.py)
+- HLS (m3u8) download with parallel segment fetch + ffmpeg remux (hls.py)
+- ffmpeg/ffprobe as asyncio subprocesses (tools.py)
 """
 
 from .dedup import DedupIndex, DedupResult
 from .downloader import MediaDownloader, DownloadResult, DownloadStats
+from .async_downloader import AsyncMediaDownloader, AsyncMediaSink
+from .hls import HlsDownloader, HlsError, HlsPlan, is_hls_url, parse_playlist
+from .media_probe import (
+    BelowMinShortSide,
+    ImageSizeProbe,
+    MinShortSideGuard,
+    Mp4SizeProbe,
+    ffprobe_size,
+    ffprobe_size_async,
+    probe_image_size,
+    probe_mp4_size,
+)
 
 __all__ = [
     "DedupIndex",
@@ -15,4 +31,19 @@ __all__ = [
     "MediaDownloader",
     "DownloadResult",
     "DownloadStats",
+    "AsyncMediaDownloader",
+    "AsyncMediaSink",
+    "HlsDownloader",
+    "HlsError",
+    "HlsPlan",
+    "is_hls_url",
+    "parse_playlist",
+    "BelowMinShortSide",
+    "ImageSizeProbe",
+    "MinShortSideGuard",
+    "Mp4SizeProbe",
+    "ffprobe_size",
+    "ffprobe_size_async",
+    "probe_image_size",
+    "probe_mp4_size",
 ]
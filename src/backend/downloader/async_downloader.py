@@ -0,0 +1,406 @@
+"""
+Async media downloader: the fetch stage runs as a coroutine.
+
+`MediaDownloader.fetch()` blocks a thread for the whole transfer, so the
+pipeline needs one executor thread per in-flight download (shared by every
+concurrent account run). `AsyncMediaDownloader` keeps transfers on the event
+loop and only hands disk work to a small dedicated I/O pool:
+
+- body chunks are buffered and written + hashed in batches (`AsyncMediaSink`),
+- temp file creation, fsync and `commit()` (rename, hash index) run there too.
+
+Naming, dedup ("first wins", ADR-0004 Ignore+Replace) and stats are inherited
+unchanged: `commit()` is the same ordered stage.
+
+HLS (`.m3u8`) URLs are fetched segment by segment with the same stream
+download function and remuxed into an MP4 by ffmpeg (see hls.py).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import replace
+from pathlib import Path
+from typing import Awaitable, BinaryIO, Callable, Optional
+
+from ..fs.hash_index import FileHashIndex
+from ..fs.hashing import StreamHasher
+from ..fs.storage import AccountStorageManager
+from .downloader import DownloadResult, FetchedMedia, MediaDownloader, MediaIntent
+from .hls import DEFAULT_SEGMENT_CONCURRENCY, HlsDownloader, is_hls_url
+from .media_probe import BelowMinShortSide, MinShortSideGuard, ffprobe_size_async
+
+
+# Bytes buffered per sink before they are written (one executor hop per batch).
+WRITE_BATCH_SIZE = 1024 * 1024
+
+# Threads of the shared I/O pool (disk writes are short; transfers don't use it).
+DEFAULT_IO_WORKERS = 4
+
+
+class AsyncMediaSink:
+    """
+    Async write target handed to an async streaming download function.
+
+    `write()` only buffers; every `batch_size` bytes the batch is written to the
+    temp file and fed to the `StreamHasher` on the I/O executor. `reset()`,
+    `bytes_written`, `expected_size` and the MIN_SHORT_SIDE `guard` behave
+    like `MediaSink` (the truncate is applied with the next batch).
+
+    A cancelled `flush()` or `close()` leaves its executor job running; the
+    file is only closed (and deleted) by `discard()`, after that job.
+    """
+
+    def __init__(
+        self,
+        file: BinaryIO,
+        *,
+        executor: Executor,
+        batch_size: int = WRITE_BATCH_SIZE,
+        guard: Optional[MinShortSideGuard] = None,
+    ) -> None:
+        self._file = file
+        self._executor = executor
+        self._batch_size = max(1, int(batch_size))
+        self._guard = guard
+        self.expected_size: Optional[int] = None
+        self._hasher = StreamHasher()
+        self._buffer: list[bytes] = []
+        self._buffered = 0
+        self._size = 0
+        self._truncate = False
+        self._disk_job: Optional[asyncio.Future[None]] = None
+
+    async def write(self, chunk: bytes) -> None:
+        """Append a chunk (flushed to file + hash in batches)."""
+        if not chunk:
+            return
+        self._buffer.append(chunk)
+        self._buffered += len(chunk)
+        self._size += len(chunk)
+        if self._guard is not None:
+            self._guard.feed(chunk)
+        if self._buffered >= self._batch_size:
+            await self.flush()
+
+    def reset(self) -> None:
+        """Discard everything written so far (e.g. before retrying from byte 0)."""
+        self._buffer = []
+        self._buffered = 0
+        self._size = 0
+        self._hasher = StreamHasher()
+        self._truncate = True
+        if self._guard is not None:
+            self._guard.reset()
+
+    async def flush(self) -> None:
+        """Write out buffered chunks."""
+        if not self._buffer and not self._truncate:
+            return
+        batch, self._buffer, self._buffered = self._buffer, [], 0
+        truncate, self._truncate = self._truncate, False
+        await self._run_disk_job(self._write_batch, batch, truncate, self._hasher)
+
+    async def close(self) -> None:
+        """Write out buffered chunks, then fsync and close the file."""
+        await self.flush()
+        await self._run_disk_job(_fsync_and_close, self._file)
+
+    async def discard(self, path: Path) -> None:
+        """Close the file and delete `path` once the running disk job (if any) is done."""
+        if self._disk_job is not None:
+            try:
+                await self._disk_job
+            except Exception:  # noqa: BLE001
+                pass
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, _close_and_unlink, self._file, path)
+
+    async def _run_disk_job(self, func: Callable[..., None], *args: object) -> None:
+        loop = asyncio.get_running_loop()
+        self._disk_job = loop.run_in_executor(self._executor, func, *args)
+        # Shielded: cancelling the caller must not hide when the job ends.
+        await asyncio.shield(self._disk_job)
+
+    @property
+    def bytes_written(self) -> int:
+        """Number of bytes written since creation or the last reset (including buffered)."""
+        return self._size
+
+    @property
+    def hasher(self) -> StreamHasher:
+        """Hash of the flushed bytes (complete after `flush()`)."""
+        return self._hasher
+
+    def _write_batch(self, batch: list[bytes], truncate: bool, hasher: StreamHasher) -> None:
+        if truncate:
+            self._file.seek(0)
+            self._file.truncate()
+        for chunk in batch:
+            self._file.write(chunk)
+            hasher.update(chunk)
+
+
+# Type for async streaming download function: (url, sink) -> None
+# Same contract as StreamDownloadFunc, with `await sink.write(chunk)`.
+AsyncStreamDownloadFunc = Callable[[str, AsyncMediaSink], Awaitable[None]]
+
+
+_io_executor: Optional[ThreadPoolExecutor] = None
+_io_executor_lock = threading.Lock()
+
+
+def default_io_executor() -> ThreadPoolExecutor:
+    """Process-wide I/O pool shared by all async downloaders (not the loop's default executor)."""
+    global _io_executor
+    with _io_executor_lock:
+        if _io_executor is None:
+            _io_executor = ThreadPoolExecutor(max_workers=DEFAULT_IO_WORKERS, thread_name_prefix="xmc-io")
+        return _io_executor
+
+
+class AsyncMediaDownloader(MediaDownloader):
+    """
+    MediaDownloader with a coroutine fetch stage.
+
+    Usage:
+        downloader = AsyncMediaDownloader(
+            storage=AccountStorageManager(download_root),
+            handle="username",
+            stream_download_func=my_async_stream_function,
+        )
+        result = await downloader.download_async(intent)
+
+    As with `fetch()`/`commit()`, several `fetch_async()` calls may run
+    concurrently as long as `commit_async()` is awaited in processing order.
+    The sync `fetch()`/`download()` are not available.
+    """
+
+    _requires_download_func = False
+
+    def __init__(
+        self,
+        storage: AccountStorageManager,
+        handle: str,
+        *,
+        stream_download_func: AsyncStreamDownloadFunc,
+        ignore_replace: bool = False,
+        hash_index: Optional[FileHashIndex] = None,
+        io_executor: Optional[Executor] = None,
+        write_batch_size: int = WRITE_BATCH_SIZE,
+        min_short_side: Optional[int] = None,
+        hls_segment_concurrency: int = DEFAULT_SEGMENT_CONCURRENCY,
+    ):
+        """
+        Initialize the downloader.
+
+        Args:
+            storage: Storage manager for directory structure.
+            handle: Twitter handle for this account.
+            stream_download_func: Async function writing a URL's body into an
+                `AsyncMediaSink` (also used for HLS playlists and segments).
+            ignore_replace: ADR-0004 Ignore+Replace (see MediaDownloader).
+            hash_index: Optional persistent hash cache (see MediaDownloader).
+            io_executor: Executor for disk work; defaults to the shared I/O pool.
+            write_batch_size: Bytes buffered per download before each disk write.
+            min_short_side: Post-download MIN_SHORT_SIDE check (see MediaDownloader).
+                HLS videos are checked against the RESOLUTION of the chosen
+                variant before any segment is fetched.
+            hls_segment_concurrency: HLS segments in flight per video.
+        """
+        super().__init__(
+            storage,
+            handle,
+            ignore_replace=ignore_replace,
+            hash_index=hash_index,
+            min_short_side=min_short_side,
+        )
+        self._async_stream_download_func = stream_download_func
+        self._io_executor = io_executor or default_io_executor()
+        self._write_batch_size = write_batch_size
+        self._hls = HlsDownloader(
+            stream_download_func,
+            io_executor=self._io_executor,
+            segment_concurrency=hls_segment_concurrency,
+        )
+
+    @property
+    def io_executor(self) -> Executor:
+        return self._io_executor
+
+    def fetch(self, intent: MediaIntent) -> FetchedMedia:
+        raise TypeError("AsyncMediaDownloader only supports fetch_async()")
+
+    async def download_async(self, intent: MediaIntent) -> DownloadResult:
+        """Async `download()`: `commit_async(await fetch_async(intent))`."""
+        return await self.commit_async(await self.fetch_async(intent))
+
+    async def fetch_async(self, intent: MediaIntent) -> FetchedMedia:
+        """
+        Async `fetch()`: download a media body into a temp file.
+
+        Never raises (except on cancellation, after removing the temp file);
+        failures are reported through `FetchedMedia.error`.
+        """
+        try:
+            return await self._fetch_async_impl(intent)
+        except Exception as e:
+            return FetchedMedia(intent=intent, error=str(e))
+
+    async def commit_async(self, fetched: FetchedMedia) -> DownloadResult:
+        """Run `commit()` on the I/O executor (call in processing order)."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._io_executor, self.commit, fetched)
+
+    async def _fetch_async_impl(self, intent: MediaIntent) -> FetchedMedia:
+        loop = asyncio.get_running_loop()
+        io = self._io_executor
+
+        if self._hash_index is not None and not self._ignore_replace:
+            known = await loop.run_in_executor(io, self._hash_index.lookup_media, intent.url)
+            if known is not None:
+                known_file, content_hash = known
+                return FetchedMedia(intent=intent, content_hash=content_hash, known_file=known_file)
+
+        target_dir = self._target_dir(intent)
+        if is_hls_url(intent.url):
+            return await self._fetch_hls(intent, target_dir)
+
+        guard = self._min_short_side_guard(intent)
+        tmp_path, f = await self._open_temp_file_async(intent, target_dir)
+        sink = AsyncMediaSink(f, executor=io, batch_size=self._write_batch_size, guard=guard)
+        try:
+            await self._async_stream_download_func(intent.url, sink)
+            await sink.close()
+        except BaseException as exc:
+            # Shielded: a cancelled fetch still removes its temp file, after
+            # any batch the I/O pool is writing into it.
+            await asyncio.shield(sink.discard(tmp_path))
+            if isinstance(exc, BelowMinShortSide):
+                return self._below_min_short_side(
+                    intent, exc, received=sink.bytes_written, expected=sink.expected_size
+                )
+            raise
+
+        content_hash = sink.hasher.hexdigest()
+        fetched = FetchedMedia(
+            intent=intent,
+            tmp_path=tmp_path,
+            final_path=target_dir / self._final_filename(intent, content_hash),
+            content_hash=content_hash,
+            size=sink.bytes_written,
+        )
+        return await self._finish_min_short_side_check_async(fetched, guard)
+
+    async def _open_temp_file_async(self, intent: MediaIntent, target_dir: Path) -> tuple[Path, BinaryIO]:
+        """`_open_temp_file()` on the I/O executor; if cancelled, the file is removed once created."""
+        loop = asyncio.get_running_loop()
+        opening = loop.run_in_executor(self._io_executor, self._open_temp_file, intent, target_dir)
+        try:
+            return await asyncio.shield(opening)
+        except asyncio.CancelledError:
+            opening.add_done_callback(_discard_opened_temp_file)
+            raise
+
+    async def _fetch_hls(self, intent: MediaIntent, target_dir: Path) -> FetchedMedia:
+        """Playlists -> MIN_SHORT_SIDE pre-check -> segments -> ffmpeg remux into the temp file."""
+        loop = asyncio.get_running_loop()
+        io = self._io_executor
+
+        plan = await self._hls.resolve(intent.url)
+        guard = self._min_short_side_guard(intent)
+        if guard is not None and plan.size is not None and min(plan.size) < guard.min_short_side:
+            return FetchedMedia(
+                intent=intent,
+                probed_size=plan.size,
+                below_min_short_side=True,
+                bytes_saved=plan.estimated_bytes,
+            )
+
+        intent = replace(intent, extension="mp4")
+        tmp_path, f = await self._open_temp_file_async(intent, target_dir)
+        f.close()  # written by ffmpeg
+        work_dir = Path(
+            await loop.run_in_executor(
+                io, lambda: tempfile.mkdtemp(dir=str(target_dir), prefix=f".{intent.tweet_id}.", suffix=".hls")
+            )
+        )
+        try:
+            await self._hls.download(plan, tmp_path, work_dir)
+            content_hash, size = await loop.run_in_executor(io, _fsync_and_hash, tmp_path)
+        except BaseException:
+            _unlink_quietly(tmp_path)
+            raise
+        finally:
+            await loop.run_in_executor(io, lambda: shutil.rmtree(work_dir, ignore_errors=True))
+
+        fetched = FetchedMedia(
+            intent=intent,
+            tmp_path=tmp_path,
+            final_path=target_dir / self._final_filename(intent, content_hash),
+            content_hash=content_hash,
+            size=size,
+        )
+        if guard is None:
+            return fetched
+        if plan.size is not None:
+            fetched.probed_size = plan.size
+            return fetched
+        return await self._finish_min_short_side_check_async(fetched, guard)
+
+    async def _finish_min_short_side_check_async(
+        self, fetched: FetchedMedia, guard: Optional[MinShortSideGuard]
+    ) -> FetchedMedia:
+        """
+        `_finish_min_short_side_check()` with ffprobe as an asyncio subprocess,
+        so a slow probe holds no thread of the shared I/O pool.
+        """
+        if guard is None:
+            return fetched
+        size = guard.size
+        if size is None and fetched.tmp_path is not None:
+            size = await ffprobe_size_async(fetched.tmp_path)
+        if size is not None and min(size) < guard.min_short_side:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._io_executor, self._apply_probed_size, fetched, guard, size)
+        return self._apply_probed_size(fetched, guard, size)
+
+
+def _fsync_and_hash(path: Path) -> tuple[str, int]:
+    hasher = StreamHasher()
+    with open(path, "r+b") as f:
+        os.fsync(f.fileno())
+        while chunk := f.read(1024 * 1024):
+            hasher.update(chunk)
+    return hasher.hexdigest(), hasher.size
+
+
+def _fsync_and_close(f: BinaryIO) -> None:
+    with f:
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _close_and_unlink(f: BinaryIO, path: Path) -> None:
+    f.close()
+    _unlink_quietly(path)
+
+
+def _discard_opened_temp_file(opening: asyncio.Future[tuple[Path, BinaryIO]]) -> None:
+    """Done-callback for a temp file whose opener was cancelled while it ran."""
+    if opening.cancelled() or opening.exception() is not None:
+        return
+    tmp_path, f = opening.result()
+    _close_and_unlink(f, tmp_path)
+
+
+def _unlink_quietly(path: Path) -> None:
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
@@ -7,7 +7,8 @@ Implements "first wins" deduplication within an account:
 - Subsequent occurrences with the same hash are skipped and counted as duplicates
 
 The DedupIndex maintains an in-memory hash set for the current run and can
-optionally load existing hashes from the account directory.
+optionally load existing hashes from the account directory (sequentially, or
+on a thread pool via scan_directories()).
 """
 
 from __future__ import annotations
@@ -15,11 +16,20 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from enum import Enum
 from pathlib import Path
-from typing import Optional
-
-from ..fs.hashing import compute_file_hash
+from typing import TYPE_CHECKING, Optional
+
+from ..fs.hashing import (
+    DEFAULT_HASH_WORKERS,
+    SCAN_BUFFER_SIZE,
+    ProgressCallback,
+    compute_file_hash,
+    hash_files_parallel,
+)
 from ..fs.naming import parse_media_filename
 
+if TYPE_CHECKING:
+    from ..fs.hash_index import FileHashIndex
+
 
 class DedupResult(str, Enum):
     """Result of a deduplication check."""
@@ -150,7 +160,11 @@ class DedupIndex:
             content_hash=normalized_hash,
         )
 
-    def load_from_directory(self, directory: Path) -> int:
+    def load_from_directory(
+        self,
+        directory: Path,
+        hash_index: Optional["FileHashIndex"] = None,
+    ) -> int:
         """
         Load content hashes from existing files in a directory.
 
@@ -159,43 +173,64 @@ class DedupIndex:
 
         Args:
             directory: Directory containing media files.
+            hash_index: Optional persistent hash cache; unchanged files are
+                not re-read, and entries for vanished files are pruned.
 
         Returns:
             Number of files loaded.
         """
-        if not directory.exists():
-            return 0
+        return self.scan_directories(directory, workers=1, hash_index=hash_index)
 
-        loaded = 0
-        for file_path in directory.iterdir():
-            if not file_path.is_file():
-                continue
-
-            # Skip hidden files and non-media files
-            if file_path.name.startswith('.'):
-                continue
+    def load_from_directories(
+        self,
+        *directories: Path,
+        hash_index: Optional["FileHashIndex"] = None,
+    ) -> int:
+        """
+        Load content hashes from multiple directories.
 
-            try:
-                content_hash = compute_file_hash(file_path)
-                self.register(content_hash, file_path)
-                loaded += 1
-            except (IOError, OSError):
-                # Skip files we can't read
-                continue
+        Args:
+            directories: Directories to load from.
+            hash_index: Optional persistent hash cache (see load_from_directory).
 
-        return loaded
+        Returns:
+            Total number of files loaded.
+        """
+        return sum(self.load_from_directory(d, hash_index=hash_index) for d in directories)
 
-    def load_from_directories(self, *directories: Path) -> int:
+    def scan_directories(
+        self,
+        *directories: Path,
+        workers: int = DEFAULT_HASH_WORKERS,
+        hash_index: Optional["FileHashIndex"] = None,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> int:
         """
-        Load content hashes from multiple directories.
+        Load content hashes from existing files, hashing on a thread pool.
+
+        Same result as load_from_directories(); files are registered in
+        directory listing order once all hashes are known, so the recorded
+        "existing file" for a hash does not depend on thread timing.
 
         Args:
             directories: Directories to load from.
+            workers: Hashing threads (1 = sequential).
+            hash_index: Optional persistent hash cache.
+            on_progress: Called as (files_done, files_total) while hashing.
 
         Returns:
             Total number of files loaded.
         """
-        return sum(self.load_from_directory(d) for d in directories)
+        loaded = 0
+        for file_path, content_hash in scan_existing_hashes(
+            *directories,
+            workers=workers,
+            hash_index=hash_index,
+            on_progress=on_progress,
+        ):
+            self.register(content_hash, file_path)
+            loaded += 1
+        return loaded
 
     def get_existing_file(self, content_hash: str) -> Optional[Path]:
         """
@@ -227,3 +262,60 @@ class DedupIndex:
             "duplicates_found": self._duplicates_found,
             "unique_hashes": len(self._hash_to_file),
         }
+
+
+def scan_existing_hashes(
+    *directories: Path,
+    workers: int = DEFAULT_HASH_WORKERS,
+    hash_index: Optional["FileHashIndex"] = None,
+    on_progress: Optional[ProgressCallback] = None,
+) -> list[tuple[Path, str]]:
+    """
+    Hash the media files in `directories` (non-recursive).
+
+    Hidden files and `.tmp` leftovers of interrupted downloads are skipped, as are
+    files that cannot be read. With a hash index, unchanged files are served
+    from the cache and entries for vanished files are pruned.
+
+    Returns:
+        (file_path, content_hash) pairs in directory listing order.
+    """
+    listed: list[tuple[Path, list[Path]]] = []
+    for directory in directories:
+        if not directory.exists():
+            continue
+        files = [
+            p for p in directory.iterdir()
+            if p.is_file() and not p.name.startswith('.') and p.suffix.lower() != '.tmp'
+        ]
+        listed.append((directory, files))
+
+    all_files = [p for _, files in listed for p in files]
+    if hash_index is not None:
+        def hash_func(p: Path) -> str:
+            return hash_index.hash_file(p, buffer_size=SCAN_BUFFER_SIZE)
+    else:
+        def hash_func(p: Path) -> str:
+            return compute_file_hash(p, buffer_size=SCAN_BUFFER_SIZE)
+
+    hashes = hash_files_parallel(
+        all_files,
+        hash_func=hash_func,
+        workers=workers,
+        on_progress=on_progress,
+    )
+    by_path = dict(zip(all_files, hashes))
+
+    results: list[tuple[Path, str]] = []
+    for directory, files in listed:
+        seen = []
+        for p in files:
+            content_hash = by_path[p]
+            if content_hash is None:
+                continue
+            seen.append(p)
+            results.append((p, content_hash.lower()))
+        if hash_index is not None:
+            hash_index.prune_directory(directory, seen)
+
+    return results
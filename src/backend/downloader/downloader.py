@@ -19,18 +19,28 @@ from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 from pathlib import Path
-from typing import Optional, Callable, Any
+from typing import BinaryIO, Optional, Callable, Any
 
 from ..fs.storage import AccountStorageManager, MediaType
 from ..fs.naming import generate_media_filename, get_extension_from_url
-from ..fs.hashing import compute_bytes_hash, compute_file_hash, compute_hash6
-from .dedup import DedupIndex
+from ..fs.hashing import (
+    DEFAULT_HASH_WORKERS,
+    ProgressCallback,
+    StreamHasher,
+    compute_bytes_hash,
+    compute_hash6,
+)
+from ..fs.hash_index import FileHashIndex
+from .dedup import DedupIndex, scan_existing_hashes
+from .hls import HlsError, is_hls_url
+from .media_probe import BelowMinShortSide, ImageSizeProbe, MinShortSideGuard, Mp4SizeProbe, ffprobe_size
 
 
 class DownloadStatus(str, Enum):
     """Status of a single download."""
     SUCCESS = "success"
     SKIPPED_DUPLICATE = "skipped_duplicate"
+    SKIPPED_MIN_SHORT_SIDE = "skipped_min_short_side"
     FAILED = "failed"
 
 
@@ -50,6 +60,9 @@ class DownloadResult:
     # Set on duplicate
     existing_file: Optional[Path] = None
 
+    # Set when the post-download MIN_SHORT_SIDE check probed the size
+    probed_size: Optional[tuple[int, int]] = None
+
     # Set on failure
     error: Optional[str] = None
 
@@ -65,6 +78,21 @@ class DownloadStats:
     # Tracking
     total_bytes: int = 0
 
+    # Subset of skipped_duplicate resolved from the URL index, without any HTTP request
+    skipped_without_fetch: int = 0
+
+    # ADR-0005 post-download check: media without width/height in the JSON
+    # whose probed size is below MIN_SHORT_SIDE (not kept), and media whose
+    # size could not be probed (kept, see the warning log)
+    skipped_min_short_side: int = 0
+    min_short_side_unverified: int = 0
+    # Body bytes not transferred because the probe aborted the download
+    min_short_side_bytes_saved: int = 0
+
+    # Start-up scan of files from previous runs (progress)
+    existing_files_scanned: int = 0
+    existing_files_total: int = 0
+
     def increment(self, result: DownloadResult) -> None:
         """Update stats based on a download result."""
         if result.status == DownloadStatus.SUCCESS:
@@ -74,6 +102,8 @@ class DownloadStats:
                 self.videos_downloaded += 1
         elif result.status == DownloadStatus.SKIPPED_DUPLICATE:
             self.skipped_duplicate += 1
+        elif result.status == DownloadStatus.SKIPPED_MIN_SHORT_SIDE:
+            self.skipped_min_short_side += 1
         elif result.status == DownloadStatus.FAILED:
             self.failed += 1
 
@@ -85,7 +115,7 @@ class DownloadStats:
     @property
     def total_processed(self) -> int:
         """Total items processed (downloaded + skipped + failed)."""
-        return self.total_downloaded + self.skipped_duplicate + self.failed
+        return self.total_downloaded + self.skipped_duplicate + self.skipped_min_short_side + self.failed
 
     def to_dict(self) -> dict:
         """Convert to dictionary."""
@@ -95,6 +125,12 @@ class DownloadStats:
             "skipped_duplicate": self.skipped_duplicate,
             "failed": self.failed,
             "total_bytes": self.total_bytes,
+            "skipped_without_fetch": self.skipped_without_fetch,
+            "skipped_min_short_side": self.skipped_min_short_side,
+            "min_short_side_unverified": self.min_short_side_unverified,
+            "min_short_side_bytes_saved": self.min_short_side_bytes_saved,
+            "existing_files_scanned": self.existing_files_scanned,
+            "existing_files_total": self.existing_files_total,
         }
 
 
@@ -122,9 +158,90 @@ class MediaIntent:
         return get_extension_from_url(self.url)
 
 
+@dataclass
+class FetchedMedia:
+    """
+    Media body fetched into a temp file but not yet committed.
+
+    Produced by `MediaDownloader.fetch()` (safe to run concurrently) and
+    consumed by `MediaDownloader.commit()` (must run in processing order).
+    """
+    intent: MediaIntent
+
+    # Set on success
+    tmp_path: Optional[Path] = None
+    final_path: Optional[Path] = None
+    content_hash: Optional[str] = None
+    size: int = 0
+
+    # Set when the URL is already on disk (no body was fetched)
+    known_file: Optional[Path] = None
+
+    # Post-download MIN_SHORT_SIDE check (only for flagged intents)
+    probed_size: Optional[tuple[int, int]] = None
+    below_min_short_side: bool = False  # nothing to commit
+    min_short_side_unverified: bool = False  # size unknown, kept
+    bytes_saved: int = 0  # of an aborted transfer (needs the expected size)
+
+    # Set on failure
+    error: Optional[str] = None
+
+
+class MediaSink:
+    """
+    Write target handed to a streaming download function.
+
+    Every chunk is appended to the temp file and fed to a `StreamHasher`, so the
+    content hash is known when the transfer ends without holding the body in
+    memory. With a `guard`, the head of the body is probed first and
+    `write()` raises `BelowMinShortSide` to abort an undersized media.
+
+    Download functions may set `expected_size` (e.g. from Content-Length) so
+    that an aborted transfer can report the bytes it saved.
+    """
+
+    def __init__(self, file: BinaryIO, *, guard: Optional[MinShortSideGuard] = None) -> None:
+        self._file = file
+        self._hasher = StreamHasher()
+        self._guard = guard
+        self.expected_size: Optional[int] = None
+
+    def write(self, chunk: bytes) -> None:
+        """Append a chunk (file + hash)."""
+        if not chunk:
+            return
+        self._file.write(chunk)
+        self._hasher.update(chunk)
+        if self._guard is not None:
+            # After the write: `bytes_written` counts the aborting chunk too.
+            self._guard.feed(chunk)
+
+    def reset(self) -> None:
+        """Discard everything written so far (e.g. before retrying from byte 0)."""
+        self._file.seek(0)
+        self._file.truncate()
+        self._hasher = StreamHasher()
+        if self._guard is not None:
+            self._guard.reset()
+
+    @property
+    def bytes_written(self) -> int:
+        """Number of bytes written since creation or the last reset."""
+        return self._hasher.size
+
+    @property
+    def hasher(self) -> StreamHasher:
+        return self._hasher
+
+
 # Type for download function: (url) -> bytes
 DownloadFunc = Callable[[str], bytes]
 
+# Type for streaming download function: (url, sink) -> None
+# Must write the complete body into `sink`; on retry it is responsible for
+# calling `sink.reset()` before writing again.
+StreamDownloadFunc = Callable[[str, MediaSink], None]
+
 
 class MediaDownloader:
     """
@@ -148,15 +265,28 @@ class MediaDownloader:
 
         # Get statistics
         print(downloader.stats.to_dict())
+
+    `download()` is `commit(fetch(intent))`. Callers that want to overlap
+    network transfers may run `fetch()` for several intents concurrently, as
+    long as `commit()` is called once per fetched item in processing order;
+    all dedup decisions and stats updates happen in `commit()`, so "first wins"
+    stays deterministic.
     """
 
+    # Subclasses that fetch without a sync download function (AsyncMediaDownloader)
+    # set this to False.
+    _requires_download_func = True
+
     def __init__(
         self,
         storage: AccountStorageManager,
         handle: str,
-        download_func: DownloadFunc,
+        download_func: Optional[DownloadFunc] = None,
         *,
+        stream_download_func: Optional[StreamDownloadFunc] = None,
         ignore_replace: bool = False,
+        hash_index: Optional[FileHashIndex] = None,
+        min_short_side: Optional[int] = None,
     ):
         """
         Initialize the downloader.
@@ -165,14 +295,32 @@ class MediaDownloader:
             storage: Storage manager for directory structure.
             handle: Twitter handle for this account.
             download_func: Function to download content from a URL.
+            stream_download_func: Streaming alternative to `download_func`; writes
+                the body chunk by chunk into a `MediaSink` (preferred when given,
+                keeps memory per download bounded to one chunk).
             ignore_replace: If True, enable ADR-0004 Ignore+Replace behavior:
                 - Do NOT treat historical files as dedup winners
                 - After successfully writing a new file, delete any historical files with same content hash
+            hash_index: Optional persistent hash cache for this account. Existing
+                files are only re-hashed when their size/mtime changed, and newly
+                written files are recorded so the next run need not hash them.
+                It also remembers which file each media URL ended up as; in
+                first-wins mode a URL that is already on disk is skipped without
+                any HTTP request.
+            min_short_side: Account MIN_SHORT_SIDE (ADR-0005). Images of intents
+                flagged `needs_post_min_short_side_check` are probed from the
+                head of the body and aborted when smaller.
         """
+        if download_func is None and stream_download_func is None and self._requires_download_func:
+            raise ValueError("download_func or stream_download_func is required")
+
         self._storage = storage
         self._handle = handle
         self._download_func = download_func
+        self._stream_download_func = stream_download_func
         self._ignore_replace = bool(ignore_replace)
+        self._hash_index = hash_index
+        self._min_short_side = int(min_short_side) if min_short_side else None
         self._dedup = DedupIndex()
         self._stats = DownloadStats()
         self._paths = storage.ensure_account_dirs(handle)
@@ -191,22 +339,40 @@ class MediaDownloader:
         """Get the deduplication index."""
         return self._dedup
 
-    def load_existing_files(self) -> int:
+    def load_existing_files(
+        self,
+        *,
+        workers: int = DEFAULT_HASH_WORKERS,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> int:
         """
         Load existing files for deduplication.
 
         Call this before downloading to support "first wins" behavior
         where existing files from previous runs are preserved.
 
+        Args:
+            workers: Hashing threads for files not served by the hash index.
+            on_progress: Called as (files_done, files_total); the same numbers
+                are kept in `stats.existing_files_scanned/total`.
+
         Returns:
             Number of existing files loaded.
         """
-        return self._dedup.load_from_directories(
+        return self._dedup.scan_directories(
             self._paths.images,
             self._paths.videos,
+            workers=workers,
+            hash_index=self._hash_index,
+            on_progress=self._track_scan_progress(on_progress),
         )
 
-    def load_existing_files_for_replace(self) -> int:
+    def load_existing_files_for_replace(
+        self,
+        *,
+        workers: int = DEFAULT_HASH_WORKERS,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> int:
         """
         Load existing files as "replace candidates" (Ignore+Replace mode).
 
@@ -216,34 +382,36 @@ class MediaDownloader:
         Unlike `load_existing_files()`, this does NOT register hashes into the
         dedup index (because in Ignore+Replace mode, the current run wins).
 
+        Args:
+            workers: Hashing threads (see load_existing_files).
+            on_progress: Progress callback (see load_existing_files).
+
         Returns:
             Number of existing files scanned (best-effort).
         """
-        loaded = 0
         self._existing_hashes.clear()
 
-        for directory in (self._paths.images, self._paths.videos):
-            if not directory.exists():
-                continue
-            for file_path in directory.iterdir():
-                if not file_path.is_file():
-                    continue
-                if file_path.name.startswith("."):
-                    continue
-                if file_path.suffix.lower() == ".tmp":
-                    continue
-
-                try:
-                    content_hash = compute_file_hash(file_path)
-                except (OSError, IOError):
-                    continue
-
-                normalized_hash = content_hash.lower()
-                self._existing_hashes.setdefault(normalized_hash, set()).add(file_path)
-                loaded += 1
+        scanned = scan_existing_hashes(
+            self._paths.images,
+            self._paths.videos,
+            workers=workers,
+            hash_index=self._hash_index,
+            on_progress=self._track_scan_progress(on_progress),
+        )
+        for file_path, content_hash in scanned:
+            self._existing_hashes.setdefault(content_hash, set()).add(file_path)
 
         self._existing_hashes_loaded = True
-        return loaded
+        return len(scanned)
+
+    def _track_scan_progress(self, on_progress: Optional[ProgressCallback]) -> ProgressCallback:
+        def _progress(done: int, total: int) -> None:
+            self._stats.existing_files_scanned = done
+            self._stats.existing_files_total = total
+            if on_progress is not None:
+                on_progress(done, total)
+
+        return _progress
 
     def download(self, intent: MediaIntent) -> DownloadResult:
         """
@@ -255,12 +423,50 @@ class MediaDownloader:
         Returns:
             DownloadResult with status and details.
         """
-        if self._ignore_replace and not self._existing_hashes_loaded:
+        return self.commit(self.fetch(intent))
+
+    def fetch(self, intent: MediaIntent) -> FetchedMedia:
+        """
+        Download a media body into a temp file next to its final location.
+
+        Thread-safe: does not touch the dedup index or statistics, so several
+        intents may be fetched concurrently. Never raises; failures are
+        reported through `FetchedMedia.error` and counted by `commit()`.
+
+        Args:
+            intent: The media download intent.
+
+        Returns:
+            FetchedMedia to pass to `commit()`.
+        """
+        try:
+            return self._fetch_impl(intent)
+        except Exception as e:
+            return FetchedMedia(intent=intent, error=str(e))
+
+    def commit(self, fetched: FetchedMedia) -> DownloadResult:
+        """
+        Apply dedup and move a fetched body to its final path.
+
+        Must be called in processing order (newest to oldest) so that
+        "first wins" is predictable.
+
+        Args:
+            fetched: Result of `fetch()`.
+
+        Returns:
+            DownloadResult with status and details.
+        """
+        intent = fetched.intent
+        if fetched.error is None and self._ignore_replace and not self._existing_hashes_loaded:
             self.load_existing_files_for_replace()
 
         try:
-            return self._download_impl(intent)
+            if fetched.error is not None:
+                raise RuntimeError(fetched.error)
+            return self._commit_impl(fetched)
         except Exception as e:
+            self.discard(fetched)
             self._stats.failed += 1
             return DownloadResult(
                 status=DownloadStatus.FAILED,
@@ -271,25 +477,189 @@ class MediaDownloader:
                 error=str(e),
             )
 
-    def _download_impl(self, intent: MediaIntent) -> DownloadResult:
-        """Implementation of download with proper error handling."""
-        # Get target directory
-        target_dir = (
-            self._paths.images
-            if intent.media_type == MediaType.IMAGE
-            else self._paths.videos
-        )
+    def discard(self, fetched: FetchedMedia) -> None:
+        """Remove the temp file of a fetched item that will not be committed."""
+        if fetched.tmp_path is None:
+            return
+        try:
+            fetched.tmp_path.unlink()
+        except FileNotFoundError:
+            pass
+
+    def _fetch_impl(self, intent: MediaIntent) -> FetchedMedia:
+        """Download + hash + write temp file (no shared state)."""
+        # Pre-check: media saved by an earlier run is a guaranteed duplicate under
+        # "first wins". (Ignore+Replace must refetch so the new run wins.)
+        if self._hash_index is not None and not self._ignore_replace:
+            known = self._hash_index.lookup_media(intent.url)
+            if known is not None:
+                known_file, content_hash = known
+                return FetchedMedia(intent=intent, content_hash=content_hash, known_file=known_file)
+
+        if is_hls_url(intent.url):
+            raise HlsError("HLS videos are only supported by AsyncMediaDownloader")
+
+        target_dir = self._target_dir(intent)
+
+        if self._stream_download_func is not None:
+            return self._fetch_streaming(intent, target_dir)
 
         # Download content (sync; injected by caller)
+        assert self._download_func is not None
         content = self._download_func(intent.url)
 
+        guard = self._min_short_side_guard(intent)
+        if guard is not None:
+            try:
+                guard.feed(content)
+            except BelowMinShortSide as exc:
+                return self._below_min_short_side(intent, exc, received=len(content))
+
         # Compute content hash
         content_hash = compute_bytes_hash(content)
-        hash6 = compute_hash6(content_hash)
+        final_path = target_dir / self._final_filename(intent, content_hash)
 
-        # Check for duplicate ("first wins")
-        if self._dedup.is_known(content_hash):
+        tmp_path = self._write_temp_bytes(final_path, content)
+        fetched = FetchedMedia(
+            intent=intent,
+            tmp_path=tmp_path,
+            final_path=final_path,
+            content_hash=content_hash,
+            size=len(content),
+        )
+        return self._finish_min_short_side_check(fetched, guard)
+
+    def _fetch_streaming(self, intent: MediaIntent, target_dir: Path) -> FetchedMedia:
+        """Stream the body into a temp file while hashing; name it once the hash is known."""
+        assert self._stream_download_func is not None
+        guard = self._min_short_side_guard(intent)
+        tmp_path, file = self._open_temp_file(intent, target_dir)
+        try:
+            with file as f:
+                sink = MediaSink(f, guard=guard)
+                self._stream_download_func(intent.url, sink)
+                f.flush()
+                os.fsync(f.fileno())
+        except BaseException as exc:
+            try:
+                tmp_path.unlink()
+            except FileNotFoundError:
+                pass
+            if isinstance(exc, BelowMinShortSide):
+                return self._below_min_short_side(
+                    intent, exc, received=sink.bytes_written, expected=sink.expected_size
+                )
+            raise
+
+        content_hash = sink.hasher.hexdigest()
+        fetched = FetchedMedia(
+            intent=intent,
+            tmp_path=tmp_path,
+            final_path=target_dir / self._final_filename(intent, content_hash),
+            content_hash=content_hash,
+            size=sink.bytes_written,
+        )
+        return self._finish_min_short_side_check(fetched, guard)
+
+    def _min_short_side_guard(self, intent: MediaIntent) -> Optional[MinShortSideGuard]:
+        """Post-download check (ADR-0005) for flagged intents; None when not applicable."""
+        if self._min_short_side is None or not intent.needs_post_min_short_side_check:
+            return None
+        probe = ImageSizeProbe() if intent.media_type == MediaType.IMAGE else Mp4SizeProbe()
+        return MinShortSideGuard(self._min_short_side, probe)
+
+    def _finish_min_short_side_check(
+        self, fetched: FetchedMedia, guard: Optional[MinShortSideGuard]
+    ) -> FetchedMedia:
+        """
+        Complete body, head probe passed or gave up: in the latter case ask
+        `ffprobe` about the temp file (may block; thread-safe).
+        """
+        if guard is None:
+            return fetched
+        size = guard.size
+        if size is None and fetched.tmp_path is not None:
+            size = ffprobe_size(fetched.tmp_path)
+        return self._apply_probed_size(fetched, guard, size)
+
+    def _apply_probed_size(
+        self, fetched: FetchedMedia, guard: MinShortSideGuard, size: Optional[tuple[int, int]]
+    ) -> FetchedMedia:
+        """Discard `fetched` if `size` is below MIN_SHORT_SIDE, else record it (None = unverified)."""
+        if size is not None and min(size) < guard.min_short_side:
+            self.discard(fetched)
+            return FetchedMedia(
+                intent=fetched.intent,
+                probed_size=size,
+                below_min_short_side=True,
+                size=fetched.size,
+            )
+        fetched.probed_size = size
+        fetched.min_short_side_unverified = size is None
+        return fetched
+
+    @staticmethod
+    def _below_min_short_side(
+        intent: MediaIntent,
+        exc: BelowMinShortSide,
+        *,
+        received: int,
+        expected: Optional[int] = None,
+    ) -> FetchedMedia:
+        return FetchedMedia(
+            intent=intent,
+            probed_size=(exc.width, exc.height),
+            below_min_short_side=True,
+            size=received,
+            bytes_saved=(max(0, expected - received) if expected else 0),
+        )
+
+    def _target_dir(self, intent: MediaIntent) -> Path:
+        return self._paths.images if intent.media_type == MediaType.IMAGE else self._paths.videos
+
+    def _open_temp_file(self, intent: MediaIntent, target_dir: Path) -> tuple[Path, BinaryIO]:
+        """Create a hidden temp file in `target_dir` for a streamed body."""
+        target_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path_str = tempfile.mkstemp(
+            dir=str(target_dir),
+            prefix=f".{intent.tweet_id}.",
+            suffix=".tmp",
+        )
+        return Path(tmp_path_str), os.fdopen(fd, "w+b")
+
+    def _final_filename(self, intent: MediaIntent, content_hash: str) -> str:
+        return generate_media_filename(
+            tweet_id=intent.tweet_id,
+            created_at=intent.created_at,
+            hash6=compute_hash6(content_hash),
+            extension=intent.get_extension(),
+        )
+
+    def _commit_impl(self, fetched: FetchedMedia) -> DownloadResult:
+        """Dedup check + atomic rename + stats (ordered stage)."""
+        intent = fetched.intent
+
+        if fetched.below_min_short_side:
+            # ADR-0005: undersized media never reach the final directory.
+            self._stats.skipped_min_short_side += 1
+            self._stats.min_short_side_bytes_saved += fetched.bytes_saved
+            return DownloadResult(
+                status=DownloadStatus.SKIPPED_MIN_SHORT_SIDE,
+                media_url=intent.url,
+                tweet_id=intent.tweet_id,
+                created_at=intent.created_at,
+                media_type=intent.media_type,
+                probed_size=fetched.probed_size,
+            )
+        content_hash = fetched.content_hash
+        final_path = fetched.final_path
+        assert content_hash is not None
+
+        if fetched.known_file is not None:
+            # Already on disk: the existing file wins, nothing was downloaded.
+            self._dedup.register(content_hash, fetched.known_file)
             self._stats.skipped_duplicate += 1
+            self._stats.skipped_without_fetch += 1
             return DownloadResult(
                 status=DownloadStatus.SKIPPED_DUPLICATE,
                 media_url=intent.url,
@@ -300,18 +670,31 @@ class MediaDownloader:
                 existing_file=self._dedup.get_existing_file(content_hash),
             )
 
-        # Generate filename
-        extension = intent.get_extension()
-        filename = generate_media_filename(
-            tweet_id=intent.tweet_id,
-            created_at=intent.created_at,
-            hash6=hash6,
-            extension=extension,
-        )
+        assert final_path is not None
 
-        # Write to final location (write temp + atomic replace)
-        final_path = target_dir / filename
-        self._atomic_write_bytes(final_path, content)
+        # Check for duplicate ("first wins")
+        if self._dedup.is_known(content_hash):
+            self.discard(fetched)
+            self._stats.skipped_duplicate += 1
+            existing_file = self._dedup.get_existing_file(content_hash)
+            if self._hash_index is not None and existing_file is not None and existing_file.is_file():
+                self._hash_index.record_media(intent.url, existing_file, content_hash)
+            return DownloadResult(
+                status=DownloadStatus.SKIPPED_DUPLICATE,
+                media_url=intent.url,
+                tweet_id=intent.tweet_id,
+                created_at=intent.created_at,
+                media_type=intent.media_type,
+                content_hash=content_hash,
+                existing_file=existing_file,
+            )
+
+        # Move to final location (temp file was fully written + fsynced in fetch)
+        assert fetched.tmp_path is not None
+        os.replace(fetched.tmp_path, final_path)
+        if self._hash_index is not None:
+            self._hash_index.record(final_path, content_hash)
+            self._hash_index.record_media(intent.url, final_path, content_hash)
 
         # Ignore+Replace: delete historical file(s) only after new file is safe
         if self._ignore_replace:
@@ -319,9 +702,14 @@ class MediaDownloader:
 
         # Update dedup index with actual path
         self._dedup.register(content_hash, final_path)
+
+        if fetched.min_short_side_unverified:
+            # Keep the file rather than risk deleting a valid one (ADR-0005).
+            self._stats.min_short_side_unverified += 1
+            self._log.warning("MIN_SHORT_SIDE: could not probe the size of %s, keeping it", intent.url[:80])
 
         # Update stats
-        self._stats.total_bytes += len(content)
+        self._stats.total_bytes += fetched.size
         if intent.media_type == MediaType.IMAGE:
             self._stats.images_downloaded += 1
         else:
@@ -335,9 +723,10 @@ class MediaDownloader:
             media_type=intent.media_type,
             file_path=final_path,
             content_hash=content_hash,
+            probed_size=fetched.probed_size,
         )
 
-    def _atomic_write_bytes(self, final_path: Path, content: bytes) -> None:
+    def _write_temp_bytes(self, final_path: Path, content: bytes) -> Path:
         final_path.parent.mkdir(parents=True, exist_ok=True)
         fd, tmp_path_str = tempfile.mkstemp(
             dir=str(final_path.parent),
@@ -350,12 +739,13 @@ class MediaDownloader:
                 f.write(content)
                 f.flush()
                 os.fsync(f.fileno())
-            os.replace(tmp_path, final_path)
-        finally:
+        except BaseException:
             try:
                 tmp_path.unlink()
             except FileNotFoundError:
                 pass
+            raise
+        return tmp_path
 
     def _delete_replaced_history_files(self, content_hash: str, final_path: Path) -> None:
         normalized_hash = content_hash.lower()
@@ -370,10 +760,13 @@ class MediaDownloader:
             try:
                 old_path.unlink()
             except FileNotFoundError:
-                continue
+                pass
             except OSError as exc:
                 self._log.warning("Ignore+Replace: failed to delete old file %s: %s", old_path, exc)
                 survivors.add(old_path)
+                continue
+            if self._hash_index is not None:
+                self._hash_index.remove(old_path)
 
         self._existing_hashes[normalized_hash] = survivors
 
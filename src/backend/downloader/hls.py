@@ -0,0 +1,343 @@
+"""
+HLS (m3u8) video download (ADR-0006: m3u8 when a video has no mp4 variant).
+
+X serves HLS as a master playlist whose variants are media playlists of
+fMP4 (CMAF) or MPEG-TS segments; CMAF video variants reference a separate
+audio rendition (`#EXT-X-MEDIA:TYPE=AUDIO`). `HlsDownloader`:
+
+1. fetches the master playlist and picks the highest-bandwidth variant
+   (`resolve()`, which also reports its RESOLUTION so MIN_SHORT_SIDE can be
+   decided before any segment is fetched),
+2. fetches the init section + segments of the video (and audio) playlist
+   concurrently, through the same streaming download function as other
+   media (connection pool, throttle, retry, global rate gate), and appends
+   them in playlist order to one file per track,
+3. remuxes the tracks into a single MP4 with a local `ffmpeg -c copy`
+   (no re-encoding).
+
+Encrypted playlists (`#EXT-X-KEY` other than NONE) and byte-range segments
+are not supported.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import re
+import shutil
+from collections import deque
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, BinaryIO, Callable, Mapping, Optional, Sequence, Union
+from urllib.parse import urljoin, urlparse
+
+from .tools import run_tool
+
+
+# Segments in flight per download (shared by the video and audio tracks).
+DEFAULT_SEGMENT_CONCURRENCY = 4
+
+FFMPEG_TIMEOUT_S = 300.0
+
+_ATTR_RE = re.compile(r'([A-Z0-9-]+)=("[^"]*"|[^,]*)')
+
+
+class HlsError(Exception):
+    """Playlist or remux failure (not retried: a retry would fail the same way)."""
+
+
+def is_hls_url(url: str) -> bool:
+    """Whether `url` points at an m3u8 playlist."""
+    return urlparse(url).path.lower().endswith(".m3u8")
+
+
+@dataclass(frozen=True)
+class HlsVariant:
+    """One `#EXT-X-STREAM-INF` entry of a master playlist."""
+
+    uri: str
+    bandwidth: int = 0
+    width: Optional[int] = None
+    height: Optional[int] = None
+    audio_group: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class MasterPlaylist:
+    variants: tuple[HlsVariant, ...]
+    # GROUP-ID -> URI of the audio rendition (DEFAULT=YES, else the first one)
+    audio: Mapping[str, str]
+
+
+@dataclass(frozen=True)
+class MediaPlaylist:
+    segments: tuple[str, ...]
+    init_uri: Optional[str] = None  # `#EXT-X-MAP` (fMP4)
+    duration_s: float = 0.0
+
+
+def _parse_attributes(value: str) -> dict[str, str]:
+    return {k: v[1:-1] if v.startswith('"') else v for k, v in _ATTR_RE.findall(value)}
+
+
+def _parse_resolution(value: Optional[str]) -> tuple[Optional[int], Optional[int]]:
+    try:
+        width, height = (int(v) for v in (value or "").lower().split("x"))
+    except ValueError:
+        return None, None
+    if width <= 0 or height <= 0:
+        return None, None
+    return width, height
+
+
+def parse_playlist(text: str, base_url: str) -> Union[MasterPlaylist, MediaPlaylist]:
+    """
+    Parse an m3u8 playlist; relative URIs are resolved against `base_url`.
+
+    Raises:
+        HlsError: Not a playlist, or uses encryption / byte ranges.
+    """
+    lines = [line.strip() for line in text.splitlines()]
+    if not lines or lines[0] != "#EXTM3U":
+        raise HlsError("not an m3u8 playlist")
+
+    variants: list[HlsVariant] = []
+    audio: dict[str, str] = {}
+    segments: list[str] = []
+    init_uri: Optional[str] = None
+    duration_s = 0.0
+    stream_inf: Optional[dict[str, str]] = None
+
+    for line in lines[1:]:
+        if not line:
+            continue
+        if line.startswith("#"):
+            tag, _, value = line.partition(":")
+            if tag == "#EXT-X-STREAM-INF":
+                stream_inf = _parse_attributes(value)
+            elif tag == "#EXT-X-MEDIA":
+                attrs = _parse_attributes(value)
+                group, uri = attrs.get("GROUP-ID"), attrs.get("URI")
+                if attrs.get("TYPE") == "AUDIO" and group and uri:
+                    if group not in audio or attrs.get("DEFAULT") == "YES":
+                        audio[group] = urljoin(base_url, uri)
+            elif tag == "#EXT-X-MAP":
+                attrs = _parse_attributes(value)
+                if "BYTERANGE" in attrs:
+                    raise HlsError("byte-range HLS segments are not supported")
+                init_uri = urljoin(base_url, attrs.get("URI", ""))
+            elif tag == "#EXT-X-KEY":
+                if _parse_attributes(value).get("METHOD", "NONE") != "NONE":
+                    raise HlsError("encrypted HLS is not supported")
+            elif tag == "#EXT-X-BYTERANGE":
+                raise HlsError("byte-range HLS segments are not supported")
+            elif tag == "#EXTINF":
+                try:
+                    duration_s += float(value.split(",", 1)[0])
+                except ValueError:
+                    pass
+            continue
+
+        uri = urljoin(base_url, line)
+        if stream_inf is not None:
+            width, height = _parse_resolution(stream_inf.get("RESOLUTION"))
+            try:
+                bandwidth = int(stream_inf.get("BANDWIDTH", "0"))
+            except ValueError:
+                bandwidth = 0
+            variants.append(HlsVariant(uri, bandwidth, width, height, stream_inf.get("AUDIO")))
+            stream_inf = None
+        else:
+            segments.append(uri)
+
+    if variants:
+        return MasterPlaylist(variants=tuple(variants), audio=audio)
+    if not segments:
+        raise HlsError("playlist has no segments")
+    return MediaPlaylist(segments=tuple(segments), init_uri=init_uri, duration_s=duration_s)
+
+
+def pick_variant(master: MasterPlaylist) -> HlsVariant:
+    """Highest bandwidth; the larger frame on ties."""
+    return max(master.variants, key=lambda v: (v.bandwidth, (v.width or 0) * (v.height or 0)))
+
+
+@dataclass(frozen=True)
+class HlsPlan:
+    """What `HlsDownloader.resolve()` chose: the playlists to fetch and the expected frame size."""
+
+    video: MediaPlaylist
+    audio: Optional[MediaPlaylist] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    bandwidth: Optional[int] = None
+
+    @property
+    def size(self) -> Optional[tuple[int, int]]:
+        if self.width is None or self.height is None:
+            return None
+        return self.width, self.height
+
+    @property
+    def estimated_bytes(self) -> int:
+        """BANDWIDTH x duration (0 when unknown); used for `min_short_side_bytes_saved`."""
+        if not self.bandwidth:
+            return 0
+        return int(self.bandwidth * self.video.duration_s / 8)
+
+
+class _MemorySink:
+    """In-memory sink for playlists and segments (MediaSink interface, async `write()`)."""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+        self._size = 0
+        self.expected_size: Optional[int] = None
+
+    async def write(self, chunk: bytes) -> None:
+        if chunk:
+            self._chunks.append(chunk)
+            self._size += len(chunk)
+
+    def reset(self) -> None:
+        self._chunks = []
+        self._size = 0
+
+    @property
+    def bytes_written(self) -> int:
+        return self._size
+
+    def getvalue(self) -> bytes:
+        return b"".join(self._chunks)
+
+
+# An AsyncStreamDownloadFunc; the sink is only used through write/reset/
+# bytes_written/expected_size.
+SegmentDownloadFunc = Callable[[str, Any], Awaitable[None]]
+
+
+async def remux_tracks(tracks: Sequence[Path], output: Path, *, timeout_s: float = FFMPEG_TIMEOUT_S) -> None:
+    """
+    Remux concatenated HLS tracks into one MP4 with `ffmpeg -c copy`.
+
+    With two tracks the first is taken as video and the second as audio.
+
+    Raises:
+        HlsError: ffmpeg is missing, failed or timed out (it is killed then).
+    """
+    exe = shutil.which("ffmpeg")
+    if exe is None:
+        raise HlsError("ffmpeg not found (required for HLS videos, see ADR-0006)")
+    cmd = [exe, "-hide_banner", "-loglevel", "error", "-nostdin", "-y"]
+    for track in tracks:
+        cmd += ["-i", str(track)]
+    if len(tracks) == 2:
+        cmd += ["-map", "0:v:0", "-map", "1:a:0"]
+    cmd += ["-c", "copy", "-movflags", "+faststart", "-f", "mp4", str(output)]
+    try:
+        returncode, _, stderr = await run_tool(cmd, timeout_s=timeout_s)
+    except asyncio.TimeoutError as exc:
+        raise HlsError(f"ffmpeg timed out after {timeout_s:.0f}s") from exc
+    except OSError as exc:
+        raise HlsError(f"ffmpeg failed: {exc}") from exc
+    if returncode != 0:
+        detail = stderr.strip().splitlines()[-1:] or [""]
+        raise HlsError(f"ffmpeg exited with {returncode}: {detail[0][:200]}")
+
+
+class HlsDownloader:
+    """
+    Download an HLS video into a single MP4.
+
+    Usage:
+        hls = HlsDownloader(stream_download_func, io_executor=io)
+        plan = await hls.resolve(url)
+        await hls.download(plan, output_path, work_dir)
+
+    `work_dir` receives one file per track and may be removed afterwards.
+    """
+
+    def __init__(
+        self,
+        stream_download_func: SegmentDownloadFunc,
+        *,
+        io_executor: Optional[Executor] = None,
+        segment_concurrency: int = DEFAULT_SEGMENT_CONCURRENCY,
+        ffmpeg_timeout_s: float = FFMPEG_TIMEOUT_S,
+    ) -> None:
+        self._download = stream_download_func
+        self._io_executor = io_executor
+        self._segment_concurrency = max(1, int(segment_concurrency))
+        self._ffmpeg_timeout_s = ffmpeg_timeout_s
+
+    async def resolve(self, url: str) -> HlsPlan:
+        """Fetch the master (if any) and media playlists of `url`."""
+        playlist = await self._fetch_playlist(url)
+        if isinstance(playlist, MediaPlaylist):
+            return HlsPlan(video=playlist)
+
+        variant = pick_variant(playlist)
+        audio_uri = playlist.audio.get(variant.audio_group) if variant.audio_group else None
+        playlists = await asyncio.gather(
+            self._fetch_playlist(variant.uri),
+            *([self._fetch_playlist(audio_uri)] if audio_uri else []),
+        )
+        for media in playlists:
+            if not isinstance(media, MediaPlaylist):
+                raise HlsError("variant playlist is not a media playlist")
+        return HlsPlan(
+            video=playlists[0],
+            audio=(playlists[1] if len(playlists) > 1 else None),
+            width=variant.width,
+            height=variant.height,
+            bandwidth=variant.bandwidth or None,
+        )
+
+    async def download(self, plan: HlsPlan, output: Path, work_dir: Path) -> None:
+        """Fetch every track of `plan` into `work_dir` and remux them into `output`."""
+        slots = asyncio.Semaphore(self._segment_concurrency)
+        tracks = [work_dir / "video.track"]
+        if plan.audio is not None:
+            tracks.append(work_dir / "audio.track")
+        await asyncio.gather(
+            *(
+                self._fetch_track(media, path, slots)
+                for media, path in zip((plan.video, plan.audio), tracks)
+                if media is not None
+            )
+        )
+        await remux_tracks(tracks, output, timeout_s=self._ffmpeg_timeout_s)
+
+    async def _fetch_bytes(self, url: str) -> bytes:
+        sink = _MemorySink()
+        await self._download(url, sink)
+        return sink.getvalue()
+
+    async def _fetch_playlist(self, url: str) -> Union[MasterPlaylist, MediaPlaylist]:
+        body = await self._fetch_bytes(url)
+        return parse_playlist(body.decode("utf-8-sig", errors="replace"), url)
+
+    async def _fetch_track(self, media: MediaPlaylist, path: Path, slots: asyncio.Semaphore) -> None:
+        """Segments are fetched ahead (bounded window) and appended in playlist order."""
+        loop = asyncio.get_running_loop()
+        uris = ([media.init_uri] if media.init_uri else []) + list(media.segments)
+        window = 2 * self._segment_concurrency
+
+        async def fetch(uri: str) -> bytes:
+            async with slots:
+                return await self._fetch_bytes(uri)
+
+        f: BinaryIO = await loop.run_in_executor(self._io_executor, lambda: open(path, "wb"))
+        pending: deque[asyncio.Task[bytes]] = deque()
+        try:
+            for uri in uris:
+                pending.append(asyncio.ensure_future(fetch(uri)))
+                if len(pending) >= window:
+                    await loop.run_in_executor(self._io_executor, f.write, await pending.popleft())
+            while pending:
+                await loop.run_in_executor(self._io_executor, f.write, await pending.popleft())
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            await loop.run_in_executor(self._io_executor, f.close)
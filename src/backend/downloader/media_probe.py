@@ -0,0 +1,446 @@
+"""
+Media dimension probes for the post-download MIN_SHORT_SIDE check (ADR-0005).
+
+Intents flagged `needs_post_min_short_side_check` had no width/height in the
+timeline JSON, so their size is only known once the body arrives. Images
+carry it in the first bytes of the file:
+
+- JPEG: the SOFn segment (after APPn/EXIF segments, which are skipped),
+- PNG: the IHDR chunk,
+- GIF: the logical screen descriptor,
+- WebP: the VP8 / VP8L / VP8X chunk header.
+
+Progressive MP4 videos ("faststart", as served by video.twimg.com) put the
+`moov` box before `mdat`; the video track's `stsd` sample entry (or `tkhd`)
+holds the dimensions.
+
+`ImageSizeProbe` / `Mp4SizeProbe` parse these incrementally from the head of
+the stream without decoding anything; `MinShortSideGuard` wraps a probe and
+raises `BelowMinShortSide` as soon as the size is known to be too small, so
+the download is aborted before the rest of the body is transferred. When the
+head is not enough (MP4 with `moov` at the end, unknown format),
+`ffprobe_size()` / `ffprobe_size_async()` read the finished file.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import shutil
+import subprocess
+from pathlib import Path
+from typing import Iterator, Optional, Protocol, Union
+
+from .tools import run_tool
+
+
+# Bytes buffered per download at most; a header not found by then is "unknown".
+PROBE_LIMIT = 256 * 1024
+# `moov` grows with the number of samples (~100 KiB for a few minutes of video).
+MP4_PROBE_LIMIT = 2 * 1024 * 1024
+
+FFPROBE_TIMEOUT_S = 30.0
+
+
+class _Incomplete:
+    """Marker: the buffered prefix is too short to decide."""
+
+
+_INCOMPLETE = _Incomplete()
+
+_ParseResult = Union[tuple[int, int], None, _Incomplete]
+
+# JPEG start-of-frame markers (SOF0-SOF15 except DHT/JPG/DAC).
+_JPEG_SOF_MARKERS = frozenset((0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF))
+# Markers without a length field.
+_JPEG_STANDALONE_MARKERS = frozenset((0x01, 0xD8, *range(0xD0, 0xD8)))
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+_SIGNATURES = (b"\xff\xd8", _PNG_SIGNATURE, b"GIF8", b"RIFF")
+
+
+def _u16be(data: bytes, offset: int) -> int:
+    return (data[offset] << 8) | data[offset + 1]
+
+
+def _u16le(data: bytes, offset: int) -> int:
+    return data[offset] | (data[offset + 1] << 8)
+
+
+def _u24le(data: bytes, offset: int) -> int:
+    return data[offset] | (data[offset + 1] << 8) | (data[offset + 2] << 16)
+
+
+def _valid(width: int, height: int) -> Optional[tuple[int, int]]:
+    return (width, height) if width > 0 and height > 0 else None
+
+
+def _parse_jpeg(data: bytes) -> _ParseResult:
+    n = len(data)
+    i = 2  # after SOI
+    while True:
+        if i >= n:
+            return _INCOMPLETE
+        if data[i] != 0xFF:
+            return None
+        # Any number of 0xFF fill bytes may precede a marker.
+        while i < n and data[i] == 0xFF:
+            i += 1
+        if i >= n:
+            return _INCOMPLETE
+        marker = data[i]
+        i += 1
+        if marker in _JPEG_STANDALONE_MARKERS:
+            continue
+        if marker in (0xD9, 0xDA):
+            # EOI / start of scan before any frame header.
+            return None
+        if i + 2 > n:
+            return _INCOMPLETE
+        length = _u16be(data, i)
+        if length < 2:
+            return None
+        if marker in _JPEG_SOF_MARKERS:
+            # length(2) precision(1) height(2) width(2)
+            if i + 7 > n:
+                return _INCOMPLETE
+            return _valid(_u16be(data, i + 5), _u16be(data, i + 3))
+        i += length
+
+
+def _parse_png(data: bytes) -> _ParseResult:
+    if len(data) < 24:
+        return _INCOMPLETE
+    if data[12:16] != b"IHDR":
+        return None
+    return _valid(int.from_bytes(data[16:20], "big"), int.from_bytes(data[20:24], "big"))
+
+
+def _parse_gif(data: bytes) -> _ParseResult:
+    if len(data) < 10:
+        return _INCOMPLETE
+    return _valid(_u16le(data, 6), _u16le(data, 8))
+
+
+def _parse_webp(data: bytes) -> _ParseResult:
+    if len(data) < 30:
+        return _INCOMPLETE
+    chunk = data[12:16]
+    if chunk == b"VP8 ":
+        # Key frame header: 3-byte frame tag, start code, then 14-bit sizes.
+        if data[23:26] != b"\x9d\x01\x2a":
+            return None
+        return _valid(_u16le(data, 26) & 0x3FFF, _u16le(data, 28) & 0x3FFF)
+    if chunk == b"VP8L":
+        if data[20] != 0x2F:
+            return None
+        bits = int.from_bytes(data[21:25], "little")
+        return _valid((bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1)
+    if chunk == b"VP8X":
+        return _valid(_u24le(data, 24) + 1, _u24le(data, 27) + 1)
+    return None
+
+
+def _parse_image_header(data: bytes) -> _ParseResult:
+    if len(data) < 12:
+        # Too short for the checks below; only a foreign signature is final.
+        known = any(sig.startswith(data[: len(sig)]) for sig in _SIGNATURES)
+        return _INCOMPLETE if known else None
+    if data.startswith(b"\xff\xd8"):
+        return _parse_jpeg(data)
+    if data.startswith(_PNG_SIGNATURE):
+        return _parse_png(data)
+    if data.startswith((b"GIF87a", b"GIF89a")):
+        return _parse_gif(data)
+    if data.startswith(b"RIFF") and data[8:12] == b"WEBP":
+        return _parse_webp(data)
+    return None
+
+
+# MP4 boxes on the path moov/trak/mdia/minf/stbl/stsd.
+_MP4_VISUAL_SAMPLE_ENTRIES = frozenset((b"avc1", b"avc3", b"hvc1", b"hev1", b"vp09", b"av01", b"mp4v", b"encv"))
+
+
+def _u32be(data: bytes, offset: int) -> int:
+    return int.from_bytes(data[offset : offset + 4], "big")
+
+
+def _iter_boxes(data: bytes, start: int, end: int) -> Iterator[tuple[bytes, int, int]]:
+    """(type, payload start, box end) of the complete boxes in data[start:end]."""
+    i = start
+    while i + 8 <= end:
+        size = _u32be(data, i)
+        box_type = data[i + 4 : i + 8]
+        header = 8
+        if size == 1:
+            if i + 16 > end:
+                return
+            size = int.from_bytes(data[i + 8 : i + 16], "big")
+            header = 16
+        elif size == 0:
+            size = end - i
+        if size < header or i + size > end:
+            return
+        yield box_type, i + header, i + size
+        i += size
+
+
+def _child(data: bytes, start: int, end: int, box_type: bytes) -> Optional[tuple[int, int]]:
+    for found, payload, box_end in _iter_boxes(data, start, end):
+        if found == box_type:
+            return payload, box_end
+    return None
+
+
+def _mp4_track_size(data: bytes, start: int, end: int) -> Optional[tuple[int, int]]:
+    """Dimensions of a video `trak` (None for audio/other tracks)."""
+    tkhd_size: Optional[tuple[int, int]] = None
+    tkhd = _child(data, start, end, b"tkhd")
+    if tkhd is not None:
+        payload, box_end = tkhd
+        # version/flags, times + IDs (20 or 32 bytes), reserved/layer/group/volume (16), matrix (36)
+        offset = payload + 4 + (32 if data[payload] == 1 else 20) + 16 + 36
+        if offset + 8 <= box_end:
+            tkhd_size = _valid(_u32be(data, offset) >> 16, _u32be(data, offset + 4) >> 16)
+
+    mdia = _child(data, start, end, b"mdia")
+    if mdia is None:
+        return tkhd_size
+    hdlr = _child(data, mdia[0], mdia[1], b"hdlr")
+    if hdlr is not None and data[hdlr[0] + 8 : hdlr[0] + 12] != b"vide":
+        return None
+
+    box = mdia
+    for box_type in (b"minf", b"stbl", b"stsd"):
+        box = _child(data, box[0], box[1], box_type)
+        if box is None:
+            return tkhd_size
+    # stsd: version/flags, entry_count, then sample entries.
+    for entry_type, payload, entry_end in _iter_boxes(data, box[0] + 8, box[1]):
+        if entry_type in _MP4_VISUAL_SAMPLE_ENTRIES and payload + 28 <= entry_end:
+            # reserved(6) data_reference_index(2) pre_defined/reserved(16) width(2) height(2)
+            size = _valid(_u16be(data, payload + 24), _u16be(data, payload + 26))
+            if size is not None:
+                return size
+    return tkhd_size
+
+
+def _parse_mp4(data: bytes) -> _ParseResult:
+    n = len(data)
+    i = 0
+    while True:
+        if i + 16 > n:
+            return _INCOMPLETE
+        size = _u32be(data, i)
+        box_type = data[i + 4 : i + 8]
+        header = 8
+        if size == 1:
+            size = int.from_bytes(data[i + 8 : i + 16], "big")
+            header = 16
+        elif size == 0:
+            # Last box, up to the end of the file: the body has to be complete.
+            return None
+        if size < header or (i == 0 and box_type != b"ftyp"):
+            return None
+        if box_type == b"mdat":
+            # `moov` at the end (no faststart): only the finished file has it.
+            return None
+        if box_type == b"moov":
+            if i + size > n:
+                return _INCOMPLETE
+            for trak_type, payload, trak_end in _iter_boxes(data, i + header, i + size):
+                if trak_type == b"trak":
+                    track_size = _mp4_track_size(data, payload, trak_end)
+                    if track_size is not None:
+                        return track_size
+            return None
+        i += size
+
+
+def probe_image_size(data: bytes) -> Optional[tuple[int, int]]:
+    """
+    (width, height) from the header of a JPEG/PNG/GIF/WebP body (or its prefix).
+
+    Returns None if the format is not recognised or the prefix is too short.
+    """
+    result = _parse_image_header(bytes(data))
+    return None if isinstance(result, _Incomplete) else result
+
+
+def probe_mp4_size(data: bytes) -> Optional[tuple[int, int]]:
+    """
+    (width, height) of the first video track of an MP4 body (or its prefix).
+
+    Returns None if `moov` is not in `data` (truncated, or stored after `mdat`).
+    """
+    result = _parse_mp4(bytes(data))
+    return None if isinstance(result, _Incomplete) else result
+
+
+def _ffprobe_cmd(exe: str, path: Path) -> list[str]:
+    return [
+        exe,
+        "-v",
+        "error",
+        "-select_streams",
+        "v:0",
+        "-show_entries",
+        "stream=width,height",
+        "-of",
+        "csv=p=0:s=x",
+        str(path),
+    ]
+
+
+def _parse_ffprobe_output(returncode: int, stdout: str) -> Optional[tuple[int, int]]:
+    if returncode != 0:
+        return None
+    try:
+        width, height = (int(v) for v in stdout.strip().splitlines()[0].split("x")[:2])
+    except (IndexError, ValueError):
+        return None
+    return _valid(width, height)
+
+
+def ffprobe_size(path: Path, *, timeout_s: float = FFPROBE_TIMEOUT_S) -> Optional[tuple[int, int]]:
+    """(width, height) of the first video stream via a local `ffprobe`; None if unavailable or it fails."""
+    exe = shutil.which("ffprobe")
+    if exe is None:
+        return None
+    try:
+        out = subprocess.run(_ffprobe_cmd(exe, path), capture_output=True, text=True, timeout=timeout_s, check=False)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return _parse_ffprobe_output(out.returncode, out.stdout)
+
+
+async def ffprobe_size_async(path: Path, *, timeout_s: float = FFPROBE_TIMEOUT_S) -> Optional[tuple[int, int]]:
+    """`ffprobe_size()` as an asyncio subprocess (killed on timeout); holds no thread."""
+    exe = shutil.which("ffprobe")
+    if exe is None:
+        return None
+    try:
+        returncode, stdout, _ = await run_tool(_ffprobe_cmd(exe, path), timeout_s=timeout_s)
+    except (OSError, asyncio.TimeoutError):
+        return None
+    return _parse_ffprobe_output(returncode, stdout)
+
+
+class SizeProbe(Protocol):
+    """Incremental dimension probe fed with the head of a body."""
+
+    @property
+    def size(self) -> Optional[tuple[int, int]]: ...
+
+    @property
+    def done(self) -> bool: ...
+
+    def feed(self, chunk: bytes) -> None: ...
+
+    def reset(self) -> None: ...
+
+
+class _BufferedProbe:
+    """
+    Buffers chunks until `_parse` decides, or `limit` bytes were seen; after
+    that `feed()` is a no-op.
+    """
+
+    _default_limit = PROBE_LIMIT
+
+    def __init__(self, *, limit: Optional[int] = None) -> None:
+        self._limit = max(1, int(limit if limit is not None else self._default_limit))
+        self.reset()
+
+    @property
+    def size(self) -> Optional[tuple[int, int]]:
+        return self._size
+
+    @property
+    def done(self) -> bool:
+        return self._done
+
+    def feed(self, chunk: bytes) -> None:
+        if self._done or not chunk:
+            return
+        self._buffer += chunk
+        result = self._parse(bytes(self._buffer))
+        if isinstance(result, _Incomplete):
+            if len(self._buffer) >= self._limit:
+                self._finish(None)
+            return
+        self._finish(result)
+
+    def reset(self) -> None:
+        """Forget everything fed so far (the body restarts from byte 0)."""
+        self._buffer = bytearray()
+        self._size: Optional[tuple[int, int]] = None
+        self._done = False
+
+    def _finish(self, size: Optional[tuple[int, int]]) -> None:
+        self._size = size
+        self._done = True
+        self._buffer = bytearray()
+
+    @staticmethod
+    def _parse(data: bytes) -> _ParseResult:
+        raise NotImplementedError
+
+
+class ImageSizeProbe(_BufferedProbe):
+    """Incremental `probe_image_size()` (JPEG/PNG/GIF/WebP)."""
+
+    _parse = staticmethod(_parse_image_header)
+
+
+class Mp4SizeProbe(_BufferedProbe):
+    """Incremental `probe_mp4_size()` (needs the whole `moov` box)."""
+
+    _default_limit = MP4_PROBE_LIMIT
+    _parse = staticmethod(_parse_mp4)
+
+
+class BelowMinShortSide(Exception):
+    """The probed media is smaller than MIN_SHORT_SIDE (aborts the transfer)."""
+
+    def __init__(self, width: int, height: int, min_short_side: int) -> None:
+        super().__init__(f"media is {width}x{height}, below MIN_SHORT_SIDE={min_short_side}")
+        self.width = width
+        self.height = height
+        self.min_short_side = min_short_side
+
+
+class MinShortSideGuard:
+    """
+    Feeds body chunks to a probe and enforces MIN_SHORT_SIDE.
+
+    `feed()` raises `BelowMinShortSide` once the probed size is too small.
+    When the probe gives up, the media is kept and reported as unverified.
+    """
+
+    def __init__(self, min_short_side: int, probe: SizeProbe) -> None:
+        self._min_short_side = int(min_short_side)
+        self._probe = probe
+
+    @property
+    def min_short_side(self) -> int:
+        return self._min_short_side
+
+    @property
+    def size(self) -> Optional[tuple[int, int]]:
+        return self._probe.size
+
+    @property
+    def verified(self) -> bool:
+        """True once the size is known (and passed the check)."""
+        return self._probe.size is not None
+
+    def feed(self, chunk: bytes) -> None:
+        if self._probe.done:
+            return
+        self._probe.feed(chunk)
+        size = self._probe.size
+        if size is not None and min(size) < self._min_short_side:
+            raise BelowMinShortSide(size[0], size[1], self._min_short_side)
+
+    def reset(self) -> None:
+        self._probe.reset()
@@ -0,0 +1,40 @@
+"""
+Local media tools (ffmpeg, ffprobe) run as asyncio subprocesses.
+
+A remux or probe can take seconds to minutes. Run this way it holds neither
+the event loop nor a thread of the shared I/O pool, which does the disk
+writes and ordered commits of every run.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Sequence
+
+
+async def run_tool(cmd: Sequence[str], *, timeout_s: float) -> tuple[int, str, str]:
+    """
+    Run `cmd` (stdin closed) and collect its output.
+
+    Returns:
+        (exit code, stdout, stderr)
+
+    Raises:
+        OSError: The executable could not be started.
+        asyncio.TimeoutError: It ran longer than `timeout_s`; the process is killed.
+    """
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout_s)
+    except BaseException:
+        # Timeout or cancelled run: don't leave the tool running.
+        if proc.returncode is None:
+            proc.kill()
+            await proc.wait()
+        raise
+    return proc.returncode or 0, stdout.decode("utf-8", "replace"), stderr.decode("utf-8", "replace")
@@ -5,12 +5,14 @@ Provides:
 - Directory structure management (storage.py)
 - File naming conventions (naming.py)
 - Content hashing for deduplication (hashing.py)
+- Persistent per-account hash cache (hash_index.py)
 - Archive utilities for Pack&Restart (archive_zip.py)
 """
 
 from .storage import AccountStorageManager, MediaType
 from .naming import generate_media_filename, parse_media_filename
 from .hashing import compute_file_hash, compute_hash6
+from .hash_index import FileHashIndex
 from .archive_zip import archive_account_files, delete_account_files, ArchiveResult
 
 __all__ = [
@@ -20,6 +22,7 @@ __all__ = [
     "parse_media_filename",
     "compute_file_hash",
     "compute_hash6",
+    "FileHashIndex",
     "archive_account_files",
     "delete_account_files",
     "ArchiveResult",
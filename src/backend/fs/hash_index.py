@@ -0,0 +1,347 @@
+"""
+Persistent content-hash cache for an account directory.
+
+Hashing every existing file at the start of each run is the dominant cost
+for large accounts. This index remembers the SHA-256 of each media file,
+keyed by its path relative to the account root, and trusts the cached hash
+as long as the file's size and mtime are unchanged.
+
+Storage: a small SQLite database at <download_root>/<handle>/.xmc_hash_index.sqlite3
+(outside images/ and videos/, so it is never scanned as media).
+
+It also maps media URLs to the file they were saved as (or deduplicated
+against), so re-runs can skip the HTTP request for media already on disk.
+
+The index is a cache: any SQLite error degrades to "miss" (rehash / refetch)
+rather than failing the run.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Iterable, Optional
+
+from .hashing import BUFFER_SIZE, compute_file_hash
+
+
+INDEX_FILENAME = ".xmc_hash_index.sqlite3"
+
+# Bump when the table layout changes; older indexes are dropped and rebuilt.
+SCHEMA_VERSION = 1
+
+logger = logging.getLogger(__name__)
+
+
+class FileHashIndex:
+    """
+    path + size + mtime -> content hash, persisted per account.
+
+    Usage:
+        index = FileHashIndex.for_account(paths.root)
+        content_hash = index.hash_file(file_path)   # cached unless file changed
+        index.record(new_file, content_hash)        # after writing a new file
+        index.close()
+
+    Thread-safe: one connection guarded by a lock (download workers commit
+    from different threads).
+    """
+
+    def __init__(self, db_path: Path, *, root: Optional[Path] = None) -> None:
+        """
+        Open (or create) an index database.
+
+        Args:
+            db_path: SQLite file path.
+            root: Directory that stored paths are relative to (defaults to db_path's parent).
+        """
+        self._db_path = Path(db_path)
+        self._root = (Path(root) if root is not None else self._db_path.parent).resolve()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._conn = self._open()
+
+    @classmethod
+    def for_account(cls, account_root: Path) -> "FileHashIndex":
+        """Open the index stored in an account root directory."""
+        account_root = Path(account_root)
+        account_root.mkdir(parents=True, exist_ok=True)
+        return cls(account_root / INDEX_FILENAME, root=account_root)
+
+    @property
+    def db_path(self) -> Path:
+        return self._db_path
+
+    @property
+    def hits(self) -> int:
+        """Lookups answered from the index since open."""
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        """Lookups that required hashing the file since open."""
+        return self._misses
+
+    # ------------------------------------------------------------------
+    # Lookup / update
+    # ------------------------------------------------------------------
+
+    def lookup(self, file_path: Path, st: Optional[os.stat_result] = None) -> Optional[str]:
+        """
+        Return the cached hash if the file is unchanged since it was recorded.
+
+        Args:
+            file_path: File to look up.
+            st: Optional pre-fetched stat result.
+
+        Returns:
+            Lowercase hex hash, or None on miss.
+        """
+        try:
+            st = st or os.stat(file_path)
+        except OSError:
+            return None
+
+        key = self._key(file_path)
+        with self._lock:
+            try:
+                row = self._conn.execute(
+                    "SELECT size, mtime_ns, sha256 FROM files WHERE path = ?",
+                    (key,),
+                ).fetchone()
+            except sqlite3.Error as exc:
+                logger.warning("Hash index lookup failed (%s): %s", self._db_path, exc)
+                return None
+
+        if row is None or row[0] != st.st_size or row[1] != st.st_mtime_ns:
+            return None
+        return str(row[2])
+
+    def record(self, file_path: Path, content_hash: str, st: Optional[os.stat_result] = None) -> None:
+        """
+        Store the hash of a file as of its current size/mtime.
+
+        Args:
+            file_path: File that was hashed or written.
+            content_hash: Its SHA-256 hash.
+            st: Optional pre-fetched stat result.
+        """
+        self.record_many([(file_path, content_hash, st)])
+
+    def record_many(
+        self,
+        entries: Iterable[tuple[Path, str, Optional[os.stat_result]]],
+    ) -> None:
+        """Store several hashes in one transaction."""
+        rows = []
+        for file_path, content_hash, st in entries:
+            try:
+                st = st or os.stat(file_path)
+            except OSError:
+                continue
+            rows.append((self._key(file_path), st.st_size, st.st_mtime_ns, content_hash.lower()))
+        if not rows:
+            return
+
+        self._write_many(
+            "INSERT OR REPLACE INTO files (path, size, mtime_ns, sha256) VALUES (?, ?, ?, ?)",
+            rows,
+        )
+
+    def remove(self, file_path: Path) -> None:
+        """Forget a file (e.g. after deleting it)."""
+        self._forget_paths([(self._key(file_path),)])
+
+    def lookup_media(self, url: str) -> Optional[tuple[Path, str]]:
+        """
+        Find the file a media URL was previously saved as.
+
+        Only answers if that file still exists unchanged (its recorded size/mtime
+        and hash still match), so a hit can safely stand in for a download.
+
+        Returns:
+            (file path, content hash), or None.
+        """
+        with self._lock:
+            try:
+                row = self._conn.execute(
+                    "SELECT path, sha256 FROM media WHERE url = ?",
+                    (url,),
+                ).fetchone()
+            except sqlite3.Error as exc:
+                logger.warning("Hash index lookup failed (%s): %s", self._db_path, exc)
+                return None
+        if row is None:
+            return None
+
+        file_path = self._root / row[0]
+        content_hash = str(row[1])
+        if self.lookup(file_path) != content_hash:
+            return None
+        return file_path, content_hash
+
+    def record_media(self, url: str, file_path: Path, content_hash: str) -> None:
+        """Remember that `url` has the content of `file_path` (downloaded or deduplicated)."""
+        self._write_many(
+            "INSERT OR REPLACE INTO media (url, path, sha256) VALUES (?, ?, ?)",
+            [(url, self._key(file_path), content_hash.lower())],
+        )
+
+    def hash_file(self, file_path: Path, buffer_size: int = BUFFER_SIZE) -> str:
+        """
+        Get a file's content hash, rehashing only if it changed since last seen.
+
+        Safe to call from several threads at once (see hash_files_parallel).
+
+        Raises:
+            OSError: If the file cannot be read.
+        """
+        st = os.stat(file_path)
+        cached = self.lookup(file_path, st)
+        with self._lock:
+            if cached is not None:
+                self._hits += 1
+            else:
+                self._misses += 1
+        if cached is not None:
+            return cached
+
+        content_hash = compute_file_hash(file_path, buffer_size=buffer_size)
+        self.record(file_path, content_hash, st)
+        return content_hash
+
+    def prune_directory(self, directory: Path, keep: Iterable[Path]) -> int:
+        """
+        Drop entries under `directory` whose files were not seen in a scan.
+
+        Args:
+            directory: Scanned directory (non-recursive).
+            keep: Files that still exist in it.
+
+        Returns:
+            Number of entries removed.
+        """
+        prefix = self._key(directory)
+        keep_keys = {self._key(p) for p in keep}
+        with self._lock:
+            try:
+                rows = self._conn.execute(
+                    "SELECT path FROM files WHERE path LIKE ? ESCAPE '\\'",
+                    (_like_prefix(prefix + "/"),),
+                ).fetchall()
+            except sqlite3.Error as exc:
+                logger.warning("Hash index prune failed (%s): %s", self._db_path, exc)
+                return 0
+
+        stale = [(r[0],) for r in rows if r[0] not in keep_keys]
+        if stale:
+            self._forget_paths(stale)
+        return len(stale)
+
+    def close(self) -> None:
+        with self._lock:
+            try:
+                self._conn.close()
+            except sqlite3.Error:
+                pass
+
+    def __enter__(self) -> "FileHashIndex":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _forget_paths(self, keys: list[tuple[str]]) -> None:
+        self._write_many(
+            "DELETE FROM files WHERE path = ?",
+            keys,
+            "DELETE FROM media WHERE path = ?",
+        )
+
+    def _write_many(self, sql: str, rows: list[tuple], *more_sql: str) -> None:
+        with self._lock:
+            try:
+                self._conn.execute("BEGIN")
+                try:
+                    self._conn.executemany(sql, rows)
+                    for extra in more_sql:
+                        self._conn.executemany(extra, rows)
+                except BaseException:
+                    self._conn.execute("ROLLBACK")
+                    raise
+                self._conn.execute("COMMIT")
+            except sqlite3.Error as exc:
+                logger.warning("Hash index update failed (%s): %s", self._db_path, exc)
+
+    def _key(self, file_path: Path) -> str:
+        path = Path(file_path)
+        try:
+            return path.relative_to(self._root).as_posix()
+        except ValueError:
+            pass
+        path = path.resolve()
+        try:
+            return path.relative_to(self._root).as_posix()
+        except ValueError:
+            return path.as_posix()
+
+    def _open(self) -> sqlite3.Connection:
+        try:
+            return self._connect()
+        except sqlite3.DatabaseError as exc:
+            # Corrupt or foreign file: it is only a cache, start over.
+            logger.warning("Hash index unreadable, rebuilding (%s): %s", self._db_path, exc)
+            for suffix in ("", "-wal", "-shm"):
+                try:
+                    Path(str(self._db_path) + suffix).unlink()
+                except FileNotFoundError:
+                    pass
+            return self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self._db_path), check_same_thread=False, isolation_level=None)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            row = conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+            if row is None or row[0] != str(SCHEMA_VERSION):
+                conn.execute("DROP TABLE IF EXISTS files")
+                conn.execute("DROP TABLE IF EXISTS media")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS files ("
+                " path TEXT PRIMARY KEY,"
+                " size INTEGER NOT NULL,"
+                " mtime_ns INTEGER NOT NULL,"
+                " sha256 TEXT NOT NULL"
+                ")"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS media ("
+                " url TEXT PRIMARY KEY,"
+                " path TEXT NOT NULL,"
+                " sha256 TEXT NOT NULL"
+                ")"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS media_path ON media (path)")
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('schema_version', ?)",
+                (str(SCHEMA_VERSION),),
+            )
+        except sqlite3.DatabaseError:
+            conn.close()
+            raise
+        return conn
+
+
+def _like_prefix(prefix: str) -> str:
+    escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return escaped + "%"
@@ -8,8 +8,10 @@ in filenames for traceability, while the full hash is used for deduplication.
 from __future__ import annotations
 
 import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import BinaryIO
+from typing import BinaryIO, Callable, Optional, Sequence
 
 
 # Hash algorithm to use
@@ -21,13 +23,24 @@ HASH6_LENGTH = 6
 # Buffer size for streaming hash computation
 BUFFER_SIZE = 65536  # 64 KB
 
+# Buffer size for bulk scans of existing files. hashlib releases the GIL for
+# updates larger than 2 KiB, so big reads let several threads hash in parallel.
+SCAN_BUFFER_SIZE = 1024 * 1024  # 1 MiB
 
-def compute_file_hash(file_path: Path | str) -> str:
+# Default worker count for parallel file hashing
+DEFAULT_HASH_WORKERS = min(8, os.cpu_count() or 1)
+
+# (done, total) progress callback
+ProgressCallback = Callable[[int, int], None]
+
+
+def compute_file_hash(file_path: Path | str, buffer_size: int = BUFFER_SIZE) -> str:
     """
     Compute the SHA-256 hash of a file's contents.
 
     Args:
         file_path: Path to the file.
+        buffer_size: Read size per chunk.
 
     Returns:
         Lowercase hexadecimal hash string.
@@ -39,12 +52,70 @@ def compute_file_hash(file_path: Path | str) -> str:
     path = Path(file_path)
     hasher = hashlib.new(HASH_ALGORITHM)
 
-    with open(path, 'rb') as f:
-        _update_hash_from_stream(hasher, f)
+    with open(path, 'rb', buffering=0) as f:
+        buf = bytearray(buffer_size)
+        view = memoryview(buf)
+        while True:
+            n = f.readinto(buf)
+            if not n:
+                break
+            hasher.update(view[:n])
 
     return hasher.hexdigest()
 
 
+def hash_files_parallel(
+    file_paths: Sequence[Path],
+    *,
+    hash_func: Optional[Callable[[Path], str]] = None,
+    workers: int = DEFAULT_HASH_WORKERS,
+    on_progress: Optional[ProgressCallback] = None,
+) -> list[Optional[str]]:
+    """
+    Hash many files on a thread pool.
+
+    Args:
+        file_paths: Files to hash.
+        hash_func: Per-file hash function (default: compute_file_hash with
+            SCAN_BUFFER_SIZE reads).
+        workers: Thread count; 1 hashes inline.
+        on_progress: Called as (done, total) after each file, from the
+            calling thread.
+
+    Returns:
+        Hashes in the same order as `file_paths`; None for files that could
+        not be read.
+    """
+    if hash_func is None:
+        def hash_func(p: Path) -> str:
+            return compute_file_hash(p, buffer_size=SCAN_BUFFER_SIZE)
+
+    total = len(file_paths)
+    results: list[Optional[str]] = [None] * total
+
+    def _one(i: int) -> None:
+        try:
+            results[i] = hash_func(file_paths[i])
+        except OSError:
+            results[i] = None
+
+    if workers <= 1 or total <= 1:
+        for i in range(total):
+            _one(i)
+            if on_progress is not None:
+                on_progress(i + 1, total)
+        return results
+
+    with ThreadPoolExecutor(max_workers=min(workers, total), thread_name_prefix="hash") as pool:
+        futures = [pool.submit(_one, i) for i in range(total)]
+        for done, future in enumerate(as_completed(futures), start=1):
+            future.result()
+            if on_progress is not None:
+                on_progress(done, total)
+
+    return results
+
+
 def compute_bytes_hash(data: bytes) -> str:
     """
     Compute the SHA-256 hash of bytes.
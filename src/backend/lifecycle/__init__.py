@@ -23,16 +23,21 @@ from .operations import (
 
 if TYPE_CHECKING:
     from src.backend.fs import AccountStorageManager
+    from src.backend.pipeline.timeline_cache import TimelineCacheStore
     from fastapi import APIRouter  # pragma: no cover
 
 
-def create_lifecycle_router(*, storage: "AccountStorageManager") -> "APIRouter":
+def create_lifecycle_router(
+    *,
+    storage: "AccountStorageManager",
+    timeline_caches: "TimelineCacheStore | None" = None,
+) -> "APIRouter":
     """
     Lazily import FastAPI router to keep non-web imports lightweight.
     """
     from .api import create_lifecycle_router as _create_lifecycle_router
 
-    return _create_lifecycle_router(storage=storage)
+    return _create_lifecycle_router(storage=storage, timeline_caches=timeline_caches)
 
 __all__ = [
     "StartMode",
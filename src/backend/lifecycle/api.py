@@ -10,6 +10,7 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
 
 from src.backend.fs import AccountStorageManager
+from src.backend.pipeline.timeline_cache import TimelineCacheStore
 
 from .models import StartMode, CancelMode
 from .operations import (
@@ -26,6 +27,7 @@ class CheckExistingFilesOut(BaseModel):
     image_count: int
     video_count: int
     total_count: int
+    has_timeline_cache: bool = False
 
 
 class PrepareStartIn(BaseModel):
@@ -58,12 +60,18 @@ class PrepareCancelOut(BaseModel):
     error: Optional[str] = None
 
 
-def create_lifecycle_router(*, storage: AccountStorageManager) -> APIRouter:
+def create_lifecycle_router(
+    *,
+    storage: AccountStorageManager,
+    timeline_caches: Optional[TimelineCacheStore] = None,
+) -> APIRouter:
     """
     Create the lifecycle API router.
 
     Args:
         storage: The account storage manager.
+        timeline_caches: Timeline caches, reported by the check endpoint so the
+            UI only offers Refilter when there is a cache to refilter.
 
     Returns:
         FastAPI router with lifecycle endpoints.
@@ -76,15 +84,20 @@ def create_lifecycle_router(*, storage: AccountStorageManager) -> APIRouter:
         Check if an account has existing media files.
 
         This is called before Start New to determine if the user needs
-        to choose how to handle existing files.
+        to choose how to handle existing files, and to gate Refilter.
         """
         info = check_existing_files(storage, handle)
+        try:
+            has_timeline_cache = timeline_caches is not None and timeline_caches.exists(handle)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
         return CheckExistingFilesOut(
             handle=handle,
             has_files=info.has_files,
             image_count=info.image_count,
             video_count=info.video_count,
             total_count=info.total_count,
+            has_timeline_cache=has_timeline_cache,
         )
 
     @router.post("/prepare-start", response_model=PrepareStartOut)
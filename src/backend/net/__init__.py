@@ -1,5 +1,7 @@
 """
-Network utilities: throttle, retry with exponential backoff, and proxy config.
+Network utilities: throttle, retry with exponential backoff, proxy config,
+the process-wide rate governor, and the shared keep-alive httpx client used
+for media downloads.
 """
 
 from .throttle import Throttle, ThrottleConfig
@@ -10,6 +12,8 @@ from .retry import (
     with_retry_async,
 )
 from .proxy import ProxyConfig
+from .governor import FairRateLimiter, RateGate, RateGovernor, RateLimitConfig
+from .async_http import new_async_client, shared_async_client
 
 __all__ = [
     "Throttle",
@@ -19,4 +23,10 @@ __all__ = [
     "with_retry",
     "with_retry_async",
     "ProxyConfig",
+    "FairRateLimiter",
+    "RateGate",
+    "RateGovernor",
+    "RateLimitConfig",
+    "new_async_client",
+    "shared_async_client",
 ]
@@ -0,0 +1,242 @@
+"""
+Process-wide rate governor shared by all concurrent account runs.
+
+`Throttle` spaces the requests of one run; with several runs in parallel the
+total rate to X grows with `max_concurrent`. The governor adds global caps on
+top, per lane:
+
+- api:   GraphQL requests/s (timeline pages)
+- media: CDN requests/s and bytes/s (pbs.twimg.com / video.twimg.com)
+
+Each cap is a token bucket whose waiters are served round-robin by handle, so
+running accounts get an equal share regardless of how many download workers
+each one has in flight.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Optional
+
+
+DEFAULT_API_REQUESTS_PER_S = 1.0
+DEFAULT_MEDIA_REQUESTS_PER_S = 8.0
+DEFAULT_MEDIA_BYTES_PER_S = 0.0  # 0 = unlimited
+
+
+def _non_negative_float(value: Any, default: float) -> float:
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return default
+
+
+@dataclass
+class RateLimitConfig:
+    """
+    Global rate caps shared by all runs (0 = unlimited).
+
+    Attributes:
+        api_requests_per_s: GraphQL API requests per second, all accounts combined.
+        media_requests_per_s: Media (CDN) requests per second, all accounts combined.
+        media_bytes_per_s: Media download bandwidth in bytes per second.
+        enabled: If False, no global caps apply (per-run Throttle still does).
+    """
+    api_requests_per_s: float = DEFAULT_API_REQUESTS_PER_S
+    media_requests_per_s: float = DEFAULT_MEDIA_REQUESTS_PER_S
+    media_bytes_per_s: float = DEFAULT_MEDIA_BYTES_PER_S
+    enabled: bool = True
+
+    def to_persist_dict(self) -> dict[str, Any]:
+        return {
+            "api_requests_per_s": self.api_requests_per_s,
+            "media_requests_per_s": self.media_requests_per_s,
+            "media_bytes_per_s": self.media_bytes_per_s,
+            "enabled": self.enabled,
+        }
+
+    @classmethod
+    def from_persist_dict(cls, data: dict[str, Any]) -> "RateLimitConfig":
+        return cls(
+            api_requests_per_s=_non_negative_float(data.get("api_requests_per_s"), DEFAULT_API_REQUESTS_PER_S),
+            media_requests_per_s=_non_negative_float(data.get("media_requests_per_s"), DEFAULT_MEDIA_REQUESTS_PER_S),
+            media_bytes_per_s=_non_negative_float(data.get("media_bytes_per_s"), DEFAULT_MEDIA_BYTES_PER_S),
+            enabled=bool(data.get("enabled", True)),
+        )
+
+
+class FairRateLimiter:
+    """
+    Token bucket whose waiters are granted round-robin across keys.
+
+    `acquire(key, amount)` waits until the bucket holds `min(amount, burst)`
+    tokens, then takes `amount` (the balance may go negative for amounts larger
+    than the burst, which delays the following grants accordingly). When
+    several keys are waiting, grants alternate between keys instead of going
+    to whichever key queued the most requests.
+
+    Single event loop: waiters are granted by a dispatcher task on the loop of
+    the first waiter.
+    """
+
+    def __init__(self, rate: float, *, burst: Optional[float] = None) -> None:
+        self._rate = 0.0
+        self._burst = 1.0
+        self._tokens = 0.0
+        self._updated = time.monotonic()
+        self._queues: dict[str, deque[tuple[float, asyncio.Future[None]]]] = {}
+        self._ring: deque[str] = deque()
+        self._task: Optional[asyncio.Task[None]] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Future[None]] = None
+        self.set_rate(rate, burst=burst)
+        self._tokens = self._burst
+
+    @property
+    def rate(self) -> float:
+        """Tokens per second (0 = unlimited)."""
+        return self._rate
+
+    @property
+    def waiting(self) -> int:
+        """Number of queued acquire() calls."""
+        return sum(len(q) for q in self._queues.values())
+
+    def set_rate(self, rate: float, *, burst: Optional[float] = None) -> None:
+        """Change the rate (and burst, default max(1, rate)); applies to queued waiters too."""
+        self._refill()
+        self._rate = max(0.0, float(rate))
+        self._burst = max(1.0, float(burst) if burst is not None else self._rate)
+        self._tokens = min(self._tokens, self._burst)
+        # Re-plan a dispatcher that is sleeping on the old rate.
+        wake, loop = self._wake, self._loop
+        if wake is not None and loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(_resolve, wake)
+
+    async def acquire(self, key: str, amount: float = 1.0) -> None:
+        """Wait for `amount` tokens on behalf of `key`."""
+        if self._rate <= 0:
+            return
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Waiters of another (finished) loop can never be granted: start over.
+            self._queues.clear()
+            self._ring.clear()
+            self._task = None
+            self._wake = None
+            self._loop = loop
+
+        fut: asyncio.Future[None] = loop.create_future()
+        queue = self._queues.get(key)
+        if queue is None:
+            queue = self._queues[key] = deque()
+            self._ring.append(key)
+        queue.append((float(amount), fut))
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._dispatch())
+        await fut
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        if self._rate > 0:
+            self._tokens = min(self._burst, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    async def _dispatch(self) -> None:
+        while self._ring:
+            key = self._ring[0]
+            queue = self._queues[key]
+            amount, fut = queue[0]
+            if fut.done():
+                # Cancelled waiter.
+                self._pop_head(key, queue)
+                continue
+
+            if self._rate > 0:
+                self._refill()
+                need = min(amount, self._burst)
+                if self._tokens < need:
+                    self._wake = asyncio.get_running_loop().create_future()
+                    await asyncio.wait({self._wake}, timeout=(need - self._tokens) / self._rate)
+                    self._wake = None
+                    continue
+                self._tokens -= amount
+
+            fut.set_result(None)
+            self._pop_head(key, queue)
+
+    def _pop_head(self, key: str, queue: deque) -> None:
+        queue.popleft()
+        if queue:
+            # Next grant goes to the next key in line.
+            self._ring.rotate(-1)
+        else:
+            self._ring.popleft()
+            del self._queues[key]
+
+
+def _resolve(fut: asyncio.Future[None]) -> None:
+    if not fut.done():
+        fut.set_result(None)
+
+
+class RateGate:
+    """A handle's view of the governor (what runs and download functions call)."""
+
+    def __init__(self, governor: "RateGovernor", handle: str) -> None:
+        self._governor = governor
+        self._handle = handle
+
+    @property
+    def handle(self) -> str:
+        return self._handle
+
+    async def api_request(self) -> None:
+        """Wait for a GraphQL API request slot."""
+        await self._governor._api_requests.acquire(self._handle)
+
+    async def media_request(self) -> None:
+        """Wait for a media (CDN) request slot."""
+        await self._governor._media_requests.acquire(self._handle)
+
+    async def media_bytes(self, n: int) -> None:
+        """Account for `n` downloaded media bytes (waits while over the bandwidth cap)."""
+        if n > 0:
+            await self._governor._media_bytes.acquire(self._handle, n)
+
+
+class RateGovernor:
+    """
+    Global request/bandwidth caps for all runs of the process.
+
+    Usage:
+        governor = RateGovernor(settings.get_rate_limits())   # once per process
+        gate = governor.gate(handle)                          # per run
+        await gate.api_request()
+    """
+
+    def __init__(self, config: Optional[RateLimitConfig] = None) -> None:
+        self._config = RateLimitConfig()
+        self._api_requests = FairRateLimiter(0)
+        self._media_requests = FairRateLimiter(0)
+        self._media_bytes = FairRateLimiter(0)
+        self.apply_config(config or RateLimitConfig())
+
+    @property
+    def config(self) -> RateLimitConfig:
+        return self._config
+
+    def apply_config(self, config: RateLimitConfig) -> None:
+        """Update the caps (running waiters pick up the new rates)."""
+        self._config = config
+        enabled = config.enabled
+        # Request caps: no burst (evenly spaced). Bandwidth: up to one second's worth.
+        self._api_requests.set_rate(config.api_requests_per_s if enabled else 0, burst=1)
+        self._media_requests.set_rate(config.media_requests_per_s if enabled else 0, burst=1)
+        self._media_bytes.set_rate(config.media_bytes_per_s if enabled else 0)
+
+    def gate(self, handle: str) -> RateGate:
+        return RateGate(self, handle)
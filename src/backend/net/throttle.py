@@ -2,21 +2,36 @@
 Request throttling with configurable minimum interval and random jitter.
 
 Conservative defaults to minimize risk of rate limiting or account restrictions.
+
+Adaptive mode (AIMD) lets server feedback drive the interval instead: it starts
+at `min_interval_s`, shrinks by a small step after every healthy response, and
+doubles on 429. `x-rate-limit-remaining`/`x-rate-limit-reset` keep the interval
+at or above what the remaining budget allows, and an exhausted budget (or a
+`Retry-After`) pauses requests until the window resets.
 """
 
 from __future__ import annotations
 
 import asyncio
 import random
+import threading
 import time
 from dataclasses import dataclass
-from typing import Optional
+from email.utils import parsedate_to_datetime
+from typing import Any, Mapping, Optional
 
 
 # Conservative defaults (can be tuned based on real-world experience)
 DEFAULT_MIN_INTERVAL_S = 1.5  # Minimum seconds between requests
 DEFAULT_JITTER_MAX_S = 1.0    # Random jitter up to this value (added to min_interval)
 
+# Adaptive mode bounds
+DEFAULT_ADAPTIVE_FLOOR_S = 0.2     # Fastest interval adaptive mode may reach
+DEFAULT_ADAPTIVE_CEILING_S = 60.0  # Slowest interval after repeated 429s
+ADAPTIVE_DECREASE_S = 0.05         # Additive decrease per healthy response
+ADAPTIVE_BACKOFF_FACTOR = 2.0      # Multiplicative increase on 429
+MAX_PAUSE_S = 15 * 60              # Upper bound for a reset/Retry-After pause (one X window)
+
 
 @dataclass
 class ThrottleConfig:
@@ -27,16 +42,26 @@ class ThrottleConfig:
         min_interval_s: Minimum seconds between requests.
         jitter_max_s: Maximum random jitter added to min_interval.
         enabled: If False, throttling is disabled (for testing).
+        adaptive: If True, the interval follows server feedback (AIMD), starting
+            at min_interval_s and staying within [adaptive_floor_s, adaptive_ceiling_s].
+        adaptive_floor_s: Fastest interval adaptive mode may shrink to.
+        adaptive_ceiling_s: Slowest interval adaptive mode may back off to.
     """
     min_interval_s: float = DEFAULT_MIN_INTERVAL_S
     jitter_max_s: float = DEFAULT_JITTER_MAX_S
     enabled: bool = True
+    adaptive: bool = False
+    adaptive_floor_s: float = DEFAULT_ADAPTIVE_FLOOR_S
+    adaptive_ceiling_s: float = DEFAULT_ADAPTIVE_CEILING_S
 
     def to_persist_dict(self) -> dict:
         return {
             "min_interval_s": self.min_interval_s,
             "jitter_max_s": self.jitter_max_s,
             "enabled": self.enabled,
+            "adaptive": self.adaptive,
+            "adaptive_floor_s": self.adaptive_floor_s,
+            "adaptive_ceiling_s": self.adaptive_ceiling_s,
         }
 
     @classmethod
@@ -44,6 +69,9 @@ class ThrottleConfig:
         min_interval = data.get("min_interval_s", DEFAULT_MIN_INTERVAL_S)
         jitter_max = data.get("jitter_max_s", DEFAULT_JITTER_MAX_S)
         enabled = data.get("enabled", True)
+        adaptive = data.get("adaptive", False)
+        floor = data.get("adaptive_floor_s", DEFAULT_ADAPTIVE_FLOOR_S)
+        ceiling = data.get("adaptive_ceiling_s", DEFAULT_ADAPTIVE_CEILING_S)
 
         try:
             min_interval = float(min_interval)
@@ -55,10 +83,24 @@ class ThrottleConfig:
         except (TypeError, ValueError):
             jitter_max = DEFAULT_JITTER_MAX_S
 
+        try:
+            floor = float(floor)
+        except (TypeError, ValueError):
+            floor = DEFAULT_ADAPTIVE_FLOOR_S
+
+        try:
+            ceiling = float(ceiling)
+        except (TypeError, ValueError):
+            ceiling = DEFAULT_ADAPTIVE_CEILING_S
+
+        floor = max(0.0, floor)
         return cls(
             min_interval_s=max(0.0, min_interval),
             jitter_max_s=max(0.0, jitter_max),
             enabled=bool(enabled),
+            adaptive=bool(adaptive),
+            adaptive_floor_s=floor,
+            adaptive_ceiling_s=max(floor, ceiling),
         )
 
 
@@ -79,40 +121,111 @@ class Throttle:
 
     The throttler ensures requests are spaced at least `min_interval_s` apart,
     with an additional random jitter of up to `jitter_max_s` seconds.
+
+    In adaptive mode, callers report each response with `record_response()`
+    and the spacing follows the server's feedback (see module docstring); the
+    jitter is then capped at the current interval so it shrinks along with it.
     """
 
     def __init__(self, config: Optional[ThrottleConfig] = None) -> None:
         self._config = config or ThrottleConfig()
         self._last_request_time: Optional[float] = None
         self._lock = asyncio.Lock()
+        # Sync callers may be several download worker threads sharing one throttle.
+        self._thread_lock = threading.Lock()
+        # Adaptive state (updated by record_response from any thread).
+        self._feedback_lock = threading.Lock()
+        self._interval = self._config.min_interval_s
+        self._paused_until: Optional[float] = None
 
     @property
     def config(self) -> ThrottleConfig:
         return self._config
 
+    @property
+    def current_interval(self) -> float:
+        """Base interval currently applied (min_interval_s unless adaptive)."""
+        return self._interval if self._config.adaptive else self._config.min_interval_s
+
     def _compute_delay(self) -> float:
         """Compute the delay needed before next request."""
         if not self._config.enabled:
             return 0.0
 
         now = time.monotonic()
+        interval = self.current_interval
+        jitter_max = self._config.jitter_max_s
+        if self._config.adaptive:
+            jitter_max = min(jitter_max, interval)
+
+        pause = 0.0
+        if self._config.adaptive and self._paused_until is not None:
+            pause = max(0.0, self._paused_until - now)
 
         if self._last_request_time is None:
             # First request, only add jitter
-            jitter = random.uniform(0, self._config.jitter_max_s)
-            return jitter
+            jitter = random.uniform(0, jitter_max)
+            return max(jitter, pause)
 
         elapsed = now - self._last_request_time
-        base_delay = self._config.min_interval_s - elapsed
+        base_delay = interval - elapsed
 
         if base_delay <= 0:
             # Already past minimum interval, just add jitter
-            jitter = random.uniform(0, self._config.jitter_max_s)
-            return jitter
+            jitter = random.uniform(0, jitter_max)
+            return max(jitter, pause)
 
         # Need to wait + jitter
-        jitter = random.uniform(0, self._config.jitter_max_s)
-        return base_delay + jitter
+        jitter = random.uniform(0, jitter_max)
+        return max(base_delay + jitter, pause)
+
+    def record_response(self, status: Optional[int], headers: Optional[Mapping[str, Any]] = None) -> None:
+        """
+        Feed a response back to the throttle (no-op unless adaptive).
+
+        Args:
+            status: HTTP status code of the response.
+            headers: Response headers (case-insensitive mapping such as
+                `http.client.HTTPMessage` or `httpx.Headers`).
+        """
+        if not (self._config.enabled and self._config.adaptive):
+            return
+
+        cfg = self._config
+        remaining = _int_header(headers, "x-rate-limit-remaining")
+        reset_in = _reset_in_s(headers)
+        now = time.monotonic()
+
+        with self._feedback_lock:
+            if status == 429:
+                self._interval = min(
+                    cfg.adaptive_ceiling_s,
+                    max(self._interval * ADAPTIVE_BACKOFF_FACTOR, cfg.adaptive_floor_s),
+                )
+                wait_s = _retry_after_s(headers)
+                if wait_s is None:
+                    wait_s = reset_in
+                if wait_s:
+                    self._pause(now, wait_s)
+                return
+
+            if status is None or not (200 <= status < 400):
+                # Other errors are left to retry/backoff.
+                return
+
+            interval = max(cfg.adaptive_floor_s, self._interval - ADAPTIVE_DECREASE_S)
+            if remaining is not None and reset_in is not None:
+                if remaining <= 0:
+                    self._pause(now, reset_in)
+                else:
+                    # Never go faster than the remaining budget allows.
+                    interval = max(interval, reset_in / remaining)
+            self._interval = min(cfg.adaptive_ceiling_s, interval)
+
+    def _pause(self, now: float, seconds: float) -> None:
+        until = now + min(MAX_PAUSE_S, seconds)
+        if self._paused_until is None or until > self._paused_until:
+            self._paused_until = until
 
     def wait(self) -> float:
         """
@@ -121,11 +234,12 @@ class Throttle:
         Returns:
             The actual delay waited (in seconds).
         """
-        delay = self._compute_delay()
-        if delay > 0:
-            time.sleep(delay)
-        self._last_request_time = time.monotonic()
-        return delay
+        with self._thread_lock:
+            delay = self._compute_delay()
+            if delay > 0:
+                time.sleep(delay)
+            self._last_request_time = time.monotonic()
+            return delay
 
     async def wait_async(self) -> float:
         """
@@ -144,3 +258,43 @@ class Throttle:
     def reset(self) -> None:
         """Reset the throttler state (for testing)."""
         self._last_request_time = None
+        self._interval = self._config.min_interval_s
+        self._paused_until = None
+
+
+def _int_header(headers: Optional[Mapping[str, Any]], name: str) -> Optional[int]:
+    if headers is None:
+        return None
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return int(str(value).strip())
+    except ValueError:
+        return None
+
+
+def _reset_in_s(headers: Optional[Mapping[str, Any]]) -> Optional[float]:
+    """Seconds until `x-rate-limit-reset` (an epoch timestamp)."""
+    reset_at = _int_header(headers, "x-rate-limit-reset")
+    if reset_at is None:
+        return None
+    return max(0.0, reset_at - time.time())
+
+
+def _retry_after_s(headers: Optional[Mapping[str, Any]]) -> Optional[float]:
+    """`Retry-After` as seconds (delta-seconds or HTTP date)."""
+    if headers is None:
+        return None
+    value = headers.get("Retry-After")
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError):
+        return None
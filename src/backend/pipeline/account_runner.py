@@ -2,26 +2,54 @@ from __future__ import annotations
 
 import asyncio
 import logging
-import time
+import sqlite3
+from collections import deque
+from dataclasses import dataclass, replace
 from pathlib import Path
-from typing import Any, Awaitable, Callable, Optional
-from urllib.error import HTTPError, URLError
-from urllib.request import Request, urlopen, ProxyHandler, build_opener
-
-from src.backend.downloader.downloader import DownloadStatus, MediaDownloader, MediaIntent
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Iterable, Optional, TypeVar, Union
+
+import httpx
+
+from src.backend.downloader.async_downloader import AsyncMediaDownloader, AsyncMediaSink, AsyncStreamDownloadFunc
+from src.backend.downloader.downloader import (
+    DownloadResult,
+    DownloadStatus,
+    FetchedMedia,
+    MediaIntent,
+)
+from src.backend.fs.hash_index import FileHashIndex
 from src.backend.fs.storage import AccountStorageManager, MediaType
 from src.backend.lifecycle.models import StartMode
 from src.backend.net.throttle import Throttle, ThrottleConfig
-from src.backend.net.retry import RetryConfig, with_retry
-from src.backend.net.proxy import ProxyConfig, get_urllib_proxy_handlers
+from src.backend.net.retry import RetryConfig, RetryableError, with_retry_async
+from src.backend.net.governor import RateGate, RateGovernor
+from src.backend.net.async_http import shared_async_client
+from src.backend.net.proxy import ProxyConfig
+from src.backend.pipeline.resume_cursor import MAX_RESUME_FAILURES, ResumeCursor, ResumeCursorStore, WalkProgress
+from src.backend.pipeline.sync_checkpoint import (
+    CHECKPOINT_DIRNAME,
+    SyncCheckpoint,
+    SyncCheckpointStore,
+    filter_fingerprint,
+)
+from src.backend.pipeline.timeline_cache import TIMELINE_CACHE_DIRNAME, TimelineCacheStore
 from src.backend.scheduler.models import Run
 from src.backend.settings.store import SettingsStore
-from src.backend.scraper.twscrape_scraper import DEFAULT_USER_AGENT, TwscrapeMediaScraper
-from src.shared.filter_engine.engine import apply_filters
+from src.backend.scraper.twscrape_scraper import ScrapePage, TwscrapeMediaScraper
+from src.backend.scraper.twscrape_session import DEFAULT_USER_AGENT, TwscrapeSessionRegistry
+from src.backend.scraper.user_id_cache import USER_ID_CACHE_FILENAME, UserIdCache
+from src.shared.filter_engine.batch import TweetBatch
+from src.shared.filter_engine.engine import IncrementalFilter, apply_filters
 from src.shared.filter_engine.models import DownloadIntent, FilterConfig, MediaKind
 
 logger = logging.getLogger(__name__)
 
+# UserMedia pages fetched ahead of the download stage. Scraping pauses when the
+# window is full, so memory stays bounded to a few pages regardless of timeline size.
+PAGE_PREFETCH = 2
+
+T = TypeVar("T")
+
 
 def _build_filter_config(account_config: dict[str, Any]) -> FilterConfig:
     """
@@ -32,6 +60,14 @@ def _build_filter_config(account_config: dict[str, Any]) -> FilterConfig:
     end_date = account_config.get("endDate", account_config.get("end_date"))
     media_type = account_config.get("mediaType", account_config.get("media_type", "both"))
     min_short_side = account_config.get("minShortSide", account_config.get("min_short_side"))
+    max_video_short_side = account_config.get(
+        "maxVideoShortSide", account_config.get("max_video_short_side")
+    )
+    # The UI edits kbps; FilterConfig (like the X variants) uses bit/s.
+    max_video_bitrate = account_config.get("max_video_bitrate")
+    max_video_bitrate_kbps = account_config.get("maxVideoBitrateKbps")
+    if max_video_bitrate_kbps is not None:
+        max_video_bitrate = int(max_video_bitrate_kbps) * 1000
     include_quote = account_config.get(
         "includeQuoteMediaInReply",
         account_config.get("include_quote_media_in_reply", False),
@@ -54,6 +90,8 @@ def _build_filter_config(account_config: dict[str, Any]) -> FilterConfig:
         "source_types": source_types,
         "include_quote_media_in_reply": bool(include_quote),
         "min_short_side": min_short_side,
+        "max_video_short_side": max_video_short_side,
+        "max_video_bitrate": max_video_bitrate,
     }
     return FilterConfig.from_dict(payload)
 
@@ -71,15 +109,115 @@ def _to_media_intent(intent: DownloadIntent) -> MediaIntent:
     )
 
 
-def _make_download_func(
+@dataclass
+class _RangeResume:
+    """
+    What the first response told us about a media body, and the Range-resume
+    rules of the streaming download function.
+
+    `sink` is the download's AsyncMediaSink (`reset()`, `bytes_written` and
+    `expected_size` are used).
+    """
+    total: Optional[int] = None
+    validator: Optional[str] = None  # strong ETag or Last-Modified, for If-Range
+
+    def request_headers(self, headers: dict[str, str], sink: Any) -> dict[str, str]:
+        """Headers for the next attempt: a Range request if the partial body can be resumed."""
+        req_headers = dict(headers)
+        offset = sink.bytes_written
+        if offset and self.validator:
+            req_headers["Range"] = f"bytes={offset}-"
+            req_headers["If-Range"] = self.validator
+        elif offset:
+            # Nothing to validate a resumed body against: start over.
+            sink.reset()
+        return req_headers
+
+    def on_http_error(self, status: int, sink: Any) -> None:
+        """416 on a resumed request: drop the partial body and retry from 0 (else the caller raises)."""
+        if status == 416 and sink.bytes_written:
+            sink.reset()
+            self.validator = None
+            raise RetryableError("range not satisfiable, restarting", status_code=416)
+
+    def on_response(self, resp: Any, sink: Any, url: str) -> None:
+        """Append after a matching 206; anything else restarts the body from byte 0."""
+        offset = sink.bytes_written
+        if offset and resp.status_code == 206:
+            content_range = _parse_content_range(resp.headers.get("Content-Range"))
+            if content_range is None or content_range[0] != offset or (
+                self.total is not None and content_range[1] not in (None, self.total)
+            ):
+                sink.reset()
+                raise RetryableError(f"unexpected Content-Range: {resp.headers.get('Content-Range')}")
+            logger.info("Resumed download at byte %d: %s", offset, url[:80])
+            return
+
+        if offset:
+            sink.reset()
+        length = resp.headers.get("Content-Length")
+        self.total = int(length) if length is not None and length.isdigit() else None
+        self.validator = _resume_validator(resp)
+        sink.expected_size = self.total
+
+    def interrupted(self, exc: BaseException, sink: Any) -> RetryableError:
+        """Body cut off: keep what we have, the retry resumes from here."""
+        return RetryableError(f"connection lost after {sink.bytes_written} bytes: {exc!r}")
+
+    def check_complete(self, sink: Any) -> None:
+        if self.total is not None and sink.bytes_written != self.total:
+            raise RetryableError(f"incomplete body: got {sink.bytes_written} of {self.total} bytes")
+
+
+# Errors while reading a body that mean "connection lost" (retried with Range).
+_BODY_INTERRUPTED_ERRORS = (httpx.ReadError, httpx.RemoteProtocolError, httpx.TimeoutException)
+
+
+def _parse_content_range(value: Optional[str]) -> Optional[tuple[int, Optional[int]]]:
+    """`bytes 100-199/1000` -> (100, 1000); total is None for `*`."""
+    if not value or not value.startswith("bytes "):
+        return None
+    try:
+        span, _, total = value[len("bytes "):].partition("/")
+        start = int(span.split("-", 1)[0])
+        return start, (None if total.strip() == "*" else int(total))
+    except ValueError:
+        return None
+
+
+def _resume_validator(resp: Any) -> Optional[str]:
+    if (resp.headers.get("Accept-Ranges") or "").strip().lower() == "none":
+        return None
+    etag = resp.headers.get("ETag")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return resp.headers.get("Last-Modified")
+
+
+def _make_async_stream_download_func(
     *,
     retry_config: Optional[RetryConfig] = None,
     proxy_config: Optional[ProxyConfig] = None,
     throttle: Optional[Throttle] = None,
     timeout_s: float = 30.0,
-) -> Callable[[str], bytes]:
+    client: Optional[httpx.AsyncClient] = None,
+    rate_gate: Optional[RateGate] = None,
+) -> AsyncStreamDownloadFunc:
     """
-    Create a download function with retry, proxy, and throttle support.
+    Create the download function of `AsyncMediaDownloader`: the body is copied
+    into an `AsyncMediaSink` as it arrives (httpx reads at most 64 KiB at a
+    time), with retry, proxy and throttle support. Transfers run on the event
+    loop through the shared keep-alive `httpx.AsyncClient` of the proxy setting
+    (or `client`), and throttle/retry delays are `asyncio.sleep`s, so no thread
+    is held per download.
+
+    A retry after a body was cut off resumes with `Range: bytes=<written>-`
+    (guarded by `If-Range`), keeping the partial temp file and the running hash.
+    The server must answer 206 with a matching Content-Range; a 200 (range
+    ignored or validator changed) restarts the body from byte 0.
+
+    With a `rate_gate`, every attempt also takes a global media request slot
+    and every chunk is counted against the global media bandwidth cap.
     """
     headers = {
         "User-Agent": DEFAULT_USER_AGENT,
@@ -87,30 +225,44 @@ def _make_download_func(
         "Referer": "https://x.com/",
     }
 
-    # Build opener with proxy if configured
-    proxy_handlers = get_urllib_proxy_handlers(proxy_config)
-    if proxy_handlers:
-        proxy_handler = ProxyHandler(proxy_handlers)
-        opener = build_opener(proxy_handler)
-    else:
-        opener = build_opener()
-
     cfg = retry_config or RetryConfig()
 
-    def download_single(url: str) -> bytes:
-        req = Request(url, headers=headers)
-        with opener.open(req, timeout=timeout_s) as resp:
-            return resp.read()
-
-    def download_with_retry_and_throttle(url: str) -> bytes:
-        def attempt_download() -> bytes:
-            # Apply throttle before every attempt (including retries)
+    async def stream_single(url: str, sink: AsyncMediaSink, resume: _RangeResume) -> None:
+        http_client = client or shared_async_client(proxy_config)
+        req_headers = resume.request_headers(headers, sink)
+        async with http_client.stream("GET", url, headers=req_headers, timeout=timeout_s) as resp:
             if throttle:
-                throttle.wait()
-            return download_single(url)
+                throttle.record_response(resp.status_code, resp.headers)
+            if resp.is_error:
+                resume.on_http_error(resp.status_code, sink)
+                raise httpx.HTTPStatusError(
+                    f"HTTP Error {resp.status_code}: {resp.reason_phrase}", request=resp.request, response=resp
+                )
+            resume.on_response(resp, sink, url)
+            try:
+                async for chunk in resp.aiter_raw():
+                    await sink.write(chunk)
+                    if rate_gate is not None:
+                        await rate_gate.media_bytes(len(chunk))
+            except _BODY_INTERRUPTED_ERRORS as exc:
+                raise resume.interrupted(exc, sink) from exc
+
+        resume.check_complete(sink)
+
+    async def stream_with_retry_and_throttle(url: str, sink: AsyncMediaSink) -> None:
+        resume = _RangeResume()
+        # A fresh fetch starts from an empty sink.
+        sink.reset()
+
+        async def attempt_download() -> None:
+            if throttle:
+                await throttle.wait_async()
+            if rate_gate is not None:
+                await rate_gate.media_request()
+            await stream_single(url, sink, resume)
 
         def on_retry(attempt: int, exc: Exception, delay: float) -> None:
-            status = getattr(exc, "code", None)
+            status = getattr(exc, "status_code", None) or getattr(getattr(exc, "response", None), "status_code", None)
             logger.warning(
                 "Download retry %d/%d after %.2fs (status=%s): %s",
                 attempt + 1,
@@ -120,62 +272,184 @@ def _make_download_func(
                 url[:80],
             )
 
-        return with_retry(attempt_download, config=cfg, on_retry=on_retry)
+        await with_retry_async(attempt_download, config=cfg, on_retry=on_retry)
 
-    return download_with_retry_and_throttle
+    return stream_with_retry_and_throttle
 
 
-def _download_bytes_with_retries(
-    url: str,
-    *,
-    timeout_s: float = 30.0,
-    retries: int = 2,
-    backoff_s: float = 1.5,
-) -> bytes:
-    """Legacy function for backward compatibility."""
-    headers = {
-        "User-Agent": DEFAULT_USER_AGENT,
-        "Accept": "*/*",
-        "Referer": "https://x.com/",
-    }
+class _PrefetchError:
+    def __init__(self, exc: BaseException) -> None:
+        self.exc = exc
+
 
-    last_exc: Optional[BaseException] = None
-    for attempt in range(retries + 1):
+_PREFETCH_DONE = object()
+
+
+async def _prefetch(source: AsyncIterator[T], *, maxsize: int) -> AsyncIterator[T]:
+    """
+    Pull `source` on a background task, at most `maxsize` items ahead of the consumer.
+
+    Errors from `source` are re-raised to the consumer; closing the consumer
+    (or cancelling it) cancels the producer.
+    """
+
+    queue: asyncio.Queue[Any] = asyncio.Queue(maxsize=max(1, int(maxsize)))
+
+    async def _produce() -> None:
+        try:
+            async for item in source:
+                await queue.put(item)
+        except Exception as exc:  # noqa: BLE001
+            await queue.put(_PrefetchError(exc))
+            return
+        await queue.put(_PREFETCH_DONE)
+
+    task = asyncio.ensure_future(_produce())
+    try:
+        while True:
+            item = await queue.get()
+            if item is _PREFETCH_DONE:
+                return
+            if isinstance(item, _PrefetchError):
+                raise item.exc
+            yield item
+    finally:
+        task.cancel()
         try:
-            req = Request(url, headers=headers)
-            with urlopen(req, timeout=timeout_s) as resp:
-                return resp.read()
-        except HTTPError as exc:
-            last_exc = exc
-            status = int(getattr(exc, "code", 0) or 0)
-            if status in (429, 500, 502, 503, 504) and attempt < retries:
-                time.sleep(backoff_s * (2**attempt))
-                continue
-            raise
-        except URLError as exc:
-            last_exc = exc
-            if attempt < retries:
-                time.sleep(backoff_s * (2**attempt))
-                continue
-            raise
-
-    if last_exc is not None:
-        raise RuntimeError(str(last_exc))
-    raise RuntimeError("download failed")
-
-
-async def run_account_pipeline(*, run: Run, store: SettingsStore) -> None:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+
+async def _iter_filtered_intents(
+    pages: AsyncIterable[ScrapePage],
+    filter_config: FilterConfig,
+    *,
+    on_page: Optional[Callable[[ScrapePage], None]] = None,
+    on_intent: Optional[Callable[[DownloadIntent], None]] = None,
+) -> AsyncIterator[MediaIntent]:
+    """
+    Scrape pages -> incremental Filter Engine -> MediaIntents, as pages arrive.
+
+    Yields intents in the same order as `apply_filters()` over the whole
+    timeline (see IncrementalFilter), so "first wins" dedup is unchanged.
+    `on_intent` sees each Filter Engine intent right before it is yielded.
+    """
+
+    stage = IncrementalFilter(filter_config)
+    async for page in pages:
+        if on_page is not None:
+            on_page(page)
+        for it in stage.push(page.tweets):
+            if on_intent is not None:
+                on_intent(it)
+            yield _to_media_intent(it)
+    for it in stage.finish():
+        if on_intent is not None:
+            on_intent(it)
+        yield _to_media_intent(it)
+
+
+async def _download_in_order(
+    downloader: AsyncMediaDownloader,
+    intents: Union[Iterable[MediaIntent], AsyncIterable[MediaIntent]],
+    *,
+    workers: int,
+    on_result: Optional[Callable[[DownloadResult], None]] = None,
+) -> list[DownloadResult]:
+    """
+    Fetch up to `workers` intents concurrently, but commit strictly in input order.
+
+    Fetches (network + hashing + temp write) run as coroutines; `commit_async()`
+    applies dedup in Filter Engine order, so "first wins" is identical to a
+    serial run. At most `workers` fetched-but-uncommitted bodies exist at any time.
+
+    `intents` may be an async iterable (streaming mode): fetches start as soon
+    as intents arrive, and finished heads are committed while waiting for more.
+    """
+
+    width = max(1, int(workers))
+    results: list[DownloadResult] = []
+    pending: deque[asyncio.Future[FetchedMedia]] = deque()
+
+    def _discard_when_done(fut: asyncio.Future[FetchedMedia]) -> None:
+        if fut.cancelled() or fut.exception() is not None:
+            return
+        downloader.discard(fut.result())
+
+    async def _commit_head() -> None:
+        fetched = await pending[0]
+        pending.popleft()
+        result = await downloader.commit_async(fetched)
+        results.append(result)
+        if on_result is not None:
+            on_result(result)
+
+    async def _submit(intent: MediaIntent) -> None:
+        pending.append(asyncio.ensure_future(downloader.fetch_async(intent)))
+        if len(pending) >= width:
+            await _commit_head()
+        # Don't let finished heads wait for the next intent (it may be a page away).
+        while pending and pending[0].done():
+            await _commit_head()
+
+    try:
+        if isinstance(intents, AsyncIterable):
+            async for intent in intents:
+                await _submit(intent)
+        else:
+            for intent in intents:
+                await _submit(intent)
+        while pending:
+            await _commit_head()
+    finally:
+        # Cancelled/failed run: drop temp files of uncommitted fetches instead of
+        # leaving them next to real media. Running fetches are cancelled (they
+        # clean up themselves); finished ones are discarded.
+        for fut in pending:
+            fut.cancel()
+            fut.add_done_callback(_discard_when_done)
+
+    return results
+
+
+async def run_account_pipeline(
+    *,
+    run: Run,
+    store: SettingsStore,
+    governor: Optional[RateGovernor] = None,
+    sessions: Optional[TwscrapeSessionRegistry] = None,
+) -> None:
     """
     Single-account runner: scrape -> filter -> download.
 
     Note:
-    - Scraping is async (twscrape).
-    - Downloading is done in threads to avoid blocking the event loop.
-    - Throttle/retry/proxy configs from settings are applied to both scraper and downloader.
+    - Scraping is async (twscrape). Stages are streamed: each UserMedia page is
+      filtered and its media queued for download as soon as it arrives, with
+      at most `PAGE_PREFETCH` pages scraped ahead of the downloads.
+    - Downloading is async (AsyncMediaDownloader): transfers run on the event
+      loop and only batched disk writes use a small shared I/O pool, so
+      concurrent runs don't tie up executor threads. Up to
+      `settings.download_workers` media are fetched concurrently, while dedup
+      is still committed in Filter Engine order.
+    - Retry/proxy configs from settings are applied to both scraper and downloader;
+      throttling uses separate lanes: `settings.throttle` spaces GraphQL pages,
+      `settings.media_throttle` spaces CDN media requests.
+    - `governor` enforces the global API/media rate limits across all concurrent
+      runs (fair share per handle); without one, this run gets a private governor.
+    - `sessions` keeps the twscrape API/account pool and resolved user IDs of the
+      current credentials across runs; without it, the scraper warms up a
+      private session.
+    - While paginating, the bottom cursor of the last page whose media are all
+      on disk is saved; a Continue after a failed/cancelled walk first resumes
+      that walk from the cursor, then picks up newer posts from the top.
+    - With `settings.timeline_cache`, complete walks also store the parsed
+      timeline; a "refilter" run re-applies the account config to it without
+      scraping (only media not on disk yet are downloaded).
     """
 
     settings = store.load()
-    if not settings.credentials or not settings.credentials.is_complete():
+    if run.kind != "refilter" and (not settings.credentials or not settings.credentials.is_complete()):
         raise RuntimeError("全局凭证未配置（需要 auth_token + ct0）")
 
     handle = (run.handle or "").strip().lstrip("@")
@@ -185,73 +459,357 @@ async def run_account_pipeline(*, run: Run, store: SettingsStore) -> None:
     download_root = Path(settings.download_root)
     storage = AccountStorageManager(download_root)
 
-    # Get throttle/retry/proxy configs
-    throttle_config = settings.get_throttle()
+    filter_config = _build_filter_config(run.account_config or {})
+    fingerprint = filter_fingerprint(filter_config)
+    checkpoints = SyncCheckpointStore(directory=store.path.parent / CHECKPOINT_DIRNAME)
+    resume_cursors = ResumeCursorStore(directory=store.path.parent / CHECKPOINT_DIRNAME)
+    timeline_caches = TimelineCacheStore(directory=store.path.parent / TIMELINE_CACHE_DIRNAME)
+    if run.kind == "start":
+        # Start New re-walks everything; until it completes, nothing is "synced".
+        checkpoints.clear(handle)
+        resume_cursors.clear(handle)
+
+    # Get retry/proxy configs
     retry_config = settings.get_retry()
     proxy_config = settings.get_proxy()
 
-    # Create throttle instance for download spacing
-    throttle = Throttle(throttle_config)
+    # Throttle lanes: GraphQL pagination is account-rate-limited, CDN media is not.
+    api_throttle = Throttle(settings.get_throttle())
+    media_throttle = Throttle(settings.get_media_throttle())
+
+    # Global caps shared with the other running accounts.
+    if governor is None:
+        governor = RateGovernor()
+    governor.apply_config(settings.get_rate_limits())
+    rate_gate = governor.gate(handle)
 
-    # Create download function with retry/proxy/throttle
-    download_func = _make_download_func(
+    # Create async streaming download function with retry/proxy/throttle
+    stream_download_func = _make_async_stream_download_func(
         retry_config=retry_config,
         proxy_config=proxy_config,
-        throttle=throttle,
+        throttle=media_throttle,
+        rate_gate=rate_gate,
     )
 
-    start_mode = getattr(run, "start_mode", None)
-    ignore_replace = run.kind == "start" and start_mode == StartMode.IGNORE_REPLACE
-    downloader = MediaDownloader(
-        storage=storage,
-        handle=handle,
-        download_func=download_func,
-        ignore_replace=ignore_replace,
+    # Persistent hash cache: existing files are only re-hashed when changed.
+    hash_index = _open_hash_index(storage, handle)
+
+    try:
+        start_mode = getattr(run, "start_mode", None)
+        ignore_replace = run.kind == "start" and start_mode == StartMode.IGNORE_REPLACE
+        downloader = AsyncMediaDownloader(
+            storage=storage,
+            handle=handle,
+            stream_download_func=stream_download_func,
+            ignore_replace=ignore_replace,
+            hash_index=hash_index,
+            min_short_side=filter_config.min_short_side,
+        )
+        run.download_stats = downloader.stats.to_dict()
+
+        # Existing-file scan runs on a hashing thread pool; publish its progress
+        # from the event loop thread.
+        loop = asyncio.get_running_loop()
+
+        def _publish_stats() -> None:
+            run.download_stats = downloader.stats.to_dict()
+
+        def _on_scan_progress(done: int, total: int) -> None:
+            loop.call_soon_threadsafe(_publish_stats)
+
+        if ignore_replace:
+            # ADR-0004: scan existing files as replace candidates (new run wins).
+            await asyncio.to_thread(downloader.load_existing_files_for_replace, on_progress=_on_scan_progress)
+        else:
+            # Cross-run dedup (first wins) by loading existing files.
+            await asyncio.to_thread(downloader.load_existing_files, on_progress=_on_scan_progress)
+        _publish_stats()
+
+        def _on_result(_: DownloadResult) -> None:
+            run.download_stats = downloader.stats.to_dict()
+
+        if run.kind == "refilter":
+            cached = timeline_caches.load(handle)
+            if cached is None:
+                raise RuntimeError("没有该账号的时间线缓存：请先在设置中开启时间线缓存，并完成一次 Start/Continue")
+            # The whole cached timeline at once (the TweetBatch yields Tweets).
+            filtered = apply_filters(cached.tweets, filter_config)
+            logger.info(
+                "@%s: refiltered %d cached tweets -> %d media",
+                handle,
+                len(cached.tweets),
+                len(filtered.intents),
+            )
+            results = await _download_in_order(
+                downloader,
+                (_to_media_intent(it) for it in filtered.intents),
+                workers=settings.download_workers,
+                on_result=_on_result,
+            )
+            _raise_on_failed_downloads(results)
+
+            # Everything the cache covers is now on disk for this config.
+            if cached.synced_through_id:
+                checkpoints.save(
+                    SyncCheckpoint(
+                        handle=handle,
+                        synced_through_id=cached.synced_through_id,
+                        filter_fingerprint=fingerprint,
+                    )
+                )
+            return
+
+        # Pass proxy to scraper if configured
+        proxy_url = proxy_config.get_url() if proxy_config else None
+        scraper = TwscrapeMediaScraper(
+            credentials=settings.credentials,
+            proxy=proxy_url,
+            session=(sessions.get(settings.credentials, proxy_url) if sessions is not None else None),
+            throttle=api_throttle,
+            rate_gate=rate_gate,
+        )
+        stop_at_tweet_id = _incremental_stop_id(
+            run=run,
+            handle=handle,
+            storage=storage,
+            checkpoints=checkpoints,
+            fingerprint=fingerprint,
+        )
+        resume = _resume_point(
+            run=run,
+            handle=handle,
+            storage=storage,
+            resume_cursors=resume_cursors,
+            fingerprint=fingerprint,
+        )
+
+        async def _walk(
+            *, stop_at: Optional[int], resume_from: Optional[ResumeCursor]
+        ) -> tuple[int, int, Optional[TweetBatch]]:
+            """
+            One UserMedia walk (from the top, or from a resume point), saving a
+            resume point whenever more pages are fully on disk.
+
+            Returns (newest tweet ID of the walk, number of tweets seen, the tweets
+            seen). The tweets are only kept with `settings.timeline_cache`; else
+            None, so memory stays bounded to the prefetch window.
+            """
+            progress = WalkProgress(pages_done=resume_from.pages_done if resume_from else 0)
+            newest_id = resume_from.walk_newest_id if resume_from else 0
+            tweets_seen = 0
+            seen = TweetBatch() if settings.timeline_cache else None
+
+            def _on_page(page: ScrapePage) -> None:
+                nonlocal newest_id, tweets_seen
+                progress.on_page(page)
+                tweets_seen += len(page.tweets)
+                if seen is not None:
+                    seen.extend(page.tweets)
+                for t in page.tweets:
+                    newest_id = max(newest_id, int(t.tweet_id))
+
+            def _on_walk_result(result: DownloadResult) -> None:
+                _on_result(result)
+                if progress.on_result(result):
+                    resume_cursors.save(
+                        ResumeCursor(
+                            handle=handle,
+                            cursor=progress.cursor,
+                            pages_done=progress.pages_done,
+                            walk_newest_id=newest_id,
+                            filter_fingerprint=fingerprint,
+                            stop_at_tweet_id=stop_at,
+                        )
+                    )
+
+            # Streaming: pages are filtered and downloaded as they arrive (newest first);
+            # Filter Engine ordering is preserved, so dedup matches a batch run.
+            pages = _prefetch(
+                scraper.iter_user_media_pages(
+                    handle=handle,
+                    stop_at_tweet_id=stop_at,
+                    start_cursor=(resume_from.cursor if resume_from else None),
+                ),
+                maxsize=PAGE_PREFETCH,
+            )
+            intents = _iter_filtered_intents(pages, filter_config, on_page=_on_page, on_intent=progress.on_intent)
+            try:
+                results = await _download_in_order(
+                    downloader,
+                    intents,
+                    workers=settings.download_workers,
+                    on_result=_on_walk_result,
+                )
+                _raise_on_failed_downloads(results)
+            except BaseException:
+                if resume_from is not None and progress.pages_done == resume_from.pages_done:
+                    # No progress from this resume point (e.g. an expired cursor): give up after a few tries.
+                    resume_cursors.save(replace(resume_from, failures=resume_from.failures + 1))
+                raise
+            finally:
+                await intents.aclose()
+                await pages.aclose()
+            return newest_id, tweets_seen, seen
+
+        if resume is not None:
+            logger.info("@%s: resuming interrupted walk after page %d", handle, resume.pages_done)
+            walk_newest_id, resumed_tweets, _ = await _walk(stop_at=resume.stop_at_tweet_id, resume_from=resume)
+            resume_cursors.clear(handle)
+            if resumed_tweets:
+                # The interrupted walk is now complete: record it like an uninterrupted one.
+                stop_at_tweet_id = max(walk_newest_id, resume.stop_at_tweet_id or 0)
+                checkpoints.save(
+                    SyncCheckpoint(
+                        handle=handle,
+                        synced_through_id=stop_at_tweet_id,
+                        filter_fingerprint=fingerprint,
+                    )
+                )
+            # else: nothing behind the cursor (possibly expired): the walk from the top
+            # below re-covers the whole range down to the previous sync checkpoint.
+
+        newest_id, _, walked_tweets = await _walk(stop_at=stop_at_tweet_id, resume_from=None)
+        resume_cursors.clear(handle)
+
+        # Complete walk + no failures: everything up to the newest tweet seen is on disk.
+        synced_through_id = max(newest_id, stop_at_tweet_id or 0)
+        if synced_through_id:
+            checkpoints.save(
+                SyncCheckpoint(
+                    handle=handle,
+                    synced_through_id=synced_through_id,
+                    filter_fingerprint=fingerprint,
+                )
+            )
+
+        if walked_tweets is not None:
+            if stop_at_tweet_id is None and not newest_id:
+                # An empty walk from the top (upstream hiccup, protected or renamed
+                # account) says nothing about the timeline: keep the cache.
+                logger.warning("@%s: walk returned no tweets, timeline cache not replaced", handle)
+            elif stop_at_tweet_id is None:
+                timeline_caches.replace(handle, walked_tweets, synced_through_id=synced_through_id)
+            elif not timeline_caches.extend(
+                handle,
+                walked_tweets,
+                walked_down_to=stop_at_tweet_id,
+                synced_through_id=synced_through_id,
+            ):
+                logger.info("@%s: timeline cache does not reach the sync checkpoint, not updated", handle)
+
+    finally:
+        if hash_index is not None:
+            hash_index.close()
+
+
+def _raise_on_failed_downloads(results: list[DownloadResult]) -> None:
+    failed = [r for r in results if r.status == DownloadStatus.FAILED]
+    if not failed:
+        return
+    downloaded = sum(1 for r in results if r.status == DownloadStatus.SUCCESS)
+    skipped = sum(1 for r in results if r.status == DownloadStatus.SKIPPED_DUPLICATE)
+    examples = "; ".join(
+        f"{r.tweet_id}:{r.media_url} -> {r.error or 'unknown error'}"
+        for r in failed[:3]
+    )
+    raise RuntimeError(
+        f"download failures: {len(failed)}/{len(results)} failed "
+        f"(downloaded={downloaded}, skipped_duplicate={skipped}). "
+        f"examples: {examples}"
     )
-    run.download_stats = downloader.stats.to_dict()
 
-    if ignore_replace:
-        # ADR-0004: scan existing files as replace candidates (new run wins).
-        await asyncio.to_thread(downloader.load_existing_files_for_replace)
+
+def _resume_point(
+    *,
+    run: Run,
+    handle: str,
+    storage: AccountStorageManager,
+    resume_cursors: ResumeCursorStore,
+    fingerprint: str,
+) -> Optional[ResumeCursor]:
+    """
+    Continue runs resume an interrupted walk from its last complete page.
+
+    The resume point is dropped when the filter config changed, the account
+    has no media on disk anymore, or resuming kept failing without progress.
+    """
+    if run.kind != "continue":
+        return None
+
+    resume = resume_cursors.load(handle)
+    if resume is None:
+        return None
+    if resume.filter_fingerprint != fingerprint:
+        logger.info("@%s: filter config changed since the interrupted walk, not resuming", handle)
+    elif not storage.has_existing_files(handle):
+        logger.info("@%s: no media on disk, not resuming", handle)
+    elif resume.failures >= MAX_RESUME_FAILURES:
+        logger.info("@%s: resume point failed %d times, walking from the top", handle, resume.failures)
     else:
-        # Cross-run dedup (first wins) by loading existing files.
-        await asyncio.to_thread(downloader.load_existing_files)
+        return resume
+    resume_cursors.clear(handle)
+    return None
 
-    # Pass proxy to scraper if configured
-    proxy_url = proxy_config.get_url() if proxy_config else None
-    scraper = TwscrapeMediaScraper(credentials=settings.credentials, proxy=proxy_url, throttle=throttle)
-    tweets = await scraper.collect_tweets(handle=handle)
 
-    filter_config = _build_filter_config(run.account_config or {})
-    filter_result = apply_filters(tweets, filter_config)
+def _incremental_stop_id(
+    *,
+    run: Run,
+    handle: str,
+    storage: AccountStorageManager,
+    checkpoints: SyncCheckpointStore,
+    fingerprint: str,
+) -> Optional[int]:
+    """
+    Continue runs stop paginating at the last fully synced tweet ID.
 
-    media_intents: list[MediaIntent] = []
-    for it in filter_result.intents:
-        media_intents.append(_to_media_intent(it))
+    Falls back to a full walk when there is no checkpoint, the filter config
+    changed since it was written, or the account has no media on disk anymore.
+    """
+    if run.kind != "continue":
+        return None
 
-    # Preserve Filter Engine ordering (stable + aligns with trigger_created_at sorting).
-    results = []
-    for intent in media_intents:
-        results.append(await asyncio.to_thread(downloader.download, intent))
-        run.download_stats = downloader.stats.to_dict()
+    checkpoint = checkpoints.load(handle)
+    if checkpoint is None:
+        return None
+    if checkpoint.filter_fingerprint != fingerprint:
+        logger.info("@%s: filter config changed since last sync, walking full timeline", handle)
+        return None
+    if not storage.has_existing_files(handle):
+        logger.info("@%s: no media on disk, ignoring sync checkpoint", handle)
+        return None
 
-    failed = [r for r in results if r.status == DownloadStatus.FAILED]
-    if failed:
-        downloaded = sum(1 for r in results if r.status == DownloadStatus.SUCCESS)
-        skipped = sum(1 for r in results if r.status == DownloadStatus.SKIPPED_DUPLICATE)
-        examples = "; ".join(
-            f"{r.tweet_id}:{r.media_url} -> {r.error or 'unknown error'}"
-            for r in failed[:3]
-        )
-        raise RuntimeError(
-            f"download failures: {len(failed)}/{len(results)} failed "
-            f"(downloaded={downloaded}, skipped_duplicate={skipped}). "
-            f"examples: {examples}"
-        )
+    logger.info("@%s: incremental continue above tweet %s", handle, checkpoint.synced_through_id)
+    return checkpoint.synced_through_id
+
+
+def _open_hash_index(storage: AccountStorageManager, handle: str) -> Optional[FileHashIndex]:
+    try:
+        return FileHashIndex.for_account(storage.get_account_paths(handle).root)
+    except (OSError, sqlite3.Error) as exc:
+        # Cache only: fall back to hashing every existing file.
+        logger.warning("Hash index unavailable for @%s: %s", handle, exc)
+        return None
 
 
-def create_account_runner(*, store: SettingsStore) -> Callable[[Run], Awaitable[None]]:
+def create_account_runner(
+    *,
+    store: SettingsStore,
+    governor: Optional[RateGovernor] = None,
+    sessions: Optional[TwscrapeSessionRegistry] = None,
+) -> Callable[[Run], Awaitable[None]]:
+    # One governor for every run the scheduler starts (process-wide rate limits).
+    if governor is None:
+        governor = RateGovernor(store.load().get_rate_limits())
+    # Long-lived twscrape sessions: no warm-up requests when a run starts.
+    if sessions is None:
+        sessions = create_session_registry(store=store)
+
     async def _runner(run: Run) -> None:
-        await run_account_pipeline(run=run, store=store)
+        await run_account_pipeline(run=run, store=store, governor=governor, sessions=sessions)
 
     return _runner
+
+
+def create_session_registry(*, store: SettingsStore) -> TwscrapeSessionRegistry:
+    """twscrape sessions whose handle -> user_id cache persists next to config.json."""
+    return TwscrapeSessionRegistry(user_id_cache=UserIdCache(path=store.path.parent / USER_ID_CACHE_FILENAME))
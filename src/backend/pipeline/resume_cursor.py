@@ -0,0 +1,198 @@
+"""
+Per-account pagination resume point for interrupted UserMedia walks.
+
+A long backfill that fails, is cancelled or loses its credentials on page 180
+used to start over from the top on the next run. While a walk runs, the
+newest-first prefix of pages whose media are all on disk is tracked, and after
+each such page the bottom cursor is saved; a later Continue resumes paginating
+from there instead of redoing every request.
+
+Storage: data/checkpoints/<handle>.cursor.json (next to the sync checkpoint).
+
+A resume point is only valid for the same filter config. It records the walk
+it belongs to (`walk_newest_id`, `stop_at_tweet_id`) so the resumed walk can
+write the same sync checkpoint the uninterrupted walk would have.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from collections import deque
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any, Optional
+
+from src.backend.downloader.downloader import DownloadResult, DownloadStatus
+from src.backend.scheduler.models import format_utc_z, utc_now
+from src.backend.scraper.twscrape_scraper import ScrapePage
+from src.shared.filter_engine.models import DownloadIntent, to_epoch_us
+
+logger = logging.getLogger(__name__)
+
+# Consecutive resumes that made no progress before the resume point is dropped
+# (e.g. an expired cursor), falling back to a walk from the top.
+MAX_RESUME_FAILURES = 3
+
+# "Oldest tweet" of a tweetless page with no page before it: newer than any
+# trigger, so the page is complete with the first committed result.
+_BEFORE_ALL_TWEETS = 2**63 - 1
+
+
+@dataclass(frozen=True)
+class ResumeCursor:
+    handle: str
+    cursor: str
+    pages_done: int
+    walk_newest_id: int
+    filter_fingerprint: str
+    stop_at_tweet_id: Optional[int] = None
+    failures: int = 0
+    updated_at: str = ""
+
+    def to_persist_dict(self) -> dict[str, Any]:
+        return {
+            "handle": self.handle,
+            "cursor": self.cursor,
+            "pages_done": self.pages_done,
+            "walk_newest_id": str(self.walk_newest_id),
+            "stop_at_tweet_id": str(self.stop_at_tweet_id) if self.stop_at_tweet_id is not None else None,
+            "filter_fingerprint": self.filter_fingerprint,
+            "failures": self.failures,
+            "updated_at": self.updated_at,
+        }
+
+    @staticmethod
+    def from_persist_dict(data: dict[str, Any]) -> "ResumeCursor":
+        stop_at = data.get("stop_at_tweet_id")
+        return ResumeCursor(
+            handle=str(data["handle"]),
+            cursor=str(data["cursor"]),
+            pages_done=int(data["pages_done"]),
+            walk_newest_id=int(data["walk_newest_id"]),
+            filter_fingerprint=str(data["filter_fingerprint"]),
+            stop_at_tweet_id=int(stop_at) if stop_at is not None else None,
+            failures=int(data.get("failures") or 0),
+            updated_at=str(data.get("updated_at") or ""),
+        )
+
+
+class ResumeCursorStore:
+    def __init__(self, *, directory: Path) -> None:
+        self._dir = Path(directory)
+        self._lock = threading.RLock()
+
+    @property
+    def directory(self) -> Path:
+        return self._dir
+
+    def load(self, handle: str) -> Optional[ResumeCursor]:
+        path = self._path(handle)
+        with self._lock:
+            if not path.exists():
+                return None
+            try:
+                raw = json.loads(path.read_text(encoding="utf-8"))
+                return ResumeCursor.from_persist_dict(raw)
+            except Exception as exc:  # noqa: BLE001
+                # A bad resume point only costs a walk from the top.
+                logger.warning("Ignoring unreadable resume cursor %s: %s", path, exc)
+                return None
+
+    def save(self, resume: ResumeCursor) -> None:
+        resume = replace(resume, updated_at=format_utc_z(utc_now()))
+        payload = resume.to_persist_dict()
+        path = self._path(resume.handle)
+
+        with self._lock:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(path.suffix + ".tmp")
+            tmp_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+            tmp_path.replace(path)
+
+    def clear(self, handle: str) -> None:
+        with self._lock:
+            try:
+                self._path(handle).unlink()
+            except FileNotFoundError:
+                pass
+
+    def _path(self, handle: str) -> Path:
+        clean = (handle or "").strip().lstrip("@")
+        if not clean:
+            raise ValueError("handle 不能为空")
+        if "/" in clean or "\\" in clean or clean in (".", ".."):
+            raise ValueError(f"handle 不合法：{clean}")
+        return self._dir / f"{clean}.cursor.json"
+
+
+def _sort_ts(intent: DownloadIntent) -> int:
+    # The Filter Engine's exact ordering key; a float timestamp can round below it.
+    return to_epoch_us(intent.trigger_created_at)
+
+
+class WalkProgress:
+    """
+    Tracks which pages of a walk are fully on disk.
+
+    Intents are emitted and committed newest-first (Filter Engine order), so
+    once the intent of a trigger tweet at time T is committed, every tweet
+    newer than T has been handled. Pages are newest-first too: a page whose
+    oldest tweet is strictly newer than T is complete, and so is every page
+    before it. A failed download freezes progress for the rest of the run.
+
+    Usage:
+        progress = WalkProgress(pages_done=0)
+        on_page -> progress.on_page(page)
+        on_intent -> progress.on_intent(intent)
+        on_result -> if progress.on_result(result): save progress.cursor / pages_done
+    """
+
+    def __init__(self, *, pages_done: int = 0) -> None:
+        self._base = pages_done
+        # (oldest trigger timestamp, bottom cursor) per page of this walk.
+        self._pages: list[tuple[int, Optional[str]]] = []
+        self._triggers: deque[int] = deque()
+        self._complete = 0
+        self._failed = False
+
+    @property
+    def pages_done(self) -> int:
+        """Pages (counted from the top of the timeline) known to be on disk."""
+        return self._base + self._complete
+
+    @property
+    def cursor(self) -> Optional[str]:
+        """Bottom cursor of the last complete page (where a resume continues)."""
+        if not self._complete:
+            return None
+        return self._pages[self._complete - 1][1]
+
+    @property
+    def seen_pages(self) -> int:
+        return len(self._pages)
+
+    def on_page(self, page: ScrapePage) -> None:
+        if page.tweets:
+            oldest = min(to_epoch_us(t.created_at) for t in page.tweets)
+        else:
+            # No tweets: complete as soon as the page before it is.
+            oldest = self._pages[-1][0] if self._pages else _BEFORE_ALL_TWEETS
+        self._pages.append((oldest, page.bottom_cursor))
+
+    def on_intent(self, intent: DownloadIntent) -> None:
+        self._triggers.append(_sort_ts(intent))
+
+    def on_result(self, result: DownloadResult) -> bool:
+        """Record a committed result; returns True if more pages became complete."""
+        trigger_ts = self._triggers.popleft()
+        if self._failed:
+            return False
+        # Everything newer than this trigger was committed before it, even if it failed.
+        self._failed = result.status == DownloadStatus.FAILED
+
+        before = self._complete
+        while self._complete < len(self._pages) and self._pages[self._complete][0] > trigger_ts:
+            self._complete += 1
+        return self._complete > before and self.cursor is not None
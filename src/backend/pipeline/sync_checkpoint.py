@@ -0,0 +1,128 @@
+"""
+Per-account sync checkpoint for incremental "Continue" runs.
+
+A checkpoint records the newest tweet ID of a UserMedia walk that was
+*complete* (reached the end of the timeline, or the previous checkpoint) and
+whose downloads all succeeded. Everything at or below that ID is known to be
+on disk for the recorded filter config, so a later Continue can stop
+paginating once it reaches it.
+
+Storage: data/checkpoints/<handle>.json (next to config.json).
+
+Why not derive the high-water mark from existing filenames alone: runs
+download newest-first, so a cancelled or failed run leaves the newest files on
+disk with gaps below them; a filter change (e.g. a wider date range) can also
+make older tweets newly eligible. Filenames are only used as a sanity check
+(an account with no media on disk ignores its checkpoint).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import threading
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any, Optional
+
+from src.backend.scheduler.models import format_utc_z, utc_now
+from src.shared.filter_engine.models import FilterConfig
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_DIRNAME = "checkpoints"
+
+
+def filter_fingerprint(config: FilterConfig) -> str:
+    """Stable digest of a FilterConfig (a checkpoint only applies to the same config)."""
+    payload = {
+        "start_date": config.start_date.isoformat() if config.start_date else None,
+        "end_date": config.end_date.isoformat() if config.end_date else None,
+        "media_type": config.media_type.value,
+        "source_types": sorted(t.value for t in config.source_types),
+        "include_quote_media_in_reply": bool(config.include_quote_media_in_reply),
+        "min_short_side": config.min_short_side,
+    }
+    # Added later: only present when set, so existing checkpoints keep their digest.
+    if config.max_video_short_side is not None:
+        payload["max_video_short_side"] = config.max_video_short_side
+    if config.max_video_bitrate is not None:
+        payload["max_video_bitrate"] = config.max_video_bitrate
+    raw = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass(frozen=True)
+class SyncCheckpoint:
+    handle: str
+    synced_through_id: int
+    filter_fingerprint: str
+    updated_at: str = ""
+
+    def to_persist_dict(self) -> dict[str, Any]:
+        return {
+            "handle": self.handle,
+            "synced_through_id": str(self.synced_through_id),
+            "filter_fingerprint": self.filter_fingerprint,
+            "updated_at": self.updated_at,
+        }
+
+    @staticmethod
+    def from_persist_dict(data: dict[str, Any]) -> "SyncCheckpoint":
+        return SyncCheckpoint(
+            handle=str(data["handle"]),
+            synced_through_id=int(data["synced_through_id"]),
+            filter_fingerprint=str(data["filter_fingerprint"]),
+            updated_at=str(data.get("updated_at") or ""),
+        )
+
+
+class SyncCheckpointStore:
+    def __init__(self, *, directory: Path) -> None:
+        self._dir = Path(directory)
+        self._lock = threading.RLock()
+
+    @property
+    def directory(self) -> Path:
+        return self._dir
+
+    def load(self, handle: str) -> Optional[SyncCheckpoint]:
+        path = self._path(handle)
+        with self._lock:
+            if not path.exists():
+                return None
+            try:
+                raw = json.loads(path.read_text(encoding="utf-8"))
+                return SyncCheckpoint.from_persist_dict(raw)
+            except Exception as exc:  # noqa: BLE001
+                # A bad checkpoint only costs a full walk.
+                logger.warning("Ignoring unreadable checkpoint %s: %s", path, exc)
+                return None
+
+    def save(self, checkpoint: SyncCheckpoint) -> None:
+        if not checkpoint.updated_at:
+            checkpoint = replace(checkpoint, updated_at=format_utc_z(utc_now()))
+        payload = checkpoint.to_persist_dict()
+        path = self._path(checkpoint.handle)
+
+        with self._lock:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(path.suffix + ".tmp")
+            tmp_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+            tmp_path.replace(path)
+
+    def clear(self, handle: str) -> None:
+        with self._lock:
+            try:
+                self._path(handle).unlink()
+            except FileNotFoundError:
+                pass
+
+    def _path(self, handle: str) -> Path:
+        clean = (handle or "").strip().lstrip("@")
+        if not clean:
+            raise ValueError("handle 不能为空")
+        if "/" in clean or "\\" in clean or clean in (".", ".."):
+            raise ValueError(f"handle 不合法：{clean}")
+        return self._dir / f"{clean}.json"
@@ -0,0 +1,146 @@
+"""
+Per-account cache of the parsed UserMedia timeline, for offline re-filtering.
+
+Scraped pages used to be discarded once filtered, so changing the date range
+or `min_short_side` of an account meant re-walking the whole timeline. When
+the cache is enabled (`GlobalSettings.timeline_cache`), every complete walk
+stores the parsed tweets (unfiltered, as the scraper returned them); a
+"refilter" run then re-applies the Filter Engine to the cache without a single
+GraphQL request (only media not yet on disk are fetched).
+
+Storage: data/timeline_cache/<handle>.jsonl.gz, gzip'd JSON lines: a header
+line ({"version", "handle", "synced_through_id", "updated_at"}) followed by
+one `Tweet.to_dict()` per line, newest first.
+
+`synced_through_id` is the newest tweet ID the cache covers without gaps
+(down to the end of the timeline). A full walk replaces the cache; an
+incremental walk only extends it when it starts at or below the cache's
+coverage, so a cache that fell behind (cache disabled for a while, resumed
+walks) stays consistent and merely covers fewer tweets.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import logging
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+from src.backend.scheduler.models import format_utc_z, utc_now
+from src.shared.filter_engine.batch import TweetBatch
+from src.shared.filter_engine.models import Tweet
+
+logger = logging.getLogger(__name__)
+
+TIMELINE_CACHE_DIRNAME = "timeline_cache"
+CACHE_VERSION = 1
+
+
+@dataclass(frozen=True)
+class CachedTimeline:
+    handle: str
+    synced_through_id: int
+    tweets: TweetBatch  # newest first
+    updated_at: str = ""
+
+
+class TimelineCacheStore:
+    def __init__(self, *, directory: Path) -> None:
+        self._dir = Path(directory)
+        self._lock = threading.RLock()
+
+    @property
+    def directory(self) -> Path:
+        return self._dir
+
+    def load(self, handle: str) -> Optional[CachedTimeline]:
+        path = self._path(handle)
+        with self._lock:
+            if not path.exists():
+                return None
+            try:
+                with gzip.open(path, "rt", encoding="utf-8") as f:
+                    header = json.loads(f.readline())
+                    if int(header.get("version") or 0) != CACHE_VERSION:
+                        raise ValueError(f"unsupported version {header.get('version')!r}")
+                    tweets = TweetBatch()
+                    for line in f:
+                        if line.strip():
+                            tweets.append(Tweet.from_dict(json.loads(line)))
+                return CachedTimeline(
+                    handle=str(header["handle"]),
+                    synced_through_id=int(header["synced_through_id"]),
+                    tweets=tweets,
+                    updated_at=str(header.get("updated_at") or ""),
+                )
+            except Exception as exc:  # noqa: BLE001
+                # A bad cache only costs a re-scrape.
+                logger.warning("Ignoring unreadable timeline cache %s: %s", path, exc)
+                return None
+
+    def exists(self, handle: str) -> bool:
+        """Whether a cache file exists for `handle` (a refilter run has something to read)."""
+        return self._path(handle).exists()
+
+    def replace(self, handle: str, tweets: Iterable[Tweet], *, synced_through_id: int) -> None:
+        """Store the tweets of a full walk (everything down to the end of the timeline)."""
+        with self._lock:
+            self._write(handle, list(tweets), synced_through_id=synced_through_id)
+
+    def extend(self, handle: str, tweets: Iterable[Tweet], *, walked_down_to: int, synced_through_id: int) -> bool:
+        """
+        Merge the tweets of an incremental walk that stopped at `walked_down_to`.
+
+        Returns False (cache unchanged) if there is no cache or it does not
+        reach up to `walked_down_to`: merging would leave a gap.
+        """
+        with self._lock:
+            cached = self.load(handle)
+            if cached is None or cached.synced_through_id < walked_down_to:
+                return False
+            merged: dict[str, Tweet] = {t.tweet_id: t for t in cached.tweets}
+            for t in tweets:
+                merged[t.tweet_id] = t
+            self._write(
+                handle,
+                list(merged.values()),
+                synced_through_id=max(synced_through_id, cached.synced_through_id),
+            )
+            return True
+
+    def clear(self, handle: str) -> None:
+        with self._lock:
+            try:
+                self._path(handle).unlink()
+            except FileNotFoundError:
+                pass
+
+    def _write(self, handle: str, tweets: list[Tweet], *, synced_through_id: int) -> None:
+        clean = (handle or "").strip().lstrip("@")
+        path = self._path(clean)
+        tweets.sort(key=lambda t: int(t.tweet_id), reverse=True)
+        header: dict[str, Any] = {
+            "version": CACHE_VERSION,
+            "handle": clean,
+            "synced_through_id": str(synced_through_id),
+            "updated_at": format_utc_z(utc_now()),
+        }
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            f.write(json.dumps(header, ensure_ascii=False) + "\n")
+            for t in tweets:
+                f.write(json.dumps(t.to_dict(), ensure_ascii=False, separators=(",", ":")) + "\n")
+        tmp_path.replace(path)
+
+    def _path(self, handle: str) -> Path:
+        clean = (handle or "").strip().lstrip("@")
+        if not clean:
+            raise ValueError("handle 不能为空")
+        if "/" in clean or "\\" in clean or clean in (".", ".."):
+            raise ValueError(f"handle 不合法：{clean}")
+        return self._dir / f"{clean}.jsonl.gz"
@@ -29,6 +29,8 @@ class HandleStateOut(BaseModel):
     images_downloaded: int = 0
     videos_downloaded: int = 0
     skipped_duplicate: int = 0
+    existing_files_scanned: int = 0
+    existing_files_total: int = 0
     runtime_s: float = 0.0
     avg_speed: float = 0.0
 
@@ -57,6 +59,8 @@ def create_scheduler_router(*, scheduler: Scheduler) -> APIRouter:
                 images_downloaded=h.get("images_downloaded", 0),
                 videos_downloaded=h.get("videos_downloaded", 0),
                 skipped_duplicate=h.get("skipped_duplicate", 0),
+                existing_files_scanned=h.get("existing_files_scanned", 0),
+                existing_files_total=h.get("existing_files_total", 0),
                 runtime_s=h.get("runtime_s", 0.0),
                 avg_speed=h.get("avg_speed", 0.0),
             )
@@ -82,6 +86,8 @@ def create_scheduler_router(*, scheduler: Scheduler) -> APIRouter:
             images_downloaded=state.get("images_downloaded", 0),
             videos_downloaded=state.get("videos_downloaded", 0),
             skipped_duplicate=state.get("skipped_duplicate", 0),
+            existing_files_scanned=state.get("existing_files_scanned", 0),
+            existing_files_total=state.get("existing_files_total", 0),
             runtime_s=state.get("runtime_s", 0.0),
             avg_speed=state.get("avg_speed", 0.0),
         )
@@ -109,6 +115,8 @@ def create_scheduler_router(*, scheduler: Scheduler) -> APIRouter:
             images_downloaded=state.get("images_downloaded", 0),
             videos_downloaded=state.get("videos_downloaded", 0),
             skipped_duplicate=state.get("skipped_duplicate", 0),
+            existing_files_scanned=state.get("existing_files_scanned", 0),
+            existing_files_total=state.get("existing_files_total", 0),
             runtime_s=state.get("runtime_s", 0.0),
             avg_speed=state.get("avg_speed", 0.0),
         )
@@ -136,6 +144,37 @@ def create_scheduler_router(*, scheduler: Scheduler) -> APIRouter:
             images_downloaded=state.get("images_downloaded", 0),
             videos_downloaded=state.get("videos_downloaded", 0),
             skipped_duplicate=state.get("skipped_duplicate", 0),
+            existing_files_scanned=state.get("existing_files_scanned", 0),
+            existing_files_total=state.get("existing_files_total", 0),
+            runtime_s=state.get("runtime_s", 0.0),
+            avg_speed=state.get("avg_speed", 0.0),
+        )
+
+    @router.post("/refilter", response_model=HandleStateOut)
+    async def refilter_run(body: RunRequestIn) -> HandleStateOut:
+        # Re-apply account_config to the cached timeline: downloads only, no scraping.
+        try:
+            await scheduler.enqueue(
+                handle=body.handle,
+                kind="refilter",
+                account_config=body.account_config,
+            )
+        except SchedulerConflictError as exc:
+            raise HTTPException(status_code=409, detail=str(exc)) from exc
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+        state = await scheduler.get_handle_state(handle=body.handle)
+        return HandleStateOut(
+            handle=state["handle"],
+            status=state["status"],
+            run_id=state.get("run_id"),
+            queued_position=state.get("queued_position"),
+            images_downloaded=state.get("images_downloaded", 0),
+            videos_downloaded=state.get("videos_downloaded", 0),
+            skipped_duplicate=state.get("skipped_duplicate", 0),
+            existing_files_scanned=state.get("existing_files_scanned", 0),
+            existing_files_total=state.get("existing_files_total", 0),
             runtime_s=state.get("runtime_s", 0.0),
             avg_speed=state.get("avg_speed", 0.0),
         )
@@ -156,6 +195,8 @@ def create_scheduler_router(*, scheduler: Scheduler) -> APIRouter:
             images_downloaded=state.get("images_downloaded", 0),
             videos_downloaded=state.get("videos_downloaded", 0),
             skipped_duplicate=state.get("skipped_duplicate", 0),
+            existing_files_scanned=state.get("existing_files_scanned", 0),
+            existing_files_total=state.get("existing_files_total", 0),
             runtime_s=state.get("runtime_s", 0.0),
             avg_speed=state.get("avg_speed", 0.0),
         )
@@ -8,6 +8,10 @@ from src.backend.lifecycle.models import StartMode
 from src.shared.task_status import TaskStatus
 
 
+# "refilter" re-applies the account config to the cached timeline (no scraping).
+RUN_KINDS = ("start", "continue", "refilter")
+
+
 def utc_now() -> datetime:
     return datetime.now(timezone.utc)
 
@@ -22,7 +26,7 @@ def format_utc_z(dt: datetime) -> str:
 class Run:
     run_id: str
     handle: str
-    kind: str  # "start" | "continue"
+    kind: str  # "start" | "continue" | "refilter"
     account_config: dict[str, Any]
     status: TaskStatus
     created_at: datetime
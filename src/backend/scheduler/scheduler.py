@@ -11,7 +11,7 @@ from src.shared.stats.metrics import compute_avg_speed, compute_runtime_s
 from src.shared.task_status import TaskStatus
 
 from .config import SchedulerConfig
-from .models import Run, utc_now
+from .models import RUN_KINDS, Run, utc_now
 
 
 class SchedulerConflictError(RuntimeError):
@@ -74,8 +74,8 @@ class Scheduler:
     ) -> Run:
         if not handle or not handle.strip():
             raise ValueError("handle 不能为空")
-        if kind not in ("start", "continue"):
-            raise ValueError("kind 必须是 start 或 continue")
+        if kind not in RUN_KINDS:
+            raise ValueError("kind 必须是 start、continue 或 refilter")
 
         if kind != "start":
             start_mode = None
@@ -108,6 +108,9 @@ class Scheduler:
                     "skipped_duplicate": 0,
                     "failed": 0,
                     "total_bytes": 0,
+                    "skipped_without_fetch": 0,
+                    "existing_files_scanned": 0,
+                    "existing_files_total": 0,
                 },
             )
 
@@ -181,6 +184,8 @@ class Scheduler:
             images_downloaded = int((metrics_run.download_stats or {}).get("images_downloaded") or 0) if metrics_run else 0
             videos_downloaded = int((metrics_run.download_stats or {}).get("videos_downloaded") or 0) if metrics_run else 0
             skipped_duplicate = int((metrics_run.download_stats or {}).get("skipped_duplicate") or 0) if metrics_run else 0
+            existing_files_scanned = int((metrics_run.download_stats or {}).get("existing_files_scanned") or 0) if metrics_run else 0
+            existing_files_total = int((metrics_run.download_stats or {}).get("existing_files_total") or 0) if metrics_run else 0
 
             runtime_s = 0.0
             if metrics_run is not None and status != TaskStatus.QUEUED:
@@ -195,6 +200,8 @@ class Scheduler:
                 "images_downloaded": images_downloaded,
                 "videos_downloaded": videos_downloaded,
                 "skipped_duplicate": skipped_duplicate,
+                "existing_files_scanned": existing_files_scanned,
+                "existing_files_total": existing_files_total,
                 "runtime_s": runtime_s,
                 "avg_speed": avg_speed,
             }
@@ -232,6 +239,8 @@ class Scheduler:
                 images_downloaded = int((metrics_run.download_stats or {}).get("images_downloaded") or 0) if metrics_run else 0
                 videos_downloaded = int((metrics_run.download_stats or {}).get("videos_downloaded") or 0) if metrics_run else 0
                 skipped_duplicate = int((metrics_run.download_stats or {}).get("skipped_duplicate") or 0) if metrics_run else 0
+                existing_files_scanned = int((metrics_run.download_stats or {}).get("existing_files_scanned") or 0) if metrics_run else 0
+                existing_files_total = int((metrics_run.download_stats or {}).get("existing_files_total") or 0) if metrics_run else 0
 
                 runtime_s = 0.0
                 if metrics_run is not None and status != TaskStatus.QUEUED:
@@ -247,6 +256,8 @@ class Scheduler:
                         "images_downloaded": images_downloaded,
                         "videos_downloaded": videos_downloaded,
                         "skipped_duplicate": skipped_duplicate,
+                        "existing_files_scanned": existing_files_scanned,
+                        "existing_files_total": existing_files_total,
                         "runtime_s": runtime_s,
                         "avg_speed": avg_speed,
                     }
@@ -1,10 +1,25 @@
-from .twscrape_scraper import ScrapePage, TwscrapeMediaScraper
-from .user_media_parser import extract_bottom_cursor, parse_user_media_tweets
+from .twscrape_scraper import ScrapePage, TwscrapeMediaScraper, drop_synced_tweets
+from .twscrape_session import TwscrapeSession, TwscrapeSessionRegistry
+from .user_media_parser import (
+    UserMediaPage,
+    extract_bottom_cursor,
+    loads_page,
+    parse_user_media_batch,
+    parse_user_media_page,
+    parse_user_media_tweets,
+)
 
 __all__ = [
     "ScrapePage",
     "TwscrapeMediaScraper",
+    "TwscrapeSession",
+    "TwscrapeSessionRegistry",
+    "UserMediaPage",
+    "drop_synced_tweets",
     "extract_bottom_cursor",
+    "loads_page",
+    "parse_user_media_batch",
+    "parse_user_media_page",
     "parse_user_media_tweets",
 ]
 
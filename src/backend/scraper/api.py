@@ -0,0 +1,102 @@
+"""
+API routes for scrape-layer helpers.
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+
+from src.backend.net.governor import RateGovernor
+from src.backend.net.throttle import Throttle
+from src.backend.settings.store import SettingsStore
+
+from .twscrape_session import TwscrapeSessionRegistry
+
+
+MAX_RESOLVE_HANDLES = 500
+
+
+class ResolveHandlesIn(BaseModel):
+    """Request body for bulk handle -> user_id resolution."""
+    handles: list[str] = Field(min_length=1, max_length=MAX_RESOLVE_HANDLES)
+
+
+class ResolvedHandleOut(BaseModel):
+    handle: str
+    user_id: Optional[str] = None  # string: IDs exceed JS number precision
+    cached: bool = False
+    error: Optional[str] = None
+
+
+class ResolveHandlesOut(BaseModel):
+    resolved: list[ResolvedHandleOut]
+
+
+def create_scraper_router(
+    *,
+    store: SettingsStore,
+    sessions: TwscrapeSessionRegistry,
+    governor: Optional[RateGovernor] = None,
+) -> APIRouter:
+    """
+    Create the scraper API router.
+
+    Args:
+        store: Settings store (credentials, proxy, throttle).
+        sessions: The twscrape sessions used by account runs (shares their user ID cache).
+        governor: Global rate governor shared with account runs.
+
+    Returns:
+        FastAPI router with scraper endpoints.
+    """
+    router = APIRouter(prefix="/api/scraper", tags=["scraper"])
+
+    @router.post("/resolve-handles", response_model=ResolveHandlesOut)
+    async def resolve_handles(body: ResolveHandlesIn) -> ResolveHandlesOut:
+        """
+        Resolve handles to user IDs ahead of queuing runs.
+
+        Fresh cache entries cost no request; the rest are looked up one by one
+        under the API throttle and the global API rate limit.
+        """
+        settings = store.load()
+        if not settings.credentials or not settings.credentials.is_complete():
+            raise HTTPException(status_code=400, detail="全局凭证未配置（需要 auth_token + ct0）")
+
+        session = sessions.get(settings.credentials, settings.get_proxy().get_url())
+        throttle = Throttle(settings.get_throttle())
+        gate = governor.gate("@resolve") if governor is not None else None
+
+        async def before_request() -> None:
+            await throttle.wait_async()
+            if gate is not None:
+                await gate.api_request()
+
+        resolved: list[ResolvedHandleOut] = []
+        seen: set[str] = set()
+        for raw in body.handles:
+            clean = (raw or "").strip().lstrip("@")
+            if clean.lower() in seen:
+                continue
+            seen.add(clean.lower())
+            if not clean:
+                resolved.append(ResolvedHandleOut(handle=raw, error="handle 不能为空"))
+                continue
+
+            cached = session.user_id_cache.get(clean)
+            if cached is not None:
+                resolved.append(ResolvedHandleOut(handle=clean, user_id=str(cached), cached=True))
+                continue
+            try:
+                user_id = await session.resolve_user_id(clean, before_request=before_request)
+            except Exception as exc:  # noqa: BLE001
+                resolved.append(ResolvedHandleOut(handle=clean, error=str(exc)))
+                continue
+            resolved.append(ResolvedHandleOut(handle=clean, user_id=str(user_id)))
+
+        return ResolveHandlesOut(resolved=resolved)
+
+    return router
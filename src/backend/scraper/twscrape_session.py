@@ -0,0 +1,310 @@
+"""
+Long-lived twscrape API + account for one credential set.
+
+Creating an `API` per run meant a fresh `accounts.db`, `add_account`, a
+`user_by_login` round-trip and (with a new account) a fresh XClientTxId
+bootstrap (x.com home page + ondemand script) every time. A session keeps all
+of that for the lifetime of the process:
+
+- one `API`/`AccountsPool` (temp `accounts.db`) per credentials + proxy, with
+  exactly one account: the credentials are one real X account, so twscrape's
+  per-account rate-limit tracking (lock until reset on 429) stays accurate;
+- a stable account username, so twscrape's per-username XClientTxId generator
+  cache (`xclid.XClIdGenStore`) is bootstrapped once and reused by every run;
+- one UserMedia `QueueClient` held open across runs (twscrape locks the
+  account for the whole client context), through which the GraphQL requests
+  of all runs are serialized; fairness between runs is `RateGovernor`'s job;
+- resolved handle -> user_id pairs (`UserIdCache`, persisted with a TTL when
+  the registry is given a file).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import re
+import tempfile
+from typing import Any, Awaitable, Callable, Optional
+
+from ..settings.models import Credentials
+from .user_id_cache import UserIdCache
+
+
+DEFAULT_USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/120.0.0.0 Safari/537.36"
+)
+
+
+def _cookie_string(credentials: Credentials) -> str:
+    parts = [
+        f"auth_token={credentials.auth_token.strip()}",
+        f"ct0={credentials.ct0.strip()}",
+    ]
+    if credentials.twid and credentials.twid.strip():
+        parts.append(f"twid={credentials.twid.strip()}")
+    return "; ".join(parts)
+
+
+def session_key(credentials: Credentials, proxy: Optional[str] = None) -> str:
+    """Short stable fingerprint of credentials + proxy (never the secrets themselves)."""
+    raw = "\n".join([_cookie_string(credentials), proxy or ""])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def _import_twscrape() -> Any:
+    try:
+        import twscrape  # type: ignore
+        from twscrape import xclid  # type: ignore
+    except Exception as exc:  # noqa: BLE001
+        raise RuntimeError(
+            "缺少依赖 twscrape：请先安装 requirements.txt（twscrape>=0.17.0）"
+        ) from exc
+    _patch_xclid_scripts_parser(xclid)
+    return twscrape
+
+
+def _patch_xclid_scripts_parser(xclid: Any) -> None:
+    # twscrape 0.17.0: XClientTxId 解析依赖 x.com 首页内联脚本里的 chunk 映射。
+    # 近期该映射从 JSON 变为 JS object literal（包含未加引号的 key），导致 json.loads 失败并触发：
+    #   "Failed to parse scripts"
+    # 这里做一次轻量 monkey patch，兼容两种格式，避免上游库不可用。
+    if getattr(getattr(xclid, "get_scripts_list", None), "__xmc_patched__", False):
+        return
+    original_get_scripts_list = xclid.get_scripts_list
+
+    def _get_scripts_list_compat(text: str):  # type: ignore
+        try:
+            raw = text.split('e=>e+"."+', 1)[1].split('[e]+"a.js"', 1)[0]
+        except Exception as exc:  # noqa: BLE001
+            raise Exception("Failed to parse scripts") from exc
+
+        # Fast path: original behavior (JSON object)
+        try:
+            for k, v in json.loads(raw).items():
+                yield xclid.script_url(k, f"{v}a")
+            return
+        except Exception:
+            pass
+
+        # Fallback: JS object literal with unquoted identifier keys
+        pair_re = re.compile(
+            r'(?:\"(?P<qkey>[^\"]+)\"|(?P<ukey>[A-Za-z0-9_]+))\s*:\s*\"(?P<val>[0-9a-f]+)\"'
+        )
+        parsed: dict[str, str] = {}
+        for m in pair_re.finditer(raw):
+            key = m.group("qkey") or m.group("ukey")
+            if not key:
+                continue
+            parsed[key] = m.group("val")
+
+        if not parsed:
+            # Preserve original error string for twscrape retry/lock logic.
+            raise Exception("Failed to parse scripts")
+
+        for k, v in parsed.items():
+            yield xclid.script_url(k, f"{v}a")
+
+    setattr(_get_scripts_list_compat, "__xmc_patched__", True)
+    xclid.get_scripts_list = _get_scripts_list_compat  # type: ignore
+    setattr(xclid.get_scripts_list, "__xmc_original__", original_get_scripts_list)
+
+
+class TwscrapeSession:
+    """
+    twscrape `API` + account shared by the runs of one credential set.
+
+    Usage:
+        session = TwscrapeSession(credentials=creds, proxy=proxy_url)
+        user_id = await session.resolve_user_id("username")
+        rep = await session.user_media(user_id, cursor=None)
+
+    Requests are serialized on the session's account. Not thread-safe; use
+    from one event loop.
+    """
+
+    def __init__(
+        self,
+        *,
+        credentials: Credentials,
+        proxy: Optional[str] = None,
+        debug: bool = False,
+        account_prefix: str = "xmc_cookie",
+        user_id_cache: Optional[UserIdCache] = None,
+    ) -> None:
+        self._credentials = credentials
+        self._proxy = proxy
+        self._debug = debug
+        self._account_prefix = account_prefix
+        self._api: Any = None
+        self._tmpdir: Optional[tempfile.TemporaryDirectory] = None
+        self._user_media_client: Any = None
+        self._user_ids = user_id_cache or UserIdCache()
+        self._lock: Optional[asyncio.Lock] = None
+
+    @property
+    def proxy(self) -> Optional[str]:
+        return self._proxy
+
+    @property
+    def debug(self) -> bool:
+        return self._debug
+
+    @property
+    def user_id_cache(self) -> UserIdCache:
+        return self._user_ids
+
+    async def resolve_user_id(
+        self,
+        handle: str,
+        *,
+        before_request: Optional[Callable[[], Awaitable[None]]] = None,
+    ) -> int:
+        """
+        Resolve a handle to its numeric user ID (served from the cache while fresh).
+
+        Args:
+            handle: X handle without leading @.
+            before_request: Awaited right before the API call (throttling);
+                not called when the ID is cached.
+        """
+        cached = self._user_ids.get(handle)
+        if cached is not None:
+            return cached
+
+        if before_request is not None:
+            await before_request()
+        async with self._get_lock():
+            api = await self._ensure_api()
+            user = await api.user_by_login(handle)
+        if user is None:
+            # Renamed/deleted handle: never serve the stale ID again.
+            self._user_ids.invalidate(handle)
+            raise RuntimeError(f"未找到账号：{handle}")
+
+        user_id = int(getattr(user, "id", 0) or 0)
+        if not user_id:
+            raise RuntimeError(f"无法解析 user_id：{handle}")
+        self._user_ids.put(handle, user_id)
+        return user_id
+
+    async def user_media(self, user_id: int, *, cursor: Optional[str] = None) -> Any:
+        """
+        Request one UserMedia page (newest first; `cursor` = Bottom cursor of the
+        previous page) on the session's account.
+
+        Returns:
+            The twscrape response, or None when twscrape has no usable account.
+        """
+        variables: dict[str, Any] = {
+            "userId": str(user_id),
+            "count": 40,
+            "includePromotedContent": False,
+            "withClientEventToken": False,
+            "withBirdwatchNotes": False,
+            "withVoice": True,
+            "withV2Timeline": True,
+        }
+        if cursor:
+            variables["cursor"] = cursor
+
+        async with self._get_lock():
+            api = await self._ensure_api()
+            from twscrape.api import OP_UserMedia, GQL_URL, GQL_FEATURES  # type: ignore
+            from twscrape.queue_client import QueueClient  # type: ignore
+            from twscrape.utils import encode_params  # type: ignore
+
+            params: dict[str, Any] = {
+                "variables": variables,
+                "features": dict(GQL_FEATURES),
+                "fieldToggles": {"withArticlePlainText": False},
+            }
+            if self._user_media_client is None:
+                client = QueueClient(api.pool, "UserMedia", debug=bool(self._debug), proxy=(self._proxy or None))
+                await client.__aenter__()
+                self._user_media_client = client
+            return await self._user_media_client.get(f"{GQL_URL}/{OP_UserMedia}", params=encode_params(params))
+
+    async def reset(self) -> None:
+        """
+        Drop the API and account (e.g. after the account was rejected); the
+        next request starts from a fresh pool. Resolved user IDs are kept.
+        """
+        async with self._get_lock():
+            await self._close()
+
+    async def aclose(self) -> None:
+        """Release the account and remove the temporary pool."""
+        await self.reset()
+
+    def _get_lock(self) -> asyncio.Lock:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    async def _ensure_api(self) -> Any:
+        if self._api is None:
+            twscrape = _import_twscrape()
+            self._tmpdir = tempfile.TemporaryDirectory(prefix="xmc_twscrape_")
+            api = twscrape.API(
+                pool=f"{self._tmpdir.name}/accounts.db",
+                debug=bool(self._debug),
+                proxy=(self._proxy or None),
+                raise_when_no_account=False,
+            )
+            await api.pool.add_account(
+                self._account_prefix,
+                "x",
+                "xmc@example.com",
+                "x",
+                cookies=_cookie_string(self._credentials),
+                user_agent=DEFAULT_USER_AGENT,
+            )
+            self._api = api
+        return self._api
+
+    async def _close(self) -> None:
+        client, self._user_media_client = self._user_media_client, None
+        self._api = None
+        try:
+            if client is not None:
+                await client.__aexit__(None, None, None)
+        finally:
+            if self._tmpdir is not None:
+                self._tmpdir.cleanup()
+                self._tmpdir = None
+
+
+class TwscrapeSessionRegistry:
+    """
+    Process-wide `TwscrapeSession`s keyed by credentials + proxy.
+
+    Only the session of the current credentials is kept: changing them in the
+    settings starts a new session on the next run (runs still using the old one
+    keep their reference until they finish). User IDs are not tied to the
+    credentials, so all sessions share one `UserIdCache`.
+    """
+
+    def __init__(self, *, debug: bool = False, user_id_cache: Optional[UserIdCache] = None) -> None:
+        self._debug = debug
+        self._user_id_cache = user_id_cache or UserIdCache()
+        self._key: Optional[str] = None
+        self._session: Optional[TwscrapeSession] = None
+
+    @property
+    def user_id_cache(self) -> UserIdCache:
+        return self._user_id_cache
+
+    def get(self, credentials: Credentials, proxy: Optional[str] = None) -> TwscrapeSession:
+        key = session_key(credentials, proxy)
+        if self._session is None or key != self._key:
+            self._session = TwscrapeSession(
+                credentials=credentials,
+                proxy=proxy,
+                debug=self._debug,
+                user_id_cache=self._user_id_cache,
+            )
+            self._key = key
+        return self._session
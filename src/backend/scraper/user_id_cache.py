@@ -0,0 +1,99 @@
+"""
+Persistent handle -> user_id cache.
+
+UserMedia is keyed by the numeric user ID, so every scrape first resolves the
+handle with `UserByScreenName`, a rate-limited GraphQL call. The mapping rarely
+changes, so it is cached with a TTL (handles can be renamed or reused) and
+dropped as soon as a lookup says the handle no longer exists, or UserMedia
+reports the cached user as unavailable.
+
+Storage: data/user_ids.json (next to config.json), one entry per lower-cased
+handle: {"user_id": "<id>", "resolved_at": <unix seconds>}.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+USER_ID_CACHE_FILENAME = "user_ids.json"
+DEFAULT_TTL_S = 7 * 24 * 3600
+
+
+def _key(handle: str) -> str:
+    return (handle or "").strip().lstrip("@").lower()
+
+
+class UserIdCache:
+    """
+    handle -> user_id with TTL, persisted to one JSON file (in memory only if
+    `path` is None). Thread-safe; the file is loaded on first use.
+    """
+
+    def __init__(self, *, path: Optional[Path] = None, ttl_s: float = DEFAULT_TTL_S) -> None:
+        self._path = Path(path) if path is not None else None
+        self._ttl_s = float(ttl_s)
+        self._lock = threading.RLock()
+        self._entries: Optional[dict[str, tuple[int, float]]] = None
+
+    @property
+    def path(self) -> Optional[Path]:
+        return self._path
+
+    def get(self, handle: str) -> Optional[int]:
+        """Cached user ID, or None if unknown or expired."""
+        with self._lock:
+            entry = self._load().get(_key(handle))
+        if entry is None:
+            return None
+        user_id, resolved_at = entry
+        if time.time() - resolved_at > self._ttl_s:
+            return None
+        return user_id
+
+    def put(self, handle: str, user_id: int) -> None:
+        with self._lock:
+            self._load()[_key(handle)] = (int(user_id), time.time())
+            self._save()
+
+    def invalidate(self, handle: str) -> None:
+        with self._lock:
+            if self._load().pop(_key(handle), None) is not None:
+                self._save()
+
+    def _load(self) -> dict[str, tuple[int, float]]:
+        if self._entries is not None:
+            return self._entries
+        entries: dict[str, tuple[int, float]] = {}
+        if self._path is not None and self._path.exists():
+            try:
+                raw: Any = json.loads(self._path.read_text(encoding="utf-8"))
+                for handle, item in (raw.get("handles") or {}).items():
+                    entries[_key(handle)] = (int(item["user_id"]), float(item["resolved_at"]))
+            except Exception as exc:  # noqa: BLE001
+                # A bad cache only costs lookups.
+                logger.warning("Ignoring unreadable user ID cache %s: %s", self._path, exc)
+                entries = {}
+        self._entries = entries
+        return entries
+
+    def _save(self) -> None:
+        if self._path is None or self._entries is None:
+            return
+        payload = {
+            "version": 1,
+            "handles": {
+                handle: {"user_id": str(user_id), "resolved_at": resolved_at}
+                for handle, (user_id, resolved_at) in sorted(self._entries.items())
+            },
+        }
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._path.with_suffix(self._path.suffix + ".tmp")
+        tmp_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        tmp_path.replace(self._path)
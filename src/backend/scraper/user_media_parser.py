@@ -1,11 +1,56 @@
 from __future__ import annotations
 
+import json
+import re
+from collections.abc import Mapping, Sequence
 from dataclasses import dataclass
-from datetime import datetime, timezone
-from typing import Any, Iterable, Mapping, Optional, Sequence
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any, Optional, Union
 from urllib.parse import parse_qs, urlencode, urlparse, urlunparse
 
-from src.shared.filter_engine.models import MediaCandidate, MediaKind, Tweet
+from src.shared.filter_engine.batch import TweetBatch
+from src.shared.filter_engine.models import MediaCandidate, MediaKind, Tweet, VideoVariant, to_epoch_us
+
+try:  # Optional: a faster JSON decoder for GraphQL pages.
+    import orjson as _orjson  # type: ignore
+except ImportError:  # pragma: no cover - depends on the environment
+    _orjson = None
+
+# Video variant URLs carry their frame size, e.g. `/vid/avc1/1280x720/…mp4`
+# (older uploads omit the codec segment: `/vid/1280x720/…`).
+_VARIANT_SIZE_RE = re.compile(r"/vid/(?:[^/]+/)*?(\d+)x(\d+)/")
+
+# X snowflake IDs: the top 41 bits are milliseconds since this epoch.
+SNOWFLAKE_EPOCH_MS = 1288834974657
+
+_UTC_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MONTHS = {
+    name: number
+    for number, name in enumerate(
+        ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"), start=1
+    )
+}
+
+
+def loads_page(content: Union[bytes, str]) -> Any:
+    """Decode a GraphQL response body (uses `orjson` when installed)."""
+
+    if _orjson is not None:
+        return _orjson.loads(content)
+    return json.loads(content)
+
+
+def snowflake_datetime(tweet_id: str) -> Optional[datetime]:
+    """Creation time encoded in a snowflake tweet ID (millisecond precision), or None."""
+
+    try:
+        n = int(tweet_id)
+    except (TypeError, ValueError):
+        return None
+    if n < (1 << 22):
+        return None
+    return _UTC_EPOCH + timedelta(milliseconds=(n >> 22) + SNOWFLAKE_EPOCH_MS)
 
 
 def _parse_created_at(value: Any) -> datetime:
@@ -19,8 +64,22 @@ def _parse_created_at(value: Any) -> datetime:
 
     if not isinstance(value, str) or not value.strip():
         raise ValueError("created_at missing")
+    return _parse_created_at_str(value.strip())
 
-    raw = value.strip()
+
+@lru_cache(maxsize=4096)
+def _parse_created_at_str(raw: str) -> datetime:
+    # Quoted and retweeted tweets repeat across pages; parsed values are cached.
+    parts = raw.split(" ")
+    if len(parts) == 6 and parts[4] == "+0000" and parts[1] in _MONTHS:
+        # Fast path for the (always UTC) legacy format; avoids strptime.
+        try:
+            hh, mm, ss = parts[3].split(":")
+            return datetime(
+                int(parts[5]), _MONTHS[parts[1]], int(parts[2]), int(hh), int(mm), int(ss), tzinfo=timezone.utc
+            )
+        except ValueError:
+            pass
 
     # X legacy format (Twitter API style)
     try:
@@ -38,7 +97,12 @@ def _parse_created_at(value: Any) -> datetime:
     return dt.astimezone(timezone.utc)
 
 
+@lru_cache(maxsize=4096)
 def _upgrade_pbs_image_url(url: str) -> str:
+    if url.startswith("https://pbs.twimg.com/") and "?" not in url and "#" not in url:
+        # Common case (plain media_url_https); same result as the general path.
+        return url + "?name=orig"
+
     parsed = urlparse(url)
     if parsed.netloc != "pbs.twimg.com":
         return url
@@ -67,60 +131,76 @@ def _unwrap_tweet_result(raw: Any) -> Optional[Mapping[str, Any]]:
     return None
 
 
-def _iter_timeline_tweet_results(page: Mapping[str, Any]) -> Iterable[Mapping[str, Any]]:
-    """
-    Yield top-level Tweet result objects from a UserMedia timeline page.
-
-    This intentionally only returns tweets present as timeline items, not nested
-    quoted/retweeted tweets, to avoid treating embedded tweets as separate items.
-    """
+def _user_result(page: Mapping[str, Any]) -> Optional[Mapping[str, Any]]:
+    """`data.user.result` of a UserMedia page, or None if absent."""
 
     data = page.get("data")
     if not isinstance(data, Mapping):
-        return
+        return None
 
     user = data.get("user")
     if not isinstance(user, Mapping):
-        return
+        return None
 
     result = user.get("result")
     if not isinstance(result, Mapping):
-        return
+        return None
+    return result
+
+
+def _timeline_instructions(page: Mapping[str, Any]) -> Sequence[Any]:
+    """`instructions` of a UserMedia page, or () if the page has another shape."""
+
+    result = _user_result(page)
+    if result is None:
+        return ()
 
     # X 的 GraphQL 响应结构存在版本差异：
     # - 旧：data.user.result.timeline_v2.timeline.instructions
     # - 新：data.user.result.timeline.timeline.instructions
-    timeline_container = None
-    timeline_v2 = result.get("timeline_v2")
-    if isinstance(timeline_v2, Mapping):
-        timeline_container = timeline_v2
-    else:
-        timeline = result.get("timeline")
-        if isinstance(timeline, Mapping):
-            timeline_container = timeline
-
+    timeline_container = result.get("timeline_v2")
     if not isinstance(timeline_container, Mapping):
-        return
+        timeline_container = result.get("timeline")
+        if not isinstance(timeline_container, Mapping):
+            return ()
 
     timeline = timeline_container.get("timeline")
     if not isinstance(timeline, Mapping):
-        return
+        return ()
 
-    instructions = timeline.get("instructions") or []
+    instructions = timeline.get("instructions") or ()
     if not isinstance(instructions, Sequence):
-        return
-
-    def from_item_content(item_content: Any) -> Optional[Mapping[str, Any]]:
-        if not isinstance(item_content, Mapping):
-            return None
-        if item_content.get("itemType") != "TimelineTweet":
-            return None
-        tweet_results = item_content.get("tweet_results")
-        if not isinstance(tweet_results, Mapping):
-            return None
-        return _unwrap_tweet_result(tweet_results.get("result"))
-
-    for ins in instructions:
+        return ()
+    return instructions
+
+
+def _tweet_from_item_content(item_content: Any) -> Optional[Mapping[str, Any]]:
+    if not isinstance(item_content, Mapping):
+        return None
+    if item_content.get("itemType") != "TimelineTweet":
+        return None
+    tweet_results = item_content.get("tweet_results")
+    if not isinstance(tweet_results, Mapping):
+        return None
+    return _unwrap_tweet_result(tweet_results.get("result"))
+
+
+def _scan_timeline(page: Mapping[str, Any]) -> tuple[list[Mapping[str, Any]], Optional[str]]:
+    """
+    Walk the instructions of a UserMedia page once.
+
+    Returns:
+        (top-level Tweet result objects, Bottom cursor or None).
+
+    Only tweets present as timeline items are returned, not nested
+    quoted/retweeted tweets, to avoid treating embedded tweets as separate items.
+    """
+
+    results: list[Mapping[str, Any]] = []
+    bottom_cursor: Optional[str] = None
+    cursor_seen = False
+
+    for ins in _timeline_instructions(page):
         if not isinstance(ins, Mapping):
             continue
 
@@ -136,6 +216,14 @@ def _iter_timeline_tweet_results(page: Mapping[str, Any]) -> Iterable[Mapping[st
                 if not isinstance(content, Mapping):
                     continue
 
+                if content.get("entryType") == "TimelineTimelineCursor":
+                    # The first Bottom cursor of the page wins.
+                    if not cursor_seen and content.get("cursorType") == "Bottom":
+                        cursor_seen = True
+                        value = content.get("value")
+                        bottom_cursor = str(value) if isinstance(value, str) and value.strip() else None
+                    continue
+
                 # Grid/module style: content.items[]
                 items = content.get("items")
                 if isinstance(items, Sequence):
@@ -145,17 +233,15 @@ def _iter_timeline_tweet_results(page: Mapping[str, Any]) -> Iterable[Mapping[st
                         item = it.get("item")
                         if not isinstance(item, Mapping):
                             continue
-                        item_content = item.get("itemContent")
-                        tw = from_item_content(item_content)
+                        tw = _tweet_from_item_content(item.get("itemContent"))
                         if tw is not None:
-                            yield tw
+                            results.append(tw)
                     continue
 
                 # Single item style: content.itemContent
-                item_content = content.get("itemContent")
-                tw = from_item_content(item_content)
+                tw = _tweet_from_item_content(content.get("itemContent"))
                 if tw is not None:
-                    yield tw
+                    results.append(tw)
 
         elif ins_type == "TimelineAddToModule":
             module_items = ins.get("moduleItems") or []
@@ -164,10 +250,11 @@ def _iter_timeline_tweet_results(page: Mapping[str, Any]) -> Iterable[Mapping[st
             for mi in module_items:
                 if not isinstance(mi, Mapping):
                     continue
-                item_content = mi.get("item", {}).get("itemContent")
-                tw = from_item_content(item_content)
+                tw = _tweet_from_item_content(mi.get("item", {}).get("itemContent"))
                 if tw is not None:
-                    yield tw
+                    results.append(tw)
+
+    return results, bottom_cursor
 
 
 def extract_bottom_cursor(page: Mapping[str, Any]) -> Optional[str]:
@@ -175,90 +262,77 @@ def extract_bottom_cursor(page: Mapping[str, Any]) -> Optional[str]:
     Extract the Bottom cursor value from a UserMedia page, if present.
     """
 
-    data = page.get("data")
-    if not isinstance(data, Mapping):
-        return None
+    _, bottom_cursor = _scan_timeline(page)
+    return bottom_cursor
 
-    user = data.get("user")
-    if not isinstance(user, Mapping):
-        return None
 
-    result = user.get("result")
-    if not isinstance(result, Mapping):
-        return None
+def _variant_dimensions(url: str) -> tuple[Optional[int], Optional[int]]:
+    """(width, height) from a `/vid/…/WxH/` video URL segment, or (None, None)."""
 
-    # X 的 GraphQL 响应结构存在版本差异：
-    # - 旧：data.user.result.timeline_v2.timeline.instructions
-    # - 新：data.user.result.timeline.timeline.instructions
-    timeline_container = None
-    timeline_v2 = result.get("timeline_v2")
-    if isinstance(timeline_v2, Mapping):
-        timeline_container = timeline_v2
-    else:
-        timeline = result.get("timeline")
-        if isinstance(timeline, Mapping):
-            timeline_container = timeline
+    m = _VARIANT_SIZE_RE.search(url)
+    if m is None:
+        return None, None
+    width, height = int(m.group(1)), int(m.group(2))
+    if width <= 0 or height <= 0:
+        return None, None
+    return width, height
 
-    if not isinstance(timeline_container, Mapping):
-        return None
 
-    timeline = timeline_container.get("timeline")
-    if not isinstance(timeline, Mapping):
-        return None
+def _parse_video_variants(video_info: Mapping[str, Any]) -> tuple[VideoVariant, ...]:
+    """The mp4 variants of a video, in response order (HLS playlists are skipped)."""
 
-    instructions = timeline.get("instructions") or []
-    if not isinstance(instructions, Sequence):
-        return None
+    variants = video_info.get("variants") or []
+    if not isinstance(variants, Sequence):
+        return ()
 
-    for ins in instructions:
-        if not isinstance(ins, Mapping):
+    out: list[VideoVariant] = []
+    for v in variants:
+        if not isinstance(v, Mapping):
             continue
-        if ins.get("type") != "TimelineAddEntries":
+        if str(v.get("content_type") or "") != "video/mp4":
             continue
-        entries = ins.get("entries") or []
-        if not isinstance(entries, Sequence):
+        url = v.get("url")
+        if not isinstance(url, str) or not url.strip():
             continue
-        for entry in entries:
-            if not isinstance(entry, Mapping):
-                continue
-            content = entry.get("content")
-            if not isinstance(content, Mapping):
-                continue
-            if content.get("entryType") != "TimelineTimelineCursor":
-                continue
-            if content.get("cursorType") != "Bottom":
-                continue
-            value = content.get("value")
-            return str(value) if isinstance(value, str) and value.strip() else None
+        url = url.strip()
+        bitrate = v.get("bitrate")
+        try:
+            bitrate_int = int(bitrate) if bitrate is not None else None
+        except (TypeError, ValueError):
+            bitrate_int = None
+        width, height = _variant_dimensions(url)
+        out.append(VideoVariant(url=url, bitrate=bitrate_int, width=width, height=height))
+    return tuple(out)
 
-    return None
 
+def _hls_playlist_url(video_info: Mapping[str, Any]) -> Optional[str]:
+    """The m3u8 variant, used only when a video has no mp4 variant (ADR-0006)."""
 
-def _pick_best_video_variant(video_info: Mapping[str, Any]) -> Optional[str]:
     variants = video_info.get("variants") or []
     if not isinstance(variants, Sequence):
         return None
-
-    best_url: Optional[str] = None
-    best_bitrate: int = -1
     for v in variants:
         if not isinstance(v, Mapping):
             continue
-        if str(v.get("content_type") or "") != "video/mp4":
+        if str(v.get("content_type") or "").lower() != "application/x-mpegurl":
             continue
         url = v.get("url")
-        if not isinstance(url, str) or not url.strip():
-            continue
-        bitrate = v.get("bitrate")
-        try:
-            bitrate_int = int(bitrate) if bitrate is not None else 0
-        except (TypeError, ValueError):
-            bitrate_int = 0
-        if bitrate_int > best_bitrate:
-            best_bitrate = bitrate_int
-            best_url = url.strip()
+        if isinstance(url, str) and url.strip():
+            return url.strip()
+    return None
+
+
+def _pick_best_video_variant(variants: Sequence[VideoVariant]) -> Optional[VideoVariant]:
+    """Highest bitrate wins; the first one on ties."""
 
-    return best_url
+    best: Optional[VideoVariant] = None
+    best_bitrate = -1
+    for v in variants:
+        bitrate = v.bitrate or 0
+        if bitrate > best_bitrate:
+            best_bitrate = bitrate
+            best = v
+    return best
 
 
 def _extract_media_candidates(tweet_result: Mapping[str, Any]) -> tuple[MediaCandidate, ...]:
@@ -314,16 +388,26 @@ def _extract_media_candidates(tweet_result: Mapping[str, Any]) -> tuple[MediaCan
             video_info = media.get("video_info")
             if not isinstance(video_info, Mapping):
                 continue
-            best = _pick_best_video_variant(video_info)
-            if not best:
+            variants = _parse_video_variants(video_info)
+            best = _pick_best_video_variant(variants)
+            if best is None:
+                hls_url = _hls_playlist_url(video_info)
+                if hls_url is not None:
+                    candidates.append(
+                        MediaCandidate(media_id=media_id, kind=MediaKind.VIDEO, url=hls_url, width=width, height=height)
+                    )
                 continue
+            if (width is None or height is None) and best.width is not None:
+                width, height = best.width, best.height
             candidates.append(
                 MediaCandidate(
                     media_id=media_id,
                     kind=MediaKind.VIDEO,
-                    url=best,
+                    url=best.url,
                     width=width,
                     height=height,
+                    # Only worth keeping when FilterConfig caps could pick another one.
+                    variants=(variants if len(variants) > 1 else ()),
                 )
             )
             continue
@@ -340,7 +424,13 @@ def _build_tweet_from_result(tweet_result: Mapping[str, Any], *, _depth: int) ->
     if not isinstance(tweet_id, str) or not tweet_id.strip():
         return None
 
-    created_at = _parse_created_at(legacy.get("created_at"))
+    try:
+        created_at = _parse_created_at(legacy.get("created_at"))
+    except ValueError:
+        # Tweet IDs are snowflakes: fall back to the time they encode.
+        created_at = snowflake_datetime(tweet_id)
+        if created_at is None:
+            raise
 
     is_reply = bool(
         legacy.get("in_reply_to_status_id_str")
@@ -376,16 +466,24 @@ def _build_tweet_from_result(tweet_result: Mapping[str, Any], *, _depth: int) ->
     )
 
 
-def parse_user_media_tweets(page: Mapping[str, Any]) -> list[Tweet]:
-    """
-    Parse a (GraphQL) UserMedia timeline page into FilterEngine Tweets.
+@dataclass(frozen=True)
+class UserMediaPage:
+    tweets: list[Tweet]  # newest -> oldest, tweets with media only
+    bottom_cursor: Optional[str] = None
+    tweet_result_count: int = 0  # timeline Tweet items, with or without media
+    # No `data.user.result`, or X reports the user as unavailable (suspended,
+    # deleted, or the user ID no longer exists).
+    user_unavailable: bool = False
 
-    Returns:
-        Tweets sorted newest -> oldest for stability.
+
+def parse_user_media_page(page: Mapping[str, Any]) -> UserMediaPage:
+    """
+    Parse a (GraphQL) UserMedia timeline page: tweets and Bottom cursor in one pass.
     """
 
+    results, bottom_cursor = _scan_timeline(page)
     tweets: list[Tweet] = []
-    for raw in _iter_timeline_tweet_results(page):
+    for raw in results:
         tw = _build_tweet_from_result(raw, _depth=0)
         if tw is None:
             continue
@@ -393,5 +491,33 @@ def parse_user_media_tweets(page: Mapping[str, Any]) -> list[Tweet]:
             continue
         tweets.append(tw)
 
-    tweets.sort(key=lambda t: (-int(t.created_at.timestamp() * 1_000_000), t.tweet_id))
-    return tweets
+    tweets.sort(key=lambda t: (-to_epoch_us(t.created_at), t.tweet_id))
+    user = _user_result(page)
+    return UserMediaPage(
+        tweets=tweets,
+        bottom_cursor=bottom_cursor,
+        tweet_result_count=len(results),
+        user_unavailable=user is None or user.get("__typename") == "UserUnavailable",
+    )
+
+
+def parse_user_media_tweets(page: Mapping[str, Any]) -> list[Tweet]:
+    """
+    Parse a (GraphQL) UserMedia timeline page into FilterEngine Tweets.
+
+    Returns:
+        Tweets sorted newest -> oldest for stability.
+    """
+
+    return parse_user_media_page(page).tweets
+
+
+def parse_user_media_batch(page: Mapping[str, Any], *, into: Optional[TweetBatch] = None) -> TweetBatch:
+    """
+    Like `parse_user_media_tweets`, but appends to a columnar `TweetBatch`
+    (the pages of a long walk can share one compact batch).
+    """
+
+    batch = into if into is not None else TweetBatch()
+    batch.extend(parse_user_media_tweets(page))
+    return batch
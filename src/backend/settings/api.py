@@ -12,7 +12,8 @@ from ..scheduler.scheduler import Scheduler
 from ..net.throttle import ThrottleConfig
 from ..net.retry import RetryConfig
 from ..net.proxy import ProxyConfig
-from .models import Credentials, GlobalSettings
+from ..net.governor import RateLimitConfig
+from .models import MAX_DOWNLOAD_WORKERS, Credentials, GlobalSettings
 from .store import SettingsStore
 
 
@@ -30,10 +31,21 @@ class MaxConcurrentIn(BaseModel):
     max_concurrent: int = Field(ge=1, le=100)
 
 
+class DownloadWorkersIn(BaseModel):
+    download_workers: int = Field(ge=1, le=MAX_DOWNLOAD_WORKERS)
+
+
+class TimelineCacheIn(BaseModel):
+    enabled: bool
+
+
 class ThrottleIn(BaseModel):
     min_interval_s: float = Field(ge=0.0, le=60.0, default=1.5)
     jitter_max_s: float = Field(ge=0.0, le=30.0, default=1.0)
     enabled: bool = True
+    adaptive: bool = False
+    adaptive_floor_s: float = Field(ge=0.0, le=60.0, default=0.2)
+    adaptive_ceiling_s: float = Field(ge=0.0, le=900.0, default=60.0)
 
 
 class RetryIn(BaseModel):
@@ -48,6 +60,13 @@ class ProxyIn(BaseModel):
     url: str = ""
 
 
+class RateLimitsIn(BaseModel):
+    api_requests_per_s: float = Field(ge=0.0, le=100.0, default=1.0)
+    media_requests_per_s: float = Field(ge=0.0, le=1000.0, default=8.0)
+    media_bytes_per_s: float = Field(ge=0.0, default=0.0)
+    enabled: bool = True
+
+
 class CredentialsStatusOut(BaseModel):
     configured: bool
     auth_token_set: bool
@@ -59,6 +78,9 @@ class ThrottleOut(BaseModel):
     min_interval_s: float
     jitter_max_s: float
     enabled: bool
+    adaptive: bool
+    adaptive_floor_s: float
+    adaptive_ceiling_s: float
 
 
 class RetryOut(BaseModel):
@@ -73,13 +95,46 @@ class ProxyOut(BaseModel):
     url_configured: bool  # Don't expose actual URL for security
 
 
+class RateLimitsOut(BaseModel):
+    api_requests_per_s: float
+    media_requests_per_s: float
+    media_bytes_per_s: float
+    enabled: bool
+
+
 class SettingsOut(BaseModel):
     credentials: CredentialsStatusOut
     download_root: str
     max_concurrent: int
+    download_workers: int
     throttle: ThrottleOut
+    media_throttle: ThrottleOut
     retry: RetryOut
     proxy: ProxyOut
+    rate_limits: RateLimitsOut
+    timeline_cache: bool = False
+
+
+def _throttle_out(throttle: ThrottleConfig) -> ThrottleOut:
+    return ThrottleOut(
+        min_interval_s=throttle.min_interval_s,
+        jitter_max_s=throttle.jitter_max_s,
+        enabled=throttle.enabled,
+        adaptive=throttle.adaptive,
+        adaptive_floor_s=throttle.adaptive_floor_s,
+        adaptive_ceiling_s=throttle.adaptive_ceiling_s,
+    )
+
+
+def _throttle_config(body: ThrottleIn) -> ThrottleConfig:
+    return ThrottleConfig(
+        min_interval_s=body.min_interval_s,
+        jitter_max_s=body.jitter_max_s,
+        enabled=body.enabled,
+        adaptive=body.adaptive,
+        adaptive_floor_s=body.adaptive_floor_s,
+        adaptive_ceiling_s=max(body.adaptive_floor_s, body.adaptive_ceiling_s),
+    )
 
 
 def _public_settings(settings: GlobalSettings) -> SettingsOut:
@@ -87,9 +142,9 @@ def _public_settings(settings: GlobalSettings) -> SettingsOut:
     ct0_set = bool(settings.credentials and settings.credentials.ct0.strip())
     twid_set = bool(settings.credentials and (settings.credentials.twid or "").strip())
 
-    throttle = settings.get_throttle()
     retry = settings.get_retry()
     proxy = settings.get_proxy()
+    rate_limits = settings.get_rate_limits()
 
     return SettingsOut(
         credentials=CredentialsStatusOut(
@@ -100,11 +155,9 @@ def _public_settings(settings: GlobalSettings) -> SettingsOut:
         ),
         download_root=settings.download_root,
         max_concurrent=settings.max_concurrent,
-        throttle=ThrottleOut(
-            min_interval_s=throttle.min_interval_s,
-            jitter_max_s=throttle.jitter_max_s,
-            enabled=throttle.enabled,
-        ),
+        download_workers=settings.download_workers,
+        throttle=_throttle_out(settings.get_throttle()),
+        media_throttle=_throttle_out(settings.get_media_throttle()),
         retry=RetryOut(
             max_retries=retry.max_retries,
             base_delay_s=retry.base_delay_s,
@@ -115,6 +168,13 @@ def _public_settings(settings: GlobalSettings) -> SettingsOut:
             enabled=proxy.enabled,
             url_configured=bool(proxy.url.strip()),
         ),
+        rate_limits=RateLimitsOut(
+            api_requests_per_s=rate_limits.api_requests_per_s,
+            media_requests_per_s=rate_limits.media_requests_per_s,
+            media_bytes_per_s=rate_limits.media_bytes_per_s,
+            enabled=rate_limits.enabled,
+        ),
+        timeline_cache=settings.timeline_cache,
     )
 
 
@@ -195,13 +255,22 @@ def create_settings_router(
         await scheduler.reschedule()
         return _public_settings(updated)
 
+    @router.post("/download-workers", response_model=SettingsOut)
+    def set_download_workers(body: DownloadWorkersIn) -> SettingsOut:
+        # Takes effect for runs started after the change (each run reads settings once).
+        updated = store.set_value(key="download_workers", value=body.download_workers)
+        return _public_settings(updated)
+
+    @router.post("/timeline-cache", response_model=SettingsOut)
+    def set_timeline_cache(body: TimelineCacheIn) -> SettingsOut:
+        # Existing caches are kept when disabled; they just stop being updated.
+        updated = store.set_value(key="timeline_cache", value=body.enabled)
+        return _public_settings(updated)
+
     @router.post("/throttle", response_model=SettingsOut)
     def set_throttle(body: ThrottleIn) -> SettingsOut:
-        throttle = ThrottleConfig(
-            min_interval_s=body.min_interval_s,
-            jitter_max_s=body.jitter_max_s,
-            enabled=body.enabled,
-        )
+        # API lane (GraphQL pagination).
+        throttle = _throttle_config(body)
 
         def mutate(settings: GlobalSettings) -> GlobalSettings:
             settings.throttle = throttle
@@ -210,6 +279,18 @@ def create_settings_router(
         updated = store.update(mutator=mutate)
         return _public_settings(updated)
 
+    @router.post("/media-throttle", response_model=SettingsOut)
+    def set_media_throttle(body: ThrottleIn) -> SettingsOut:
+        # Media lane (CDN downloads).
+        throttle = _throttle_config(body)
+
+        def mutate(settings: GlobalSettings) -> GlobalSettings:
+            settings.media_throttle = throttle
+            return settings
+
+        updated = store.update(mutator=mutate)
+        return _public_settings(updated)
+
     @router.post("/retry", response_model=SettingsOut)
     def set_retry(body: RetryIn) -> SettingsOut:
         retry = RetryConfig(
@@ -245,6 +326,23 @@ def create_settings_router(
         updated = store.update(mutator=mutate)
         return _public_settings(updated)
 
+    @router.post("/rate-limits", response_model=SettingsOut)
+    def set_rate_limits(body: RateLimitsIn) -> SettingsOut:
+        # Applied to the shared governor when the next run starts.
+        rate_limits = RateLimitConfig(
+            api_requests_per_s=body.api_requests_per_s,
+            media_requests_per_s=body.media_requests_per_s,
+            media_bytes_per_s=body.media_bytes_per_s,
+            enabled=body.enabled,
+        )
+
+        def mutate(settings: GlobalSettings) -> GlobalSettings:
+            settings.rate_limits = rate_limits
+            return settings
+
+        updated = store.update(mutator=mutate)
+        return _public_settings(updated)
+
     @router.delete("/proxy", response_model=SettingsOut)
     def clear_proxy() -> SettingsOut:
         def mutate(settings: GlobalSettings) -> GlobalSettings:
@@ -6,10 +6,16 @@ from typing import Any, Optional
 from ..net.throttle import ThrottleConfig
 from ..net.retry import RetryConfig
 from ..net.proxy import ProxyConfig
+from ..net.governor import RateLimitConfig
 
 
 DEFAULT_MAX_CONCURRENT = 3
+# Media (CDN) lane: not account-rate-limited, so no spacing by default.
+DEFAULT_MEDIA_MIN_INTERVAL_S = 0.0
+DEFAULT_MEDIA_JITTER_MAX_S = 0.0
 DEFAULT_DOWNLOAD_ROOT = "downloads"
+DEFAULT_DOWNLOAD_WORKERS = 4
+MAX_DOWNLOAD_WORKERS = 32
 
 
 @dataclass(frozen=True)
@@ -44,17 +50,32 @@ class GlobalSettings:
     credentials: Optional[Credentials] = None
     download_root: str = DEFAULT_DOWNLOAD_ROOT
     max_concurrent: int = DEFAULT_MAX_CONCURRENT
+    # Per-run media fetch pool width (downloads inside one account run).
+    download_workers: int = DEFAULT_DOWNLOAD_WORKERS
+    # Throttle lanes: GraphQL pagination (`throttle`) and CDN media fetches.
     throttle: Optional[ThrottleConfig] = None
+    media_throttle: Optional[ThrottleConfig] = None
     retry: Optional[RetryConfig] = None
     proxy: Optional[ProxyConfig] = None
+    # Global caps shared by all concurrent runs (see net.governor).
+    rate_limits: Optional[RateLimitConfig] = None
+    # Keep parsed timelines on disk so account configs can be re-applied offline.
+    timeline_cache: bool = False
 
     def credentials_configured(self) -> bool:
         return self.credentials is not None and self.credentials.is_complete()
 
     def get_throttle(self) -> ThrottleConfig:
-        """Get throttle config, using defaults if not set."""
+        """Get the API (GraphQL) throttle config, using defaults if not set."""
         return self.throttle or ThrottleConfig()
 
+    def get_media_throttle(self) -> ThrottleConfig:
+        """Get the media (CDN) throttle config, using defaults if not set."""
+        return self.media_throttle or ThrottleConfig(
+            min_interval_s=DEFAULT_MEDIA_MIN_INTERVAL_S,
+            jitter_max_s=DEFAULT_MEDIA_JITTER_MAX_S,
+        )
+
     def get_retry(self) -> RetryConfig:
         """Get retry config, using defaults if not set."""
         return self.retry or RetryConfig()
@@ -63,20 +84,30 @@ class GlobalSettings:
         """Get proxy config, using defaults if not set."""
         return self.proxy or ProxyConfig()
 
+    def get_rate_limits(self) -> RateLimitConfig:
+        """Get global rate limits, using defaults if not set."""
+        return self.rate_limits or RateLimitConfig()
+
     def to_persist_dict(self) -> dict[str, Any]:
         data: dict[str, Any] = {
             "version": 2,
             "download_root": self.download_root,
             "max_concurrent": self.max_concurrent,
+            "download_workers": self.download_workers,
+            "timeline_cache": self.timeline_cache,
         }
         if self.credentials is not None:
             data["credentials"] = self.credentials.to_persist_dict()
         if self.throttle is not None:
             data["throttle"] = self.throttle.to_persist_dict()
+        if self.media_throttle is not None:
+            data["media_throttle"] = self.media_throttle.to_persist_dict()
         if self.retry is not None:
             data["retry"] = self.retry.to_persist_dict()
         if self.proxy is not None:
             data["proxy"] = self.proxy.to_persist_dict()
+        if self.rate_limits is not None:
+            data["rate_limits"] = self.rate_limits.to_persist_dict()
         return data
 
     @classmethod
@@ -92,11 +123,22 @@ class GlobalSettings:
         except (TypeError, ValueError):
             max_concurrent = DEFAULT_MAX_CONCURRENT
 
+        try:
+            download_workers = int(data.get("download_workers", DEFAULT_DOWNLOAD_WORKERS) or DEFAULT_DOWNLOAD_WORKERS)
+        except (TypeError, ValueError):
+            download_workers = DEFAULT_DOWNLOAD_WORKERS
+        download_workers = max(1, min(MAX_DOWNLOAD_WORKERS, download_workers))
+
         raw_throttle = data.get("throttle")
         throttle = None
         if isinstance(raw_throttle, dict):
             throttle = ThrottleConfig.from_persist_dict(raw_throttle)
 
+        raw_media_throttle = data.get("media_throttle")
+        media_throttle = None
+        if isinstance(raw_media_throttle, dict):
+            media_throttle = ThrottleConfig.from_persist_dict(raw_media_throttle)
+
         raw_retry = data.get("retry")
         retry = None
         if isinstance(raw_retry, dict):
@@ -107,12 +149,21 @@ class GlobalSettings:
         if isinstance(raw_proxy, dict):
             proxy = ProxyConfig.from_persist_dict(raw_proxy)
 
+        raw_rate_limits = data.get("rate_limits")
+        rate_limits = None
+        if isinstance(raw_rate_limits, dict):
+            rate_limits = RateLimitConfig.from_persist_dict(raw_rate_limits)
+
         return cls(
             credentials=credentials,
             download_root=download_root,
             max_concurrent=max_concurrent,
+            download_workers=download_workers,
             throttle=throttle,
+            media_throttle=media_throttle,
             retry=retry,
             proxy=proxy,
+            rate_limits=rate_limits,
+            timeline_cache=bool(data.get("timeline_cache", False)),
         )
 
@@ -81,6 +81,7 @@ class AccountRow {
     this._validation = { valid: false, handle: null, error: "URL cannot be empty" };
     this._taskStatus = TaskStatus.IDLE;
     this._queuedPosition = null;
+    this._hasTimelineCache = false;
     this._unsubscribeClipboard = null;
     this._render();
   }
@@ -103,6 +104,10 @@ class AccountRow {
           this._queuedPosition = null;
           if (this.statsComponent) this.statsComponent.reset();
         }
+        if (prevHandle !== result.handle) {
+          this._hasTimelineCache = false;
+          if (result.valid) this._refreshTimelineCache();
+        }
         this._updateGating();
         if (this.statsComponent) this.statsComponent.refresh();
       },
@@ -159,6 +164,14 @@ class AccountRow {
 
     actionsSection.appendChild(el("div", { class: "w-px h-5 bg-slate-200 mx-1" }));
 
+    // Refilter button (re-apply the config to the cached timeline)
+    this.btnRefilter = el("button", {
+      class: "p-2 text-slate-400 hover:text-blue-600 hover:bg-blue-50 rounded-lg transition disabled:opacity-30 disabled:cursor-not-allowed",
+      title: "Refilter",
+      disabled: "disabled",
+    }, [el("span", { class: "material-symbols-outlined text-[20px]", text: "filter_alt" })]);
+    actionsSection.appendChild(this.btnRefilter);
+
     // Main action button (Start/Continue/Stop)
     this.btnMain = el("button", {
       class: "flex items-center gap-1.5 px-4 py-2 bg-slate-800 hover:bg-slate-700 text-white rounded-lg text-sm font-medium transition shadow-sm hover:shadow active:scale-95 disabled:opacity-50 mx-1",
@@ -277,6 +290,9 @@ class AccountRow {
       }
     };
 
+    // Refilter
+    this.btnRefilter.onclick = () => this._onRefilter();
+
     // Delete
     this.btnDelete.onclick = () => this._onDeleteClick();
   }
@@ -294,6 +310,8 @@ class AccountRow {
 
     if (config.startDate || config.endDate) parts.push("Date");
     if (config.minShortSide && config.minShortSide > 0) parts.push(`>${config.minShortSide}px`);
+    if (config.maxVideoShortSide) parts.push(`video≤${config.maxVideoShortSide}p`);
+    if (config.maxVideoBitrateKbps) parts.push(`video≤${config.maxVideoBitrateKbps}kbps`);
 
     summary = parts.length > 0 ? parts.join(", ") : "Default";
     this.configSummary.textContent = summary;
@@ -329,6 +347,29 @@ class AccountRow {
     }
   }
 
+  _onRefilter() {
+    if (isLockedStatus(this._taskStatus) || !this._hasTimelineCache) return;
+    if (!this._validation.valid) return;
+    const handle = this._validation.handle;
+    const config = this.getConfig() || {};
+    this._startOrContinue("refilter", { handle, config });
+  }
+
+  async _refreshTimelineCache() {
+    const handle = this._validation.handle;
+    try {
+      const res = await fetch(`/api/lifecycle/check/${encodeURIComponent(handle)}`);
+      if (!res.ok) return;
+      const info = await res.json();
+      // The handle may have changed while the check was in flight.
+      if (handle !== this._validation.handle) return;
+      this._hasTimelineCache = Boolean(info.has_timeline_cache);
+      this._updateGating();
+    } catch (e) {
+      // Leave Refilter disabled; the next finished run checks again.
+    }
+  }
+
   async _checkExistingAndStart(handle, config) {
     try {
       const res = await fetch(`/api/lifecycle/check/${encodeURIComponent(handle)}`);
@@ -382,7 +423,12 @@ class AccountRow {
   }
 
   async _startOrContinue(kind, { handle, config, startMode }) {
-    const endpoint = kind === "continue" ? "/api/scheduler/continue" : "/api/scheduler/start";
+    const endpoints = {
+      start: "/api/scheduler/start",
+      continue: "/api/scheduler/continue",
+      refilter: "/api/scheduler/refilter",
+    };
+    const endpoint = endpoints[kind] || endpoints.start;
     try {
       const res = await fetch(endpoint, {
         method: "POST",
@@ -508,8 +554,11 @@ class AccountRow {
 
   applyBackendState(state) {
     if (!state || state.handle !== this._validation.handle) return;
+    const wasLocked = isLockedStatus(this._taskStatus);
     this._queuedPosition = state.queued_position ?? null;
     this.setTaskStatus(state.status);
+    // A finished Start/Continue may have written the timeline cache.
+    if (wasLocked && !isLockedStatus(state.status)) this._refreshTimelineCache();
     if (this.statsComponent) this.statsComponent.applyBackendState(state);
   }
 
@@ -553,6 +602,17 @@ class AccountRow {
       this.btnMain.disabled = shouldDisable;
     }
 
+    // Update refilter button (needs a cached timeline, no credentials)
+    const canRefilter = !isLocked && this._validation.valid && this._hasTimelineCache;
+    this.btnRefilter.disabled = !canRefilter;
+    if (isLocked) {
+      this.btnRefilter.title = "Cannot refilter while task is running";
+    } else if (this._validation.valid && !this._hasTimelineCache) {
+      this.btnRefilter.title = "No timeline cache: enable Timeline cache in Global Settings and run Start first";
+    } else {
+      this.btnRefilter.title = "Refilter cached timeline (no re-scraping)";
+    }
+
     // Update delete button
     this.btnDelete.disabled = isLocked;
     this.btnDelete.title = isLocked ? "Cannot delete while task is running" : "Delete Row";
@@ -3,7 +3,7 @@
  *
  * 功能：
  * - 提供每账号的筛选配置项
- * - 日期范围、媒体类型、来源类型、MIN_SHORT_SIDE、Quote开关
+ * - 日期范围、媒体类型、来源类型、MIN_SHORT_SIDE、视频分辨率/码率上限、Quote开关
  * - 支持 Copy/Paste Config 功能
  * - Locked 状态下禁用输入和 Paste
  */
@@ -19,6 +19,8 @@
  * @property {boolean} sourceTypes.Reply
  * @property {boolean} sourceTypes.Quote
  * @property {number|null} minShortSide - 最小短边像素
+ * @property {number|null} maxVideoShortSide - 视频变体短边上限（像素）
+ * @property {number|null} maxVideoBitrateKbps - 视频变体码率上限（kbps）
  * @property {boolean} includeQuoteMediaInReply - Reply 中是否包含被引用推文的媒体
  */
 
@@ -38,6 +40,8 @@ function getDefaultConfig() {
       Quote: true,
     },
     minShortSide: null,
+    maxVideoShortSide: null,
+    maxVideoBitrateKbps: null,
     includeQuoteMediaInReply: false,
   };
 }
@@ -54,6 +58,8 @@ function cloneConfig(config) {
     mediaType: config.mediaType,
     sourceTypes: { ...config.sourceTypes },
     minShortSide: config.minShortSide,
+    maxVideoShortSide: config.maxVideoShortSide ?? null,
+    maxVideoBitrateKbps: config.maxVideoBitrateKbps ?? null,
     includeQuoteMediaInReply: config.includeQuoteMediaInReply,
   };
 }
@@ -144,6 +150,14 @@ class AccountRowConfig {
                 <label class="text-xs text-slate-600">Min Short Side (px)</label>
                 <input type="number" class="config-min-short-side w-full text-xs border border-slate-200 rounded px-2 py-1.5 focus:border-blue-500 outline-none bg-white disabled:bg-slate-50 disabled:text-slate-400 mt-1" min="0" step="1" placeholder="No limit" />
               </div>
+              <div>
+                <label class="text-xs text-slate-600">Max Video Short Side (px)</label>
+                <input type="number" class="config-max-video-short-side w-full text-xs border border-slate-200 rounded px-2 py-1.5 focus:border-blue-500 outline-none bg-white disabled:bg-slate-50 disabled:text-slate-400 mt-1" min="0" step="1" placeholder="No limit" />
+              </div>
+              <div>
+                <label class="text-xs text-slate-600">Max Video Bitrate (kbps)</label>
+                <input type="number" class="config-max-video-bitrate w-full text-xs border border-slate-200 rounded px-2 py-1.5 focus:border-blue-500 outline-none bg-white disabled:bg-slate-50 disabled:text-slate-400 mt-1" min="0" step="1" placeholder="No limit" />
+              </div>
               <label class="flex items-center justify-between text-xs text-slate-600 cursor-pointer">
                 <span>Include quote media in replies</span>
                 <input type="checkbox" class="config-include-quote accent-blue-600" />
@@ -171,6 +185,12 @@ class AccountRowConfig {
     this._minShortSideInput = this.container.querySelector(
       ".config-min-short-side"
     );
+    this._maxVideoShortSideInput = this.container.querySelector(
+      ".config-max-video-short-side"
+    );
+    this._maxVideoBitrateInput = this.container.querySelector(
+      ".config-max-video-bitrate"
+    );
     this._includeQuoteCheckbox =
       this.container.querySelector(".config-include-quote");
 
@@ -212,6 +232,12 @@ class AccountRowConfig {
       this._onInputChange()
     );
 
+    // Video variant caps
+    [this._maxVideoShortSideInput, this._maxVideoBitrateInput].forEach((input) => {
+      input.addEventListener("change", () => this._onInputChange());
+      input.addEventListener("input", () => this._onInputChange());
+    });
+
     // Include quote checkbox
     this._includeQuoteCheckbox.addEventListener("change", () =>
       this._onInputChange()
@@ -248,6 +274,14 @@ class AccountRowConfig {
     this._config.minShortSide =
       !isNaN(minShortSide) && minShortSide > 0 ? minShortSide : null;
 
+    // 视频变体上限
+    const maxVideoShortSide = parseInt(this._maxVideoShortSideInput.value, 10);
+    this._config.maxVideoShortSide =
+      !isNaN(maxVideoShortSide) && maxVideoShortSide > 0 ? maxVideoShortSide : null;
+    const maxVideoBitrateKbps = parseInt(this._maxVideoBitrateInput.value, 10);
+    this._config.maxVideoBitrateKbps =
+      !isNaN(maxVideoBitrateKbps) && maxVideoBitrateKbps > 0 ? maxVideoBitrateKbps : null;
+
     // Quote 开关
     this._config.includeQuoteMediaInReply = this._includeQuoteCheckbox.checked;
   }
@@ -271,6 +305,10 @@ class AccountRowConfig {
     this._minShortSideInput.value =
       this._config.minShortSide !== null ? this._config.minShortSide : "";
 
+    // 视频变体上限
+    this._maxVideoShortSideInput.value = this._config.maxVideoShortSide ?? "";
+    this._maxVideoBitrateInput.value = this._config.maxVideoBitrateKbps ?? "";
+
     // Quote 开关
     this._includeQuoteCheckbox.checked = this._config.includeQuoteMediaInReply;
   }
@@ -42,6 +42,8 @@ class AccountRowStats {
       images_downloaded: 0,
       videos_downloaded: 0,
       skipped_duplicate: 0,
+      existing_files_scanned: 0,
+      existing_files_total: 0,
       runtime_s: 0,
       avg_speed: 0,
     };
@@ -63,6 +65,8 @@ class AccountRowStats {
       images_downloaded: 0,
       videos_downloaded: 0,
       skipped_duplicate: 0,
+      existing_files_scanned: 0,
+      existing_files_total: 0,
       runtime_s: 0,
       avg_speed: 0,
     };
@@ -72,6 +76,8 @@ class AccountRowStats {
     this._stats.images_downloaded = Number(state?.images_downloaded ?? 0) || 0;
     this._stats.videos_downloaded = Number(state?.videos_downloaded ?? 0) || 0;
     this._stats.skipped_duplicate = Number(state?.skipped_duplicate ?? 0) || 0;
+    this._stats.existing_files_scanned = Number(state?.existing_files_scanned ?? 0) || 0;
+    this._stats.existing_files_total = Number(state?.existing_files_total ?? 0) || 0;
     this._stats.runtime_s = Number(state?.runtime_s ?? 0) || 0;
     this._stats.avg_speed = Number(state?.avg_speed ?? 0) || 0;
   }
@@ -1,5 +1,23 @@
 /* global fetch, showToast */
 
+// Throttle lanes: GraphQL pagination (account-rate-limited) vs CDN media fetches.
+const THROTTLE_LANES = {
+  throttle: {
+    title: "API Throttle",
+    icon: "timer",
+    endpoint: "/api/settings/throttle",
+    hint: "GraphQL pagination. Conservative defaults to avoid rate limiting.",
+    defaults: { min_interval_s: 1.5, jitter_max_s: 1.0, enabled: true, adaptive: false },
+  },
+  media_throttle: {
+    title: "Media Throttle",
+    icon: "image",
+    endpoint: "/api/settings/media-throttle",
+    hint: "CDN media downloads. Not account-rate-limited: full speed by default (global rate limits still apply).",
+    defaults: { min_interval_s: 0, jitter_max_s: 0, enabled: true, adaptive: false },
+  },
+};
+
 class GlobalSettingsPanel {
   constructor(container, { onChange } = {}) {
     this.container = container;
@@ -49,6 +67,7 @@ class GlobalSettingsPanel {
       </h3>
       <div class="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-4 mb-6">
         <div class="bg-white border border-slate-200 rounded-xl p-4" data-block="throttle"></div>
+        <div class="bg-white border border-slate-200 rounded-xl p-4" data-block="media_throttle"></div>
         <div class="bg-white border border-slate-200 rounded-xl p-4" data-block="retry"></div>
         <div class="bg-white border border-slate-200 rounded-xl p-4" data-block="proxy"></div>
       </div>
@@ -58,7 +77,10 @@ class GlobalSettingsPanel {
     this.credentialsEl = this.container.querySelector('[data-block="credentials"]');
     this.downloadRootEl = this.container.querySelector('[data-block="downloadRoot"]');
     this.maxConcurrentEl = this.container.querySelector('[data-block="maxConcurrent"]');
-    this.throttleEl = this.container.querySelector('[data-block="throttle"]');
+    this.throttleEls = {};
+    for (const lane of Object.keys(THROTTLE_LANES)) {
+      this.throttleEls[lane] = this.container.querySelector(`[data-block="${lane}"]`);
+    }
     this.retryEl = this.container.querySelector('[data-block="retry"]');
     this.proxyEl = this.container.querySelector('[data-block="proxy"]');
   }
@@ -68,7 +90,10 @@ class GlobalSettingsPanel {
       credentials: { configured: false, auth_token_set: false, ct0_set: false, twid_set: false },
       download_root: "downloads",
       max_concurrent: 3,
-      throttle: { min_interval_s: 1.5, jitter_max_s: 1.0, enabled: true },
+      download_workers: 4,
+      timeline_cache: false,
+      throttle: THROTTLE_LANES.throttle.defaults,
+      media_throttle: THROTTLE_LANES.media_throttle.defaults,
       retry: { max_retries: 3, base_delay_s: 2.0, max_delay_s: 60.0, enabled: true },
       proxy: { enabled: false, url_configured: false },
     };
@@ -76,7 +101,8 @@ class GlobalSettingsPanel {
     this._renderCredentials(s);
     this._renderDownloadRoot(s);
     this._renderMaxConcurrent(s);
-    this._renderThrottle(s);
+    this._renderThrottle(s, "throttle");
+    this._renderThrottle(s, "media_throttle");
     this._renderRetry(s);
     this._renderProxy(s);
   }
@@ -196,26 +222,63 @@ class GlobalSettingsPanel {
       <p class="mt-3 text-[10px] text-slate-400">
         Default: 3. Changes apply immediately to scheduler.
       </p>
+      <div class="mt-4">
+        <label class="block text-[10px] font-bold text-slate-400 uppercase tracking-wider mb-1">Download Workers (per account)</label>
+        <div class="flex gap-2">
+          <input class="flex-1 text-xs border border-slate-200 rounded-lg px-3 py-2 focus:ring-2 focus:ring-blue-500 focus:border-blue-500 outline-none" type="number" min="1" max="32" step="1" data-el="downloadWorkers" />
+          <button class="px-3 py-2 text-xs font-medium text-slate-700 bg-slate-100 hover:bg-slate-200 rounded-lg transition" data-action="saveWorkers">
+            Save
+          </button>
+        </div>
+        <p class="mt-2 text-[10px] text-slate-400">
+          Default: 4. Applies to runs started after saving.
+        </p>
+      </div>
+      <div class="mt-4">
+        <label class="flex items-center gap-2 text-xs text-slate-600 cursor-pointer">
+          <input type="checkbox" class="accent-blue-600" data-el="timelineCache" />
+          Timeline cache (refilter without re-scraping)
+        </label>
+        <p class="mt-2 text-[10px] text-slate-400">
+          Stores scraped timelines under data/timeline_cache.
+        </p>
+      </div>
     `;
     const input = this.maxConcurrentEl.querySelector('[data-el="maxConcurrent"]');
     input.value = String(settings.max_concurrent ?? 3);
     this.maxConcurrentEl.querySelector('[data-action="saveMax"]').addEventListener("click", () => {
       this._saveMaxConcurrent(input.value);
     });
+    const workersInput = this.maxConcurrentEl.querySelector('[data-el="downloadWorkers"]');
+    workersInput.value = String(settings.download_workers ?? 4);
+    this.maxConcurrentEl.querySelector('[data-action="saveWorkers"]').addEventListener("click", () => {
+      this._saveDownloadWorkers(workersInput.value);
+    });
+    const cacheInput = this.maxConcurrentEl.querySelector('[data-el="timelineCache"]');
+    cacheInput.checked = Boolean(settings.timeline_cache);
+    cacheInput.addEventListener("change", () => {
+      this._saveTimelineCache(cacheInput.checked);
+    });
   }
 
-  _renderThrottle(settings) {
-    const t = settings.throttle || { min_interval_s: 1.5, jitter_max_s: 1.0, enabled: true };
-    this.throttleEl.innerHTML = `
+  _renderThrottle(settings, lane) {
+    const spec = THROTTLE_LANES[lane];
+    const el = this.throttleEls[lane];
+    const t = settings[lane] || spec.defaults;
+    el.innerHTML = `
       <div class="flex items-center gap-2 mb-3">
-        <span class="material-symbols-outlined text-lg text-orange-500">timer</span>
-        <h4 class="text-sm font-bold text-slate-700">Throttle</h4>
+        <span class="material-symbols-outlined text-lg text-orange-500">${spec.icon}</span>
+        <h4 class="text-sm font-bold text-slate-700">${spec.title}</h4>
       </div>
       <div class="space-y-3">
         <label class="flex items-center gap-2 text-xs text-slate-600 cursor-pointer">
           <input type="checkbox" class="accent-blue-600" data-el="throttleEnabled" ${t.enabled ? "checked" : ""} />
           <span>Enable request throttling</span>
         </label>
+        <label class="flex items-center gap-2 text-xs text-slate-600 cursor-pointer">
+          <input type="checkbox" class="accent-blue-600" data-el="throttleAdaptive" ${t.adaptive ? "checked" : ""} />
+          <span>Adaptive (follow 429 / rate-limit headers)</span>
+        </label>
         <div>
           <label class="block text-[10px] font-bold text-slate-400 uppercase tracking-wider mb-1">Min Interval (s)</label>
           <input class="w-full text-xs border border-slate-200 rounded-lg px-3 py-2 focus:ring-2 focus:ring-blue-500 focus:border-blue-500 outline-none" type="number" min="0" max="60" step="0.1" data-el="minInterval" value="${t.min_interval_s}" />
@@ -229,11 +292,11 @@ class GlobalSettingsPanel {
         Save
       </button>
       <p class="mt-3 text-[10px] text-slate-400">
-        Conservative defaults to avoid rate limiting.
+        ${spec.hint}
       </p>
     `;
-    this.throttleEl.querySelector('[data-action="saveThrottle"]').addEventListener("click", () => {
-      this._saveThrottle();
+    el.querySelector('[data-action="saveThrottle"]').addEventListener("click", () => {
+      this._saveThrottle(lane);
     });
   }
 
@@ -420,10 +483,54 @@ class GlobalSettingsPanel {
     this._applySettings(data);
   }
 
-  async _saveThrottle() {
-    const enabled = this.throttleEl.querySelector('[data-el="throttleEnabled"]')?.checked ?? true;
-    const minInterval = Number(this.throttleEl.querySelector('[data-el="minInterval"]')?.value ?? 1.5);
-    const jitterMax = Number(this.throttleEl.querySelector('[data-el="jitterMax"]')?.value ?? 1.0);
+  async _saveDownloadWorkers(value) {
+    const n = Number(value);
+    if (!Number.isFinite(n) || n < 1 || n > 32 || !Number.isInteger(n)) {
+      this._setBanner("error", "Download Workers 必须是 1-32 的整数");
+      return;
+    }
+
+    const res = await fetch("/api/settings/download-workers", {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ download_workers: n }),
+    });
+
+    if (!res.ok) {
+      const detail = await this._readError(res);
+      this._setBanner("error", `保存失败（HTTP ${res.status}）：${detail}`);
+      return;
+    }
+    const data = await res.json();
+    this._setBanner("ok", "Download Workers 已更新");
+    this._applySettings(data);
+  }
+
+  async _saveTimelineCache(enabled) {
+    const res = await fetch("/api/settings/timeline-cache", {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ enabled }),
+    });
+
+    if (!res.ok) {
+      const detail = await this._readError(res);
+      this._setBanner("error", `保存失败（HTTP ${res.status}）：${detail}`);
+      return;
+    }
+    const data = await res.json();
+    this._setBanner("ok", enabled ? "时间线缓存已开启" : "时间线缓存已关闭");
+    this._applySettings(data);
+  }
+
+  async _saveThrottle(lane) {
+    const spec = THROTTLE_LANES[lane];
+    const el = this.throttleEls[lane];
+    const enabled = el.querySelector('[data-el="throttleEnabled"]')?.checked ?? true;
+    const minInterval = Number(el.querySelector('[data-el="minInterval"]')?.value ?? spec.defaults.min_interval_s);
+    const jitterMax = Number(el.querySelector('[data-el="jitterMax"]')?.value ?? spec.defaults.jitter_max_s);
+    const adaptive = el.querySelector('[data-el="throttleAdaptive"]')?.checked ?? false;
+    const current = this.settings?.[lane] || spec.defaults;
 
     if (!Number.isFinite(minInterval) || minInterval < 0 || minInterval > 60) {
       this._setBanner("error", "Min Interval must be 0-60 seconds");
@@ -434,10 +541,17 @@ class GlobalSettingsPanel {
       return;
     }
 
-    const res = await fetch("/api/settings/throttle", {
+    const res = await fetch(spec.endpoint, {
       method: "POST",
       headers: { "Content-Type": "application/json" },
-      body: JSON.stringify({ min_interval_s: minInterval, jitter_max_s: jitterMax, enabled }),
+      body: JSON.stringify({
+        min_interval_s: minInterval,
+        jitter_max_s: jitterMax,
+        enabled,
+        adaptive,
+        adaptive_floor_s: current.adaptive_floor_s ?? 0.2,
+        adaptive_ceiling_s: current.adaptive_ceiling_s ?? 60,
+      }),
     });
 
     if (!res.ok) {
@@ -446,7 +560,7 @@ class GlobalSettingsPanel {
       return;
     }
     const data = await res.json();
-    this._setBanner("ok", "Throttle settings updated");
+    this._setBanner("ok", `${spec.title} settings updated`);
     this._applySettings(data);
   }
 
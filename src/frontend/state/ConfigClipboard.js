@@ -34,6 +34,8 @@ class ConfigClipboard {
       mediaType: config.mediaType,
       sourceTypes: { ...config.sourceTypes },
       minShortSide: config.minShortSide,
+      maxVideoShortSide: config.maxVideoShortSide ?? null,
+      maxVideoBitrateKbps: config.maxVideoBitrateKbps ?? null,
       includeQuoteMediaInReply: config.includeQuoteMediaInReply,
     };
     this._notifyListeners();
@@ -54,6 +56,8 @@ class ConfigClipboard {
       mediaType: this._config.mediaType,
       sourceTypes: { ...this._config.sourceTypes },
       minShortSide: this._config.minShortSide,
+      maxVideoShortSide: this._config.maxVideoShortSide,
+      maxVideoBitrateKbps: this._config.maxVideoBitrateKbps,
       includeQuoteMediaInReply: this._config.includeQuoteMediaInReply,
     };
   }
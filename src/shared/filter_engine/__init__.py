@@ -1,5 +1,6 @@
+from .batch import TweetBatch
 from .classifier import classify_tweet_source_type, is_reply_plus_quote
-from .engine import FILTER_REASON_MIN_SHORT_SIDE, apply_filters
+from .engine import FILTER_REASON_MIN_SHORT_SIDE, IncrementalFilter, apply_filters
 from .models import (
     DownloadIntent,
     FilterConfig,
@@ -9,6 +10,7 @@ from .models import (
     MediaTypeFilter,
     Tweet,
     TweetSourceType,
+    VideoVariant,
 )
 
 __all__ = [
@@ -19,8 +21,11 @@ __all__ = [
     "MediaKind",
     "MediaTypeFilter",
     "Tweet",
+    "TweetBatch",
     "TweetSourceType",
+    "VideoVariant",
     "FILTER_REASON_MIN_SHORT_SIDE",
+    "IncrementalFilter",
     "apply_filters",
     "classify_tweet_source_type",
     "is_reply_plus_quote",
@@ -0,0 +1,207 @@
+"""
+列式推文批（TweetBatch）：大时间线的紧凑内存表示。
+
+10 万级媒体的账号，list[Tweet] 里每条推文/媒体都是独立对象（datetime、str、
+tuple……）。TweetBatch 按列存储：
+
+- 推文列：tweet_id（int64）、created_at（UTC 纪元微秒）、reply/retweet 标志位、
+  被引用推文的行号、媒体区间起点，均为 `array`
+- 媒体列：media_id（int64）、kind、width/height（-1 表示未知）为 `array`；
+  URL 拆成“驻留前缀 + 后缀”，同一 CDN 目录只存一份前缀
+- 非纯数字的 ID（如 fixtures 中的 "t_reply_quote_1"）单独存放，保证原样还原
+- 视频的 mp4 变体（MediaCandidate.variants）按媒体下标稀疏存放
+
+被引用推文也占一行，但不计入顶层顺序。按需物化为 Tweet（迭代/下标），
+因此可直接传给 apply_filters()/IncrementalFilter。
+"""
+
+from __future__ import annotations
+
+from array import array
+from typing import Iterable, Iterator, Union, overload
+
+from .models import MediaCandidate, MediaKind, Tweet, VideoVariant, from_epoch_us, to_epoch_us
+
+_INT64_MAX = 2**63 - 1
+
+_FLAG_REPLY = 1
+_FLAG_RETWEET = 2
+
+_NO_ROW = -1
+_NO_SIZE = -1
+_NO_ID = -1
+
+_KINDS = (MediaKind.IMAGE, MediaKind.VIDEO)
+_KIND_CODES = {kind: code for code, kind in enumerate(_KINDS)}
+
+
+class _IdColumn:
+    """字符串 ID 列：规范十进制数字存 int64，其余存入溢出表。"""
+
+    __slots__ = ("_ints", "_other")
+
+    def __init__(self) -> None:
+        self._ints = array("q")
+        self._other: dict[int, str] = {}
+
+    def append(self, value: str) -> None:
+        if value.isdigit() and (value == "0" or value[0] != "0"):
+            n = int(value)
+            if n <= _INT64_MAX:
+                self._ints.append(n)
+                return
+        self._other[len(self._ints)] = value
+        self._ints.append(_NO_ID)
+
+    def __getitem__(self, index: int) -> str:
+        n = self._ints[index]
+        if n == _NO_ID:
+            return self._other[index]
+        return str(n)
+
+    def __len__(self) -> int:
+        return len(self._ints)
+
+
+class TweetBatch:
+    """
+    只追加的列式推文集合（顶层推文保持追加顺序）。
+
+    用法：
+        batch = TweetBatch.from_tweets(tweets)
+        batch.extend(page.tweets)
+        result = apply_filters(batch, config)
+    """
+
+    __slots__ = (
+        "_tweet_ids",
+        "_created_us",
+        "_flags",
+        "_quoted_rows",
+        "_media_starts",
+        "_top_rows",
+        "_media_ids",
+        "_media_kinds",
+        "_media_widths",
+        "_media_heights",
+        "_url_prefix_ids",
+        "_url_suffixes",
+        "_url_prefixes",
+        "_url_prefix_index",
+        "_media_variants",
+    )
+
+    def __init__(self) -> None:
+        # Tweet rows (top-level and quoted).
+        self._tweet_ids = _IdColumn()
+        self._created_us = array("q")
+        self._flags = array("B")
+        self._quoted_rows = array("q")
+        # Media of row r: [_media_starts[r], _media_starts[r + 1]).
+        self._media_starts = array("q", [0])
+        self._top_rows = array("q")
+
+        # Media rows.
+        self._media_ids = _IdColumn()
+        self._media_kinds = array("B")
+        self._media_widths = array("q")
+        self._media_heights = array("q")
+        self._url_prefix_ids = array("I")
+        self._url_suffixes: list[str] = []
+        self._url_prefixes: list[str] = []
+        self._url_prefix_index: dict[str, int] = {}
+        self._media_variants: dict[int, tuple[VideoVariant, ...]] = {}
+
+    @classmethod
+    def from_tweets(cls, tweets: Iterable[Tweet]) -> "TweetBatch":
+        batch = cls()
+        batch.extend(tweets)
+        return batch
+
+    def append(self, tweet: Tweet) -> None:
+        self._top_rows.append(self._append_row(tweet))
+
+    def extend(self, tweets: Iterable[Tweet]) -> None:
+        for tweet in tweets:
+            self.append(tweet)
+
+    def __len__(self) -> int:
+        return len(self._top_rows)
+
+    def __iter__(self) -> Iterator[Tweet]:
+        for row in self._top_rows:
+            yield self._tweet_at(row)
+
+    @overload
+    def __getitem__(self, index: int) -> Tweet: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[Tweet]: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Tweet, list[Tweet]]:
+        if isinstance(index, slice):
+            return [self._tweet_at(row) for row in self._top_rows[index]]
+        return self._tweet_at(self._top_rows[index])
+
+    def _append_row(self, tweet: Tweet) -> int:
+        quoted_row = _NO_ROW
+        if tweet.quoted_tweet is not None:
+            quoted_row = self._append_row(tweet.quoted_tweet)
+
+        row = len(self._created_us)
+        self._tweet_ids.append(tweet.tweet_id)
+        self._created_us.append(to_epoch_us(tweet.created_at))
+        self._flags.append((_FLAG_REPLY if tweet.is_reply else 0) | (_FLAG_RETWEET if tweet.is_retweet else 0))
+        self._quoted_rows.append(quoted_row)
+        for media in tweet.media:
+            self._append_media(media)
+        self._media_starts.append(len(self._media_kinds))
+        return row
+
+    def _append_media(self, media: MediaCandidate) -> None:
+        if media.variants:
+            self._media_variants[len(self._media_kinds)] = media.variants
+        self._media_ids.append(media.media_id)
+        self._media_kinds.append(_KIND_CODES[media.kind])
+        self._media_widths.append(_NO_SIZE if media.width is None else media.width)
+        self._media_heights.append(_NO_SIZE if media.height is None else media.height)
+
+        cut = media.url.rfind("/") + 1
+        prefix = media.url[:cut]
+        prefix_id = self._url_prefix_index.get(prefix)
+        if prefix_id is None:
+            prefix_id = len(self._url_prefixes)
+            self._url_prefixes.append(prefix)
+            self._url_prefix_index[prefix] = prefix_id
+        self._url_prefix_ids.append(prefix_id)
+        self._url_suffixes.append(media.url[cut:])
+
+    def _tweet_at(self, row: int) -> Tweet:
+        quoted_row = self._quoted_rows[row]
+        flags = self._flags[row]
+        return Tweet(
+            tweet_id=self._tweet_ids[row],
+            created_at=from_epoch_us(self._created_us[row]),
+            is_reply=bool(flags & _FLAG_REPLY),
+            is_retweet=bool(flags & _FLAG_RETWEET),
+            quoted_tweet=(self._tweet_at(quoted_row) if quoted_row != _NO_ROW else None),
+            media=tuple(
+                self._media_at(i) for i in range(self._media_starts[row], self._media_starts[row + 1])
+            ),
+        )
+
+    def _media_url(self, index: int) -> str:
+        return self._url_prefixes[self._url_prefix_ids[index]] + self._url_suffixes[index]
+
+    def _media_at(self, index: int) -> MediaCandidate:
+        width = self._media_widths[index]
+        height = self._media_heights[index]
+        return MediaCandidate(
+            media_id=self._media_ids[index],
+            kind=_KINDS[self._media_kinds[index]],
+            url=self._media_url(index),
+            width=(None if width == _NO_SIZE else width),
+            height=(None if height == _NO_SIZE else height),
+            variants=self._media_variants.get(index, ()),
+        )
+
@@ -9,17 +9,27 @@ from __future__ import annotations
 
 from collections import defaultdict
 from datetime import datetime
-from typing import Iterable, Sequence
+from typing import Iterable, Optional, Sequence, Union
 
+from .batch import TweetBatch
 from .classifier import classify_tweet_source_type, is_reply_plus_quote
-from .models import DownloadIntent, FilterConfig, FilterResult, MediaCandidate, MediaKind, Tweet
+from .models import (
+    DownloadIntent,
+    FilterConfig,
+    FilterResult,
+    MediaCandidate,
+    MediaKind,
+    Tweet,
+    VideoVariant,
+    to_epoch_us,
+)
 
 
 FILTER_REASON_MIN_SHORT_SIDE = "min_short_side"
 
 
 def _dt_to_sort_int(dt: datetime) -> int:
-    return int(dt.timestamp() * 1_000_000)
+    return to_epoch_us(dt)
 
 
 def _media_kind_allowed(kind: MediaKind, media_type: str) -> bool:
@@ -55,7 +65,115 @@ def _iter_candidate_media(
             yield (m, "quoted", tweet.quoted_tweet)
 
 
-def apply_filters(tweets: Sequence[Tweet], config: FilterConfig) -> FilterResult:
+def _pick_capped_variant(variants: Sequence[VideoVariant], config: FilterConfig) -> Optional[VideoVariant]:
+    """
+    在 max_video_short_side / max_video_bitrate 之内选码率最高的变体。
+
+    - 设了分辨率上限时，URL 中没有尺寸的变体不算“满足上限”
+    - 没有变体满足上限时退回码率最低的变体（上限的目的就是省带宽）
+    - 码率相同取靠前者；无变体返回 None
+    """
+    if not variants:
+        return None
+    max_side = config.max_video_short_side
+    max_bitrate = config.max_video_bitrate
+
+    best: Optional[VideoVariant] = None
+    lowest: Optional[VideoVariant] = None
+    for v in variants:
+        bitrate = v.bitrate or 0
+        if lowest is None or bitrate < (lowest.bitrate or 0):
+            lowest = v
+        if max_bitrate is not None and bitrate > max_bitrate:
+            continue
+        if max_side is not None:
+            if v.width is None or v.height is None or min(v.width, v.height) > max_side:
+                continue
+        if best is None or bitrate > (best.bitrate or 0):
+            best = v
+    return best if best is not None else lowest
+
+
+def _apply_video_caps(media: MediaCandidate, config: FilterConfig) -> MediaCandidate:
+    """按视频上限替换下载 URL；所选变体有尺寸时一并替换 width/height。"""
+    variant = _pick_capped_variant(media.variants, config)
+    if variant is None or variant.url == media.url:
+        return media
+    width, height = media.width, media.height
+    if variant.width is not None and variant.height is not None:
+        width, height = variant.width, variant.height
+    return MediaCandidate(media.media_id, media.kind, variant.url, width, height, media.variants)
+
+
+_ORIGIN_RANK = {"self": 0, "quoted": 1}
+_KIND_RANK = {MediaKind.IMAGE: 0, MediaKind.VIDEO: 1}
+
+
+def _intent_sort_key(it: DownloadIntent) -> tuple:
+    return (
+        -_dt_to_sort_int(it.trigger_created_at),
+        it.trigger_tweet_id,
+        _ORIGIN_RANK.get(it.origin, 9),
+        _KIND_RANK.get(it.kind, 9),
+        it.tweet_id,
+        it.media_id,
+    )
+
+
+def _validate_config(config: FilterConfig) -> None:
+    if config.start_date and config.end_date and config.start_date > config.end_date:
+        raise ValueError("start_date 不能晚于 end_date")
+
+
+def _collect_tweet_intents(
+    tweet: Tweet,
+    config: FilterConfig,
+    intents: list[DownloadIntent],
+    filtered_counts: dict[str, int],
+) -> None:
+    if not _in_date_closed_interval(tweet, config):
+        return
+
+    source_type = classify_tweet_source_type(tweet)
+    if source_type not in config.source_types:
+        return
+
+    include_quoted_media = bool(is_reply_plus_quote(tweet) and config.include_quote_media_in_reply)
+    caps_video = config.caps_video_variants
+
+    for media, origin, media_tweet in _iter_candidate_media(tweet, include_quoted_media=include_quoted_media):
+        if not _media_kind_allowed(media.kind, config.media_type.value):
+            continue
+        if caps_video and media.variants:
+            media = _apply_video_caps(media, config)
+
+        needs_post_check = False
+        if config.min_short_side is not None:
+            if media.width is not None and media.height is not None:
+                if min(media.width, media.height) < config.min_short_side:
+                    filtered_counts[FILTER_REASON_MIN_SHORT_SIDE] += 1
+                    continue
+            else:
+                needs_post_check = True
+
+        intents.append(
+            DownloadIntent(
+                media_id=media.media_id,
+                kind=media.kind,
+                url=media.url,
+                width=media.width,
+                height=media.height,
+                tweet_id=media_tweet.tweet_id,
+                tweet_created_at=media_tweet.created_at,
+                trigger_tweet_id=tweet.tweet_id,
+                trigger_created_at=tweet.created_at,
+                origin=origin,
+                needs_post_min_short_side_check=needs_post_check,
+            )
+        )
+
+
+def apply_filters(tweets: Union[Sequence[Tweet], TweetBatch], config: FilterConfig) -> FilterResult:
     """
     根据配置对推文集合做分类与过滤，并输出“下载意图列表”。
 
@@ -63,69 +181,85 @@ def apply_filters(tweets: Sequence[Tweet], config: FilterConfig) -> FilterResult
     - 日期/来源类型筛选作用于“触发推文”（即当前 tweet）
     - Reply+Quote 开关仅对 Reply+Quote 生效；开启时可额外纳入被引用推文的媒体
     - MIN_SHORT_SIDE：有 width/height 则前置过滤；无尺寸信息则保留并标记 needs_post_min_short_side_check
-    """
+    - 视频上限（max_video_short_side / max_video_bitrate）：先在 variants 中重选变体，
+      再以所选变体的尺寸参与 MIN_SHORT_SIDE 判断
 
-    if config.start_date and config.end_date and config.start_date > config.end_date:
-        raise ValueError("start_date 不能晚于 end_date")
+    TweetBatch 按顶层顺序逐条物化为 Tweet，与列表输入走同一条路径。
+    """
 
+    _validate_config(config)
     filtered_counts: dict[str, int] = defaultdict(int)
     intents: list[DownloadIntent] = []
 
     for tweet in tweets:
-        if not _in_date_closed_interval(tweet, config):
-            continue
+        _collect_tweet_intents(tweet, config, intents, filtered_counts)
 
-        source_type = classify_tweet_source_type(tweet)
-        if source_type not in config.source_types:
-            continue
+    intents_sorted = tuple(sorted(intents, key=_intent_sort_key))
 
-        include_quoted_media = bool(is_reply_plus_quote(tweet) and config.include_quote_media_in_reply)
+    return FilterResult(intents=intents_sorted, filtered_counts=dict(filtered_counts))
 
-        for media, origin, media_tweet in _iter_candidate_media(tweet, include_quoted_media=include_quoted_media):
-            if not _media_kind_allowed(media.kind, config.media_type.value):
-                continue
 
-            needs_post_check = False
-            if config.min_short_side is not None:
-                if media.width is not None and media.height is not None:
-                    if min(media.width, media.height) < config.min_short_side:
-                        filtered_counts[FILTER_REASON_MIN_SHORT_SIDE] += 1
-                        continue
-                else:
-                    needs_post_check = True
-
-            intents.append(
-                DownloadIntent(
-                    media_id=media.media_id,
-                    kind=media.kind,
-                    url=media.url,
-                    width=media.width,
-                    height=media.height,
-                    tweet_id=media_tweet.tweet_id,
-                    tweet_created_at=media_tweet.created_at,
-                    trigger_tweet_id=tweet.tweet_id,
-                    trigger_created_at=tweet.created_at,
-                    origin=origin,
-                    needs_post_min_short_side_check=needs_post_check,
-                )
-            )
+class IncrementalFilter:
+    """
+    增量筛选：按页输入推文，尽早输出下载意图。
 
-    origin_rank = {"self": 0, "quoted": 1}
-    kind_rank = {MediaKind.IMAGE: 0, MediaKind.VIDEO: 1}
-
-    intents_sorted = tuple(
-        sorted(
-            intents,
-            key=lambda it: (
-                -_dt_to_sort_int(it.trigger_created_at),
-                it.trigger_tweet_id,
-                origin_rank.get(it.origin, 9),
-                kind_rank.get(it.kind, 9),
-                it.tweet_id,
-                it.media_id,
-            ),
-        )
-    )
+    UserMedia 时间线按新→旧返回，因此看到某页之后，后续页面的推文不会比
+    “目前见过的最旧推文”（watermark）更新。严格新于 watermark 的意图即可按
+    全局排序输出；与 watermark 同一时刻的意图留到下一页或 finish() 再输出。
 
-    return FilterResult(intents=intents_sorted, filtered_counts=dict(filtered_counts))
+    在上述前提下，push()/finish() 输出的拼接结果与对全部推文调用
+    apply_filters() 的 intents 完全一致（顺序亦相同）。
+
+    用法：
+        stage = IncrementalFilter(config)
+        for page in pages:
+            for intent in stage.push(page.tweets):
+                ...
+        for intent in stage.finish():
+            ...
+    """
+
+    def __init__(self, config: FilterConfig) -> None:
+        _validate_config(config)
+        self._config = config
+        self._pending: list[DownloadIntent] = []
+        self._filtered_counts: dict[str, int] = defaultdict(int)
+        self._watermark: Optional[int] = None
+
+    @property
+    def filtered_counts(self) -> dict[str, int]:
+        return dict(self._filtered_counts)
+
+    @property
+    def pending_count(self) -> int:
+        """尚未输出（等待 watermark 推进）的意图数量。"""
+        return len(self._pending)
+
+    def push(self, tweets: Iterable[Tweet]) -> tuple[DownloadIntent, ...]:
+        """输入一页推文，返回已可确定顺序的意图。"""
+        for tweet in tweets:
+            _collect_tweet_intents(tweet, self._config, self._pending, self._filtered_counts)
+            ts = _dt_to_sort_int(tweet.created_at)
+            if self._watermark is None or ts < self._watermark:
+                self._watermark = ts
+
+        if self._watermark is None or not self._pending:
+            return ()
+
+        self._pending.sort(key=_intent_sort_key)
+        cut = 0
+        for it in self._pending:
+            if _dt_to_sort_int(it.trigger_created_at) <= self._watermark:
+                break
+            cut += 1
+
+        ready = tuple(self._pending[:cut])
+        del self._pending[:cut]
+        return ready
 
+    def finish(self) -> tuple[DownloadIntent, ...]:
+        """时间线结束：输出剩余意图。"""
+        self._pending.sort(key=_intent_sort_key)
+        rest = tuple(self._pending)
+        self._pending.clear()
+        return rest
@@ -4,12 +4,13 @@ Filter Engine 的稳定领域模型（纯逻辑层）。
 目标：
 - 用最少的字段表达筛选与分类所需信息
 - 便于从 JSON fixtures 解析并做回归
+- 实例使用 __slots__（大时间线的列式表示见 batch.TweetBatch）
 """
 
 from __future__ import annotations
 
 from dataclasses import dataclass
-from datetime import date, datetime, timezone
+from datetime import date, datetime, timedelta, timezone
 from enum import Enum
 from typing import Any, Mapping, Optional, Sequence
 
@@ -55,6 +56,21 @@ def format_iso_datetime_z(dt: datetime) -> str:
     return dt.astimezone(timezone.utc).isoformat().replace("+00:00", "Z")
 
 
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def to_epoch_us(dt: datetime) -> int:
+    """datetime → UTC 纪元微秒（整数运算，无浮点误差；naive 视为 UTC）。"""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    delta = dt - _EPOCH
+    return (delta.days * 86_400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def from_epoch_us(us: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=us)
+
+
 def parse_iso_date(value: Optional[str]) -> Optional[date]:
     if value is None:
         return None
@@ -63,13 +79,55 @@ def parse_iso_date(value: Optional[str]) -> Optional[date]:
     return date.fromisoformat(value.strip())
 
 
-@dataclass(frozen=True)
+def _optional_int(value: Any) -> Optional[int]:
+    return int(value) if value is not None else None
+
+
+@dataclass(frozen=True, slots=True)
+class VideoVariant:
+    """
+    视频的一个 mp4 码率变体。
+
+    width/height 来自变体 URL 中的 `/vid/.../WxH/` 段（无法解析时为 None）；
+    bitrate 单位为 bit/s。
+    """
+
+    url: str
+    bitrate: Optional[int] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+
+    @staticmethod
+    def from_dict(data: Mapping[str, Any]) -> "VideoVariant":
+        return VideoVariant(
+            url=str(data["url"]),
+            bitrate=_optional_int(data.get("bitrate")),
+            width=_optional_int(data.get("width")),
+            height=_optional_int(data.get("height")),
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "url": self.url,
+            "bitrate": self.bitrate,
+            "width": self.width,
+            "height": self.height,
+        }
+
+
+@dataclass(frozen=True, slots=True)
 class MediaCandidate:
+    """
+    url/width/height 为默认选择（视频取最高码率变体）；
+    variants 保留全部 mp4 变体，供 FilterConfig 的视频分辨率/码率上限重新选择。
+    """
+
     media_id: str
     kind: MediaKind
     url: str
     width: Optional[int] = None
     height: Optional[int] = None
+    variants: tuple[VideoVariant, ...] = ()
 
     @staticmethod
     def from_dict(data: Mapping[str, Any]) -> "MediaCandidate":
@@ -79,10 +137,23 @@ class MediaCandidate:
             url=str(data["url"]),
             width=(int(data["width"]) if data.get("width") is not None else None),
             height=(int(data["height"]) if data.get("height") is not None else None),
+            variants=tuple(VideoVariant.from_dict(v) for v in data.get("variants", None) or ()),
         )
 
+    def to_dict(self) -> dict[str, Any]:
+        out: dict[str, Any] = {
+            "media_id": self.media_id,
+            "kind": self.kind.value,
+            "url": self.url,
+            "width": self.width,
+            "height": self.height,
+        }
+        if self.variants:
+            out["variants"] = [v.to_dict() for v in self.variants]
+        return out
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, slots=True)
 class Tweet:
     tweet_id: str
     created_at: datetime
@@ -103,6 +174,16 @@ class Tweet:
             media=tuple(MediaCandidate.from_dict(m) for m in data.get("media", []) or []),
         )
 
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "tweet_id": self.tweet_id,
+            "created_at": format_iso_datetime_z(self.created_at),
+            "is_reply": self.is_reply,
+            "is_retweet": self.is_retweet,
+            "quoted_tweet": (self.quoted_tweet.to_dict() if self.quoted_tweet is not None else None),
+            "media": [m.to_dict() for m in self.media],
+        }
+
 
 @dataclass(frozen=True)
 class FilterConfig:
@@ -123,6 +204,9 @@ class FilterConfig:
     )
     include_quote_media_in_reply: bool = False
     min_short_side: Optional[int] = None
+    # 视频变体上限：短边像素 / 码率（bit/s）；None 表示不限。
+    max_video_short_side: Optional[int] = None
+    max_video_bitrate: Optional[int] = None
 
     @staticmethod
     def from_dict(data: Mapping[str, Any]) -> "FilterConfig":
@@ -134,11 +218,9 @@ class FilterConfig:
                 raise ValueError("source_types 必须是数组")
             source_types = frozenset(TweetSourceType(str(v)) for v in raw_source_types)
 
-        min_short_side = data.get("min_short_side", None)
-        if min_short_side is not None:
-            min_short_side = int(min_short_side)
-            if min_short_side <= 0:
-                min_short_side = None
+        min_short_side = _positive_int_or_none(data.get("min_short_side", None))
+        max_video_short_side = _positive_int_or_none(data.get("max_video_short_side", None))
+        max_video_bitrate = _positive_int_or_none(data.get("max_video_bitrate", None))
 
         return FilterConfig(
             start_date=parse_iso_date(data.get("start_date")),
@@ -147,10 +229,24 @@ class FilterConfig:
             source_types=source_types,
             include_quote_media_in_reply=bool(data.get("include_quote_media_in_reply", False)),
             min_short_side=min_short_side,
+            max_video_short_side=max_video_short_side,
+            max_video_bitrate=max_video_bitrate,
         )
 
+    @property
+    def caps_video_variants(self) -> bool:
+        return self.max_video_short_side is not None or self.max_video_bitrate is not None
 
-@dataclass(frozen=True)
+
+def _positive_int_or_none(value: Any) -> Optional[int]:
+    """非正数视为“不限”。"""
+    if value is None:
+        return None
+    n = int(value)
+    return n if n > 0 else None
+
+
+@dataclass(frozen=True, slots=True)
 class DownloadIntent:
     """
     “下载意图” = 业务层决定要下载的一个具体媒体（image/video）。
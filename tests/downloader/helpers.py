@@ -0,0 +1,30 @@
+"""
+Shared fixtures for the downloader tests.
+"""
+
+from datetime import datetime
+from pathlib import Path
+
+from src.backend.downloader.downloader import MediaIntent
+from src.backend.fs.storage import MediaType
+
+
+def media_intent(
+    url: str,
+    media_type: MediaType = MediaType.VIDEO,
+    *,
+    tweet_id: str = "1000",
+    min_short_side_check: bool = False,
+) -> MediaIntent:
+    return MediaIntent(
+        url=url,
+        tweet_id=tweet_id,
+        created_at=datetime(2026, 1, 13, 12, 0, 0),
+        media_type=media_type,
+        needs_post_min_short_side_check=min_short_side_check,
+    )
+
+
+def hidden_files(directory: Path) -> list[str]:
+    """Dot-files in `directory` (temp files left behind by a download)."""
+    return sorted(p.name for p in directory.iterdir() if p.name.startswith("."))
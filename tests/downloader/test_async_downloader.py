@@ -0,0 +1,243 @@
+import asyncio
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import patch
+
+from src.backend.downloader.async_downloader import AsyncMediaDownloader, AsyncMediaSink
+from src.backend.downloader.downloader import DownloadStatus
+from src.backend.fs.hash_index import FileHashIndex
+from src.backend.fs.hashing import compute_bytes_hash
+from src.backend.fs.storage import AccountStorageManager
+
+from tests.downloader.helpers import hidden_files, media_intent
+
+
+class _CountingExecutor(ThreadPoolExecutor):
+    def __init__(self) -> None:
+        super().__init__(max_workers=2)
+        self.submitted = 0
+
+    def submit(self, *args, **kwargs):  # noqa: ANN002, ANN003
+        self.submitted += 1
+        return super().submit(*args, **kwargs)
+
+
+class _NoDefaultExecutor(ThreadPoolExecutor):
+    def submit(self, *args, **kwargs):  # noqa: ANN002, ANN003
+        raise AssertionError("default executor used")
+
+
+class TestAsyncMediaSink(unittest.TestCase):
+    def test_chunks_are_written_in_batches(self) -> None:
+        chunks = [bytes([i]) * 100 for i in range(10)]
+
+        async def main(f, executor):  # noqa: ANN001
+            sink = AsyncMediaSink(f, executor=executor, batch_size=250)
+            for chunk in chunks:
+                await sink.write(chunk)
+            await sink.flush()
+            return sink
+
+        with tempfile.TemporaryFile() as f, _CountingExecutor() as executor:
+            sink = asyncio.run(main(f, executor))
+            f.seek(0)
+            self.assertEqual(f.read(), b"".join(chunks))
+            self.assertEqual(sink.hasher.hexdigest(), compute_bytes_hash(b"".join(chunks)))
+            self.assertEqual(sink.bytes_written, 1000)
+            # 3 full batches of 300 bytes + the final flush.
+            self.assertEqual(executor.submitted, 4)
+
+    def test_reset_discards_flushed_and_buffered_bytes(self) -> None:
+        async def main(f, executor):  # noqa: ANN001
+            sink = AsyncMediaSink(f, executor=executor, batch_size=4)
+            await sink.write(b"partial garbage")
+            await sink.write(b"xx")
+            sink.reset()
+            self.assertEqual(sink.bytes_written, 0)
+            await sink.write(b"real body")
+            await sink.flush()
+            return sink
+
+        with tempfile.TemporaryFile() as f, ThreadPoolExecutor(max_workers=1) as executor:
+            sink = asyncio.run(main(f, executor))
+            f.seek(0)
+            self.assertEqual(f.read(), b"real body")
+            self.assertEqual(sink.hasher.hexdigest(), compute_bytes_hash(b"real body"))
+
+
+class TestAsyncMediaDownloader(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.storage = AccountStorageManager(Path(self._tmp.name))
+        self.videos = Path(self._tmp.name) / "alice" / "videos"
+        self.executor = ThreadPoolExecutor(max_workers=2)
+
+    def tearDown(self) -> None:
+        self.executor.shutdown()
+        self._tmp.cleanup()
+
+    def _downloader(self, stream, **kwargs) -> AsyncMediaDownloader:  # noqa: ANN001, ANN003
+        return AsyncMediaDownloader(
+            storage=self.storage,
+            handle="alice",
+            stream_download_func=stream,
+            io_executor=self.executor,
+            write_batch_size=1024,
+            **kwargs,
+        )
+
+    def test_download_does_not_use_default_executor(self) -> None:
+        chunks = [b"a" * 1000, b"b" * 1000, b"c" * 10]
+
+        async def stream(url: str, sink: AsyncMediaSink) -> None:
+            for chunk in chunks:
+                await sink.write(chunk)
+
+        async def main():
+            asyncio.get_running_loop().set_default_executor(_NoDefaultExecutor(max_workers=1))
+            return await self._downloader(stream).download_async(media_intent("https://video.twimg.com/v.mp4"))
+
+        result = asyncio.run(main())
+        content = b"".join(chunks)
+        self.assertEqual(result.status, DownloadStatus.SUCCESS, result.error)
+        self.assertEqual(result.file_path.read_bytes(), content)
+        self.assertEqual(result.content_hash, compute_bytes_hash(content))
+        self.assertEqual(hidden_files(self.videos), [])
+
+    def test_dedup_and_known_media_match_sync_downloader(self) -> None:
+        requested: list[str] = []
+
+        async def stream(url: str, sink: AsyncMediaSink) -> None:
+            requested.append(url)
+            await sink.write(b"same bytes")
+
+        async def main(index: FileHashIndex):
+            downloader = self._downloader(stream, hash_index=index)
+            first = await downloader.download_async(media_intent("https://video.twimg.com/a.mp4", "2"))
+            dup = await downloader.download_async(media_intent("https://video.twimg.com/b.mp4", "1"))
+            again = await self._downloader(stream, hash_index=index).download_async(
+                media_intent("https://video.twimg.com/a.mp4", "2")
+            )
+            return first, dup, again
+
+        with FileHashIndex.for_account(Path(self._tmp.name) / "alice") as index:
+            first, dup, again = asyncio.run(main(index))
+
+        self.assertEqual(first.status, DownloadStatus.SUCCESS)
+        self.assertEqual(dup.status, DownloadStatus.SKIPPED_DUPLICATE)
+        self.assertEqual(dup.existing_file, first.file_path)
+        self.assertEqual(again.status, DownloadStatus.SKIPPED_DUPLICATE)
+        self.assertEqual(requested, ["https://video.twimg.com/a.mp4", "https://video.twimg.com/b.mp4"])
+
+    def test_failed_stream_leaves_no_temp_file(self) -> None:
+        async def stream(url: str, sink: AsyncMediaSink) -> None:
+            await sink.write(b"x" * 5000)
+            raise ConnectionResetError("peer reset")
+
+        downloader = self._downloader(stream)
+        result = asyncio.run(downloader.download_async(media_intent("https://video.twimg.com/v.mp4")))
+
+        self.assertEqual(result.status, DownloadStatus.FAILED)
+        self.assertIn("peer reset", result.error)
+        self.assertEqual(downloader.stats.failed, 1)
+        self.assertEqual(list(self.videos.iterdir()), [])
+
+    def test_cancelled_fetch_removes_temp_file(self) -> None:
+        async def main():
+            event = asyncio.Event()
+
+            async def stream(url: str, sink: AsyncMediaSink) -> None:
+                await sink.write(b"x" * 5000)
+                event.set()
+                await asyncio.sleep(60)
+
+            task = asyncio.ensure_future(self._downloader(stream).fetch_async(media_intent("https://video.twimg.com/v.mp4")))
+            await event.wait()
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(main())
+        self.assertEqual(list(self.videos.iterdir()), [])
+
+    def test_cancel_during_flush_closes_file_after_the_write(self) -> None:
+        writing = threading.Event()
+        written = threading.Event()
+        errors: list[BaseException] = []
+        write_batch = AsyncMediaSink._write_batch
+
+        def slow_write_batch(sink, *args):  # noqa: ANN001, ANN002
+            writing.set()
+            time.sleep(0.2)
+            try:
+                write_batch(sink, *args)
+            except BaseException as exc:  # noqa: BLE001
+                errors.append(exc)
+                raise
+            finally:
+                written.set()
+
+        async def stream(url: str, sink: AsyncMediaSink) -> None:
+            await sink.write(b"x" * 5000)
+
+        async def main():
+            task = asyncio.ensure_future(self._downloader(stream).fetch_async(media_intent("https://video.twimg.com/v.mp4")))
+            while not writing.is_set():
+                await asyncio.sleep(0.01)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        with patch.object(AsyncMediaSink, "_write_batch", new=slow_write_batch):
+            asyncio.run(main())
+        self.assertTrue(written.wait(5))
+        self.assertEqual(errors, [])
+        self.assertEqual(list(self.videos.iterdir()), [])
+
+    def test_cancel_while_opening_temp_file_removes_it(self) -> None:
+        opening = threading.Event()
+        opened: list = []
+
+        async def stream(url: str, sink: AsyncMediaSink) -> None:
+            await sink.write(b"x")
+
+        downloader = self._downloader(stream)
+        open_temp_file = downloader._open_temp_file
+
+        def slow_open_temp_file(*args):  # noqa: ANN002
+            opening.set()
+            time.sleep(0.2)
+            opened.append(open_temp_file(*args))
+            return opened[-1]
+
+        downloader._open_temp_file = slow_open_temp_file
+
+        async def main():
+            task = asyncio.ensure_future(downloader.fetch_async(media_intent("https://video.twimg.com/v.mp4")))
+            while not opening.is_set():
+                await asyncio.sleep(0.01)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            deadline = time.monotonic() + 5
+            while not (opened and opened[0][1].closed) and time.monotonic() < deadline:
+                await asyncio.sleep(0.01)
+
+        asyncio.run(main())
+        self.assertTrue(opened[0][1].closed)
+        self.assertEqual(list(self.videos.iterdir()), [])
+
+    def test_sync_fetch_is_rejected(self) -> None:
+        async def stream(url: str, sink: AsyncMediaSink) -> None:
+            await sink.write(b"x")
+
+        with self.assertRaises(TypeError):
+            self._downloader(stream).download(media_intent("https://video.twimg.com/v.mp4"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,330 @@
+import asyncio
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest.mock import patch
+
+from src.backend.downloader.async_downloader import AsyncMediaDownloader
+from src.backend.downloader.downloader import DownloadStatus, MediaDownloader
+from src.backend.downloader.hls import (
+    HlsError,
+    MasterPlaylist,
+    MediaPlaylist,
+    is_hls_url,
+    parse_playlist,
+    pick_variant,
+)
+from src.backend.downloader.media_probe import ffprobe_size
+from src.backend.downloader.tools import run_tool
+from src.backend.fs.storage import AccountStorageManager
+from src.backend.net.retry import RetryConfig
+from src.backend.pipeline.account_runner import _make_async_stream_download_func
+
+from tests.downloader.helpers import media_intent
+
+
+MASTER = """#EXTM3U
+#EXT-X-VERSION:6
+#EXT-X-INDEPENDENT-SEGMENTS
+#EXT-X-MEDIA:NAME="Audio",TYPE=AUDIO,GROUP-ID="audio-32000",AUTOSELECT=YES,URI="/pl/mp4a/32000/a.m3u8?container=cmaf"
+#EXT-X-MEDIA:NAME="Audio",TYPE=AUDIO,GROUP-ID="audio-128000",AUTOSELECT=YES,URI="/pl/mp4a/128000/a.m3u8?container=cmaf"
+#EXT-X-STREAM-INF:AVERAGE-BANDWIDTH=300000,BANDWIDTH=400000,RESOLUTION=480x270,CODECS="mp4a.40.2,avc1.4d0015",AUDIO="audio-32000"
+/pl/avc1/480x270/v.m3u8?container=cmaf
+#EXT-X-STREAM-INF:AVERAGE-BANDWIDTH=2000000,BANDWIDTH=2400000,RESOLUTION=1280x720,CODECS="mp4a.40.2,avc1.640020",AUDIO="audio-128000"
+/pl/avc1/1280x720/v.m3u8?container=cmaf
+"""
+
+VIDEO_SEGMENTS = 6
+
+
+def _media_playlist(track: str, count: int) -> str:
+    lines = ["#EXTM3U", "#EXT-X-VERSION:6", "#EXT-X-TARGETDURATION:3", "#EXT-X-PLAYLIST-TYPE:VOD"]
+    lines.append(f'#EXT-X-MAP:URI="/seg/{track}/init.mp4"')
+    for i in range(count):
+        lines += ["#EXTINF:3.000,", f"/seg/{track}/{i}.m4s"]
+    lines.append("#EXT-X-ENDLIST")
+    return "\n".join(lines) + "\n"
+
+
+def _fixture_files() -> dict[str, bytes]:
+    files = {
+        "/pl/master.m3u8": MASTER.encode(),
+        "/pl/avc1/1280x720/v.m3u8": _media_playlist("v720", VIDEO_SEGMENTS).encode(),
+        "/pl/avc1/480x270/v.m3u8": _media_playlist("v270", VIDEO_SEGMENTS).encode(),
+        "/pl/mp4a/128000/a.m3u8": _media_playlist("a128", 2).encode(),
+        "/seg/v720/init.mp4": b"V-INIT|",
+        "/seg/a128/init.mp4": b"A-INIT|",
+    }
+    for i in range(VIDEO_SEGMENTS):
+        files[f"/seg/v720/{i}.m4s"] = f"V{i}|".encode() * 1000
+    for i in range(2):
+        files[f"/seg/a128/{i}.m4s"] = f"A{i}|".encode() * 100
+    return files
+
+
+class _HlsHandler(BaseHTTPRequestHandler):
+    """Serves `files` by path; segment responses are slowed down to expose concurrency."""
+
+    files: dict[str, bytes] = {}
+    fail_once: set[str] = set()
+    segment_delay_s = 0.0
+    requests: list[str] = []
+    in_flight = 0
+    max_in_flight = 0
+    lock = threading.Lock()
+
+    def do_GET(self) -> None:  # noqa: N802
+        cls = type(self)
+        path = self.path.split("?", 1)[0]
+        with cls.lock:
+            cls.requests.append(path)
+            cls.in_flight += 1
+            cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+        try:
+            if path.startswith("/seg/") and cls.segment_delay_s:
+                time.sleep(cls.segment_delay_s)
+            if path in cls.fail_once:
+                cls.fail_once.discard(path)
+                self.send_response(503)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            body = cls.files.get(path)
+            if body is None:
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with cls.lock:
+                cls.in_flight -= 1
+
+    def log_message(self, format, *args):  # noqa: A002, ANN001
+        return
+
+
+async def _fake_ffmpeg(cmd, **kwargs):  # noqa: ANN001, ANN003
+    """Stands in for `ffmpeg -c copy`: concatenates the inputs into the output."""
+    inputs = [cmd[i + 1] for i, arg in enumerate(cmd) if arg == "-i"]
+    Path(cmd[-1]).write_bytes(b"".join(Path(p).read_bytes() for p in inputs))
+    return 0, "", ""
+
+
+class TestPlaylistParsing(unittest.TestCase):
+    def test_master_playlist(self) -> None:
+        master = parse_playlist(MASTER, "https://video.twimg.com/ext_tw_video/1/pu/pl/master.m3u8?tag=12")
+        self.assertIsInstance(master, MasterPlaylist)
+        best = pick_variant(master)
+        self.assertEqual(best.uri, "https://video.twimg.com/pl/avc1/1280x720/v.m3u8?container=cmaf")
+        self.assertEqual((best.bandwidth, best.width, best.height), (2400000, 1280, 720))
+        self.assertEqual(master.audio[best.audio_group], "https://video.twimg.com/pl/mp4a/128000/a.m3u8?container=cmaf")
+
+    def test_media_playlist(self) -> None:
+        media = parse_playlist(_media_playlist("v", 3), "http://cdn.test/pl/v.m3u8")
+        self.assertIsInstance(media, MediaPlaylist)
+        self.assertEqual(media.init_uri, "http://cdn.test/seg/v/init.mp4")
+        self.assertEqual(media.segments, tuple(f"http://cdn.test/seg/v/{i}.m4s" for i in range(3)))
+        self.assertAlmostEqual(media.duration_s, 9.0)
+
+        relative = parse_playlist("#EXTM3U\n#EXTINF:2.5,\nseg0.ts\n#EXT-X-ENDLIST\n", "http://cdn.test/a/b/v.m3u8")
+        self.assertEqual(relative.segments, ("http://cdn.test/a/b/seg0.ts",))
+
+    def test_unsupported_playlists(self) -> None:
+        cases = {
+            "not a playlist": "<html></html>",
+            "encrypted": '#EXTM3U\n#EXT-X-KEY:METHOD=AES-128,URI="k"\n#EXTINF:2,\ns.ts\n',
+            "byte range": "#EXTM3U\n#EXTINF:2,\n#EXT-X-BYTERANGE:100@0\ns.ts\n",
+            "empty": "#EXTM3U\n#EXT-X-ENDLIST\n",
+        }
+        for name, text in cases.items():
+            with self.subTest(name):
+                with self.assertRaises(HlsError):
+                    parse_playlist(text, "http://cdn.test/v.m3u8")
+        self.assertIsInstance(
+            parse_playlist('#EXTM3U\n#EXT-X-KEY:METHOD=NONE\n#EXTINF:2,\ns.ts\n', "http://cdn.test/v.m3u8"),
+            MediaPlaylist,
+        )
+
+    def test_is_hls_url(self) -> None:
+        self.assertTrue(is_hls_url("https://video.twimg.com/x/pl/a.m3u8?tag=12&container=cmaf"))
+        self.assertFalse(is_hls_url("https://video.twimg.com/x/vid/avc1/1280x720/a.mp4?tag=12"))
+
+
+class _HlsServerTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        _HlsHandler.files = _fixture_files()
+        _HlsHandler.fail_once = set()
+        _HlsHandler.segment_delay_s = 0.0
+        _HlsHandler.requests = []
+        _HlsHandler.in_flight = 0
+        _HlsHandler.max_in_flight = 0
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _HlsHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+
+    def tearDown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp.cleanup()
+
+    def _downloader(self, **kwargs) -> AsyncMediaDownloader:  # noqa: ANN003
+        stream = _make_async_stream_download_func(
+            retry_config=RetryConfig(max_retries=2, base_delay_s=0.01, jitter_factor=0.0),
+        )
+        return AsyncMediaDownloader(AccountStorageManager(self.root), "alice", stream_download_func=stream, **kwargs)
+
+
+class TestHlsDownload(_HlsServerTestCase):
+    def test_segments_are_fetched_concurrently_and_remuxed(self) -> None:
+        _HlsHandler.segment_delay_s = 0.05
+        _HlsHandler.fail_once = {"/seg/v720/2.m4s"}
+        downloader = self._downloader(hls_segment_concurrency=4)
+        remuxed_on: list[threading.Thread] = []
+
+        async def ffmpeg(cmd, **kwargs):  # noqa: ANN001, ANN003
+            remuxed_on.append(threading.current_thread())
+            return await _fake_ffmpeg(cmd, **kwargs)
+
+        with patch("src.backend.downloader.hls.shutil.which", return_value="ffmpeg"), patch(
+            "src.backend.downloader.hls.run_tool", side_effect=ffmpeg
+        ) as run:
+            result = asyncio.run(downloader.download_async(media_intent(f"{self.base_url}/pl/master.m3u8?tag=12")))
+
+        self.assertEqual(result.status, DownloadStatus.SUCCESS, result.error)
+        self.assertEqual(result.file_path.suffix, ".mp4")
+        files = _HlsHandler.files
+        video = files["/seg/v720/init.mp4"] + b"".join(files[f"/seg/v720/{i}.m4s"] for i in range(VIDEO_SEGMENTS))
+        audio = files["/seg/a128/init.mp4"] + files["/seg/a128/0.m4s"] + files["/seg/a128/1.m4s"]
+        self.assertEqual(result.file_path.read_bytes(), video + audio, "tracks appended in playlist order")
+
+        self.assertEqual(remuxed_on, [threading.main_thread()], "ffmpeg is awaited on the event loop, not the I/O pool")
+        cmd = run.call_args.args[0]
+        self.assertEqual(cmd[cmd.index("-c") + 1], "copy")
+        self.assertIn("0:v:0", cmd)
+        self.assertIn("1:a:0", cmd)
+        self.assertNotIn("/seg/v270/init.mp4", _HlsHandler.requests, "only the best variant is fetched")
+        self.assertEqual(_HlsHandler.requests.count("/seg/v720/2.m4s"), 2, "a failed segment is retried")
+        self.assertGreater(_HlsHandler.max_in_flight, 1)
+        self.assertLessEqual(_HlsHandler.max_in_flight, 4)
+        self.assertEqual([p.name for p in (self.root / "alice" / "videos").iterdir()], [result.file_path.name])
+        self.assertEqual(downloader.stats.videos_downloaded, 1)
+
+    def test_min_short_side_is_decided_from_the_variant_resolution(self) -> None:
+        downloader = self._downloader(min_short_side=1080)
+
+        result = asyncio.run(downloader.download_async(media_intent(f"{self.base_url}/pl/master.m3u8", min_short_side_check=True)))
+
+        self.assertEqual(result.status, DownloadStatus.SKIPPED_MIN_SHORT_SIDE, result.error)
+        self.assertEqual(result.probed_size, (1280, 720))
+        self.assertFalse([p for p in _HlsHandler.requests if p.startswith("/seg/")], "no segment was fetched")
+        self.assertEqual(downloader.stats.min_short_side_bytes_saved, 2400000 * 3 * VIDEO_SEGMENTS // 8)
+
+    def test_missing_ffmpeg_fails_the_media(self) -> None:
+        downloader = self._downloader()
+
+        with patch("src.backend.downloader.hls.shutil.which", return_value=None):
+            result = asyncio.run(downloader.download_async(media_intent(f"{self.base_url}/pl/master.m3u8")))
+
+        self.assertEqual(result.status, DownloadStatus.FAILED)
+        self.assertIn("ffmpeg", result.error)
+        self.assertEqual(list((self.root / "alice" / "videos").iterdir()), [], "temp files are removed")
+
+    def test_missing_segment_fails_the_media(self) -> None:
+        del _HlsHandler.files["/seg/v720/3.m4s"]
+        downloader = self._downloader()
+
+        with patch("src.backend.downloader.hls.shutil.which", return_value="ffmpeg"), patch(
+            "src.backend.downloader.hls.run_tool", side_effect=_fake_ffmpeg
+        ) as run:
+            result = asyncio.run(downloader.download_async(media_intent(f"{self.base_url}/pl/master.m3u8")))
+
+        self.assertEqual(result.status, DownloadStatus.FAILED)
+        run.assert_not_called()
+        self.assertEqual(list((self.root / "alice" / "videos").iterdir()), [])
+
+    def test_ffmpeg_timeout_fails_the_media(self) -> None:
+        downloader = self._downloader()
+
+        async def hang(cmd, *, timeout_s):  # noqa: ANN001
+            raise asyncio.TimeoutError
+
+        with patch("src.backend.downloader.hls.shutil.which", return_value="ffmpeg"), patch(
+            "src.backend.downloader.hls.run_tool", side_effect=hang
+        ):
+            result = asyncio.run(downloader.download_async(media_intent(f"{self.base_url}/pl/master.m3u8")))
+
+        self.assertEqual(result.status, DownloadStatus.FAILED)
+        self.assertIn("timed out", result.error)
+        self.assertEqual(list((self.root / "alice" / "videos").iterdir()), [], "temp files are removed")
+
+    def test_sync_downloader_rejects_hls(self) -> None:
+        downloader = MediaDownloader(AccountStorageManager(self.root), "alice", download_func=lambda url: b"")
+        result = downloader.download(media_intent(f"{self.base_url}/pl/master.m3u8"))
+        self.assertEqual(result.status, DownloadStatus.FAILED)
+
+
+class TestRunTool(unittest.TestCase):
+    def test_output_and_exit_code(self) -> None:
+        cmd = [sys.executable, "-c", "import sys; print('out'); sys.stderr.write('err'); sys.exit(3)"]
+        code, stdout, stderr = asyncio.run(run_tool(cmd, timeout_s=30))
+        self.assertEqual((code, stdout.strip(), stderr), (3, "out", "err"))
+
+    @unittest.skipIf(sys.platform == "win32", "signal 0 probing is POSIX only")
+    def test_timeout_kills_the_process(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            pid_file = Path(tmpdir) / "pid"
+            cmd = [
+                sys.executable,
+                "-c",
+                f"import os, time; open({str(pid_file)!r}, 'w').write(str(os.getpid())); time.sleep(60)",
+            ]
+            started = time.monotonic()
+            with self.assertRaises(asyncio.TimeoutError):
+                asyncio.run(run_tool(cmd, timeout_s=1.0))
+            self.assertLess(time.monotonic() - started, 30)
+            pid = int(pid_file.read_text())
+        with self.assertRaises(ProcessLookupError):
+            os.kill(pid, 0)
+
+
+@unittest.skipUnless(shutil.which("ffmpeg") and shutil.which("ffprobe"), "ffmpeg is not installed")
+class TestHlsDownloadWithFfmpeg(_HlsServerTestCase):
+    def test_real_remux(self) -> None:
+        src = self.root / "src"
+        src.mkdir()
+        subprocess.run(
+            [
+                "ffmpeg", "-hide_banner", "-loglevel", "error", "-nostdin",
+                "-f", "lavfi", "-i", "testsrc=size=320x180:rate=25:duration=4",
+                "-f", "lavfi", "-i", "sine=duration=4",
+                "-c:v", "libx264", "-g", "25", "-c:a", "aac", "-shortest",
+                "-f", "hls", "-hls_time", "1", "-hls_playlist_type", "vod",
+                "-hls_segment_type", "fmp4", str(src / "v.m3u8"),
+            ],
+            check=True,
+        )
+        _HlsHandler.files = {f"/hls/{p.name}": p.read_bytes() for p in src.iterdir()}
+        downloader = self._downloader()
+
+        result = asyncio.run(downloader.download_async(media_intent(f"{self.base_url}/hls/v.m3u8")))
+
+        self.assertEqual(result.status, DownloadStatus.SUCCESS, result.error)
+        self.assertEqual(ffprobe_size(result.file_path), (320, 180))
+
+
+if __name__ == "__main__":
+    unittest.main()
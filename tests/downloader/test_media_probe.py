@@ -0,0 +1,377 @@
+import asyncio
+import struct
+import tempfile
+import threading
+import unittest
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest.mock import patch
+
+from src.backend.downloader.async_downloader import AsyncMediaDownloader, AsyncMediaSink
+from src.backend.downloader.downloader import DownloadStatus, MediaDownloader, MediaSink
+from src.backend.downloader.media_probe import (
+    BelowMinShortSide,
+    ImageSizeProbe,
+    MinShortSideGuard,
+    Mp4SizeProbe,
+    ffprobe_size,
+    probe_image_size,
+    probe_mp4_size,
+)
+from src.backend.fs.storage import AccountStorageManager, MediaType
+from src.backend.net.retry import RetryConfig
+from src.backend.pipeline.account_runner import _make_async_stream_download_func
+
+from tests.downloader.helpers import media_intent
+
+
+def _png(width: int, height: int, tail: int = 0) -> bytes:
+    ihdr = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    chunk = struct.pack(">I", len(ihdr)) + b"IHDR" + ihdr + struct.pack(">I", zlib.crc32(b"IHDR" + ihdr))
+    return b"\x89PNG\r\n\x1a\n" + chunk + b"\x00" * tail
+
+
+def _jpeg(width: int, height: int, *, exif: int = 0, progressive: bool = False) -> bytes:
+    out = b"\xff\xd8"
+    out += b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\x00" + b"\x00" * 9
+    if exif:
+        out += b"\xff\xe1" + struct.pack(">H", exif + 2) + b"E" * exif
+    out += b"\xff\xff"  # fill bytes before the next marker
+    out += b"\xff\xdb" + struct.pack(">H", 67) + b"\x00" * 65
+    sof = b"\xc2" if progressive else b"\xc0"
+    out += b"\xff" + sof + struct.pack(">HBHHB", 11, 8, height, width, 1) + b"\x01\x11\x00"
+    out += b"\xff\xda" + struct.pack(">H", 8) + b"\x00" * 6 + b"\x12" * 100 + b"\xff\xd9"
+    return out
+
+
+def _gif(width: int, height: int) -> bytes:
+    return b"GIF89a" + struct.pack("<HH", width, height) + b"\x00" * 20
+
+
+def _webp(chunk: bytes, payload: bytes) -> bytes:
+    body = b"WEBP" + chunk + struct.pack("<I", len(payload)) + payload
+    return b"RIFF" + struct.pack("<I", len(body)) + body
+
+
+def _webp_vp8(width: int, height: int) -> bytes:
+    return _webp(b"VP8 ", b"\x00\x00\x00" + b"\x9d\x01\x2a" + struct.pack("<HH", width, height) + b"\x00" * 10)
+
+
+def _webp_vp8l(width: int, height: int) -> bytes:
+    bits = (width - 1) | ((height - 1) << 14)
+    return _webp(b"VP8L", b"\x2f" + struct.pack("<I", bits) + b"\x00" * 10)
+
+
+def _webp_vp8x(width: int, height: int) -> bytes:
+    return _webp(b"VP8X", b"\x00" * 4 + (width - 1).to_bytes(3, "little") + (height - 1).to_bytes(3, "little"))
+
+
+def _box(box_type: bytes, payload: bytes) -> bytes:
+    return struct.pack(">I", 8 + len(payload)) + box_type + payload
+
+
+def _tkhd(width: int, height: int, version: int = 0) -> bytes:
+    times = b"\x00" * (32 if version == 1 else 20)
+    return _box(b"tkhd", bytes([version, 0, 0, 3]) + times + b"\x00" * 16 + b"\x00" * 36 + struct.pack(">II", width << 16, height << 16))
+
+
+def _trak(handler: bytes, width: int, height: int, *, entry: bytes = b"avc1", tkhd_version: int = 0) -> bytes:
+    sample_entry = _box(entry, b"\x00" * 6 + b"\x00\x01" + b"\x00" * 16 + struct.pack(">HH", width, height) + b"\x00" * 50)
+    stsd = _box(b"stsd", b"\x00" * 4 + struct.pack(">I", 1) + sample_entry)
+    stbl = _box(b"stbl", stsd + _box(b"stts", b"\x00" * 8))
+    minf = _box(b"minf", _box(b"vmhd", b"\x00" * 12) + stbl)
+    hdlr = _box(b"hdlr", b"\x00" * 8 + handler + b"\x00" * 13)
+    mdia = _box(b"mdia", _box(b"mdhd", b"\x00" * 24) + hdlr + minf)
+    tkhd_size = (width, height) if handler == b"vide" else (0, 0)
+    return _box(b"trak", _tkhd(*tkhd_size, version=tkhd_version) + mdia)
+
+
+def _mp4(width: int, height: int, *, mdat: int = 4096, moov_first: bool = True, **trak_kwargs) -> bytes:
+    ftyp = _box(b"ftyp", b"isom\x00\x00\x02\x00isomiso2avc1mp41")
+    moov = _box(b"moov", _box(b"mvhd", b"\x00" * 100) + _trak(b"soun", 0, 0) + _trak(b"vide", width, height, **trak_kwargs))
+    body = _box(b"mdat", b"\x00" * mdat)
+    return ftyp + (moov + body if moov_first else body + moov)
+
+
+class TestImageSizeProbe(unittest.TestCase):
+    def test_formats(self) -> None:
+        cases = {
+            "png": (_png(1920, 1080), (1920, 1080)),
+            "jpeg": (_jpeg(4096, 2304), (4096, 2304)),
+            "jpeg progressive + exif": (_jpeg(640, 480, exif=30000, progressive=True), (640, 480)),
+            "gif": (_gif(320, 200), (320, 200)),
+            "webp lossy": (_webp_vp8(1200, 800), (1200, 800)),
+            "webp lossless": (_webp_vp8l(16383, 2), (16383, 2)),
+            "webp extended": (_webp_vp8x(5000, 3000), (5000, 3000)),
+        }
+        for name, (data, expected) in cases.items():
+            with self.subTest(name=name):
+                self.assertEqual(probe_image_size(data), expected)
+
+                probe = ImageSizeProbe()
+                for i in range(len(data)):
+                    probe.feed(data[i : i + 1])
+                    if probe.done:
+                        break
+                self.assertEqual(probe.size, expected)
+
+    def test_unknown_truncated_and_limit(self) -> None:
+        self.assertIsNone(probe_image_size(b"<html>not an image</html>"))
+        self.assertIsNone(probe_image_size(_png(10, 10)[:20]))
+
+        probe = ImageSizeProbe()
+        probe.feed(b"<html>")
+        self.assertTrue(probe.done)
+        self.assertIsNone(probe.size)
+
+        probe = ImageSizeProbe(limit=1024)
+        probe.feed(_jpeg(100, 100, exif=4000)[:2000])
+        self.assertTrue(probe.done)
+        self.assertIsNone(probe.size)
+
+    def test_guard_raises_when_below_threshold(self) -> None:
+        guard = MinShortSideGuard(720, ImageSizeProbe())
+        data = _png(1280, 640)
+        with self.assertRaises(BelowMinShortSide) as ctx:
+            guard.feed(data[:10])
+            guard.feed(data[10:])
+        self.assertEqual((ctx.exception.width, ctx.exception.height), (1280, 640))
+
+        guard = MinShortSideGuard(720, ImageSizeProbe())
+        guard.feed(_png(1280, 720))
+        self.assertTrue(guard.verified)
+
+
+class TestMp4SizeProbe(unittest.TestCase):
+    def test_moov_first(self) -> None:
+        cases = {
+            "avc1": (_mp4(1280, 720), (1280, 720)),
+            "hevc, tkhd v1": (_mp4(720, 1280, entry=b"hvc1", tkhd_version=1), (720, 1280)),
+            "unknown sample entry uses tkhd": (_mp4(480, 270, entry=b"xxxx"), (480, 270)),
+        }
+        for name, (data, expected) in cases.items():
+            with self.subTest(name=name):
+                self.assertEqual(probe_mp4_size(data), expected)
+
+                probe = Mp4SizeProbe()
+                consumed = 0
+                for i in range(0, len(data), 7):
+                    probe.feed(data[i : i + 7])
+                    consumed = i + 7
+                    if probe.done:
+                        break
+                self.assertEqual(probe.size, expected)
+                self.assertLess(consumed, len(data) - 4000, "should not need mdat")
+
+    def test_moov_after_mdat_or_not_mp4(self) -> None:
+        probe = Mp4SizeProbe()
+        probe.feed(_mp4(1280, 720, moov_first=False)[:200])
+        self.assertTrue(probe.done)
+        self.assertIsNone(probe.size)
+
+        self.assertIsNone(probe_mp4_size(b"\x00\x00\x00\x10notanmp4" + b"\x00" * 100))
+        self.assertIsNone(probe_mp4_size(_mp4(1280, 720)[:100]))
+
+    def test_ffprobe_missing(self) -> None:
+        with patch("src.backend.downloader.media_probe.shutil.which", return_value=None):
+            self.assertIsNone(ffprobe_size(Path("whatever.mp4")))
+
+
+class TestDownloaderPostCheck(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.storage = AccountStorageManager(Path(self._tmp.name))
+        self.images = Path(self._tmp.name) / "alice" / "images"
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def _streamed(self, data: bytes, chunk_size: int = 16):  # noqa: ANN202
+        sent: list[int] = []
+
+        def stream(url: str, sink: MediaSink) -> None:
+            for i in range(0, len(data), chunk_size):
+                sink.write(data[i : i + chunk_size])
+                sent.append(i)
+
+        return stream, sent
+
+    def test_undersized_image_is_aborted_early_and_counted(self) -> None:
+        stream, sent = self._streamed(_png(640, 480, tail=10_000))
+        downloader = MediaDownloader(self.storage, "alice", stream_download_func=stream, min_short_side=720)
+
+        result = downloader.download(media_intent("https://pbs.twimg.com/media/a.png", MediaType.IMAGE, min_short_side_check=True))
+
+        self.assertEqual(result.status, DownloadStatus.SKIPPED_MIN_SHORT_SIDE)
+        self.assertEqual(result.probed_size, (640, 480))
+        self.assertEqual(len(sent), 1, "transfer should stop once the header is parsed")
+        self.assertEqual(list(self.images.iterdir()), [])
+        self.assertEqual(downloader.stats.skipped_min_short_side, 1)
+        self.assertEqual(downloader.stats.to_dict()["skipped_min_short_side"], 1)
+        self.assertEqual(downloader.stats.total_downloaded, 0)
+
+    def test_large_enough_unflagged_and_unknown_images_are_kept(self) -> None:
+        def download_func(url: str) -> bytes:
+            return {
+                "big": _jpeg(1920, 1080),
+                "unflagged": _png(10, 10),
+                "unknown": b"\x00not an image",
+            }[url]
+
+        downloader = MediaDownloader(self.storage, "alice", download_func=download_func, min_short_side=720)
+        big = downloader.download(media_intent("big", MediaType.IMAGE, min_short_side_check=True))
+        unflagged = downloader.download(media_intent("unflagged", MediaType.IMAGE))
+        unknown = downloader.download(media_intent("unknown", MediaType.IMAGE, min_short_side_check=True))
+        video = downloader.download(media_intent("unknown", min_short_side_check=True))
+
+        self.assertEqual(big.status, DownloadStatus.SUCCESS)
+        self.assertEqual(big.probed_size, (1920, 1080))
+        self.assertEqual(unflagged.status, DownloadStatus.SUCCESS)
+        self.assertEqual(unknown.status, DownloadStatus.SUCCESS)
+        self.assertEqual(video.status, DownloadStatus.SKIPPED_DUPLICATE)
+        self.assertEqual(downloader.stats.min_short_side_unverified, 1)
+        self.assertEqual(downloader.stats.skipped_min_short_side, 0)
+
+    def test_bytes_download_below_threshold_is_not_written(self) -> None:
+        downloader = MediaDownloader(self.storage, "alice", download_func=lambda url: _gif(100, 900), min_short_side=200)
+        result = downloader.download(media_intent("https://pbs.twimg.com/media/a.gif", MediaType.IMAGE, min_short_side_check=True))
+        self.assertEqual(result.status, DownloadStatus.SKIPPED_MIN_SHORT_SIDE)
+        self.assertFalse(self.images.exists() and any(self.images.iterdir()))
+
+    def test_async_downloader_aborts_undersized_image(self) -> None:
+        data = _webp_vp8(300, 300) + b"\x00" * 10_000
+        sent: list[int] = []
+
+        async def stream(url: str, sink: AsyncMediaSink) -> None:
+            for i in range(0, len(data), 64):
+                await sink.write(data[i : i + 64])
+                sent.append(i)
+
+        async def main():
+            downloader = AsyncMediaDownloader(
+                self.storage,
+                "alice",
+                stream_download_func=stream,
+                min_short_side=720,
+            )
+            intent = media_intent("https://pbs.twimg.com/media/a.webp", MediaType.IMAGE, min_short_side_check=True)
+            result = await downloader.download_async(intent)
+            return downloader, result
+
+        downloader, result = asyncio.run(main())
+        self.assertEqual(result.status, DownloadStatus.SKIPPED_MIN_SHORT_SIDE)
+        self.assertEqual(len(sent), 0)
+        self.assertEqual(list(self.images.iterdir()), [])
+        self.assertEqual(downloader.stats.skipped_min_short_side, 1)
+
+    def test_undersized_video_is_aborted_and_bytes_saved_are_counted(self) -> None:
+        data = _mp4(640, 360, mdat=100_000)
+        stream, sent = self._streamed(data, chunk_size=1024)
+
+        def stream_with_length(url: str, sink: MediaSink) -> None:
+            sink.expected_size = len(data)
+            stream(url, sink)
+
+        downloader = MediaDownloader(self.storage, "alice", stream_download_func=stream_with_length, min_short_side=720)
+        result = downloader.download(media_intent("https://video.twimg.com/v.mp4", min_short_side_check=True))
+
+        self.assertEqual(result.status, DownloadStatus.SKIPPED_MIN_SHORT_SIDE)
+        self.assertEqual(result.probed_size, (640, 360))
+        self.assertEqual(sent, [], "the first chunk already holds moov")
+        self.assertEqual(downloader.stats.min_short_side_bytes_saved, len(data) - 1024)
+
+    def test_ffprobe_fallback_for_moov_at_the_end(self) -> None:
+        data = _mp4(640, 360, moov_first=False)
+        videos = Path(self._tmp.name) / "alice" / "videos"
+        downloader = MediaDownloader(self.storage, "alice", download_func=lambda url: data, min_short_side=720)
+        intent = media_intent("https://video.twimg.com/v.mp4", min_short_side_check=True)
+
+        with patch("src.backend.downloader.downloader.ffprobe_size", return_value=(640, 360)) as ffprobe:
+            result = downloader.download(intent)
+        self.assertEqual(ffprobe.call_count, 1)
+        self.assertEqual(result.status, DownloadStatus.SKIPPED_MIN_SHORT_SIDE)
+        self.assertEqual(list(videos.iterdir()), [])
+        self.assertEqual(downloader.stats.min_short_side_bytes_saved, 0)
+
+        with patch("src.backend.downloader.downloader.ffprobe_size", return_value=None):
+            result = downloader.download(intent)
+        self.assertEqual(result.status, DownloadStatus.SUCCESS)
+        self.assertEqual(downloader.stats.min_short_side_unverified, 1)
+
+
+    def test_async_ffprobe_fallback_runs_off_the_io_pool(self) -> None:
+        data = _mp4(640, 360, moov_first=False)
+        videos = Path(self._tmp.name) / "alice" / "videos"
+        probed_on: list[threading.Thread] = []
+
+        async def ffprobe(path: Path) -> tuple[int, int]:
+            probed_on.append(threading.current_thread())
+            return 640, 360
+
+        async def stream(url: str, sink: AsyncMediaSink) -> None:
+            await sink.write(data)
+
+        async def main():
+            downloader = AsyncMediaDownloader(self.storage, "alice", stream_download_func=stream, min_short_side=720)
+            return await downloader.download_async(media_intent("https://video.twimg.com/v.mp4", min_short_side_check=True))
+
+        with patch("src.backend.downloader.async_downloader.ffprobe_size_async", side_effect=ffprobe):
+            result = asyncio.run(main())
+        self.assertEqual(result.status, DownloadStatus.SKIPPED_MIN_SHORT_SIDE)
+        self.assertEqual(probed_on, [threading.main_thread()], "ffprobe is awaited on the event loop")
+        self.assertEqual(list(videos.iterdir()), [])
+
+class _Mp4Handler(BaseHTTPRequestHandler):
+    body = b""
+    bytes_sent = 0
+
+    def do_GET(self) -> None:  # noqa: N802
+        cls = type(self)
+        self.send_response(200)
+        self.send_header("Content-Type", "video/mp4")
+        self.send_header("Content-Length", str(len(cls.body)))
+        self.end_headers()
+        try:
+            for i in range(0, len(cls.body), 16 * 1024):
+                self.wfile.write(cls.body[i : i + 16 * 1024])
+                cls.bytes_sent += 16 * 1024
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):  # noqa: A002, ANN001
+        return
+
+
+class TestEarlyAbortOverHttp(unittest.TestCase):
+    def setUp(self) -> None:
+        _Mp4Handler.body = _mp4(640, 360, mdat=8 * 1024 * 1024)
+        _Mp4Handler.bytes_sent = 0
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _Mp4Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/v.mp4"
+
+    def tearDown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_content_length_feeds_bytes_saved(self) -> None:
+        stream = _make_async_stream_download_func(
+            retry_config=RetryConfig(max_retries=0, base_delay_s=0.01, jitter_factor=0.0),
+        )
+        with tempfile.TemporaryDirectory() as tmpdir:
+            downloader = AsyncMediaDownloader(
+                AccountStorageManager(Path(tmpdir)),
+                "alice",
+                stream_download_func=stream,
+                min_short_side=720,
+            )
+            result = asyncio.run(downloader.download_async(media_intent(self.url, min_short_side_check=True)))
+
+        self.assertEqual(result.status, DownloadStatus.SKIPPED_MIN_SHORT_SIDE, result.error)
+        self.assertGreater(downloader.stats.min_short_side_bytes_saved, 7 * 1024 * 1024)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from src.backend.downloader.dedup import DedupIndex
+from src.backend.downloader.downloader import MediaDownloader
+from src.backend.fs.hash_index import FileHashIndex
+from src.backend.fs.hashing import compute_bytes_hash, compute_file_hash, hash_files_parallel
+from src.backend.fs.storage import AccountStorageManager
+
+
+def _populate(root: Path, count: int) -> list[Path]:
+    paths = []
+    for i in range(count):
+        sub = "images" if i % 2 == 0 else "videos"
+        p = root / sub / f"{i}_2026-01-01_aaaaaa.bin"
+        p.parent.mkdir(parents=True, exist_ok=True)
+        # A few duplicates (i % 5) so registration order matters.
+        p.write_bytes(f"content-{i % 5}".encode() * (1000 + i))
+        paths.append(p)
+    return paths
+
+
+class TestHashFilesParallel(unittest.TestCase):
+    def test_results_keep_input_order_and_skip_unreadable(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            files = _populate(Path(tmpdir), 12)
+            missing = Path(tmpdir) / "images" / "missing.bin"
+            inputs = files[:6] + [missing] + files[6:]
+
+            progress: list[tuple[int, int]] = []
+            hashes = hash_files_parallel(inputs, workers=4, on_progress=lambda d, t: progress.append((d, t)))
+
+            self.assertIsNone(hashes[6])
+            expected = [compute_file_hash(p) for p in files]
+            self.assertEqual(hashes[:6] + hashes[7:], expected)
+            self.assertEqual(len(progress), len(inputs))
+            self.assertEqual(progress[-1], (len(inputs), len(inputs)))
+
+    def test_uses_multiple_threads(self) -> None:
+        barrier = threading.Barrier(3, timeout=5)
+
+        def hash_func(p: Path) -> str:
+            barrier.wait()
+            return compute_bytes_hash(p.name.encode())
+
+        hashes = hash_files_parallel([Path("a"), Path("b"), Path("c")], hash_func=hash_func, workers=3)
+        self.assertEqual(hashes, [compute_bytes_hash(n.encode()) for n in "abc"])
+
+
+class TestDedupParallelScan(unittest.TestCase):
+    def test_parallel_scan_matches_sequential_load(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            _populate(root, 20)
+
+            sequential = DedupIndex()
+            sequential.load_from_directories(root / "images", root / "videos")
+            parallel = DedupIndex()
+            loaded = parallel.scan_directories(root / "images", root / "videos", workers=4)
+
+            self.assertEqual(loaded, 20)
+            self.assertEqual(parallel.known_hashes, sequential.known_hashes)
+            for h in sequential.known_hashes:
+                self.assertEqual(parallel.get_existing_file(h), sequential.get_existing_file(h))
+
+    def test_scan_with_hash_index_populates_cache(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            files = _populate(root, 8)
+            with FileHashIndex.for_account(root) as index:
+                DedupIndex().scan_directories(root / "images", root / "videos", workers=4, hash_index=index)
+                self.assertEqual(index.misses, 8)
+                for p in files:
+                    self.assertEqual(index.lookup(p), compute_file_hash(p))
+
+                DedupIndex().scan_directories(root / "images", root / "videos", workers=4, hash_index=index)
+                self.assertEqual(index.hits, 8)
+
+    def test_downloader_reports_scan_progress_in_stats(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            storage = AccountStorageManager(Path(tmpdir))
+            paths = storage.ensure_account_dirs("alice")
+            _populate(paths.root, 6)
+
+            downloader = MediaDownloader(storage=storage, handle="alice", download_func=lambda url: b"")
+            seen: list[tuple[int, int]] = []
+            downloader.load_existing_files(workers=3, on_progress=lambda d, t: seen.append((d, t)))
+
+            stats = downloader.stats.to_dict()
+            self.assertEqual(stats["existing_files_scanned"], 6)
+            self.assertEqual(stats["existing_files_total"], 6)
+            self.assertEqual(seen[-1], (6, 6))
+
+
+if __name__ == "__main__":
+    unittest.main()
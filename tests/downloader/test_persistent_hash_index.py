@@ -0,0 +1,228 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+from unittest import mock
+
+from src.backend.downloader import dedup as dedup_module
+from src.backend.downloader.downloader import DownloadStatus, MediaDownloader, MediaIntent
+from src.backend.fs import hash_index as hash_index_module
+from src.backend.fs.hash_index import INDEX_FILENAME, FileHashIndex
+from src.backend.fs.hashing import compute_bytes_hash
+from src.backend.fs.storage import AccountStorageManager, MediaType
+
+from tests.downloader.helpers import media_intent
+
+
+def _write(path: Path, content: bytes) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    return path
+
+
+class TestFileHashIndex(unittest.TestCase):
+    def test_unchanged_files_are_not_rehashed_across_runs(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            storage = AccountStorageManager(Path(tmpdir))
+            paths = storage.ensure_account_dirs("alice")
+            for i in range(3):
+                _write(paths.images / f"{i}_2026-01-01_aaaaaa.jpg", f"img-{i}".encode())
+
+            with FileHashIndex.for_account(paths.root) as index:
+                loaded = MediaDownloader(
+                    storage=storage, handle="alice", download_func=lambda url: b"", hash_index=index
+                ).load_existing_files()
+                self.assertEqual(loaded, 3)
+                self.assertEqual(index.misses, 3)
+
+            with mock.patch.object(
+                hash_index_module, "compute_file_hash", side_effect=AssertionError("rehashed")
+            ), mock.patch.object(
+                dedup_module, "compute_file_hash", side_effect=AssertionError("rehashed")
+            ):
+                with FileHashIndex.for_account(paths.root) as index:
+                    downloader = MediaDownloader(
+                        storage=storage, handle="alice", download_func=lambda url: b"", hash_index=index
+                    )
+                    self.assertEqual(downloader.load_existing_files(), 3)
+                    self.assertEqual(index.hits, 3)
+                    self.assertTrue(downloader.dedup_index.is_known(compute_bytes_hash(b"img-1")))
+
+    def test_modified_file_is_rehashed(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            f = _write(root / "images" / "a.jpg", b"old")
+            with FileHashIndex.for_account(root) as index:
+                self.assertEqual(index.hash_file(f), compute_bytes_hash(b"old"))
+
+            f.write_bytes(b"new content")
+            st = f.stat()
+            os.utime(f, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+            with FileHashIndex.for_account(root) as index:
+                self.assertEqual(index.hash_file(f), compute_bytes_hash(b"new content"))
+                self.assertEqual(index.misses, 1)
+
+    def test_scan_prunes_entries_for_deleted_files(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            images = root / "images"
+            keep = _write(images / "keep.jpg", b"keep")
+            gone = _write(images / "gone.jpg", b"gone")
+            with FileHashIndex.for_account(root) as index:
+                dedup_module.DedupIndex().load_from_directory(images, hash_index=index)
+                gone.unlink()
+                dedup_module.DedupIndex().load_from_directory(images, hash_index=index)
+
+                self.assertIsNotNone(index.lookup(keep))
+                _write(gone, b"gone")
+                self.assertIsNone(index.lookup(gone))
+
+    def test_downloaded_files_are_recorded(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            storage = AccountStorageManager(Path(tmpdir))
+            paths = storage.ensure_account_dirs("alice")
+            with FileHashIndex.for_account(paths.root) as index:
+                downloader = MediaDownloader(
+                    storage=storage, handle="alice", download_func=lambda url: b"body", hash_index=index
+                )
+                result = downloader.download(
+                    MediaIntent(
+                        url="https://pbs.twimg.com/media/a.jpg",
+                        tweet_id="1",
+                        created_at=datetime(2026, 1, 1),
+                        media_type=MediaType.IMAGE,
+                    )
+                )
+                self.assertEqual(result.status, DownloadStatus.SUCCESS)
+                self.assertEqual(index.lookup(result.file_path), compute_bytes_hash(b"body"))
+
+    def test_ignore_replace_deletion_drops_index_entry(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            storage = AccountStorageManager(Path(tmpdir))
+            paths = storage.ensure_account_dirs("alice")
+            old = _write(paths.images / "9_2025-01-01_aaaaaa.jpg", b"same")
+            with FileHashIndex.for_account(paths.root) as index:
+                downloader = MediaDownloader(
+                    storage=storage,
+                    handle="alice",
+                    download_func=lambda url: b"same",
+                    ignore_replace=True,
+                    hash_index=index,
+                )
+                downloader.load_existing_files_for_replace()
+                self.assertIsNotNone(index.lookup(old))
+
+                result = downloader.download(
+                    MediaIntent(
+                        url="https://pbs.twimg.com/media/a.jpg",
+                        tweet_id="1",
+                        created_at=datetime(2026, 1, 1),
+                        media_type=MediaType.IMAGE,
+                    )
+                )
+                self.assertEqual(result.status, DownloadStatus.SUCCESS)
+                self.assertFalse(old.exists())
+                _write(old, b"same")
+                self.assertIsNone(index.lookup(old))
+
+    def test_corrupt_database_is_rebuilt(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            (root / INDEX_FILENAME).write_bytes(b"this is not a sqlite database" * 100)
+            f = _write(root / "images" / "a.jpg", b"x")
+
+            with FileHashIndex.for_account(root) as index:
+                self.assertEqual(index.hash_file(f), compute_bytes_hash(b"x"))
+            with FileHashIndex.for_account(root) as index:
+                self.assertEqual(index.lookup(f), compute_bytes_hash(b"x"))
+
+    def test_index_file_is_not_scanned_as_media(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            storage = AccountStorageManager(Path(tmpdir))
+            paths = storage.ensure_account_dirs("alice")
+            with FileHashIndex.for_account(paths.root):
+                pass
+            self.assertTrue((paths.root / INDEX_FILENAME).exists())
+            self.assertFalse(storage.has_existing_files("alice"))
+
+
+
+class TestKnownMediaPreCheck(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.storage = AccountStorageManager(Path(self._tmp.name))
+        self.paths = self.storage.ensure_account_dirs("alice")
+        self.requested: list[str] = []
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def _downloader(self, index: FileHashIndex, *, ignore_replace: bool = False) -> MediaDownloader:
+        def download(url: str) -> bytes:
+            self.requested.append(url)
+            return b"body:" + url.rsplit("/", 1)[-1].encode()
+
+        downloader = MediaDownloader(
+            storage=self.storage,
+            handle="alice",
+            download_func=download,
+            ignore_replace=ignore_replace,
+            hash_index=index,
+        )
+        if ignore_replace:
+            downloader.load_existing_files_for_replace()
+        else:
+            downloader.load_existing_files()
+        return downloader
+
+    def test_known_url_is_skipped_without_request(self) -> None:
+        url = "https://pbs.twimg.com/media/a.jpg"
+        with FileHashIndex.for_account(self.paths.root) as index:
+            first = self._downloader(index).download(media_intent(url, MediaType.IMAGE))
+            self.assertEqual(first.status, DownloadStatus.SUCCESS)
+
+        with FileHashIndex.for_account(self.paths.root) as index:
+            downloader = self._downloader(index)
+            result = downloader.download(media_intent(url, MediaType.IMAGE))
+
+        self.assertEqual(self.requested, [url])
+        self.assertEqual(result.status, DownloadStatus.SKIPPED_DUPLICATE)
+        self.assertEqual(result.existing_file, first.file_path)
+        self.assertEqual(downloader.stats.skipped_without_fetch, 1)
+        self.assertEqual(downloader.stats.skipped_duplicate, 1)
+
+    def test_duplicate_url_is_mapped_to_the_winning_file(self) -> None:
+        with FileHashIndex.for_account(self.paths.root) as index:
+            downloader = self._downloader(index)
+            downloader.download(media_intent("https://pbs.twimg.com/media/a.jpg", MediaType.IMAGE, tweet_id="2"))
+            # Different URL, same bytes (download() derives the body from the file name).
+            dup = downloader.download(media_intent("https://video.twimg.com/other/a.jpg", MediaType.IMAGE, tweet_id="1"))
+            self.assertEqual(dup.status, DownloadStatus.SKIPPED_DUPLICATE)
+
+            known = index.lookup_media("https://video.twimg.com/other/a.jpg")
+            self.assertIsNotNone(known)
+            self.assertEqual(known[0], dup.existing_file)
+
+    def test_changed_or_missing_file_is_fetched_again(self) -> None:
+        url = "https://pbs.twimg.com/media/a.jpg"
+        with FileHashIndex.for_account(self.paths.root) as index:
+            first = self._downloader(index).download(media_intent(url, MediaType.IMAGE))
+            first.file_path.unlink()
+
+            again = self._downloader(index).download(media_intent(url, MediaType.IMAGE))
+            self.assertEqual(again.status, DownloadStatus.SUCCESS)
+            self.assertEqual(self.requested, [url, url])
+
+    def test_ignore_replace_still_fetches_known_urls(self) -> None:
+        url = "https://pbs.twimg.com/media/a.jpg"
+        with FileHashIndex.for_account(self.paths.root) as index:
+            self._downloader(index).download(media_intent(url, MediaType.IMAGE))
+            result = self._downloader(index, ignore_replace=True).download(media_intent(url, MediaType.IMAGE))
+
+        self.assertEqual(self.requested, [url, url])
+        self.assertEqual(result.status, DownloadStatus.SUCCESS)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,260 @@
+import asyncio
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from src.backend.downloader.async_downloader import AsyncMediaDownloader
+from src.backend.downloader.downloader import DownloadStatus, MediaDownloader, MediaSink
+from src.backend.fs.hashing import compute_bytes_hash
+from src.backend.fs.naming import parse_media_filename
+from src.backend.fs.storage import AccountStorageManager
+from src.backend.net.retry import RetryConfig
+from src.backend.pipeline.account_runner import _make_async_stream_download_func
+
+from tests.downloader.helpers import hidden_files, media_intent
+
+
+class _MediaHandler(BaseHTTPRequestHandler):
+    body = b""
+    fail_first = 0
+    requests = 0
+
+    def do_GET(self) -> None:  # noqa: N802
+        cls = type(self)
+        cls.requests += 1
+        if self.path.endswith("/missing.mp4"):
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if cls.requests <= cls.fail_first:
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "video/mp4")
+        self.send_header("Content-Length", str(len(cls.body)))
+        self.end_headers()
+        self.wfile.write(cls.body)
+
+    def log_message(self, format, *args):  # noqa: A002, ANN001
+        return
+
+
+class _RangeHandler(BaseHTTPRequestHandler):
+    """Serves `body` with Range support; the first response is cut off after `cut_at` bytes."""
+
+    body = b""
+    cut_at = 0
+    etag = '"v1"'
+    honor_range = True
+    requests: list[dict[str, str]] = []
+    bytes_sent = 0
+
+    def do_GET(self) -> None:  # noqa: N802
+        cls = type(self)
+        cls.requests.append({k: v for k, v in self.headers.items()})
+        body = cls.body
+        start = 0
+        range_header = self.headers.get("Range")
+        if cls.honor_range and range_header and self.headers.get("If-Range") == cls.etag:
+            start = int(range_header.split("=", 1)[1].split("-", 1)[0])
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(body) - 1}/{len(body)}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Type", "video/mp4")
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("ETag", cls.etag)
+        self.send_header("Content-Length", str(len(body) - start))
+        self.end_headers()
+
+        payload = body[start:]
+        if len(cls.requests) == 1 and cls.cut_at:
+            payload = payload[: cls.cut_at]
+            self.close_connection = True
+        self.wfile.write(payload)
+        cls.bytes_sent += len(payload)
+
+    def log_message(self, format, *args):  # noqa: A002, ANN001
+        return
+
+
+class TestStreamingDownloader(unittest.TestCase):
+    def test_chunks_are_written_and_hashed_without_buffering(self) -> None:
+        chunks = [b"a" * 1000, b"b" * 1000, b"c" * 10]
+        content = b"".join(chunks)
+
+        def stream(url: str, sink: MediaSink) -> None:
+            for chunk in chunks:
+                sink.write(chunk)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            downloader = MediaDownloader(
+                storage=AccountStorageManager(Path(tmpdir)),
+                handle="alice",
+                stream_download_func=stream,
+            )
+            result = downloader.download(media_intent("https://video.twimg.com/v.mp4"))
+
+            self.assertEqual(result.status, DownloadStatus.SUCCESS)
+            self.assertEqual(result.file_path.read_bytes(), content)
+            self.assertEqual(result.content_hash, compute_bytes_hash(content))
+            parsed = parse_media_filename(result.file_path.name)
+            self.assertEqual(parsed.hash6, compute_bytes_hash(content)[:6])
+            self.assertEqual(downloader.stats.total_bytes, len(content))
+            self.assertEqual(hidden_files(result.file_path.parent), [])
+
+    def test_reset_discards_partial_attempt(self) -> None:
+        def stream(url: str, sink: MediaSink) -> None:
+            sink.write(b"partial garbage")
+            sink.reset()
+            sink.write(b"real body")
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            downloader = MediaDownloader(
+                storage=AccountStorageManager(Path(tmpdir)),
+                handle="alice",
+                stream_download_func=stream,
+            )
+            result = downloader.download(media_intent("https://video.twimg.com/v.mp4"))
+            self.assertEqual(result.file_path.read_bytes(), b"real body")
+            self.assertEqual(result.content_hash, compute_bytes_hash(b"real body"))
+
+    def test_failed_stream_leaves_no_temp_file(self) -> None:
+        def stream(url: str, sink: MediaSink) -> None:
+            sink.write(b"x" * 100)
+            raise ConnectionResetError("peer reset")
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            downloader = MediaDownloader(
+                storage=AccountStorageManager(Path(tmpdir)),
+                handle="alice",
+                stream_download_func=stream,
+            )
+            result = downloader.download(media_intent("https://video.twimg.com/v.mp4"))
+            self.assertEqual(result.status, DownloadStatus.FAILED)
+            self.assertIn("peer reset", result.error)
+            self.assertEqual(downloader.stats.failed, 1)
+            self.assertEqual(list((Path(tmpdir) / "alice" / "videos").iterdir()), [])
+
+    def test_requires_a_download_function(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with self.assertRaises(ValueError):
+                MediaDownloader(storage=AccountStorageManager(Path(tmpdir)), handle="alice")
+
+
+class TestStreamDownloadFunc(unittest.TestCase):
+    def setUp(self) -> None:
+        _MediaHandler.body = bytes(range(256)) * 4096  # 1 MiB
+        _MediaHandler.fail_first = 0
+        _MediaHandler.requests = 0
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _MediaHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def tearDown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_streams_body_to_disk_and_retries_from_zero(self) -> None:
+        _MediaHandler.fail_first = 1
+        stream = _make_async_stream_download_func(
+            retry_config=RetryConfig(max_retries=2, base_delay_s=0.01, jitter_factor=0.0),
+        )
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            downloader = AsyncMediaDownloader(
+                storage=AccountStorageManager(Path(tmpdir)),
+                handle="alice",
+                stream_download_func=stream,
+            )
+            result = asyncio.run(downloader.download_async(media_intent(f"{self.base_url}/media/v.mp4")))
+
+            self.assertEqual(result.status, DownloadStatus.SUCCESS, result.error)
+            self.assertEqual(_MediaHandler.requests, 2)
+            self.assertEqual(result.file_path.read_bytes(), _MediaHandler.body)
+            self.assertEqual(result.content_hash, compute_bytes_hash(_MediaHandler.body))
+
+    def test_client_error_fails_without_retry(self) -> None:
+        stream = _make_async_stream_download_func(
+            retry_config=RetryConfig(max_retries=2, base_delay_s=0.01, jitter_factor=0.0),
+        )
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            downloader = AsyncMediaDownloader(
+                storage=AccountStorageManager(Path(tmpdir)),
+                handle="alice",
+                stream_download_func=stream,
+            )
+            result = asyncio.run(downloader.download_async(media_intent(f"{self.base_url}/missing.mp4")))
+
+        self.assertEqual(result.status, DownloadStatus.FAILED)
+        self.assertIn("HTTP Error 404", result.error)
+        self.assertEqual(_MediaHandler.requests, 1)
+
+
+class TestStreamDownloadResume(unittest.TestCase):
+    def setUp(self) -> None:
+        _RangeHandler.body = bytes(range(256)) * 4096  # 1 MiB
+        _RangeHandler.cut_at = 300 * 1024
+        _RangeHandler.etag = '"v1"'
+        _RangeHandler.honor_range = True
+        _RangeHandler.requests = []
+        _RangeHandler.bytes_sent = 0
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _RangeHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/media/v.mp4"
+
+    def tearDown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _download(self):
+        stream = _make_async_stream_download_func(
+            retry_config=RetryConfig(max_retries=2, base_delay_s=0.01, jitter_factor=0.0),
+        )
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        downloader = AsyncMediaDownloader(
+            storage=AccountStorageManager(Path(tmp.name)),
+            handle="alice",
+            stream_download_func=stream,
+        )
+        result = asyncio.run(downloader.download_async(media_intent(self.url)))
+        self.assertEqual(result.status, DownloadStatus.SUCCESS, result.error)
+        self.assertEqual(result.file_path.read_bytes(), _RangeHandler.body)
+        self.assertEqual(result.content_hash, compute_bytes_hash(_RangeHandler.body))
+        self.assertEqual(hidden_files(result.file_path.parent), [])
+        return result
+
+    def test_interrupted_body_resumes_with_range(self) -> None:
+        self._download()
+
+        self.assertEqual(len(_RangeHandler.requests), 2)
+        self.assertNotIn("Range", _RangeHandler.requests[0])
+        self.assertEqual(_RangeHandler.requests[1]["Range"], f"bytes={_RangeHandler.cut_at}-")
+        self.assertEqual(_RangeHandler.requests[1]["If-Range"], '"v1"')
+        self.assertEqual(_RangeHandler.bytes_sent, len(_RangeHandler.body))
+
+    def test_server_ignoring_range_restarts_from_zero(self) -> None:
+        _RangeHandler.honor_range = False
+        self._download()
+
+        self.assertEqual(len(_RangeHandler.requests), 2)
+        self.assertEqual(_RangeHandler.bytes_sent, _RangeHandler.cut_at + len(_RangeHandler.body))
+
+    def test_weak_etag_is_not_used_for_resume(self) -> None:
+        _RangeHandler.etag = 'W/"v1"'
+        self._download()
+
+        self.assertNotIn("Range", _RangeHandler.requests[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
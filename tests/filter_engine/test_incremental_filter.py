@@ -0,0 +1,67 @@
+import json
+import unittest
+from datetime import datetime, timezone
+from pathlib import Path
+
+from src.shared.filter_engine import FilterConfig, IncrementalFilter, MediaCandidate, MediaKind, Tweet, apply_filters
+
+
+def _load_fixtures() -> list[tuple[str, FilterConfig, list[Tweet]]]:
+    repo_root = Path(__file__).resolve().parents[2]
+    fixture_dir = repo_root / "artifacts" / "fixtures" / "tweets"
+    out = []
+    for fixture_path in sorted(fixture_dir.glob("*.json")):
+        fixture = json.loads(fixture_path.read_text(encoding="utf-8"))
+        config = FilterConfig.from_dict(fixture["config"])
+        tweets = [Tweet.from_dict(t) for t in fixture["tweets"]]
+        out.append((fixture_path.name, config, tweets))
+    return out
+
+
+def _run_incremental(tweets: list[Tweet], config: FilterConfig, page_size: int) -> tuple:
+    stage = IncrementalFilter(config)
+    out = []
+    for i in range(0, len(tweets), page_size):
+        out.extend(stage.push(tweets[i:i + page_size]))
+    out.extend(stage.finish())
+    return tuple(out), stage.filtered_counts
+
+
+class TestIncrementalFilter(unittest.TestCase):
+    def test_matches_batch_output_for_fixtures_in_any_page_size(self) -> None:
+        for name, config, tweets in _load_fixtures():
+            # UserMedia order: newest first.
+            timeline = sorted(tweets, key=lambda t: t.created_at, reverse=True)
+            expected = apply_filters(tweets, config)
+            for page_size in (1, 2, 3, len(timeline) or 1):
+                with self.subTest(fixture=name, page_size=page_size):
+                    intents, counts = _run_incremental(timeline, config, page_size)
+                    self.assertEqual(intents, expected.intents)
+                    self.assertEqual(counts, expected.filtered_counts)
+
+    def test_emits_newer_pages_early_and_holds_watermark_ties(self) -> None:
+        def tweet(tweet_id: str, second: int) -> Tweet:
+            return Tweet(
+                tweet_id=tweet_id,
+                created_at=datetime(2026, 1, 13, 12, 0, second, tzinfo=timezone.utc),
+                media=(MediaCandidate(media_id=f"m{tweet_id}", kind=MediaKind.IMAGE, url=f"u{tweet_id}"),),
+            )
+
+        stage = IncrementalFilter(FilterConfig())
+        first = stage.push([tweet("30", 30), tweet("20", 20)])
+        self.assertEqual([it.tweet_id for it in first], ["30"], "与 watermark 同一时刻的意图应暂缓输出")
+        self.assertEqual(stage.pending_count, 1)
+
+        # Same second as the watermark, smaller ID: must still come first in the global order.
+        second = stage.push([tweet("19", 20), tweet("10", 10)])
+        self.assertEqual([it.tweet_id for it in second], ["19", "20"])
+        self.assertEqual([it.tweet_id for it in stage.finish()], ["10"])
+
+    def test_invalid_date_range_is_rejected_up_front(self) -> None:
+        config = FilterConfig.from_dict({"start_date": "2026-02-01", "end_date": "2026-01-01"})
+        with self.assertRaises(ValueError):
+            IncrementalFilter(config)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+import json
+import random
+import unittest
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+from src.shared.filter_engine import (
+    FilterConfig,
+    MediaCandidate,
+    MediaKind,
+    MediaTypeFilter,
+    Tweet,
+    TweetBatch,
+    TweetSourceType,
+    VideoVariant,
+    apply_filters,
+)
+
+
+def _load_fixtures() -> list[dict]:
+    fixture_dir = Path(__file__).resolve().parents[2] / "artifacts" / "fixtures" / "tweets"
+    return [json.loads(p.read_text(encoding="utf-8")) for p in sorted(fixture_dir.glob("*.json"))]
+
+
+class TestTweetBatch(unittest.TestCase):
+    def test_round_trip_and_filtering_match_fixtures(self) -> None:
+        for fixture in _load_fixtures():
+            with self.subTest(fixture=fixture["id"]):
+                tweets = [Tweet.from_dict(t) for t in fixture["tweets"]]
+                batch = TweetBatch.from_tweets(tweets)
+
+                self.assertEqual(list(batch), tweets)
+                config = FilterConfig.from_dict(fixture["config"])
+                self.assertEqual(apply_filters(batch, config).to_dict(), fixture["expected"])
+
+    def test_ids_urls_and_sizes_are_restored_exactly(self) -> None:
+        created_at = datetime(2026, 1, 13, 12, 0, 0, 123456, tzinfo=timezone.utc)
+        tweets = [
+            Tweet(
+                tweet_id="1879000000000000001",
+                created_at=created_at,
+                is_retweet=True,
+                media=(
+                    MediaCandidate("3_1879", MediaKind.IMAGE, "https://pbs.twimg.com/media/a.jpg?name=orig", 1200, 800),
+                    MediaCandidate(
+                        "1879000000000000002",
+                        MediaKind.VIDEO,
+                        "https://video.twimg.com/v/b.mp4",
+                        variants=(
+                            VideoVariant("https://video.twimg.com/v/vid/avc1/640x360/a.mp4", 832000, 640, 360),
+                            VideoVariant("https://video.twimg.com/v/b.mp4", 2176000),
+                        ),
+                    ),
+                ),
+            ),
+            Tweet(
+                tweet_id="0042",  # not canonical: kept as a string
+                created_at=created_at,
+                media=(MediaCandidate("99999999999999999999", MediaKind.IMAGE, "https://pbs.twimg.com/media/c.jpg"),),
+            ),
+        ]
+        batch = TweetBatch()
+        batch.extend(tweets)
+
+        self.assertEqual(len(batch), 2)
+        self.assertEqual(batch[0], tweets[0])
+        self.assertEqual(batch[-1:], tweets[1:])
+        self.assertEqual(batch._url_prefixes, ["https://pbs.twimg.com/media/", "https://video.twimg.com/v/"])
+
+    def test_naive_datetimes_are_read_as_utc(self) -> None:
+        batch = TweetBatch.from_tweets([Tweet(tweet_id="1", created_at=datetime(2026, 1, 13, 12, 0, 0))])
+        self.assertEqual(batch[0].created_at, datetime(2026, 1, 13, 12, 0, 0, tzinfo=timezone.utc))
+
+
+def _random_timeline(rng: random.Random, count: int) -> list[Tweet]:
+    def media(n: int, prefix: str) -> tuple[MediaCandidate, ...]:
+        out = []
+        for i in range(n):
+            sized = rng.random() < 0.7
+            kind = rng.choice((MediaKind.IMAGE, MediaKind.VIDEO))
+            variants: tuple[VideoVariant, ...] = ()
+            if kind == MediaKind.VIDEO and rng.random() < 0.6:
+                variants = tuple(
+                    VideoVariant(
+                        url=f"https://video.twimg.com/vid/{w}x{h}/{prefix}{i}.mp4",
+                        bitrate=rng.choice((None, 256000, 832000, 2176000)),
+                        width=w,
+                        height=h,
+                    )
+                    for w, h in rng.sample(((480, 270), (640, 360), (1280, 720), (720, 1280)), rng.randint(2, 3))
+                )
+            out.append(
+                MediaCandidate(
+                    media_id=f"{prefix}{i}",
+                    kind=kind,
+                    url=f"https://pbs.twimg.com/media/{prefix}{i}.jpg",
+                    width=(rng.choice((320, 720, 1080)) if sized else None),
+                    height=(rng.choice((240, 720, 1920)) if sized else None),
+                    variants=variants,
+                )
+            )
+        return tuple(out)
+
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    tweets = []
+    for n in range(count):
+        # Coarse timestamps so ties (and the ID tie-breaks) are common.
+        created_at = start + timedelta(hours=rng.randint(0, 24 * 10))
+        quoted = None
+        if rng.random() < 0.3:
+            quoted = Tweet(tweet_id=f"q{n}", created_at=created_at - timedelta(days=1), media=media(rng.randint(0, 2), f"qm{n}_"))
+        tweets.append(
+            Tweet(
+                tweet_id=str(rng.randint(1, 10**6)),
+                created_at=created_at,
+                is_reply=rng.random() < 0.3,
+                is_retweet=rng.random() < 0.2,
+                quoted_tweet=quoted,
+                media=media(rng.randint(0, 3), f"m{n}_"),
+            )
+        )
+    return tweets
+
+
+class TestBatchFiltering(unittest.TestCase):
+    def test_batch_filters_like_the_tweet_list_on_random_timelines(self) -> None:
+        rng = random.Random(20260113)
+        configs = [
+            FilterConfig(),
+            FilterConfig(start_date=date(2026, 1, 3), end_date=date(2026, 1, 5), media_type=MediaTypeFilter.IMAGES),
+            FilterConfig(end_date=date(2026, 1, 2), media_type=MediaTypeFilter.VIDEOS, min_short_side=700),
+            FilterConfig(
+                source_types=frozenset((TweetSourceType.REPLY, TweetSourceType.QUOTE)),
+                include_quote_media_in_reply=True,
+                min_short_side=500,
+            ),
+            FilterConfig(max_video_short_side=720, min_short_side=400),
+            FilterConfig(max_video_bitrate=900000, media_type=MediaTypeFilter.VIDEOS),
+        ]
+        for seed in range(5):
+            tweets = _random_timeline(rng, 200)
+            batch = TweetBatch.from_tweets(tweets)
+            for config in configs:
+                with self.subTest(seed=seed, config=config):
+                    self.assertEqual(apply_filters(batch, config), apply_filters(tweets, config))
+
+    def test_invalid_date_range_is_rejected(self) -> None:
+        with self.assertRaises(ValueError):
+            apply_filters(TweetBatch(), FilterConfig(start_date=date(2026, 1, 2), end_date=date(2026, 1, 1)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+"""
+Tests for src/backend/net/governor.py
+
+Covers:
+- Token bucket spacing and unlimited mode
+- Round-robin fairness between handles
+- Cancelled waiters, live config changes
+- RateLimitConfig persistence
+"""
+
+import asyncio
+import time
+import unittest
+
+from src.backend.net.governor import FairRateLimiter, RateGovernor, RateLimitConfig
+
+
+class TestFairRateLimiter(unittest.TestCase):
+    """Tests for FairRateLimiter."""
+
+    def test_requests_are_spaced_by_rate(self):
+        """With burst 1, grants are 1/rate apart."""
+
+        async def main():
+            limiter = FairRateLimiter(50.0, burst=1)
+            start = time.monotonic()
+            for _ in range(6):
+                await limiter.acquire("a")
+            return time.monotonic() - start
+
+        self.assertGreaterEqual(asyncio.run(main()), 5 / 50 - 0.01)
+
+    def test_zero_rate_is_unlimited(self):
+        """rate=0 never waits."""
+
+        async def main():
+            limiter = FairRateLimiter(0)
+            start = time.monotonic()
+            for _ in range(100):
+                await limiter.acquire("a", 10_000)
+            return time.monotonic() - start
+
+        self.assertLess(asyncio.run(main()), 0.05)
+
+    def test_waiters_are_granted_round_robin_by_key(self):
+        """A key with many queued requests does not starve another key."""
+        order = []
+
+        async def main():
+            limiter = FairRateLimiter(200.0, burst=1)
+
+            async def request(key):
+                await limiter.acquire(key)
+                order.append(key)
+
+            await asyncio.gather(*[request("busy") for _ in range(6)], *[request("quiet") for _ in range(2)])
+
+        asyncio.run(main())
+        self.assertEqual(order[:4], ["busy", "quiet", "busy", "quiet"])
+        self.assertEqual(order.count("busy"), 6)
+
+    def test_amount_larger_than_burst_delays_next_grant(self):
+        """Large amounts are granted, then paid back before the next grant."""
+
+        async def main():
+            limiter = FairRateLimiter(10_000.0, burst=100)
+            await limiter.acquire("a", 1000)  # granted with a full bucket, 900 tokens in debt
+            start = time.monotonic()
+            await limiter.acquire("a", 1)
+            return time.monotonic() - start
+
+        self.assertGreaterEqual(asyncio.run(main()), 0.08)
+
+    def test_cancelled_waiter_is_skipped(self):
+        """A cancelled acquire() does not consume a grant."""
+
+        async def main():
+            limiter = FairRateLimiter(20.0, burst=1)
+            await limiter.acquire("a")  # use the initial token
+            waiter = asyncio.ensure_future(limiter.acquire("a"))
+            await asyncio.sleep(0)
+            waiter.cancel()
+            start = time.monotonic()
+            await limiter.acquire("b")
+            return time.monotonic() - start, limiter.waiting
+
+        elapsed, waiting = asyncio.run(main())
+        self.assertLess(elapsed, 0.09)
+        self.assertEqual(waiting, 0)
+
+
+class TestRateGovernor(unittest.TestCase):
+    """Tests for RateGovernor."""
+
+    def test_disabling_releases_waiters(self):
+        """apply_config(enabled=False) lifts the caps for queued requests too."""
+
+        async def main():
+            governor = RateGovernor(RateLimitConfig(api_requests_per_s=0.01))
+            gate = governor.gate("alice")
+            await gate.api_request()
+            waiter = asyncio.ensure_future(gate.api_request())
+            await asyncio.sleep(0.05)
+            self.assertFalse(waiter.done())
+            governor.apply_config(RateLimitConfig(enabled=False))
+            await asyncio.wait_for(waiter, 1.0)
+
+        asyncio.run(main())
+
+    def test_lanes_are_independent(self):
+        """A saturated API lane does not hold back media requests."""
+
+        async def main():
+            governor = RateGovernor(RateLimitConfig(api_requests_per_s=0.01, media_requests_per_s=0))
+            gate = governor.gate("alice")
+            await gate.api_request()
+            api_waiter = asyncio.ensure_future(gate.api_request())
+            await asyncio.wait_for(gate.media_request(), 0.5)
+            await asyncio.wait_for(gate.media_bytes(10_000_000), 0.5)
+            api_waiter.cancel()
+
+        asyncio.run(main())
+
+
+class TestRateLimitConfig(unittest.TestCase):
+    """Tests for RateLimitConfig."""
+
+    def test_roundtrip(self):
+        config = RateLimitConfig(api_requests_per_s=0.5, media_requests_per_s=4, media_bytes_per_s=1e6, enabled=False)
+        self.assertEqual(RateLimitConfig.from_persist_dict(config.to_persist_dict()), config)
+
+    def test_invalid_values_fall_back_to_defaults(self):
+        config = RateLimitConfig.from_persist_dict({"api_requests_per_s": "fast", "media_bytes_per_s": -5})
+        self.assertEqual(config.api_requests_per_s, RateLimitConfig().api_requests_per_s)
+        self.assertEqual(config.media_bytes_per_s, 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
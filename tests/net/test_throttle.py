@@ -5,6 +5,7 @@ Covers:
 - Throttle with configurable min_interval and jitter
 - Sync and async wait methods
 - Disabled throttle behavior
+- Adaptive (AIMD) mode driven by 429s and rate-limit headers
 """
 
 import time
@@ -147,5 +148,81 @@ class TestThrottleAsync(unittest.TestCase):
         self.assertGreaterEqual(elapsed, 0.09)
 
 
+class TestAdaptiveThrottle(unittest.TestCase):
+    """Tests for adaptive mode (record_response)."""
+
+    def _throttle(self, **kwargs):
+        config = ThrottleConfig(min_interval_s=1.0, jitter_max_s=0.0, adaptive=True, **kwargs)
+        return Throttle(config)
+
+    def test_healthy_responses_shrink_interval_to_floor(self):
+        """Each 2xx shrinks the interval additively, down to the floor."""
+        throttle = self._throttle(adaptive_floor_s=0.5)
+
+        throttle.record_response(200, {})
+        self.assertAlmostEqual(throttle.current_interval, 0.95)
+        for _ in range(50):
+            throttle.record_response(200, {})
+        self.assertAlmostEqual(throttle.current_interval, 0.5)
+
+    def test_429_doubles_interval_up_to_ceiling(self):
+        """A 429 backs off multiplicatively, capped at the ceiling."""
+        throttle = self._throttle(adaptive_ceiling_s=3.0)
+
+        throttle.record_response(429, {})
+        self.assertAlmostEqual(throttle.current_interval, 2.0)
+        throttle.record_response(429, {})
+        self.assertAlmostEqual(throttle.current_interval, 3.0)
+
+    def test_remaining_budget_sets_minimum_interval(self):
+        """x-rate-limit-remaining/reset keep the pace within the window budget."""
+        throttle = self._throttle()
+        headers = {
+            "x-rate-limit-remaining": "10",
+            "x-rate-limit-reset": str(int(time.time()) + 30),
+        }
+
+        throttle.record_response(200, headers)
+
+        self.assertGreaterEqual(throttle.current_interval, 2.8)
+        self.assertLessEqual(throttle.current_interval, 3.0)
+
+    def test_exhausted_budget_pauses_until_reset(self):
+        """remaining=0 delays the next request until the reset time."""
+        throttle = self._throttle(adaptive_floor_s=0.0)
+        throttle.wait()
+        throttle.record_response(200, {
+            "x-rate-limit-remaining": "0",
+            "x-rate-limit-reset": str(int(time.time()) + 2),
+        })
+
+        self.assertGreater(throttle._compute_delay(), 0.9)
+
+    def test_retry_after_pauses(self):
+        """Retry-After on a 429 pauses requests for that long."""
+        throttle = self._throttle()
+        throttle.record_response(429, {"Retry-After": "5"})
+
+        self.assertGreater(throttle._compute_delay(), 4.0)
+
+    def test_feedback_ignored_when_not_adaptive(self):
+        """Fixed mode keeps min_interval_s regardless of responses."""
+        throttle = Throttle(ThrottleConfig(min_interval_s=1.0, jitter_max_s=0.0))
+
+        throttle.record_response(429, {"Retry-After": "5"})
+
+        self.assertEqual(throttle.current_interval, 1.0)
+        self.assertLess(throttle._compute_delay(), 0.01)
+
+    def test_adaptive_config_roundtrip(self):
+        """Adaptive fields persist; ceiling is never below floor."""
+        config = ThrottleConfig(adaptive=True, adaptive_floor_s=0.3, adaptive_ceiling_s=30.0)
+        self.assertEqual(ThrottleConfig.from_persist_dict(config.to_persist_dict()), config)
+
+        clipped = ThrottleConfig.from_persist_dict({"adaptive_floor_s": 5.0, "adaptive_ceiling_s": 1.0})
+        self.assertEqual(clipped.adaptive_ceiling_s, 5.0)
+        self.assertFalse(clipped.adaptive)
+
+
 if __name__ == "__main__":
     unittest.main()
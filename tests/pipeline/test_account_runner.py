@@ -1,21 +1,50 @@
 import unittest
 import asyncio
-from datetime import datetime
+from dataclasses import replace
+from datetime import datetime, timedelta
 from pathlib import Path
 import tempfile
-from types import SimpleNamespace
+import time
 from unittest.mock import patch
 
-from src.backend.downloader.downloader import DownloadResult, DownloadStatus
-from src.backend.fs.storage import MediaType
-from src.backend.pipeline.account_runner import _to_media_intent, run_account_pipeline
+from src.backend.downloader.async_downloader import AsyncMediaDownloader
+from src.backend.downloader.downloader import DownloadStatus, FetchedMedia, MediaIntent
+from src.backend.fs.storage import AccountStorageManager, MediaType
+from src.backend.pipeline.account_runner import (
+    _build_filter_config,
+    _download_in_order,
+    _prefetch,
+    _to_media_intent,
+    run_account_pipeline,
+)
+from src.backend.pipeline.resume_cursor import MAX_RESUME_FAILURES, ResumeCursorStore
+from src.backend.pipeline.sync_checkpoint import SyncCheckpointStore, filter_fingerprint
+from src.backend.pipeline.timeline_cache import TimelineCacheStore
 from src.backend.scheduler.models import Run
+from src.backend.scraper.twscrape_scraper import ScrapePage
+from src.backend.net.throttle import ThrottleConfig
 from src.backend.settings.models import Credentials, GlobalSettings
 from src.backend.settings.store import SettingsStore
-from src.shared.filter_engine.models import DownloadIntent, MediaKind
+from src.shared.filter_engine.models import DownloadIntent, MediaCandidate, MediaKind, Tweet
 from src.shared.task_status import TaskStatus
 
 
+def _media_tweet(tweet_id: int) -> Tweet:
+    return Tweet(
+        tweet_id=str(tweet_id),
+        created_at=datetime(2026, 1, 13, 12, 0, 0) + timedelta(seconds=tweet_id),
+        media=(
+            MediaCandidate(
+                media_id=f"m{tweet_id}",
+                kind=MediaKind.IMAGE,
+                url=f"https://pbs.twimg.com/media/{tweet_id}.jpg",
+                width=None,
+                height=None,
+            ),
+        ),
+    )
+
+
 class TestAccountRunnerIntentMapping(unittest.TestCase):
     def test_to_media_intent_preserves_width_height_and_post_check_flag(self) -> None:
         intent = DownloadIntent(
@@ -41,6 +70,19 @@ class TestAccountRunnerIntentMapping(unittest.TestCase):
         self.assertIsNone(media_intent.height)
         self.assertTrue(media_intent.needs_post_min_short_side_check)
 
+    def test_video_caps_are_read_from_account_config(self) -> None:
+        config = _build_filter_config({"minShortSide": 480, "maxVideoShortSide": 720, "maxVideoBitrateKbps": 1000})
+        self.assertEqual(config.max_video_short_side, 720)
+        self.assertEqual(config.max_video_bitrate, 1_000_000)
+
+        unset = _build_filter_config({"minShortSide": 480, "maxVideoShortSide": None, "maxVideoBitrateKbps": 0})
+        self.assertIsNone(unset.max_video_short_side)
+        self.assertIsNone(unset.max_video_bitrate)
+
+        # Unset caps leave the checkpoint fingerprint of older configs unchanged.
+        self.assertEqual(filter_fingerprint(unset), filter_fingerprint(_build_filter_config({"minShortSide": 480})))
+        self.assertNotEqual(filter_fingerprint(config), filter_fingerprint(unset))
+
 
 class TestAccountRunnerDownloadFailurePropagation(unittest.TestCase):
     def test_run_account_pipeline_raises_when_downloads_fail(self) -> None:
@@ -65,55 +107,23 @@ class TestAccountRunnerDownloadFailurePropagation(unittest.TestCase):
                 updated_at=datetime(2026, 1, 13, 12, 0, 0),
             )
 
-            filter_result = SimpleNamespace(
-                intents=[
-                    DownloadIntent(
-                        media_id="m1",
-                        kind=MediaKind.IMAGE,
-                        url="https://example.com/a.jpg",
-                        width=None,
-                        height=None,
-                        tweet_id="t1",
-                        tweet_created_at=datetime(2026, 1, 13, 12, 0, 0),
-                        trigger_tweet_id="t1",
-                        trigger_created_at=datetime(2026, 1, 13, 12, 0, 0),
-                        origin="self",
-                        needs_post_min_short_side_check=False,
-                    )
-                ]
-            )
-
-            async def fake_collect_tweets(self, *, handle: str, max_pages=None):  # noqa: ANN001
-                return []
+            async def fake_iter_pages(self, *, handle: str, max_pages=None, stop_at_tweet_id=None, start_cursor=None):  # noqa: ANN001
+                yield ScrapePage(tweets=(_media_tweet(1),))
 
-            def fake_apply_filters(tweets, config):  # noqa: ANN001
-                return filter_result
-
-            def fake_download(self, intent):  # noqa: ANN001
-                return DownloadResult(
-                    status=DownloadStatus.FAILED,
-                    media_url=intent.url,
-                    tweet_id=intent.tweet_id,
-                    created_at=intent.created_at,
-                    media_type=intent.media_type,
-                    error="boom",
-                )
+            async def fake_fetch(self, intent):  # noqa: ANN001
+                return FetchedMedia(intent=intent, error="boom")
 
             async def fake_to_thread(func, /, *args, **kwargs):  # noqa: ANN001
                 return func(*args, **kwargs)
 
             with (
                 patch(
-                    "src.backend.pipeline.account_runner.TwscrapeMediaScraper.collect_tweets",
-                    new=fake_collect_tweets,
-                ),
-                patch(
-                    "src.backend.pipeline.account_runner.apply_filters",
-                    new=fake_apply_filters,
+                    "src.backend.pipeline.account_runner.TwscrapeMediaScraper.iter_user_media_pages",
+                    new=fake_iter_pages,
                 ),
                 patch(
-                    "src.backend.pipeline.account_runner.MediaDownloader.download",
-                    new=fake_download,
+                    "src.backend.pipeline.account_runner.AsyncMediaDownloader.fetch_async",
+                    new=fake_fetch,
                 ),
                 patch(
                     "src.backend.pipeline.account_runner.asyncio.to_thread",
@@ -124,5 +134,513 @@ class TestAccountRunnerDownloadFailurePropagation(unittest.TestCase):
                     asyncio.run(run_account_pipeline(run=run, store=store))
 
 
+class TestAccountRunnerOrderedWorkerPool(unittest.TestCase):
+    def test_concurrent_fetch_commits_in_filter_engine_order(self) -> None:
+        # Same content for both intents; the first one is slow, so it finishes fetching last.
+        delays = {"https://example.com/slow.jpg": 0.2, "https://example.com/fast.jpg": 0.0}
+        in_flight = 0
+        max_in_flight = 0
+
+        async def stream(url: str, sink) -> None:  # noqa: ANN001
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(delays.get(url, 0.05))
+            in_flight -= 1
+            await sink.write(b"same-bytes" if url in delays else url.encode())
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            downloader = AsyncMediaDownloader(
+                storage=AccountStorageManager(Path(tmpdir)),
+                handle="alice",
+                stream_download_func=stream,
+            )
+            intents = [
+                MediaIntent(
+                    url="https://example.com/slow.jpg",
+                    tweet_id="200",
+                    created_at=datetime(2026, 1, 13, 12, 0, 0),
+                    media_type=MediaType.IMAGE,
+                ),
+                MediaIntent(
+                    url="https://example.com/fast.jpg",
+                    tweet_id="100",
+                    created_at=datetime(2026, 1, 12, 12, 0, 0),
+                    media_type=MediaType.IMAGE,
+                ),
+            ] + [
+                MediaIntent(
+                    url=f"https://example.com/other{i}.jpg",
+                    tweet_id=str(50 - i),
+                    created_at=datetime(2026, 1, 11, 12, 0, 0),
+                    media_type=MediaType.IMAGE,
+                )
+                for i in range(6)
+            ]
+
+            results = asyncio.run(_download_in_order(downloader, intents, workers=3))
+
+            self.assertEqual([r.media_url for r in results], [i.url for i in intents])
+            self.assertEqual(results[0].status, DownloadStatus.SUCCESS)
+            self.assertEqual(results[1].status, DownloadStatus.SKIPPED_DUPLICATE)
+            self.assertEqual(results[1].existing_file, results[0].file_path)
+            self.assertTrue(all(r.status == DownloadStatus.SUCCESS for r in results[2:]))
+            self.assertGreater(max_in_flight, 1)
+            self.assertLessEqual(max_in_flight, 3)
+
+            images_dir = Path(tmpdir) / "alice" / "images"
+            self.assertEqual(sorted(p.name for p in images_dir.iterdir() if p.name.startswith(".")), [])
+            self.assertEqual(downloader.stats.skipped_duplicate, 1)
+            self.assertEqual(downloader.stats.images_downloaded, 7)
+
+
+
+class TestAccountRunnerIncrementalContinue(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        tmp_path = Path(self._tmp.name)
+        self.store = SettingsStore(path=tmp_path / "data" / "config.json")
+        self.store.save(
+            GlobalSettings(
+                credentials=Credentials(auth_token="a", ct0="b"),
+                download_root=str(tmp_path / "downloads"),
+            )
+        )
+        self.checkpoints = SyncCheckpointStore(directory=tmp_path / "data" / "checkpoints")
+        self.timeline: list[Tweet] = []
+        self.stop_ids: list = []
+        self.fail_urls: set[str] = set()
+        self.start_cursors: list = []
+        self.page_size = None
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def _run(self, kind: str, account_config: dict | None = None) -> None:
+        test = self
+
+        async def fake_iter_pages(self, *, handle: str, max_pages=None, stop_at_tweet_id=None, start_cursor=None):  # noqa: ANN001
+            test.stop_ids.append(stop_at_tweet_id)
+            test.start_cursors.append(start_cursor)
+            tweets = [t for t in test.timeline if stop_at_tweet_id is None or int(t.tweet_id) > stop_at_tweet_id]
+            if test.page_size is None:
+                yield ScrapePage(tweets=tuple(tweets))
+                return
+            # Cursor "p<n>" points below page n of the full timeline.
+            start = int(start_cursor[1:]) * test.page_size if start_cursor else 0
+            for i in range(start, len(tweets), test.page_size):
+                page = tweets[i : i + test.page_size]
+                yield ScrapePage(tweets=tuple(page), bottom_cursor=f"p{(i + test.page_size) // test.page_size}")
+
+        def fake_stream_factory(**kwargs):  # noqa: ANN001, ANN003
+            async def stream(url: str, sink) -> None:  # noqa: ANN001
+                if url in test.fail_urls:
+                    raise ConnectionError("boom")
+                await sink.write(url.encode())
+
+            return stream
+
+        run = Run(
+            run_id=f"r-{kind}",
+            handle="testuser",
+            kind=kind,
+            account_config=dict(account_config or {}),
+            status=TaskStatus.RUNNING,
+            created_at=datetime(2026, 1, 13, 12, 0, 0),
+            updated_at=datetime(2026, 1, 13, 12, 0, 0),
+        )
+        with (
+            patch(
+                "src.backend.pipeline.account_runner.TwscrapeMediaScraper.iter_user_media_pages",
+                new=fake_iter_pages,
+            ),
+            patch(
+                "src.backend.pipeline.account_runner._make_async_stream_download_func",
+                new=fake_stream_factory,
+            ),
+        ):
+            asyncio.run(run_account_pipeline(run=run, store=self.store))
+
+    def test_continue_stops_at_checkpoint_written_by_complete_run(self) -> None:
+        self.timeline = [_media_tweet(300), _media_tweet(200)]
+        self._run("start")
+        self.assertEqual(self.stop_ids, [None])
+        self.assertEqual(self.checkpoints.load("testuser").synced_through_id, 300)
+
+        self.timeline = [_media_tweet(400)] + self.timeline
+        self._run("continue")
+        self.assertEqual(self.stop_ids[-1], 300)
+        self.assertEqual(self.checkpoints.load("testuser").synced_through_id, 400)
+
+        # Nothing new: the checkpoint is kept as is.
+        self._run("continue")
+        self.assertEqual(self.stop_ids[-1], 400)
+        self.assertEqual(self.checkpoints.load("testuser").synced_through_id, 400)
+
+    def test_failed_downloads_do_not_advance_checkpoint(self) -> None:
+        self.timeline = [_media_tweet(300)]
+        self._run("start")
+
+        self.timeline = [_media_tweet(500), _media_tweet(400)] + self.timeline
+        self.fail_urls = {"https://pbs.twimg.com/media/400.jpg"}
+        with self.assertRaisesRegex(RuntimeError, "download failures"):
+            self._run("continue")
+        self.assertEqual(self.checkpoints.load("testuser").synced_through_id, 300)
+
+        self.fail_urls = set()
+        self._run("continue")
+        self.assertEqual(self.stop_ids[-1], 300)
+        self.assertEqual(self.checkpoints.load("testuser").synced_through_id, 500)
+
+    def test_filter_change_or_missing_files_forces_full_walk(self) -> None:
+        self.timeline = [_media_tweet(300)]
+        self._run("start")
+
+        self._run("continue", {"mediaType": "images"})
+        self.assertIsNone(self.stop_ids[-1])
+
+        media_dir = Path(self.store.load().download_root) / "testuser" / "images"
+        for f in media_dir.iterdir():
+            f.unlink()
+        self._run("continue")
+        self.assertIsNone(self.stop_ids[-1])
+
+    def test_start_clears_checkpoint_before_walking(self) -> None:
+        self.timeline = [_media_tweet(300)]
+        self._run("start")
+        self.assertIsNotNone(self.checkpoints.load("testuser"))
+
+        self.timeline = [_media_tweet(400)] + self.timeline
+        self.fail_urls = {"https://pbs.twimg.com/media/400.jpg"}
+        with self.assertRaisesRegex(RuntimeError, "download failures"):
+            self._run("start")
+        self.assertIsNone(self.checkpoints.load("testuser"))
+
+    def test_continue_resumes_interrupted_walk_from_last_complete_page(self) -> None:
+        resume_cursors = ResumeCursorStore(directory=self.checkpoints.directory)
+        self.page_size = 2
+        self.timeline = [_media_tweet(i) for i in range(600, 0, -100)]
+        self.fail_urls = {"https://pbs.twimg.com/media/300.jpg"}
+        with self.assertRaisesRegex(RuntimeError, "download failures"):
+            self._run("start")
+        resume = resume_cursors.load("testuser")
+        self.assertEqual((resume.cursor, resume.pages_done, resume.walk_newest_id), ("p1", 1, 600))
+        self.assertIsNone(self.checkpoints.load("testuser"))
+
+        self.timeline = [_media_tweet(700)] + self.timeline
+        self.fail_urls = set()
+        self._run("continue")
+        # Resumed below page 1, then picked up the new post from the top.
+        self.assertEqual(self.start_cursors[-2:], ["p1", None])
+        self.assertEqual(self.stop_ids[-1], 600)
+        self.assertIsNone(resume_cursors.load("testuser"))
+        self.assertEqual(self.checkpoints.load("testuser").synced_through_id, 700)
+
+    def test_resume_point_is_dropped_after_repeated_failures(self) -> None:
+        resume_cursors = ResumeCursorStore(directory=self.checkpoints.directory)
+        self.page_size = 1
+        self.timeline = [_media_tweet(300), _media_tweet(200)]
+        self.fail_urls = {"https://pbs.twimg.com/media/200.jpg"}
+        with self.assertRaisesRegex(RuntimeError, "download failures"):
+            self._run("start")
+
+        for failures in range(1, MAX_RESUME_FAILURES + 1):
+            with self.assertRaisesRegex(RuntimeError, "download failures"):
+                self._run("continue")
+            self.assertEqual(resume_cursors.load("testuser").failures, failures)
+            self.assertEqual(self.start_cursors[-1], "p1")
+
+        self.fail_urls = set()
+        self._run("continue")
+        self.assertIsNone(self.start_cursors[-1])
+        self.assertEqual(self.checkpoints.load("testuser").synced_through_id, 300)
+
+    def test_start_ignores_resume_point(self) -> None:
+        self.page_size = 1
+        self.timeline = [_media_tweet(300), _media_tweet(200)]
+        self.fail_urls = {"https://pbs.twimg.com/media/200.jpg"}
+        with self.assertRaisesRegex(RuntimeError, "download failures"):
+            self._run("start")
+
+        self.fail_urls = set()
+        self._run("start")
+        self.assertEqual(self.start_cursors[-1:], [None])
+        self.assertEqual(len(self.start_cursors), 2)
+
+
+    def test_refilter_reapplies_config_to_cached_timeline_without_scraping(self) -> None:
+        self.store.set_value(key="timeline_cache", value=True)
+        reply = replace(_media_tweet(200), is_reply=True)
+        self.timeline = [_media_tweet(300), reply]
+        no_replies = {"sourceTypes": {"Original": True, "Reply": False, "Retweet": True, "Quote": True}}
+        self._run("start", no_replies)
+        images_dir = Path(self.store.load().download_root) / "testuser" / "images"
+        self.assertEqual(len(list(images_dir.iterdir())), 1)
+
+        walks = len(self.stop_ids)
+        self._run("refilter")
+        self.assertEqual(len(self.stop_ids), walks, "refilter must not scrape")
+        self.assertEqual(len(list(images_dir.iterdir())), 2)
+        # The cached range now counts as synced for the new config.
+        self._run("continue")
+        self.assertEqual(self.stop_ids[-1], 300)
+
+    def test_incremental_walks_extend_the_cache(self) -> None:
+        caches = TimelineCacheStore(directory=self.checkpoints.directory.parent / "timeline_cache")
+        self.store.set_value(key="timeline_cache", value=True)
+        self.timeline = [_media_tweet(300), _media_tweet(200)]
+        self._run("start")
+        self.timeline = [_media_tweet(400)] + self.timeline
+        self._run("continue")
+
+        cached = caches.load("testuser")
+        self.assertEqual([t.tweet_id for t in cached.tweets], ["400", "300", "200"])
+        self.assertEqual(cached.synced_through_id, 400)
+
+    def test_empty_walk_keeps_the_cache(self) -> None:
+        caches = TimelineCacheStore(directory=self.checkpoints.directory.parent / "timeline_cache")
+        self.store.set_value(key="timeline_cache", value=True)
+        self.timeline = [_media_tweet(300), _media_tweet(200)]
+        self._run("start")
+
+        self.timeline = []
+        self._run("start")
+        cached = caches.load("testuser")
+        self.assertEqual([t.tweet_id for t in cached.tweets], ["300", "200"])
+        self.assertEqual(cached.synced_through_id, 300)
+
+    def test_refilter_without_cache_fails(self) -> None:
+        with self.assertRaisesRegex(RuntimeError, "时间线缓存"):
+            self._run("refilter")
+
+    def test_walks_keep_no_tweets_without_the_cache(self) -> None:
+        self.page_size = 1
+        self.timeline = [_media_tweet(300), _media_tweet(200)]
+        self.fail_urls = {"https://pbs.twimg.com/media/200.jpg"}
+        with patch("src.backend.pipeline.account_runner.TweetBatch", side_effect=AssertionError("tweets kept")):
+            with self.assertRaisesRegex(RuntimeError, "download failures"):
+                self._run("start")
+            self.fail_urls = set()
+            self._run("continue")
+
+        # The resumed walk saw tweets, so it still completes the sync.
+        self.assertEqual(self.checkpoints.load("testuser").synced_through_id, 300)
+
+
+class TestAccountRunnerStreaming(unittest.TestCase):
+    def test_downloads_start_before_timeline_is_fully_scraped(self) -> None:
+        downloaded: list[str] = []
+        scraped_after_first_file: list[bool] = []
+
+        async def fake_iter_pages(self, *, handle: str, max_pages=None, stop_at_tweet_id=None, start_cursor=None):  # noqa: ANN001
+            yield ScrapePage(tweets=(_media_tweet(300), _media_tweet(290)))
+            # Page 2 is only "served" once page 1 media is on disk.
+            deadline = time.monotonic() + 5
+            while not downloaded and time.monotonic() < deadline:
+                await asyncio.sleep(0.01)
+            scraped_after_first_file.append(bool(downloaded))
+            yield ScrapePage(tweets=(_media_tweet(200), _media_tweet(100)))
+
+        def fake_stream_factory(**kwargs):  # noqa: ANN001, ANN003
+            async def stream(url: str, sink) -> None:  # noqa: ANN001
+                await sink.write(url.encode())
+                downloaded.append(url)
+
+            return stream
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp_path = Path(tmpdir)
+            store = SettingsStore(path=tmp_path / "config.json")
+            store.save(
+                GlobalSettings(
+                    credentials=Credentials(auth_token="a", ct0="b"),
+                    download_root=str(tmp_path / "downloads"),
+                    download_workers=1,
+                )
+            )
+            run = Run(
+                run_id="r1",
+                handle="testuser",
+                kind="start",
+                account_config={},
+                status=TaskStatus.RUNNING,
+                created_at=datetime(2026, 1, 13, 12, 0, 0),
+                updated_at=datetime(2026, 1, 13, 12, 0, 0),
+            )
+            with (
+                patch(
+                    "src.backend.pipeline.account_runner.TwscrapeMediaScraper.iter_user_media_pages",
+                    new=fake_iter_pages,
+                ),
+                patch(
+                    "src.backend.pipeline.account_runner._make_async_stream_download_func",
+                    new=fake_stream_factory,
+                ),
+            ):
+                asyncio.run(run_account_pipeline(run=run, store=store))
+
+            self.assertEqual(scraped_after_first_file, [True])
+            self.assertEqual(
+                downloaded,
+                [f"https://pbs.twimg.com/media/{i}.jpg" for i in (300, 290, 200, 100)],
+            )
+            self.assertEqual(run.download_stats["images_downloaded"], 4)
+
+    def test_prefetch_stays_a_bounded_window_ahead(self) -> None:
+        produced = 0
+        max_lead = 0
+
+        async def source():
+            nonlocal produced
+            for i in range(50):
+                produced += 1
+                yield i
+
+        async def consume() -> list[int]:
+            nonlocal max_lead
+            out = []
+            async for item in _prefetch(source(), maxsize=2):
+                await asyncio.sleep(0)
+                max_lead = max(max_lead, produced - len(out))
+                out.append(item)
+            return out
+
+        self.assertEqual(asyncio.run(consume()), list(range(50)))
+        # queue (2) + the item being handed over + the one blocked in put()
+        self.assertLessEqual(max_lead, 4)
+
+    def test_prefetch_reraises_source_errors(self) -> None:
+        async def source():
+            yield 1
+            raise RuntimeError("UserMedia 请求失败")
+
+        async def consume() -> list[int]:
+            out = []
+            async for item in _prefetch(source(), maxsize=2):
+                out.append(item)
+            return out
+
+        with self.assertRaisesRegex(RuntimeError, "UserMedia"):
+            asyncio.run(consume())
+
+
+
+class TestAccountRunnerSkipKnownMedia(unittest.TestCase):
+    def test_rerun_skips_http_for_media_already_on_disk(self) -> None:
+        requested: list[str] = []
+
+        async def fake_iter_pages(self, *, handle: str, max_pages=None, stop_at_tweet_id=None, start_cursor=None):  # noqa: ANN001
+            yield ScrapePage(tweets=(_media_tweet(300), _media_tweet(200)))
+
+        def fake_stream_factory(**kwargs):  # noqa: ANN001, ANN003
+            async def stream(url: str, sink) -> None:  # noqa: ANN001
+                requested.append(url)
+                await sink.write(url.encode())
+
+            return stream
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp_path = Path(tmpdir)
+            store = SettingsStore(path=tmp_path / "config.json")
+            store.save(
+                GlobalSettings(
+                    credentials=Credentials(auth_token="a", ct0="b"),
+                    download_root=str(tmp_path / "downloads"),
+                )
+            )
+
+            def run_once(run_id: str) -> Run:
+                run = Run(
+                    run_id=run_id,
+                    handle="testuser",
+                    kind="start",
+                    account_config={},
+                    status=TaskStatus.RUNNING,
+                    created_at=datetime(2026, 1, 13, 12, 0, 0),
+                    updated_at=datetime(2026, 1, 13, 12, 0, 0),
+                )
+                with (
+                    patch(
+                        "src.backend.pipeline.account_runner.TwscrapeMediaScraper.iter_user_media_pages",
+                        new=fake_iter_pages,
+                    ),
+                    patch(
+                        "src.backend.pipeline.account_runner._make_async_stream_download_func",
+                        new=fake_stream_factory,
+                    ),
+                ):
+                    asyncio.run(run_account_pipeline(run=run, store=store))
+                return run
+
+            run_once("r1")
+            self.assertEqual(len(requested), 2)
+
+            second = run_once("r2")
+            self.assertEqual(len(requested), 2, "已在磁盘上的媒体不应再发起请求")
+            self.assertEqual(second.download_stats["skipped_duplicate"], 2)
+            self.assertEqual(second.download_stats["skipped_without_fetch"], 2)
+
+
+class TestAccountRunnerThrottleLanes(unittest.TestCase):
+    def test_media_downloads_do_not_use_api_throttle(self) -> None:
+        throttles: dict[str, object] = {}
+
+        async def fake_iter_pages(self, *, handle: str, max_pages=None, stop_at_tweet_id=None, start_cursor=None):  # noqa: ANN001
+            throttles["api"] = self._throttle
+            yield ScrapePage(tweets=(_media_tweet(1),))
+
+        def fake_stream_factory(**kwargs):  # noqa: ANN001, ANN003
+            throttles["media"] = kwargs["throttle"]
+
+            async def stream(url: str, sink) -> None:  # noqa: ANN001
+                await sink.write(url.encode())
+
+            return stream
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp_path = Path(tmpdir)
+            store = SettingsStore(path=tmp_path / "config.json")
+            store.save(
+                GlobalSettings(
+                    credentials=Credentials(auth_token="a", ct0="b"),
+                    download_root=str(tmp_path / "downloads"),
+                    throttle=ThrottleConfig(min_interval_s=5.0, jitter_max_s=2.0),
+                )
+            )
+            run = Run(
+                run_id="r1",
+                handle="testuser",
+                kind="start",
+                account_config={},
+                status=TaskStatus.RUNNING,
+                created_at=datetime(2026, 1, 13, 12, 0, 0),
+                updated_at=datetime(2026, 1, 13, 12, 0, 0),
+            )
+            with (
+                patch(
+                    "src.backend.pipeline.account_runner.TwscrapeMediaScraper.iter_user_media_pages",
+                    new=fake_iter_pages,
+                ),
+                patch(
+                    "src.backend.pipeline.account_runner._make_async_stream_download_func",
+                    new=fake_stream_factory,
+                ),
+            ):
+                asyncio.run(run_account_pipeline(run=run, store=store))
+
+        self.assertIsNot(throttles["api"], throttles["media"])
+        self.assertEqual(throttles["api"].config.min_interval_s, 5.0)
+        self.assertEqual(throttles["media"].config.min_interval_s, 0.0)
+        self.assertEqual(throttles["media"].config.jitter_max_s, 0.0)
+
+    def test_media_throttle_is_persisted_separately(self) -> None:
+        settings = GlobalSettings(media_throttle=ThrottleConfig(min_interval_s=0.3, jitter_max_s=0.1))
+
+        loaded = GlobalSettings.from_persist_dict(settings.to_persist_dict())
+
+        self.assertEqual(loaded.get_media_throttle(), settings.media_throttle)
+        self.assertEqual(loaded.get_throttle(), ThrottleConfig())
+
+
 if __name__ == "__main__":
     unittest.main()
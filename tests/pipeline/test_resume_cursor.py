@@ -0,0 +1,130 @@
+import tempfile
+import unittest
+from dataclasses import replace
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from src.backend.downloader.downloader import DownloadResult, DownloadStatus
+from src.backend.fs.storage import MediaType
+from src.backend.pipeline.resume_cursor import ResumeCursor, ResumeCursorStore, WalkProgress
+from src.backend.scraper.twscrape_scraper import ScrapePage
+from src.shared.filter_engine.models import DownloadIntent, MediaKind, Tweet
+
+_T0 = datetime(2026, 1, 13, 12, 0, 0)
+
+
+def _tweet(tweet_id: int) -> Tweet:
+    return Tweet(tweet_id=str(tweet_id), created_at=_T0 + timedelta(seconds=tweet_id))
+
+
+def _intent(tweet_id: int) -> DownloadIntent:
+    created_at = _T0 + timedelta(seconds=tweet_id)
+    return DownloadIntent(
+        media_id=f"m{tweet_id}",
+        kind=MediaKind.IMAGE,
+        url=f"https://pbs.twimg.com/media/{tweet_id}.jpg",
+        width=None,
+        height=None,
+        tweet_id=str(tweet_id),
+        tweet_created_at=created_at,
+        trigger_tweet_id=str(tweet_id),
+        trigger_created_at=created_at,
+        origin="self",
+    )
+
+
+def _result(tweet_id: int, status: DownloadStatus = DownloadStatus.SUCCESS) -> DownloadResult:
+    return DownloadResult(
+        status=status,
+        media_url=f"https://pbs.twimg.com/media/{tweet_id}.jpg",
+        tweet_id=str(tweet_id),
+        created_at=_T0 + timedelta(seconds=tweet_id),
+        media_type=MediaType.IMAGE,
+    )
+
+
+class TestWalkProgress(unittest.TestCase):
+    def _walk(self, pages: list[list[int]], *, pages_done: int = 0) -> WalkProgress:
+        progress = WalkProgress(pages_done=pages_done)
+        for n, ids in enumerate(pages, start=1):
+            progress.on_page(ScrapePage(tweets=tuple(_tweet(i) for i in ids), bottom_cursor=f"c{n}"))
+            for i in ids:
+                progress.on_intent(_intent(i))
+        return progress
+
+    def test_page_completes_once_an_older_trigger_is_committed(self) -> None:
+        progress = self._walk([[600, 500], [400, 300]], pages_done=10)
+
+        self.assertFalse(progress.on_result(_result(600)))
+        self.assertFalse(progress.on_result(_result(500)))
+        self.assertTrue(progress.on_result(_result(400)))
+        self.assertEqual((progress.cursor, progress.pages_done), ("c1", 11))
+
+    def test_failure_keeps_earlier_pages_but_freezes_progress(self) -> None:
+        progress = self._walk([[600], [500], [400]])
+
+        self.assertFalse(progress.on_result(_result(600)))
+        self.assertTrue(progress.on_result(_result(500, DownloadStatus.FAILED)))
+        self.assertFalse(progress.on_result(_result(400)))
+        self.assertEqual((progress.cursor, progress.pages_done), ("c1", 1))
+
+    def test_empty_page_completes_with_the_page_before_it(self) -> None:
+        progress = self._walk([[600], [], [400]])
+
+        progress.on_result(_result(600))
+        self.assertTrue(progress.on_result(_result(400)))
+        self.assertEqual(progress.cursor, "c2")
+
+    def test_empty_first_page_completes_with_the_first_result(self) -> None:
+        progress = self._walk([[], [600], [500]])
+
+        self.assertTrue(progress.on_result(_result(600)))
+        self.assertEqual(progress.cursor, "c1")
+
+    def test_page_is_not_complete_until_every_media_of_its_oldest_tweet_is(self) -> None:
+        progress = WalkProgress()
+        created_at = _T0 + timedelta(seconds=600, milliseconds=123)  # snowflake: millisecond precision
+        progress.on_page(ScrapePage(tweets=(Tweet(tweet_id="600", created_at=created_at),), bottom_cursor="c1"))
+        progress.on_page(ScrapePage(tweets=(_tweet(500),), bottom_cursor="c2"))
+        for _ in range(2):
+            progress.on_intent(replace(_intent(600), trigger_created_at=created_at))
+        progress.on_intent(_intent(500))
+
+        self.assertFalse(progress.on_result(_result(600)))
+        self.assertFalse(progress.on_result(_result(600)))
+        self.assertTrue(progress.on_result(_result(500)))
+        self.assertEqual(progress.cursor, "c1")
+
+
+class TestResumeCursorStore(unittest.TestCase):
+    def test_round_trip_and_clear(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = ResumeCursorStore(directory=Path(tmpdir))
+            self.assertIsNone(store.load("alice"))
+
+            store.save(
+                ResumeCursor(
+                    handle="alice",
+                    cursor="DAABCgAB",
+                    pages_done=3,
+                    walk_newest_id=1879000000000000001,
+                    filter_fingerprint="f",
+                    stop_at_tweet_id=1870000000000000000,
+                )
+            )
+            loaded = store.load("@alice")
+            self.assertEqual(loaded.walk_newest_id, 1879000000000000001)
+            self.assertEqual(loaded.stop_at_tweet_id, 1870000000000000000)
+            self.assertTrue(loaded.updated_at)
+
+            store.clear("alice")
+            self.assertIsNone(store.load("alice"))
+
+    def test_rejects_path_like_handles(self) -> None:
+        store = ResumeCursorStore(directory=Path("unused"))
+        with self.assertRaises(ValueError):
+            store.load("../x")
+
+
+if __name__ == "__main__":
+    unittest.main()
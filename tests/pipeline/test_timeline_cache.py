@@ -0,0 +1,73 @@
+import gzip
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from src.backend.pipeline.timeline_cache import TimelineCacheStore
+from src.shared.filter_engine.models import MediaCandidate, MediaKind, Tweet
+
+
+def _tweet(tweet_id: int, *, quoted: bool = False) -> Tweet:
+    created_at = datetime(2026, 1, 13, 12, 0, 0, tzinfo=timezone.utc) + timedelta(seconds=tweet_id)
+    return Tweet(
+        tweet_id=str(tweet_id),
+        created_at=created_at,
+        quoted_tweet=(_tweet(tweet_id - 1) if quoted else None),
+        media=(
+            MediaCandidate(
+                media_id=f"m{tweet_id}",
+                kind=MediaKind.VIDEO,
+                url=f"https://video.twimg.com/{tweet_id}.mp4",
+                width=1280,
+                height=720,
+            ),
+        ),
+    )
+
+
+class TestTimelineCacheStore(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.store = TimelineCacheStore(directory=Path(self._tmp.name))
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_round_trip_keeps_tweets_newest_first(self) -> None:
+        tweets = [_tweet(100), _tweet(300, quoted=True), _tweet(200)]
+        self.store.replace("@alice", tweets, synced_through_id=300)
+
+        cached = self.store.load("alice")
+        self.assertEqual(cached.synced_through_id, 300)
+        self.assertEqual([t.tweet_id for t in cached.tweets], ["300", "200", "100"])
+        self.assertEqual(cached.tweets[0], tweets[1])
+        with gzip.open(Path(self._tmp.name) / "alice.jsonl.gz", "rt", encoding="utf-8") as f:
+            self.assertEqual(len(f.readlines()), 4)
+
+    def test_extend_refuses_to_leave_a_gap(self) -> None:
+        self.assertFalse(self.store.extend("alice", [_tweet(400)], walked_down_to=300, synced_through_id=400))
+
+        self.store.replace("alice", [_tweet(200)], synced_through_id=200)
+        self.assertFalse(self.store.extend("alice", [_tweet(400)], walked_down_to=300, synced_through_id=400))
+        self.assertEqual(self.store.load("alice").synced_through_id, 200)
+
+        self.assertTrue(self.store.extend("alice", [_tweet(300)], walked_down_to=200, synced_through_id=300))
+        cached = self.store.load("alice")
+        self.assertEqual([t.tweet_id for t in cached.tweets], ["300", "200"])
+        self.assertEqual(cached.synced_through_id, 300)
+
+    def test_exists_until_cleared(self) -> None:
+        self.assertFalse(self.store.exists("alice"))
+        self.store.replace("alice", [_tweet(100)], synced_through_id=100)
+        self.assertTrue(self.store.exists("@alice"))
+        self.store.clear("alice")
+        self.assertFalse(self.store.exists("alice"))
+
+    def test_unreadable_cache_is_ignored(self) -> None:
+        (Path(self._tmp.name) / "alice.jsonl.gz").write_bytes(b"not gzip")
+        self.assertIsNone(self.store.load("alice"))
+
+
+if __name__ == "__main__":
+    unittest.main()
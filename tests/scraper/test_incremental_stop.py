@@ -0,0 +1,34 @@
+import unittest
+from datetime import datetime, timezone
+
+from src.backend.scraper.twscrape_scraper import drop_synced_tweets
+from src.shared.filter_engine.models import Tweet
+
+
+def _tweet(tweet_id: str) -> Tweet:
+    return Tweet(tweet_id=tweet_id, created_at=datetime(2026, 1, 13, tzinfo=timezone.utc))
+
+
+class TestDropSyncedTweets(unittest.TestCase):
+    def test_page_crossing_the_checkpoint_keeps_only_newer_tweets(self) -> None:
+        page = [_tweet("1782199752874246406"), _tweet("1782199752874246400"), _tweet("999")]
+        fresh, reached = drop_synced_tweets(page, 1782199752874246400)
+        self.assertEqual([t.tweet_id for t in fresh], ["1782199752874246406"])
+        self.assertFalse(reached, "页内仍有新推文时应继续翻页")
+
+    def test_page_entirely_at_or_below_checkpoint_stops(self) -> None:
+        fresh, reached = drop_synced_tweets([_tweet("100"), _tweet("90")], 100)
+        self.assertEqual(fresh, [])
+        self.assertTrue(reached)
+
+    def test_ids_compare_numerically_not_lexically(self) -> None:
+        fresh, reached = drop_synced_tweets([_tweet("1000")], 999)
+        self.assertEqual(len(fresh), 1)
+        self.assertFalse(reached)
+
+    def test_empty_page_does_not_count_as_synced(self) -> None:
+        self.assertEqual(drop_synced_tweets([], 100), ([], False))
+
+
+if __name__ == "__main__":
+    unittest.main()
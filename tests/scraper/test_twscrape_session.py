@@ -0,0 +1,275 @@
+import asyncio
+import json
+import sys
+import unittest
+from types import ModuleType, SimpleNamespace
+from unittest.mock import patch
+
+from src.backend.scraper.twscrape_scraper import TwscrapeMediaScraper
+from src.backend.scraper.twscrape_session import TwscrapeSession, TwscrapeSessionRegistry
+from src.backend.scraper.user_id_cache import UserIdCache
+from src.backend.settings.models import Credentials
+
+
+class _FakePool:
+    def __init__(self) -> None:
+        self.accounts: list[str] = []
+
+    async def add_account(self, username, password, email, email_password, *, cookies, user_agent):  # noqa: ANN001
+        self.accounts.append(username)
+
+
+class _FakeAPI:
+    instances: list["_FakeAPI"] = []
+    missing: set[str] = set()
+
+    def __init__(self, *, pool, debug, proxy, raise_when_no_account) -> None:  # noqa: ANN001
+        self.pool = _FakePool()
+        self.logins: list[str] = []
+        type(self).instances.append(self)
+
+    async def user_by_login(self, login: str):  # noqa: ANN201
+        self.logins.append(login)
+        if login in self.missing:
+            return None
+        return SimpleNamespace(id=1000 + len(self.logins))
+
+
+class _FakeQueueClient:
+    instances: list["_FakeQueueClient"] = []
+    pages: dict[str, bytes] = {}  # userId -> response body
+
+    def __init__(self, pool, queue, *, debug, proxy) -> None:  # noqa: ANN001
+        self.queue = queue
+        self.entered = False
+        self.closed = False
+        self.requests: list[dict] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        type(self).instances.append(self)
+
+    async def __aenter__(self) -> "_FakeQueueClient":
+        self.entered = True
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:  # noqa: ANN002
+        self.closed = True
+
+    async def get(self, url: str, params: dict):  # noqa: ANN201
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0)
+        self.in_flight -= 1
+        self.requests.append(params)
+        body = self.pages.get(params["variables"]["userId"], b"{}")
+        return SimpleNamespace(status_code=200, headers={}, content=body)
+
+
+def _fake_twscrape_modules() -> dict[str, ModuleType]:
+    api = ModuleType("twscrape.api")
+    api.OP_UserMedia = "abc/UserMedia"
+    api.GQL_URL = "https://x.com/i/api/graphql"
+    api.GQL_FEATURES = {}
+    queue_client = ModuleType("twscrape.queue_client")
+    queue_client.QueueClient = _FakeQueueClient
+    utils = ModuleType("twscrape.utils")
+    utils.encode_params = lambda params: params
+    return {"twscrape.api": api, "twscrape.queue_client": queue_client, "twscrape.utils": utils}
+
+
+def _creds(token: str = "a") -> Credentials:
+    return Credentials(auth_token=token, ct0="b")
+
+
+def _user_media_variables(user_id: str, cursor: str) -> dict:
+    return {
+        "userId": user_id,
+        "count": 40,
+        "includePromotedContent": False,
+        "withClientEventToken": False,
+        "withBirdwatchNotes": False,
+        "withVoice": True,
+        "withV2Timeline": True,
+        "cursor": cursor,
+    }
+
+
+def _user_page(*results: dict) -> bytes:
+    user = {"data": {"user": {"result": {"__typename": "User", **results[0]}}}} if results else {"data": {"user": {}}}
+    return json.dumps(user).encode()
+
+
+def _media_timeline(tweet_id: str) -> dict:
+    tweet = {
+        "__typename": "Tweet",
+        "rest_id": tweet_id,
+        "legacy": {
+            "created_at": "Mon Apr 22 14:41:30 +0000 2024",
+            "extended_entities": {
+                "media": [
+                    {
+                        "type": "photo",
+                        "id_str": "1",
+                        "media_url_https": "https://pbs.twimg.com/media/a.jpg",
+                        "original_info": {"width": 10, "height": 10},
+                    }
+                ]
+            },
+        },
+    }
+    entry = {
+        "entryId": f"tweet-{tweet_id}",
+        "content": {"itemContent": {"itemType": "TimelineTweet", "tweet_results": {"result": tweet}}},
+    }
+    instructions = [{"type": "TimelineAddEntries", "entries": [entry]}]
+    return {"timeline": {"timeline": {"instructions": instructions}}}
+
+
+def _patch_twscrape(test: unittest.TestCase) -> None:
+    _FakeAPI.instances = []
+    _FakeAPI.missing = set()
+    _FakeQueueClient.instances = []
+    _FakeQueueClient.pages = {}
+    for patcher in (
+        patch(
+            "src.backend.scraper.twscrape_session._import_twscrape",
+            return_value=SimpleNamespace(API=_FakeAPI),
+        ),
+        patch.dict(sys.modules, _fake_twscrape_modules()),
+    ):
+        patcher.start()
+        test.addCleanup(patcher.stop)
+
+
+class TestTwscrapeSession(unittest.TestCase):
+    def setUp(self) -> None:
+        _patch_twscrape(self)
+
+    def test_user_id_is_resolved_once_per_session(self) -> None:
+        calls: list[str] = []
+
+        async def before_request() -> None:
+            calls.append("throttle")
+
+        async def main() -> tuple[int, int]:
+            session = TwscrapeSession(credentials=_creds())
+            first = await session.resolve_user_id("Alice", before_request=before_request)
+            second = await session.resolve_user_id("@alice", before_request=before_request)
+            return first, second
+
+        first, second = asyncio.run(main())
+        self.assertEqual(first, second)
+        self.assertEqual(_FakeAPI.instances[0].logins, ["Alice"])
+        self.assertEqual(calls, ["throttle"], "缓存命中时不应再限流/请求")
+
+    def test_concurrent_walks_share_one_account_and_queue_client(self) -> None:
+        async def walk(session: TwscrapeSession, user_id: int) -> None:
+            for cursor in (None, "p1", "p2"):
+                await session.user_media(user_id, cursor=cursor)
+
+        async def main() -> None:
+            session = TwscrapeSession(credentials=_creds())
+            await asyncio.gather(walk(session, 1), walk(session, 2), walk(session, 3))
+            await walk(session, 4)
+
+        asyncio.run(main())
+        self.assertEqual(len(_FakeAPI.instances), 1)
+        self.assertEqual(_FakeAPI.instances[0].pool.accounts, ["xmc_cookie"])
+        self.assertEqual(len(_FakeQueueClient.instances), 1)
+        client = _FakeQueueClient.instances[0]
+        self.assertEqual((client.queue, client.entered, client.closed), ("UserMedia", True, False))
+        self.assertEqual(len(client.requests), 12)
+        self.assertEqual(client.max_in_flight, 1, "同一账号上的请求应串行")
+        self.assertEqual(client.requests[-1]["variables"], _user_media_variables("4", "p2"))
+
+    def test_reset_releases_account_and_keeps_user_ids(self) -> None:
+        async def main() -> None:
+            session = TwscrapeSession(credentials=_creds())
+            await session.resolve_user_id("alice")
+            await session.user_media(1)
+            await session.reset()
+            await session.resolve_user_id("alice")
+            await session.user_media(1)
+
+        asyncio.run(main())
+        self.assertEqual(len(_FakeAPI.instances), 2)
+        self.assertEqual(_FakeAPI.instances[1].logins, [])
+        self.assertTrue(_FakeQueueClient.instances[0].closed)
+        self.assertFalse(_FakeQueueClient.instances[1].closed)
+
+    def test_cached_user_id_skips_lookup(self) -> None:
+        cache = UserIdCache()
+        cache.put("alice", 7)
+
+        async def main() -> int:
+            return await TwscrapeSession(credentials=_creds(), user_id_cache=cache).resolve_user_id("Alice")
+
+        self.assertEqual(asyncio.run(main()), 7)
+        self.assertEqual(_FakeAPI.instances, [])
+
+    def test_not_found_handle_is_invalidated(self) -> None:
+        cache = UserIdCache(ttl_s=-1)  # cached entry exists but is stale
+        cache.put("gone", 7)
+        _FakeAPI.missing = {"gone"}
+
+        async def main() -> None:
+            await TwscrapeSession(credentials=_creds(), user_id_cache=cache).resolve_user_id("gone")
+
+        with self.assertRaises(RuntimeError):
+            asyncio.run(main())
+        self.assertEqual(cache._load(), {})
+
+
+class TestStaleCachedUserId(unittest.TestCase):
+    def setUp(self) -> None:
+        _patch_twscrape(self)
+        patcher = patch("src.backend.scraper.twscrape_scraper._import_twscrape")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = UserIdCache()
+        self.cache.put("alice", 7)
+
+    def _walk(self) -> list[str]:
+        async def main() -> list[str]:
+            session = TwscrapeSession(credentials=_creds(), user_id_cache=self.cache)
+            scraper = TwscrapeMediaScraper(credentials=_creds(), session=session)
+            return [t.tweet_id async for page in scraper.iter_user_media_pages(handle="alice") for t in page.tweets]
+
+        return asyncio.run(main())
+
+    def test_unavailable_user_is_resolved_again(self) -> None:
+        _FakeQueueClient.pages = {
+            "7": _user_page({"__typename": "UserUnavailable", "reason": "Suspended"}),
+            "1001": _user_page(_media_timeline("500")),
+        }
+        self.assertEqual(self._walk(), ["500"])
+        self.assertEqual(_FakeAPI.instances[0].logins, ["alice"])
+        self.assertEqual(self.cache.get("alice"), 1001)
+
+    def test_user_still_missing_after_lookup_raises(self) -> None:
+        _FakeQueueClient.pages = {"7": _user_page(), "1001": _user_page()}
+        with self.assertRaisesRegex(RuntimeError, "账号不可用"):
+            self._walk()
+        self.assertEqual(_FakeAPI.instances[0].logins, ["alice"])
+
+    def test_deleted_handle_raises_and_drops_the_cached_id(self) -> None:
+        _FakeQueueClient.pages = {"7": _user_page()}
+        _FakeAPI.missing = {"alice"}
+        with self.assertRaisesRegex(RuntimeError, "未找到账号"):
+            self._walk()
+        self.assertIsNone(self.cache.get("alice"))
+
+
+class TestTwscrapeSessionRegistry(unittest.TestCase):
+    def test_session_is_kept_until_credentials_or_proxy_change(self) -> None:
+        registry = TwscrapeSessionRegistry()
+
+        first = registry.get(_creds("a"))
+        self.assertIs(registry.get(_creds("a")), first)
+        self.assertIsNot(registry.get(_creds("a"), "http://127.0.0.1:7890"), first)
+        self.assertIsNot(registry.get(_creds("c")), first)
+        self.assertIs(registry.get(_creds("c")).user_id_cache, first.user_id_cache)
+
+
+if __name__ == "__main__":
+    unittest.main()
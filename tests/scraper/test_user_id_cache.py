@@ -0,0 +1,52 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from src.backend.scraper.user_id_cache import UserIdCache
+
+
+class TestUserIdCache(unittest.TestCase):
+    def test_entries_persist_across_instances(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "user_ids.json"
+            UserIdCache(path=path).put("@Alice", 1782199752874246406)
+
+            cache = UserIdCache(path=path)
+            self.assertEqual(cache.get("alice"), 1782199752874246406)
+            self.assertIsNone(cache.get("bob"))
+            raw = json.loads(path.read_text(encoding="utf-8"))
+            self.assertEqual(raw["handles"]["alice"]["user_id"], "1782199752874246406")
+
+    def test_expired_entries_are_not_served(self) -> None:
+        cache = UserIdCache(ttl_s=60)
+        with patch("src.backend.scraper.user_id_cache.time.time", return_value=1000.0):
+            cache.put("alice", 42)
+        with patch("src.backend.scraper.user_id_cache.time.time", return_value=1059.0):
+            self.assertEqual(cache.get("alice"), 42)
+        with patch("src.backend.scraper.user_id_cache.time.time", return_value=1061.0):
+            self.assertIsNone(cache.get("alice"))
+
+    def test_invalidate_is_persisted(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "user_ids.json"
+            cache = UserIdCache(path=path)
+            cache.put("alice", 42)
+            cache.invalidate("Alice")
+
+            self.assertIsNone(UserIdCache(path=path).get("alice"))
+
+    def test_unreadable_file_is_ignored(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "user_ids.json"
+            path.write_text("{not json", encoding="utf-8")
+            cache = UserIdCache(path=path)
+
+            self.assertIsNone(cache.get("alice"))
+            cache.put("alice", 42)
+            self.assertEqual(UserIdCache(path=path).get("alice"), 42)
+
+
+if __name__ == "__main__":
+    unittest.main()
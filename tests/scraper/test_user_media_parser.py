@@ -1,9 +1,42 @@
+import copy
 import json
 import unittest
+from datetime import datetime, timezone
 from pathlib import Path
 
-from src.backend.scraper.user_media_parser import parse_user_media_tweets
-from src.shared.filter_engine import FilterConfig, apply_filters
+from src.backend.scraper.user_media_parser import (
+    _parse_created_at,
+    _variant_dimensions,
+    extract_bottom_cursor,
+    loads_page,
+    parse_user_media_page,
+    parse_user_media_tweets,
+    snowflake_datetime,
+)
+from src.shared.filter_engine import FilterConfig, MediaKind, TweetBatch, apply_filters
+
+
+_VIDEO_TWEET_ID = "1782199752874246406"
+
+
+def _load_sample() -> dict:
+    repo_root = Path(__file__).resolve().parents[2]
+    sample_path = repo_root / "artifacts" / "samples" / "x_timeline_user_media_sample.json"
+    return json.loads(sample_path.read_text(encoding="utf-8"))
+
+
+def _drop_video_original_info(page: dict) -> dict:
+    broken = copy.deepcopy(page)
+    stack: list = [broken]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            if node.get("type") == "video":
+                node.pop("original_info", None)
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+    return broken
 
 
 class TestUserMediaParser(unittest.TestCase):
@@ -48,6 +81,141 @@ class TestUserMediaParser(unittest.TestCase):
                 continue
             self.assertGreaterEqual(min(intent.width, intent.height), 2000)
 
+    def test_single_pass_page_matches_separate_extractors(self) -> None:
+        repo_root = Path(__file__).resolve().parents[2]
+        sample_path = repo_root / "artifacts" / "samples" / "x_timeline_user_media_sample.json"
+        page = loads_page(sample_path.read_bytes())
+
+        parsed = parse_user_media_page(page)
+        self.assertEqual(parsed.tweets, parse_user_media_tweets(page))
+        self.assertEqual(parsed.bottom_cursor, extract_bottom_cursor(page))
+        self.assertIsNotNone(parsed.bottom_cursor)
+        self.assertGreaterEqual(parsed.tweet_result_count, len(parsed.tweets))
+
+        self.assertEqual(parse_user_media_page({"data": {}}).tweets, [])
+        self.assertIsNone(parse_user_media_page({"data": {}}).bottom_cursor)
+
+    def test_created_at_fast_path_matches_strptime(self) -> None:
+        for raw in ("Mon Apr 22 14:41:30 +0000 2024", "Sat Oct 12 04:05:06 +0000 2024", "Sat Oct 12 04:05:06 +0800 2024"):
+            with self.subTest(raw=raw):
+                expected = datetime.strptime(raw, "%a %b %d %H:%M:%S %z %Y").astimezone(timezone.utc)
+                self.assertEqual(_parse_created_at(raw), expected)
+        self.assertEqual(_parse_created_at("2024-04-22T14:41:30Z"), datetime(2024, 4, 22, 14, 41, 30, tzinfo=timezone.utc))
+
+    def test_unavailable_user_is_flagged(self) -> None:
+        self.assertFalse(parse_user_media_page(_load_sample()).user_unavailable)
+        for page in (
+            {"data": {"user": {}}},
+            {"data": {"user": {"result": {"__typename": "UserUnavailable", "reason": "Suspended"}}}},
+            {"errors": [{"message": "Not found"}]},
+        ):
+            with self.subTest(page=page):
+                parsed = parse_user_media_page(page)
+                self.assertTrue(parsed.user_unavailable)
+                self.assertEqual((parsed.tweets, parsed.bottom_cursor), ([], None))
+
+    def test_missing_created_at_falls_back_to_snowflake_time(self) -> None:
+        repo_root = Path(__file__).resolve().parents[2]
+        sample_path = repo_root / "artifacts" / "samples" / "x_timeline_user_media_sample.json"
+        page = json.loads(sample_path.read_text(encoding="utf-8"))
+
+        broken = copy.deepcopy(page)
+        stack: list = [broken]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, dict):
+                if node.get("rest_id") == "1782199752874246406" and isinstance(node.get("legacy"), dict):
+                    node["legacy"].pop("created_at", None)
+                stack.extend(node.values())
+            elif isinstance(node, list):
+                stack.extend(node)
+
+        target = next(t for t in parse_user_media_tweets(broken) if t.tweet_id == "1782199752874246406")
+        self.assertEqual(target.created_at, snowflake_datetime("1782199752874246406"))
+        self.assertEqual(target.created_at, datetime(2024, 4, 22, 0, 8, 27, 412000, tzinfo=timezone.utc))
+        self.assertIsNone(snowflake_datetime("t_1"))
+
+
+class TestVideoVariants(unittest.TestCase):
+    def _video(self, page: dict):
+        target = next(t for t in parse_user_media_tweets(page) if t.tweet_id == _VIDEO_TWEET_ID)
+        return next(m for m in target.media if m.kind == MediaKind.VIDEO)
+
+    def test_variant_dimensions_come_from_the_url(self) -> None:
+        cases = {
+            "https://video.twimg.com/ext_tw_video/1/pu/vid/avc1/1280x720/a.mp4?tag=12": (1280, 720),
+            "https://video.twimg.com/amplify_video/1/vid/avc1/720x1280/b.mp4": (720, 1280),
+            "https://video.twimg.com/ext_tw_video/1/pu/vid/640x360/c.mp4": (640, 360),
+            "https://video.twimg.com/tweet_video/d.mp4": (None, None),
+            "https://video.twimg.com/ext_tw_video/1/pu/vid/avc1/0x0/e.mp4": (None, None),
+        }
+        for url, expected in cases.items():
+            with self.subTest(url=url):
+                self.assertEqual(_variant_dimensions(url), expected)
+
+    def test_all_mp4_variants_are_kept_with_their_sizes(self) -> None:
+        video = self._video(_load_sample())
+
+        self.assertEqual((video.width, video.height), (1920, 1080), "original_info 仍优先")
+        self.assertEqual(
+            [(v.bitrate, v.width, v.height) for v in video.variants],
+            [(256000, 480, 270), (832000, 640, 360), (2176000, 1280, 720)],
+        )
+
+    def test_missing_original_info_uses_the_chosen_variant_size(self) -> None:
+        video = self._video(_drop_video_original_info(_load_sample()))
+        self.assertIn("/1280x720/", video.url)
+        self.assertEqual((video.width, video.height), (1280, 720))
+
+        # Known size → decided before download, no post-download check.
+        tweets = parse_user_media_tweets(_drop_video_original_info(_load_sample()))
+        result = apply_filters(tweets, FilterConfig(min_short_side=1080))
+        self.assertFalse(any(it.media_id == video.media_id for it in result.intents))
+        self.assertFalse(any(it.needs_post_min_short_side_check for it in result.intents))
+
+    def test_hls_playlist_is_used_only_without_mp4_variants(self) -> None:
+        page = _load_sample()
+        hls_only = copy.deepcopy(page)
+        stack: list = [hls_only]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, dict):
+                if isinstance(node.get("video_info"), dict):
+                    info = node["video_info"]
+                    info["variants"] = [v for v in info["variants"] if v.get("content_type") != "video/mp4"]
+                stack.extend(node.values())
+            elif isinstance(node, list):
+                stack.extend(node)
+
+        self.assertIn(".mp4", self._video(page).url)
+        video = self._video(hls_only)
+        self.assertIn(".m3u8", video.url)
+        self.assertEqual((video.width, video.height), (1920, 1080))
+        self.assertEqual(video.variants, ())
+
+    def test_caps_pick_the_best_variant_within_limits(self) -> None:
+        tweets = parse_user_media_tweets(_load_sample())
+        cases = [
+            (FilterConfig(), "/1280x720/", (1920, 1080)),
+            (FilterConfig(max_video_short_side=360), "/640x360/", (640, 360)),
+            (FilterConfig(max_video_bitrate=300_000), "/480x270/", (480, 270)),
+            (FilterConfig(max_video_short_side=720, max_video_bitrate=1_000_000), "/640x360/", (640, 360)),
+            # Nothing fits: the lowest bitrate variant.
+            (FilterConfig(max_video_short_side=144), "/480x270/", (480, 270)),
+        ]
+        for config, url_part, size in cases:
+            with self.subTest(config=config):
+                for timeline in (tweets, TweetBatch.from_tweets(tweets)):
+                    video = next(it for it in apply_filters(timeline, config).intents if it.kind == MediaKind.VIDEO)
+                    self.assertIn(url_part, video.url)
+                    self.assertEqual((video.width, video.height), size)
+
+    def test_capped_size_takes_part_in_min_short_side(self) -> None:
+        tweets = parse_user_media_tweets(_load_sample())
+        result = apply_filters(tweets, FilterConfig(min_short_side=500, max_video_short_side=360))
+        self.assertFalse(any(it.kind == MediaKind.VIDEO for it in result.intents))
+        self.assertGreater(result.filtered_counts.get("min_short_side", 0), 0)
+
 
 if __name__ == "__main__":
     unittest.main()